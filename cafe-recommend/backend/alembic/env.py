@@ -26,6 +26,10 @@ import app.models.menu
 import app.models.cart
 import app.models.order
 import app.models.payment
+import app.models.sales_rollup
+import app.models.event_log
+import app.models.notification
+import app.models.inventory
 # 모든 모델 모듈을 여기에 임포트
 
 # 로깅 추가: Base.metadata에 어떤 테이블이 있는지 확인
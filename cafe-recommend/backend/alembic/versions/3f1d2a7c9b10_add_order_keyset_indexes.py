@@ -0,0 +1,30 @@
+"""add order keyset pagination indexes
+
+Revision ID: 3f1d2a7c9b10
+Revises: 0b8c5a8ec24e
+Create Date: 2025-06-02 10:12:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.migrations import create_indexes
+from app.models.order import Order
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1d2a7c9b10'
+down_revision: Union[str, None] = '0b8c5a8ec24e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 세션/상태별 주문 목록을 (created_at, id) 순으로 읽기 위한 복합 인덱스 (Order.__table_args__)
+    create_indexes(op.get_bind(), Order.__table__, "ix_orders_session_created", "ix_orders_status_created")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_status_created', table_name='orders')
+    op.drop_index('ix_orders_session_created', table_name='orders')
@@ -0,0 +1,29 @@
+"""index inventory_transactions.order_id for order stock deduction
+
+Revision ID: 5c9e0a7d2b13
+Revises: b3d7f2c61a94
+Create Date: 2025-06-13 09:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.migrations import create_indexes
+from app.models.inventory import InventoryTransaction
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c9e0a7d2b13'
+down_revision: Union[str, None] = 'b3d7f2c61a94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 결제/취소 시 주문별로 이미 반영된 재고 변동 합계를 읽는 조회용 (app/services/stock_deduction.py)
+    create_indexes(op.get_bind(), InventoryTransaction.__table__, "ix_inventory_transactions_order_id")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_inventory_transactions_order_id', table_name='inventory_transactions')
@@ -0,0 +1,28 @@
+"""add orders_fts full-text search index
+
+Revision ID: 7a4e1c2b5d38
+Revises: 3f1d2a7c9b10
+Create Date: 2025-06-04 15:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.crud.order_search import create_order_search_index, drop_order_search_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4e1c2b5d38'
+down_revision: Union[str, None] = '3f1d2a7c9b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # FTS5(trigram) 가상 테이블 + 동기화 트리거 생성 후 기존 주문 색인
+    create_order_search_index(op.get_bind())
+
+
+def downgrade() -> None:
+    drop_order_search_index(op.get_bind())
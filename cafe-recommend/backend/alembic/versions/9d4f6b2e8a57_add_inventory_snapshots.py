@@ -0,0 +1,35 @@
+"""add inventory daily snapshots and ledger (ingredient, created_at) index
+
+Revision ID: 9d4f6b2e8a57
+Revises: 5c9e0a7d2b13
+Create Date: 2025-06-14 11:25:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.migrations import create_indexes, create_tables
+from app.models.inventory import InventorySnapshot, InventoryTransaction
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4f6b2e8a57'
+down_revision: Union[str, None] = '5c9e0a7d2b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # 스냅샷 이후 구간 조회와 재료별 원장 키셋 페이지네이션용
+    create_indexes(bind, InventoryTransaction.__table__, "ix_inventory_transactions_ingredient_created")
+    # 재료 x 날짜 1건 스냅샷 (시점 재고/기간 소비량 조회의 기준점)
+    create_tables(bind, InventorySnapshot.__table__)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_inventory_snapshots_ingredient_taken', table_name='inventory_snapshots')
+    op.drop_index('ix_inventory_snapshots_id', table_name='inventory_snapshots')
+    op.drop_table('inventory_snapshots')
+    op.drop_index('ix_inventory_transactions_ingredient_created', table_name='inventory_transactions')
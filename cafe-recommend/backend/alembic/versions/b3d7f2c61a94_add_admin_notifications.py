@@ -0,0 +1,38 @@
+"""add admin notification store and read cursors
+
+Revision ID: b3d7f2c61a94
+Revises: e81b4d3a7f25
+Create Date: 2025-06-11 15:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.migrations import create_tables
+from app.models.notification import AdminNotification, AdminNotificationCursor, AdminNotificationRead
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d7f2c61a94'
+down_revision: Union[str, None] = 'e81b4d3a7f25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 알림 (type, id) 키셋 인덱스와 dedupe_key 유니크 인덱스, 관리자별 읽음 커서/개별 읽음
+    create_tables(
+        op.get_bind(),
+        AdminNotification.__table__,
+        AdminNotificationCursor.__table__,
+        AdminNotificationRead.__table__,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('admin_notification_reads')
+    op.drop_table('admin_notification_cursors')
+    op.drop_index('ux_admin_notifications_dedupe_key', table_name='admin_notifications')
+    op.drop_index('ix_admin_notifications_type_id', table_name='admin_notifications')
+    op.drop_table('admin_notifications')
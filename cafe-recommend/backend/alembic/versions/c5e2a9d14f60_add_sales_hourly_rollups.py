@@ -0,0 +1,41 @@
+"""add sales hourly rollup tables
+
+Revision ID: c5e2a9d14f60
+Revises: 7a4e1c2b5d38
+Create Date: 2025-06-06 11:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.migrations import create_tables
+from app.models.sales_rollup import SalesHourlyItem, SalesHourlyOrder
+from app.services.sales_rollup import (
+    create_sales_rollup_triggers,
+    drop_sales_rollup_triggers,
+    rebuild_sales_rollups,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e2a9d14f60'
+down_revision: Union[str, None] = '7a4e1c2b5d38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # 시간 x 메뉴 / 시간 단위 매출 집계 테이블
+    create_tables(bind, SalesHourlyOrder.__table__, SalesHourlyItem.__table__)
+    # 집계 트리거 생성 후 기존 주문으로 집계 채우기
+    create_sales_rollup_triggers(bind)
+    rebuild_sales_rollups(bind)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    drop_sales_rollup_triggers(bind)
+    op.drop_table('sales_hourly_items')
+    op.drop_table('sales_hourly_orders')
@@ -0,0 +1,30 @@
+"""add event log for cross-worker event fan-out
+
+Revision ID: e81b4d3a7f25
+Revises: c5e2a9d14f60
+Create Date: 2025-06-09 10:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.migrations import create_tables
+from app.models.event_log import EventLogEntry
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e81b4d3a7f25'
+down_revision: Union[str, None] = 'c5e2a9d14f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 워커 간 이벤트 전달용 로그 테이블 (created_at 인덱스로 보관 기간 정리)
+    create_tables(op.get_bind(), EventLogEntry.__table__)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_event_log_created_at', table_name='event_log')
+    op.drop_table('event_log')
@@ -1,13 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
 from typing import List, Optional, Dict
 from datetime import datetime, timedelta
 
 from app.api.deps import get_db, get_current_active_admin
+from app.crud.pagination import next_cursor, paginate
+from app.db.writer import run_write
 from app.models.admin import Admin
 from app.models.inventory import Ingredient, IngredientStock, MenuIngredient, InventoryTransaction
 from app.models.menu import MenuItem
+from app.services.inventory_ledger import (
+    ADJUSTMENT,
+    OUTFLOW_TYPES,
+    RESTOCK,
+    InsufficientStockError,
+    change_stock,
+    consumption_between,
+    stock_at,
+    stock_delta,
+    take_daily_snapshots,
+)
+from app.services.menu_availability import load_availability_matrix, public as public_availability
+from app.services import stock_levels as stock_levels_service
+from app.services.stock_forecast import stock_forecaster
 from app.schemas.inventory import (
     Ingredient as IngredientSchema,
     IngredientCreate, 
@@ -23,7 +38,10 @@ from app.schemas.inventory import (
     IngredientWithStatus,
     MenuAvailability,
     StockAlert,
-    InventorySummary
+    InventorySummary,
+    StockAtTime,
+    IngredientConsumption,
+    StockForecast
 )
 
 router = APIRouter()
@@ -138,46 +156,23 @@ def get_all_stock(
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(get_current_active_admin)
 ):
-    """모든 재료의 재고 상태를 조회합니다."""
-    # 재료와 재고 정보 조인 쿼리
-    ingredients = db.query(Ingredient).filter(Ingredient.is_active == True).all()
-    
+    """모든 재료의 재고 상태를 조회합니다. (재료 LEFT JOIN 재고 쿼리 한 번)"""
+    statuses = {stock_levels_service.OUT, stock_levels_service.LOW, stock_levels_service.OK}
+    if low_stock_only:
+        statuses &= {stock_levels_service.LOW}
+    if out_of_stock_only:
+        statuses &= {stock_levels_service.OUT}
+    if not statuses:
+        return []
+
     result = []
-    for ingredient in ingredients:
-        stock_info = db.query(IngredientStock).filter(
-            IngredientStock.ingredient_id == ingredient.id
-        ).first()
-        
-        current_qty = 0
-        is_in_stock = False
-        stock_status = "재고 없음"
-        
-        if stock_info:
-            current_qty = stock_info.current_quantity
-            is_in_stock = current_qty > 0
-            
-            if current_qty <= 0:
-                stock_status = "재고 없음"
-            elif current_qty < ingredient.min_stock_level:
-                stock_status = "부족"
-            else:
-                stock_status = "충분"
-        
-        # 필터링 조건 적용
-        if low_stock_only and stock_status != "부족":
-            continue
-        if out_of_stock_only and stock_status != "재고 없음":
-            continue
-        
-        # 결과에 추가
-        item = IngredientWithStatus(
-            **ingredient.__dict__,
-            current_quantity=current_qty,
-            is_in_stock=is_in_stock,
-            stock_status=stock_status
-        )
-        result.append(item)
-    
+    for row in stock_levels_service.stock_levels(db, statuses):
+        status = row.pop("status")
+        result.append(IngredientWithStatus(
+            **row,
+            is_in_stock=row["current_quantity"] > 0,
+            stock_status=stock_levels_service.LABELS[status]
+        ))
     return result
 
 @router.put("/stock/{ingredient_id}", response_model=IngredientStockSchema)
@@ -187,30 +182,39 @@ def update_stock(
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(get_current_active_admin)
 ):
-    """특정 재료의 재고 정보를 업데이트합니다."""
+    """
+    특정 재료의 재고 정보를 업데이트합니다.
+
+    writer 큐에서 재고를 SQL 증감식으로 반영하므로 동시에 처리되는 주문 차감을 덮어쓰지 않습니다.
+    """
     # 재료 존재 여부 확인
     ingredient = db.query(Ingredient).filter(Ingredient.id == ingredient_id).first()
     if not ingredient:
         raise HTTPException(status_code=404, detail="재료를 찾을 수 없습니다")
     
-    # 재고 정보 조회 또는 생성
-    stock = db.query(IngredientStock).filter(IngredientStock.ingredient_id == ingredient_id).first()
-    if not stock:
-        stock = IngredientStock(ingredient_id=ingredient_id, current_quantity=0)
-        db.add(stock)
-    
     # 수정 가능한 필드 업데이트
     update_data = stock_data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(stock, key, value)
+    quantity = update_data.pop("current_quantity", None)
     
     # 재고 입고 기록
-    if "current_quantity" in update_data and "last_restock_quantity" in update_data:
-        stock.last_restock_date = datetime.utcnow()
+    if quantity is not None and "last_restock_quantity" in update_data:
+        update_data["last_restock_date"] = datetime.utcnow()
+    created_by = current_admin.email
+    
+    def update_stock_job(session: Session) -> None:
+        previous, current = change_stock(session, ingredient_id, set_to=quantity, values=update_data)
+        if quantity is not None and current != previous:
+            # 원장만으로 과거 시점 재고를 계산할 수 있도록 직접 수정도 조정 트랜잭션으로 기록
+            session.add(InventoryTransaction(
+                ingredient_id=ingredient_id,
+                transaction_type=ADJUSTMENT,
+                quantity=quantity,
+                notes="재고 직접 수정",
+                created_by=created_by,
+            ))
     
-    db.commit()
-    db.refresh(stock)
-    return stock
+    run_write(update_stock_job, db)
+    return db.query(IngredientStock).filter(IngredientStock.ingredient_id == ingredient_id).first()
 
 @router.post("/transactions", response_model=InventoryTransactionSchema)
 def create_transaction(
@@ -218,57 +222,65 @@ def create_transaction(
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(get_current_active_admin)
 ):
-    """재고 트랜잭션(입고/출고 등)을 기록합니다."""
+    """
+    재고 트랜잭션(입고/출고 등)을 기록합니다.
+
+    트랜잭션 기록과 재고 반영(SQL 증감식)을 하나의 writer 작업으로 처리합니다.
+    """
     # 재료 존재 여부 확인
     ingredient = db.query(Ingredient).filter(Ingredient.id == transaction.ingredient_id).first()
     if not ingredient:
         raise HTTPException(status_code=404, detail="재료를 찾을 수 없습니다")
     
-    # 트랜잭션 생성
-    db_transaction = InventoryTransaction(**transaction.dict())
-    db.add(db_transaction)
-    
-    # 재고 업데이트
-    stock = db.query(IngredientStock).filter(IngredientStock.ingredient_id == transaction.ingredient_id).first()
-    if not stock:
-        stock = IngredientStock(
-            ingredient_id=transaction.ingredient_id,
-            current_quantity=0
-        )
-        db.add(stock)
-    
-    # 트랜잭션 유형에 따라 재고 수량 조정
-    if transaction.transaction_type == "입고":
-        stock.current_quantity += transaction.quantity
-        stock.last_restock_date = datetime.utcnow()
-        stock.last_restock_quantity = transaction.quantity
-    elif transaction.transaction_type == "출고":
-        if stock.current_quantity < transaction.quantity:
-            raise HTTPException(status_code=400, detail="재고가 부족합니다")
-        stock.current_quantity -= transaction.quantity
-    elif transaction.transaction_type == "폐기":
-        if stock.current_quantity < transaction.quantity:
-            raise HTTPException(status_code=400, detail="재고가 부족합니다")
-        stock.current_quantity -= transaction.quantity
-    elif transaction.transaction_type == "조정":
-        stock.current_quantity = transaction.quantity
-    
-    db.commit()
-    db.refresh(db_transaction)
-    return db_transaction
+    ingredient_id = transaction.ingredient_id
+    transaction_type = transaction.transaction_type
+    quantity = transaction.quantity
+    
+    def create_transaction_job(session: Session) -> int:
+        # 트랜잭션 유형에 따라 재고 수량 조정 (재고 행이 없으면 생성)
+        if transaction_type == RESTOCK:
+            change_stock(session, ingredient_id, stock_delta(transaction_type, quantity), values={
+                "last_restock_date": datetime.utcnow(),
+                "last_restock_quantity": quantity,
+            })
+        elif transaction_type in OUTFLOW_TYPES:
+            change_stock(session, ingredient_id, stock_delta(transaction_type, quantity), require_available=True)
+        elif transaction_type == ADJUSTMENT:
+            change_stock(session, ingredient_id, set_to=quantity)
+        else:
+            change_stock(session, ingredient_id)
+        
+        # 트랜잭션 생성
+        db_transaction = InventoryTransaction(**transaction.dict())
+        session.add(db_transaction)
+        session.flush()
+        return db_transaction.id
+    
+    try:
+        transaction_id = run_write(create_transaction_job, db)
+    except InsufficientStockError:
+        raise HTTPException(status_code=400, detail="재고가 부족합니다")
+    return db.query(InventoryTransaction).filter(InventoryTransaction.id == transaction_id).first()
 
 @router.get("/transactions", response_model=List[InventoryTransactionSchema])
 def get_transactions(
+    response: Response,
     ingredient_id: Optional[int] = None,
     transaction_type: Optional[str] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값 (키셋 페이지네이션)"),
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(get_current_active_admin)
 ):
-    """재고 트랜잭션 내역을 조회합니다."""
+    """
+    재고 트랜잭션 내역을 최신순으로 조회합니다.
+
+    다음 페이지 커서는 X-Next-Cursor 헤더로 반환하며, 커서를 넘기면 OFFSET 없이 마지막 행 다음부터 읽습니다.
+    (ingredient_id 로 거르면 (ingredient_id, created_at) 인덱스를 사용하고, 거르지 않으면 전체 원장을 정렬함)
+    """
     query = db.query(InventoryTransaction)
     
     # 필터 적용
@@ -281,12 +293,67 @@ def get_transactions(
     if end_date:
         query = query.filter(InventoryTransaction.created_at <= end_date)
     
-    # 최신순 정렬
-    query = query.order_by(InventoryTransaction.created_at.desc())
-    
-    transactions = query.offset(skip).limit(limit).all()
+    # 최신순 정렬 (created_at, id)
+    try:
+        transactions = paginate(query, InventoryTransaction, skip=skip, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="잘못된 커서입니다")
+    next_page = next_cursor(transactions, limit)
+    if next_page:
+        response.headers["X-Next-Cursor"] = next_page
     return transactions
 
+@router.get("/ledger/{ingredient_id}/stock", response_model=StockAtTime)
+def get_stock_at(
+    ingredient_id: int = Path(..., title="재료 ID"),
+    at: datetime = Query(..., description="조회 시점 (UTC)"),
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_active_admin)
+):
+    """특정 시점의 재고량을 가장 가까운 일일 스냅샷과 이후 트랜잭션으로 계산합니다."""
+    result = stock_at(db, ingredient_id, at)
+    if result is None:
+        raise HTTPException(status_code=404, detail="해당 시점 이전의 재고 스냅샷이 없습니다")
+    return StockAtTime(ingredient_id=ingredient_id, at=at, **result)
+
+@router.get("/ledger/{ingredient_id}/consumption", response_model=IngredientConsumption)
+def get_consumption(
+    ingredient_id: int = Path(..., title="재료 ID"),
+    start: datetime = Query(..., description="시작 시점 (UTC, 미포함)"),
+    end: datetime = Query(..., description="종료 시점 (UTC, 포함)"),
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_active_admin)
+):
+    """기간 내 재료 소비량(출고, 폐기, 주문 차감)을 누적 소비량 스냅샷으로 계산합니다."""
+    if end < start:
+        raise HTTPException(status_code=400, detail="종료 시점이 시작 시점보다 빠릅니다")
+    consumed = consumption_between(db, ingredient_id, start, end)
+    return IngredientConsumption(ingredient_id=ingredient_id, start=start, end=end, consumed=consumed)
+
+@router.post("/ledger/snapshots")
+def create_snapshots(
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_active_admin)
+):
+    """현재 재고로 오늘 스냅샷을 만들거나 갱신합니다. (평소에는 주기 작업이 자동 생성)"""
+    count = run_write(take_daily_snapshots, db)
+    return {"status": "success", "snapshots": count}
+
+@router.get("/forecast", response_model=List[StockForecast])
+def get_stock_forecast(
+    needs_reorder: Optional[bool] = Query(None, description="발주가 필요한 재료만 조회"),
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_active_admin)
+):
+    """재료별 소비 속도(요일/시간대 계절성 반영)로 예상 소진 시각과 동적 발주점을 계산합니다."""
+    forecasts = sorted(
+        stock_forecaster.forecast(db).values(),
+        key=lambda f: (f["hours_until_stockout"] is None, f["hours_until_stockout"] or 0),
+    )
+    if needs_reorder is not None:
+        forecasts = [f for f in forecasts if f["needs_reorder"] == needs_reorder]
+    return forecasts
+
 # 메뉴-재료 관계 관리 API
 @router.post("/menu-ingredients", response_model=MenuIngredientSchema)
 def add_ingredient_to_menu(
@@ -379,54 +446,51 @@ def get_inventory_dashboard(
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(get_current_active_admin)
 ):
-    """재고 대시보드 요약 정보를 제공합니다."""
-    # 전체 재료 수
-    total_ingredients = db.query(func.count(Ingredient.id)).filter(Ingredient.is_active == True).scalar() or 0
-    
-    # 재고 경고 목록
-    alerts = []
-    ingredients = db.query(Ingredient).filter(Ingredient.is_active == True).all()
-    
-    out_of_stock_count = 0
-    low_stock_count = 0
-    total_stock_value = 0
-    
-    for ingredient in ingredients:
-        stock = db.query(IngredientStock).filter(IngredientStock.ingredient_id == ingredient.id).first()
-        
-        if not stock or stock.current_quantity <= 0:
-            out_of_stock_count += 1
-            alerts.append(StockAlert(
-                ingredient_id=ingredient.id,
-                ingredient_name=ingredient.name,
-                current_quantity=0 if not stock else stock.current_quantity,
-                min_stock_level=ingredient.min_stock_level,
-                unit=ingredient.unit,
-                status="재고 없음"
-            ))
-        elif stock.current_quantity < ingredient.min_stock_level:
-            low_stock_count += 1
+    """재고 대시보드 요약 정보를 제공합니다. (상태별 개수와 경고 행을 쿼리 한 번으로 계산)"""
+    overview = stock_levels_service.stock_overview(db)
+    forecasts = stock_forecaster.forecast(db)
+
+    # 재고 경고 목록: 재고 없음/부족
+    alerts = [
+        StockAlert(
+            ingredient_id=row["id"],
+            ingredient_name=row["name"],
+            current_quantity=row["current_quantity"],
+            min_stock_level=row["min_stock_level"],
+            unit=row["unit"],
+            status=stock_levels_service.LABELS[row["status"]],
+            **_forecast_fields(forecasts, row["id"])
+        )
+        for row in overview["alerts"]
+    ]
+    # 최소 재고 이상이지만 리드타임 안에 소진될 것으로 예측되는 재료
+    alerted = {row["id"] for row in overview["alerts"]}
+    for ingredient_id, forecast in forecasts.items():
+        if forecast["needs_reorder"] and ingredient_id not in alerted:
             alerts.append(StockAlert(
-                ingredient_id=ingredient.id,
-                ingredient_name=ingredient.name,
-                current_quantity=stock.current_quantity,
-                min_stock_level=ingredient.min_stock_level,
-                unit=ingredient.unit,
-                status="부족"
+                ingredient_id=ingredient_id,
+                ingredient_name=forecast["ingredient_name"],
+                current_quantity=forecast["current_quantity"],
+                min_stock_level=forecast["min_stock_level"],
+                unit=forecast["unit"],
+                status="발주 필요",
+                **_forecast_fields(forecasts, ingredient_id)
             ))
-        
-        # 재고 가치 계산 (임시 계산)
-        if stock:
-            total_stock_value += stock.current_quantity  # 실제로는 단가 등을 고려해야 함
-    
+
     return InventorySummary(
-        total_ingredients=total_ingredients,
-        out_of_stock_count=out_of_stock_count,
-        low_stock_count=low_stock_count,
-        total_stock_value=total_stock_value,
+        total_ingredients=overview["total"],
+        out_of_stock_count=overview["counts"][stock_levels_service.OUT],
+        low_stock_count=overview["counts"][stock_levels_service.LOW],
+        total_stock_value=overview["total_quantity"],  # 실제로는 단가 등을 고려해야 함
         stock_alerts=alerts
     )
 
+def _forecast_fields(forecasts: Dict[int, Dict], ingredient_id: int) -> Dict:
+    forecast = forecasts.get(ingredient_id)
+    if not forecast:
+        return {}
+    return {"reorder_point": forecast["reorder_point"], "predicted_stockout_at": forecast["predicted_stockout_at"]}
+
 @router.get("/menu/{menu_id}/availability", response_model=MenuAvailability)
 def check_menu_availability(
     menu_id: int = Path(..., title="메뉴 ID"),
@@ -434,41 +498,7 @@ def check_menu_availability(
     current_admin: Admin = Depends(get_current_active_admin)
 ):
     """특정 메뉴의 재고 가용성을 확인합니다."""
-    # 메뉴 존재 여부 확인
-    menu = db.query(MenuItem).filter(MenuItem.id == menu_id).first()
-    if not menu:
+    result = load_availability_matrix(db, menu_ids=[menu_id], active_only=False).evaluate()
+    if menu_id not in result:
         raise HTTPException(status_code=404, detail="메뉴를 찾을 수 없습니다")
-    
-    # 메뉴에 필요한 재료 조회
-    menu_ingredients = db.query(MenuIngredient).filter(
-        MenuIngredient.menu_id == menu_id
-    ).all()
-    
-    if not menu_ingredients:
-        # 메뉴에 등록된 재료가 없으면 항상 가용
-        return MenuAvailability(
-            menu_id=menu_id,
-            is_available=True,
-            unavailable_ingredients=[],
-            low_stock_ingredients=[]
-        )
-    
-    unavailable = []
-    low_stock = []
-    
-    for mi in menu_ingredients:
-        ingredient = db.query(Ingredient).filter(Ingredient.id == mi.ingredient_id).first()
-        stock = db.query(IngredientStock).filter(IngredientStock.ingredient_id == mi.ingredient_id).first()
-        
-        if not stock or stock.current_quantity < mi.quantity_required:
-            if not mi.is_optional:  # 필수 재료만 가용성에 영향
-                unavailable.append(ingredient.name)
-        elif stock.current_quantity < ingredient.min_stock_level:
-            low_stock.append(ingredient.name)
-    
-    return MenuAvailability(
-        menu_id=menu_id,
-        is_available=len(unavailable) == 0,
-        unavailable_ingredients=unavailable,
-        low_stock_ingredients=low_stock
-    ) 
\ No newline at end of file
+    return public_availability(result[menu_id]) 
\ No newline at end of file
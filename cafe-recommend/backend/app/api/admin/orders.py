@@ -1,16 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Tuple
 from app.database import get_db
 from app.models.order import Order, OrderItem
+from app.models.menu import MenuItem
 from app.schemas.order import AdminOrderResponse, AdminOrderItemResponse, OrderItemStatusUpdate, OrderStatusUpdate
 from app.api.deps import get_current_active_admin, get_db
 from app.models.admin import Admin
 import logging
 import httpx
 from app.core.config import settings
+from app.crud.pagination import cached_total, next_cursor, paginate
+from app.crud.order import search_orders as crud_search_orders
+from app.crud.order_stream import stream_orders_json_array, stream_orders_ndjson
 from app.routers.payment import cancel_naver_payment, cancel_kakao_payment
-from app.api.admin.realtime import broadcast_order_event
+from app.api.admin.realtime import broadcast_order_event, manager
+from app.core.events import ORDER_CREATED, ORDER_ITEM_STATUS_CHANGED, ORDER_STATUS_CHANGED, event_bus
+from app.db.session import SessionLocal
 import asyncio
 from datetime import datetime, timedelta
 
@@ -81,42 +89,87 @@ async def call_kakaopay_cancel_api(tid: str, cancel_amount: int, cancel_tax_free
         logging.exception(f"카카오페이 취소 API 호출 중 예외 발생: {str(e)}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="카카오페이 통신 중 알 수 없는 오류가 발생했습니다.")
 
+def build_order_filters(
+    start_date: Optional[str],
+    end_date: Optional[str],
+    status_filter: Optional[str],
+) -> Tuple[list, List[str]]:
+    """관리자 주문 목록 조회 조건(날짜 범위, 상태 목록)을 SQLAlchemy 필터로 변환"""
+    filters = []
+    
+    if start_date:
+        try:
+            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d")
+            filters.append(Order.created_at >= start_date_obj)
+            if end_date:
+                end_date_obj = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1) - timedelta(seconds=1)
+                filters.append(Order.created_at <= end_date_obj)
+            else:
+                end_date_obj = start_date_obj + timedelta(days=1) - timedelta(seconds=1)
+                filters.append(Order.created_at <= end_date_obj)
+        except ValueError as e:
+            logging.warning(f"날짜 파싱 오류: {e}")
+    
+    statuses = []
+    if status_filter:
+        statuses = [s.strip() for s in status_filter.split(',') if s.strip()]
+        if statuses:
+            filters.append(Order.status.in_(statuses))
+    
+    return filters, statuses
+
 @router.get("/orders", response_model=List[AdminOrderResponse])
 async def get_all_orders(
+    response: Response,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     status_filter: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="페이지 크기 (생략 시 전체 조회)"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값 (키셋 페이지네이션)"),
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(get_current_active_admin)
 ):
-    """모든 주문 목록을 조회합니다. (관리자 전용)"""
+    """
+    모든 주문 목록을 조회합니다. (관리자 전용)
+
+    limit 또는 cursor를 지정하면 페이지 단위로 조회하며, 다음 페이지 커서는
+    X-Next-Cursor, 전체 건수(짧게 캐싱된 값)는 X-Total-Count 헤더로 반환합니다.
+    전체 이력을 내려받을 때는 메모리를 일정하게 유지하는 /orders/stream 을 사용하세요.
+    """
     try:
+        filters, statuses = build_order_filters(start_date, end_date, status_filter)
+
+        # 목록에 필요한 컬럼만 읽고, 항목/메뉴는 JOIN 대신 IN 쿼리로 묶어서 로딩
         query = db.query(Order).options(
-            joinedload(Order.order_items).joinedload(OrderItem.menu)
-        )
-        
-        if start_date:
-            try:
-                start_date_obj = datetime.strptime(start_date, "%Y-%m-%d")
-                query = query.filter(Order.created_at >= start_date_obj)
-                if end_date:
-                    end_date_obj = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1) - timedelta(seconds=1)
-                    query = query.filter(Order.created_at <= end_date_obj)
-                else:
-                    end_date_obj = start_date_obj + timedelta(days=1) - timedelta(seconds=1)
-                    query = query.filter(Order.created_at <= end_date_obj)
-            except ValueError as e:
-                logging.warning(f"날짜 파싱 오류: {e}")
-        
-        if status_filter:
-            statuses = [s.strip() for s in status_filter.split(',') if s.strip()]
-            if statuses:
-                query = query.filter(Order.status.in_(statuses))
+            load_only(Order.id, Order.order_number, Order.total_amount, Order.status,
+                      Order.payment_method, Order.created_at),
+            selectinload(Order.order_items).selectinload(OrderItem.menu).load_only(MenuItem.name)
+        ).filter(*filters)
+
+        if limit is None and cursor is None:
+            # 기존 동작 유지: 조건에 맞는 주문 전체 반환
+            orders = query.order_by(Order.created_at.desc(), Order.id.desc()).all()
+            return [serialize_order(order) for order in orders]
 
-        query = query.order_by(Order.created_at.desc())
-        orders = query.all()
+        page_size = limit or 50
+        try:
+            orders = paginate(query, Order, skip=skip, limit=page_size, cursor=cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="잘못된 커서입니다.")
+
+        total = cached_total(
+            db.query(func.count(Order.id)).filter(*filters),
+            "order_count:admin", start_date, end_date, sorted(statuses)
+        )
+        response.headers["X-Total-Count"] = str(total)
+        next_page = next_cursor(orders, page_size)
+        if next_page:
+            response.headers["X-Next-Cursor"] = next_page
         
         return [serialize_order(order) for order in orders]
+    except HTTPException:
+        raise
     except Exception as e:
         logging.exception(f"관리자 주문 목록 조회 중 오류 발생: {str(e)}")
         raise HTTPException(
@@ -124,6 +177,66 @@ async def get_all_orders(
             detail="서버 내부 오류가 발생했습니다."
         )
 
+@router.get("/orders/stream")
+def stream_all_orders(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    status_filter: Optional[str] = None,
+    format: str = Query("ndjson", pattern="^(ndjson|json)$", description="ndjson 또는 json(배열)"),
+    chunk_size: int = Query(500, ge=10, le=5000),
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_active_admin)
+):
+    """
+    조건에 맞는 주문 전체를 스트리밍으로 내려받습니다. (관리자 전용)
+
+    DB 커서에서 chunk_size 단위로 읽어 바로 직렬화하여 보내므로,
+    주문 수와 관계없이 서버 메모리 사용량이 일정합니다.
+    """
+    filters, _ = build_order_filters(start_date, end_date, status_filter)
+    # 요청 세션은 응답 스트리밍 도중 닫힐 수 있으므로 같은 엔진으로 전용 세션을 연다
+    bind = db.get_bind()
+
+    def generate():
+        with Session(bind=bind) as stream_db:
+            if format == "json":
+                yield from stream_orders_json_array(stream_db, filters, chunk_size)
+            else:
+                yield from stream_orders_ndjson(stream_db, filters, chunk_size)
+
+    media_type = "application/json" if format == "json" else "application/x-ndjson"
+    return StreamingResponse(generate(), media_type=media_type)
+
+@router.get("/orders/search", response_model=List[AdminOrderResponse])
+async def search_admin_orders(
+    response: Response,
+    q: str = Query(..., min_length=1, description="주문번호, 전화번호(뒷자리 가능), 배달 주소"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값 (최신순 페이지네이션)"),
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_active_admin)
+):
+    """
+    주문을 검색합니다. (관리자 전용)
+
+    orders_fts 전문 검색 인덱스를 사용하며, 결과가 한 페이지(limit)에 모두 들어가면 관련도순으로 정렬됩니다.
+    그보다 많으면 첫 페이지부터 최신순으로 정렬하고 X-Next-Cursor 헤더로 다음 페이지 커서를 반환합니다.
+    전체 건수는 X-Total-Count 헤더로 반환합니다.
+    """
+    try:
+        orders, total = crud_search_orders(db, search_term=q, skip=skip, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="잘못된 커서입니다.")
+
+    response.headers["X-Total-Count"] = str(total)
+    # 관련도순(결과가 한 페이지 이하)일 때는 다음 페이지가 없음
+    if cursor is not None or total > limit:
+        next_page = next_cursor(orders, limit)
+        if next_page:
+            response.headers["X-Next-Cursor"] = next_page
+    return [serialize_order(order) for order in orders]
+
 @router.get("/orders/{order_id}", response_model=AdminOrderResponse)
 async def get_order_by_id(
     order_id: int,
@@ -238,10 +351,8 @@ async def update_order_item_status(
         db.refresh(order_item)
         db.refresh(order) # order 객체도 refresh
 
-        # 주문 상태 변경 이벤트 브로드캐스트
-        updated_order_data = serialize_order(order) # 전체 주문 정보 사용
-        asyncio.create_task(broadcast_order_event(event_type="order_update", order_data=updated_order_data))
-        logging.info(f"주문 항목 상태 업데이트 완료 및 이벤트 브로드캐스트: Order ID={order.id}, Item ID={item_id}")
+        # 주문 상태 변경 이벤트는 커밋 시 이벤트 버스로 발행되어 push_order_event 가 브로드캐스트
+        logging.info(f"주문 항목 상태 업데이트 완료: Order ID={order.id}, Item ID={item_id}")
 
         return serialize_order(order)
     except HTTPException:
@@ -345,10 +456,8 @@ async def update_order_status(
     db.commit()
     db.refresh(order)
     
-    # 주문 상태 변경 이벤트 브로드캐스트
-    updated_order_data = serialize_order(order)
-    asyncio.create_task(broadcast_order_event(event_type="order_update", order_data=updated_order_data))
-    logging.info(f"주문 전체 상태 업데이트 완료 및 이벤트 브로드캐스트: Order ID={order.id}")
+    # 주문 상태 변경 이벤트는 커밋 시 이벤트 버스로 발행되어 push_order_event 가 브로드캐스트
+    logging.info(f"주문 전체 상태 업데이트 완료: Order ID={order.id}")
     
     return serialize_order(order)
 
@@ -381,4 +490,34 @@ def serialize_order(order: Order) -> AdminOrderResponse:
         payment_method=order.payment_method,
         created_at=order.created_at,
         order_number=order_number
-    ) 
\ No newline at end of file
+    ) 
+
+
+# --- 이벤트 버스 구독: 커밋된 주문 생성/상태 변경을 관리자 WebSocket/SSE 로 푸시 ---
+
+_PUSHED_TOPICS = {
+    ORDER_CREATED: "new_order",
+    ORDER_STATUS_CHANGED: "order_update",
+    ORDER_ITEM_STATUS_CHANGED: "order_update",
+}
+
+
+def _load_serialized_order(order_id: int) -> Optional[dict]:
+    with SessionLocal() as db:
+        order = db.query(Order).options(
+            selectinload(Order.order_items).selectinload(OrderItem.menu).load_only(MenuItem.name)
+        ).filter(Order.id == order_id).first()
+        return serialize_order(order).model_dump(mode="json") if order else None
+
+
+async def push_order_event(event: dict) -> None:
+    event_type = _PUSHED_TOPICS.get(event["topic"])
+    if event_type is None or not manager.has_clients():
+        return
+    # 구독자 수와 관계없이 이벤트당 한 번만 조회/직렬화
+    order_data = await asyncio.to_thread(_load_serialized_order, event["data"]["order_id"])
+    if order_data is not None:
+        await broadcast_order_event(event_type=event_type, order_data=order_data)
+
+
+event_bus.subscribe("order.*", push_order_event)
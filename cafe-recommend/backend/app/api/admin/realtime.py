@@ -1,73 +1,108 @@
 from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, HTTPException, Request, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func, extract
-from typing import List, Dict, Any, AsyncGenerator
+from typing import List, Dict, Any, AsyncGenerator, Optional, Tuple, Union
 from datetime import datetime, timedelta
 import asyncio
 import json
-from sse_starlette.sse import EventSourceResponse
-from app.api.deps import get_current_admin_ws, get_current_admin_sse
-import sqlite3
-from app.core.config import settings as app_settings
+import logging
+import time
+from sse_starlette.sse import EventSourceResponse, ServerSentEvent
+from app.api.deps import get_current_active_admin, get_current_admin_ws, get_current_admin_sse
+from app.core.broadcast import Broadcaster, ClientChannel, ReplayBuffer
+from app.core.config import settings
+from app.core.wire import WireMessage, accept_websocket, field_table
+from app.services.realtime_sales import sales_snapshot_poller
 
 from app.models.order import Order, OrderItem
 from app.models.admin import Admin
+from app.routers.admin.notifications import notification_clients
+from app.services.order_status_push import order_status_hub
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# 마지막 SSE 클라이언트가 끊긴 뒤에도 재연결 시 재전송할 수 있도록 이벤트를 계속 기록하는 시간(초)
+SSE_RESUME_GRACE_SECONDS = 300
 
 # 연결된 WebSocket 및 SSE 클라이언트 관리를 위한 클래스
+# 메시지는 한 번만 JSON 직렬화해 클라이언트별 bounded 큐에 넣고, 전송은 클라이언트별 태스크가 담당
+# (느린 클라이언트는 REALTIME_SLOW_CONSUMER_POLICY 에 따라 오래된 메시지를 버리거나 연결을 끊음)
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.sse_event_queues: List[asyncio.Queue] = [] # SSE 클라이언트용 이벤트 큐
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+    def __init__(self, websockets: Broadcaster, sse: Broadcaster, sse_replay: ReplayBuffer):
+        # WebSocket 은 실시간 매출 poller 와 같은 큐를 사용 (연결당 전송 태스크 하나)
+        self.websockets = websockets
+        self.sse = sse
+        # SSE 이벤트 ID 발급 + 재연결(Last-Event-ID) 시 놓친 이벤트 재전송
+        self.sse_replay = sse_replay
+        self.sse_last_disconnect = float("-inf")
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self.websockets.channels)
+
+    def has_clients(self) -> bool:
+        """브로드캐스트할 대상이 있는지 (최근 끊긴 SSE 클라이언트의 재연결 대비 포함)"""
+        if len(self.websockets) or len(self.sse):
+            return True
+        return time.monotonic() - self.sse_last_disconnect < SSE_RESUME_GRACE_SECONDS
+
+    async def connect(self, websocket: WebSocket) -> str:
+        """연결 수락 (서브프로토콜로 JSON/MessagePack 협상), 협상된 인코딩 반환"""
+        return await accept_websocket(websocket)
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-            print(f"WebSocket client disconnected: {websocket.client}")
+        if websocket in self.websockets:
+            self.websockets.remove(websocket)
+            logger.info(f"WebSocket client disconnected: {websocket.client}")
 
     async def send_personal_message(self, message: Dict, websocket: WebSocket):
         try:
             await websocket.send_json(message)
         except Exception as e:
-            print(f"Error sending personal message to {websocket.client}: {e}")
-            # self.disconnect(websocket) # 메시지 전송 실패 시 연결 끊기 고려
-
-    async def broadcast_to_websockets(self, message: Dict):
-        # WebSocket 브로드캐스트 시에는 JSON 직렬화된 문자열이 아닌 dict를 그대로 전송
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                print(f"Error broadcasting to WebSocket {connection.client}: {e}")
-                # self.disconnect(connection) # 브로드캐스트 실패 시 해당 연결 끊기 고려
-
-    # SSE 관련 메서드
-    async def add_sse_client(self, queue: asyncio.Queue):
-        self.sse_event_queues.append(queue)
-        print(f"SSE client added. Total SSE clients: {len(self.sse_event_queues)}")
-
-    def remove_sse_client(self, queue: asyncio.Queue):
-        if queue in self.sse_event_queues:
-            self.sse_event_queues.remove(queue)
-            print(f"SSE client removed. Total SSE clients: {len(self.sse_event_queues)}")
-
-    async def broadcast_to_sse(self, event_data: Dict):
-        # SSE에는 "event: <event_name>\ndata: <json_string>\n\n" 형식으로 보내야 함
-        # 여기서는 event_data가 이미 {'event': '...', 'data': {...}} 형태의 dict라고 가정하고
-        # order_event_generator에서 json.dumps로 한번만 직렬화함.
-        message_str = json.dumps(event_data) # 전체를 JSON 문자열로 만듦
-        for queue in self.sse_event_queues:
-            try:
-                await queue.put(message_str) # generator에서 yield 할 문자열을 큐에 넣음
-            except Exception as e:
-                print(f"Error putting message to SSE queue: {e}")
-
-manager = ConnectionManager()
+            logger.warning(f"Error sending personal message to {websocket.client}: {e}")
+
+    async def broadcast_to_websockets(self, message: Dict) -> int:
+        return self.websockets.broadcast(WireMessage(message))
+
+    # SSE 관련 메서드 (SSE 제너레이터가 자신의 큐에서 직접 꺼냄)
+    def add_sse_client(self, key: Any, last_event_id: Optional[str] = None) -> Tuple[ClientChannel, Optional[List[bytes]]]:
+        """SSE 클라이언트 등록과 함께 last_event_id 이후 놓친 이벤트 목록 반환 (None 이면 재동기화 필요)
+
+        등록과 재전송 목록 계산 사이에 await 가 없으므로 이벤트가 빠지거나 중복되지 않음
+        """
+        channel = self.sse.add(key)
+        missed = self.sse_replay.since(last_event_id)
+        logger.info(f"SSE client added. Total SSE clients: {len(self.sse)}")
+        return channel, missed
+
+    def remove_sse_client(self, key: Any):
+        if key in self.sse:
+            self.sse.remove(key)
+            self.sse_last_disconnect = time.monotonic()
+            logger.info(f"SSE client removed. Total SSE clients: {len(self.sse)}")
+
+    async def broadcast_to_sse(self, event_data: Dict) -> int:
+        # event_data 는 {'event': '...', 'data': {...}} 형태. 이벤트 ID를 붙여 SSE 프레임으로 한 번만 인코딩하고
+        # 재전송 버퍼에 보관 (브라우저 EventSource 가 재연결 시 Last-Event-ID 로 보냄)
+        def build(event_id: str) -> bytes:
+            payload = json.dumps({**event_data, "id": event_id}, ensure_ascii=False)
+            return ServerSentEvent(data=payload, id=event_id).encode()
+
+        return self.sse.broadcast(self.sse_replay.append(build))
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "websocket": self.websockets.metrics(),
+            "sse": self.sse.metrics(),
+            "sse_replay": self.sse_replay.metrics(),
+        }
+
+manager = ConnectionManager(
+    sales_snapshot_poller.subscribers,
+    Broadcaster.from_settings("admin-orders-sse"),
+    ReplayBuffer(settings.REALTIME_SSE_REPLAY_SIZE),
+)
 
 @router.websocket("/realtime-sales")
 async def websocket_endpoint(
@@ -83,170 +118,29 @@ async def websocket_endpoint(
         await websocket.close(code=4003, reason="User is not an admin")
         return
 
-    await manager.connect(websocket)
+    encoding = await manager.connect(websocket)
     print(f"WebSocket client connected: {websocket.client}, Admin: {current_admin.email}")
     try:
-        await send_initial_data(websocket)
+        # 스냅샷은 공유 poller 가 한 번 계산해 모든 구독자에게 전송하므로 여기서는 연결만 유지
+        await sales_snapshot_poller.subscribe(websocket, encoding)
         while True:
-            await asyncio.sleep(5)
-            await send_update_data(websocket)
+            text = await websocket.receive_text()
+            # delta 버전이 이어지지 않으면 클라이언트가 {"type": "resync"} 로 전체 스냅샷 재요청
+            try:
+                message = json.loads(text)
+            except ValueError:
+                continue
+            if isinstance(message, dict) and message.get("type") == "resync":
+                sales_snapshot_poller.resync(websocket)
     except WebSocketDisconnect:
         print(f"WebSocket client {websocket.client} (Admin: {current_admin.email}) disconnected normally.")
     except Exception as e:
         print(f"WebSocket error for client {websocket.client} (Admin: {current_admin.email}): {e}")
     finally:
+        sales_snapshot_poller.unsubscribe(websocket)
         manager.disconnect(websocket)
         print(f"WebSocket client {websocket.client} (Admin: {current_admin.email}) connection cleanup.")
 
-async def send_initial_data(websocket: WebSocket):
-    try:
-        today = datetime.now().date()
-        today_start_str = datetime.combine(today, datetime.min.time()).isoformat()
-        today_end_str = datetime.combine(today, datetime.max.time()).isoformat()
-        
-        db_path_full = app_settings.DATABASE_URL
-        if not db_path_full.startswith("sqlite:///"):
-            raise ValueError("DATABASE_URL in settings does not start with sqlite:///")
-        db_path = db_path_full[len("sqlite:///"):]
-
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        # Today's sales
-        cursor.execute("""
-            SELECT SUM(total_amount) 
-            FROM orders 
-            WHERE created_at >= ? AND created_at <= ?
-            AND status NOT IN ('cancelled', 'failed', 'pending_payment')
-        """, (today_start_str, today_end_str))
-        today_sales_row = cursor.fetchone()
-        today_sales = today_sales_row[0] if today_sales_row and today_sales_row[0] is not None else 0.0
-        
-        # Hourly orders
-        cursor.execute("""
-            SELECT strftime('%H', created_at) as hour, COUNT(id) as count, SUM(total_amount) as amount
-            FROM orders
-            WHERE created_at >= ? AND created_at <= ?
-            AND status NOT IN ('cancelled', 'failed', 'pending_payment')
-            GROUP BY hour
-            ORDER BY hour
-        """, (today_start_str, today_end_str))
-        hourly_orders_rows = cursor.fetchall()
-        
-        # Recent orders
-        cursor.execute("""
-            SELECT id, order_number, total_amount, status, created_at
-            FROM orders
-            WHERE status NOT IN ('cancelled', 'failed', 'pending_payment')
-            ORDER BY created_at DESC
-            LIMIT 5
-        """)
-        recent_orders_rows = cursor.fetchall()
-        
-        conn.close()
-        
-        hourly_data = [
-            {'hour': int(h[0]) if h[0] is not None else 0, 'count': int(h[1] or 0), 'amount': float(h[2] or 0.0)}
-            for h in hourly_orders_rows
-        ]
-        recent_orders_data = [
-            {
-                'id': row[0],
-                'order_number': row[1] or str(row[0]),
-                'total_amount': float(row[2] or 0.0),
-                'status': row[3],
-                'created_at': row[4] # 이미 ISO 포맷 문자열로 저장되어 있거나, datetime 객체로 변환 필요
-            }
-            for row in recent_orders_rows
-        ]
-        
-        await manager.send_personal_message({
-            'type': 'initial_data',
-            'data': {
-                'today_sales': float(today_sales),
-                'hourly_data': hourly_data,
-                'recent_orders': recent_orders_data,
-                'timestamp': datetime.now().isoformat()
-            }
-        }, websocket)
-    except Exception as e:
-        print(f"Error sending initial WebSocket data: {e}")
-        await manager.send_personal_message({'type': 'error', 'message': str(e)}, websocket)
-
-async def send_update_data(websocket: WebSocket):
-    try:
-        today = datetime.now().date()
-        today_start_str = datetime.combine(today, datetime.min.time()).isoformat()
-        today_end_str = datetime.combine(today, datetime.max.time()).isoformat()
-
-        db_path_full = app_settings.DATABASE_URL
-        if not db_path_full.startswith("sqlite:///"):
-            raise ValueError("DATABASE_URL in settings does not start with sqlite:///")
-        db_path = db_path_full[len("sqlite:///"):]
-
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        # Today's sales
-        cursor.execute("""
-            SELECT SUM(total_amount) 
-            FROM orders 
-            WHERE created_at >= ? AND created_at <= ?
-            AND status NOT IN ('cancelled', 'failed', 'pending_payment')
-        """, (today_start_str, today_end_str))
-        today_sales_row = cursor.fetchone()
-        today_sales = today_sales_row[0] if today_sales_row and today_sales_row[0] is not None else 0.0
-
-        # Hourly orders update
-        cursor.execute("""
-            SELECT strftime('%H', created_at) as hour, COUNT(id) as count, SUM(total_amount) as amount
-            FROM orders
-            WHERE created_at >= ? AND created_at <= ?
-            AND status NOT IN ('cancelled', 'failed', 'pending_payment')
-            GROUP BY hour
-            ORDER BY hour
-        """, (today_start_str, today_end_str))
-        hourly_orders_update_rows = cursor.fetchall()
-        
-        # Latest order
-        cursor.execute("""
-            SELECT id, order_number, total_amount, status, created_at
-            FROM orders
-            ORDER BY created_at DESC
-            LIMIT 1
-        """)
-        latest_order_row = cursor.fetchone()
-        
-        conn.close()
-        
-        hourly_data_update = [
-            {'hour': int(h[0]) if h[0] is not None else 0, 'count': int(h[1] or 0), 'amount': float(h[2] or 0.0)}
-            for h in hourly_orders_update_rows
-        ]
-        
-        latest_order_data = None
-        if latest_order_row:
-            latest_order_data = {
-                'id': latest_order_row[0],
-                'order_number': latest_order_row[1] or str(latest_order_row[0]),
-                'total_amount': float(latest_order_row[2] or 0.0),
-                'status': latest_order_row[3],
-                'created_at': latest_order_row[4] # 이미 ISO 포맷 문자열로 저장되어 있거나, datetime 객체로 변환 필요
-            }
-        
-        await manager.send_personal_message({
-            'type': 'update_data',
-            'data': {
-                'today_sales': float(today_sales),
-                'hourly_data': hourly_data_update,
-                'latest_order': latest_order_data,
-                'timestamp': datetime.now().isoformat()
-            }
-        }, websocket)
-    except Exception as e:
-        print(f"Error sending update WebSocket data: {e}")
-        await manager.send_personal_message({'type': 'error', 'message': str(e)}, websocket)
-
 # 주문 이벤트 발생 시 WebSocket 및 SSE 클라이언트 모두에게 알림
 async def broadcast_order_event(event_type: str, order_data: Any):
     timestamp = datetime.now().isoformat()
@@ -266,35 +160,52 @@ async def broadcast_order_event(event_type: str, order_data: Any):
         'timestamp': timestamp
     }
     await manager.broadcast_to_websockets(ws_message)
-    print(f"Broadcasted to WebSockets: {ws_message}")
 
     # SSE 클라이언트에게 전송 (data는 이미 processed_order_data로 준비됨)
     sse_message = {
         "event": event_type, 
-        "data": processed_order_data, # 여기서도 변환된 dict 사용
-        "id": str(datetime.now().timestamp())
+        "data": processed_order_data, # 여기서도 변환된 dict 사용 (id 는 broadcast_to_sse 에서 발급)
     }
     await manager.broadcast_to_sse(sse_message)
-    print(f"Broadcasted to SSE clients: {sse_message}")
+    logger.debug(f"Broadcasted order event {event_type} to {len(manager.websockets)} WebSocket / {len(manager.sse)} SSE clients")
 
 
 # SSE 이벤트 제너레이터 함수 (인증 적용)
-async def order_event_stream_generator(request: Request, current_admin: Admin) -> AsyncGenerator[str, None]:
+async def order_event_stream_generator(
+    request: Request, current_admin: Admin, last_event_id: Optional[str] = None
+) -> AsyncGenerator[Union[str, bytes], None]:
     # current_admin은 sse_order_updates에서 이미 검증되었다고 가정
     # (sse_order_updates에서 Depends(get_current_admin)으로 주입 및 is_superuser 확인)
     
-    print(f"SSE client connected for stream: {request.client}, Admin: {current_admin.email}")
-    event_queue = asyncio.Queue()
-    await manager.add_sse_client(event_queue)
+    print(f"SSE client connected for stream: {request.client}, Admin: {current_admin.email}, Last-Event-ID: {last_event_id}")
+    channel, missed = manager.add_sse_client(object(), last_event_id)
+    current_id = manager.sse_replay.last_id
     
     try:
-        initial_connection_message = json.dumps({"event": "connection_established", "data": {"message": "SSE connection for orders established."}})
-        yield initial_connection_message
+        if missed is None:
+            # 놓친 이벤트가 재전송 버퍼 범위를 벗어남 (또는 서버 재시작) -> 클라이언트가 주문 목록을 다시 조회
+            yield ServerSentEvent(
+                data=json.dumps({"event": "resync", "data": {"message": "Missed events are no longer available."}}),
+                id=current_id,
+            )
+        else:
+            initial_connection_message = json.dumps({"event": "connection_established", "data": {
+                "message": "SSE connection for orders established.",
+                "replayed": len(missed),
+            }})
+            # 새 연결은 현재 ID를 받아 두어야 이후 재연결 시 그 사이 이벤트를 재전송받을 수 있음
+            yield ServerSentEvent(data=initial_connection_message, id=None if last_event_id else current_id)
+            for frame in missed:
+                yield frame
         
         heartbeat_interval = 15 
         while True:
             try:
-                event_to_send = await asyncio.wait_for(event_queue.get(), timeout=heartbeat_interval)
+                event_to_send = await channel.get(timeout=heartbeat_interval)
+                if event_to_send is None:
+                    # 처리가 밀려 연결 정리됨 (disconnect 정책) -> 클라이언트가 재연결
+                    print(f"SSE client {request.client} (Admin: {current_admin.email}) dropped as slow consumer.")
+                    break
                 yield event_to_send
             except asyncio.TimeoutError:
                 if await request.is_disconnected():
@@ -312,13 +223,14 @@ async def order_event_stream_generator(request: Request, current_admin: Admin) -
     except Exception as e:
         print(f"Error in SSE event generator for {request.client} (Admin: {current_admin.email}): {e}")
     finally:
-        manager.remove_sse_client(event_queue)
+        manager.remove_sse_client(channel.key)
         print(f"SSE event generator for {request.client} (Admin: {current_admin.email}) finished and client removed.")
 
 # 주문 관련 실시간 업데이트를 위한 SSE 엔드포인트
 @router.get("/orders/realtime/subscribe", response_class=EventSourceResponse)
 async def sse_order_updates(
     request: Request, 
+    last_event_id: Optional[str] = Query(None, description="마지막으로 받은 이벤트 ID (Last-Event-ID 헤더 대신 사용 가능)"),
     current_admin: Admin = Depends(get_current_admin_sse)
 ):
     # get_current_admin_sse 의존성이 이미 사용자 객체를 반환하거나, 권한 없으면 예외 발생시킴
@@ -330,7 +242,22 @@ async def sse_order_updates(
         return EventSourceResponse(unauthorized_generator())
 
     print(f"SSE: Admin user {current_admin.email} (ID: {current_admin.id}) is authorized for SSE.") # 인증 성공 로그 추가
-    return EventSourceResponse(order_event_stream_generator(request, current_admin))
+    last_event_id = request.headers.get("last-event-id") or last_event_id
+    return EventSourceResponse(order_event_stream_generator(request, current_admin, last_event_id))
+
+# 실시간 연결 브로드캐스트 상태 (클라이언트 수, 큐 깊이, 버린/강제 종료 메시지 수)
+@router.get("/realtime/metrics")
+async def realtime_metrics(current_admin: Admin = Depends(get_current_active_admin)):
+    return {
+        **manager.metrics(),
+        "notifications": notification_clients.metrics(),
+        "order_status": order_status_hub.metrics(),
+    }
+
+# MessagePack 인코딩(cafe.msgpack.v1)에서 정수 키가 가리키는 필드 이름
+@router.get("/realtime/wire-fields")
+async def realtime_wire_fields(current_admin: Admin = Depends(get_current_active_admin)):
+    return field_table()
 
 # orders.py에서 broadcast_sse_order_update 대신 broadcast_order_event를 사용하도록 변경 예정.
 # 따라서 broadcast_sse_order_update 함수는 broadcast_order_event로 통합.
@@ -1,11 +1,11 @@
 from fastapi import APIRouter
-# from app.api.menu import availability  # inventory 모델 문제로 임시 비활성화
+from app.api.menu import availability
 
 router = APIRouter()
 
 # 가용성 확인 라우터 포함
-# router.include_router(
-#     availability.router,
-#     prefix="/availability",
-#     tags=["menu-availability"]
-# )  # inventory 모델 문제로 임시 비활성화 
\ No newline at end of file
+router.include_router(
+    availability.router,
+    prefix="/availability",
+    tags=["menu-availability"]
+)
@@ -0,0 +1,274 @@
+"""
+클라이언트별 bounded 큐 기반 브로드캐스터 (backpressure 처리)
+
+실시간 WebSocket/SSE 브로드캐스트에서 클라이언트에게 차례로 await send 하면 느린 클라이언트
+하나가 모든 클라이언트의 전송을 늦추고, 큐가 무제한이면 메모리가 계속 늘어납니다.
+
+- 메시지는 호출한 쪽에서 한 번만 인코딩(JSON 문자열)하고, 모든 클라이언트 큐에 같은 객체를 넣음
+- 클라이언트마다 크기가 제한된 큐와 전송 태스크가 있어 서로의 전송을 기다리지 않음
+  (SSE 처럼 소비자가 직접 꺼내가는 경우 전송 태스크 없이 큐만 사용)
+- 큐가 가득 찬 느린 클라이언트 처리 정책
+    drop_oldest: 가장 오래된 메시지를 버리고 새 메시지를 넣음 (최신 상태 위주의 화면)
+    disconnect: 연결을 끊음 (클라이언트가 재연결 후 다시 동기화)
+- 전송 실패/시간 초과 연결은 즉시 정리
+- metrics(): 클라이언트 수, 큐 깊이(합계/최대), 전송/버림/강제 종료 건수
+
+ReplayBuffer 는 SSE 재연결(Last-Event-ID) 시 놓친 이벤트를 다시 보내기 위한 최근 이벤트 ring buffer 입니다.
+"""
+import asyncio
+import logging
+import uuid
+from collections import deque
+from itertools import islice
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop_oldest"
+DISCONNECT = "disconnect"
+POLICIES = (DROP_OLDEST, DISCONNECT)
+
+_CLOSED = object()  # 소비자가 꺼내는 큐의 종료 표시
+
+SendFn = Callable[[Any], Awaitable[None]]
+CloseFn = Callable[[str], Awaitable[None]]
+
+
+class ClientChannel:
+    """클라이언트 하나의 bounded 큐와 (선택적) 전송 태스크"""
+
+    def __init__(
+        self,
+        broadcaster: "Broadcaster",
+        key: Hashable,
+        send: Optional[SendFn] = None,
+        on_close: Optional[CloseFn] = None,
+    ):
+        self.broadcaster = broadcaster
+        self.key = key
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=broadcaster.max_queue_size)
+        self.closed = asyncio.Event()
+        self.close_reason: Optional[str] = None
+        self.sent = 0
+        self.dropped = 0
+        self._send = send
+        self._on_close = on_close
+        self._task: Optional[asyncio.Task] = None
+        if send is not None:
+            self._task = asyncio.get_running_loop().create_task(self._sender())
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+    def offer(self, message: Any) -> bool:
+        """메시지를 큐에 넣음 (대기하지 않음). 연결이 정리되면 False"""
+        if self.closed.is_set():
+            return False
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            pass
+        if self.broadcaster.policy == DROP_OLDEST:
+            self.queue.get_nowait()
+            self.queue.put_nowait(message)
+            self.dropped += 1
+            self.broadcaster.dropped += 1
+            return True
+        self.broadcaster.evicted += 1
+        self.close("slow_consumer")
+        return False
+
+    async def get(self, timeout: Optional[float] = None) -> Any:
+        """소비자가 직접 꺼내는 경우(SSE) 다음 메시지. 연결이 정리되면 None, 시간 초과 시 asyncio.TimeoutError"""
+        if self.closed.is_set() and self.queue.empty():
+            return None
+        message = await asyncio.wait_for(self.queue.get(), timeout)
+        if message is _CLOSED:
+            return None
+        self.sent += 1
+        self.broadcaster.sent += 1
+        return message
+
+    async def _sender(self) -> None:
+        try:
+            while True:
+                message = await self.queue.get()
+                await asyncio.wait_for(self._send(message), self.broadcaster.send_timeout)
+                self.sent += 1
+                self.broadcaster.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self.broadcaster.evicted += 1
+            self.close("send_timeout")
+        except Exception as e:
+            logger.debug(f"{self.broadcaster.name} 전송 실패, 연결 정리: {e}")
+            self.close("send_failed")
+
+    def close(self, reason: str = "closed") -> None:
+        """브로드캐스터에서 제거하고 전송 태스크 종료 (여러 번 호출해도 안전)"""
+        if self.closed.is_set():
+            return
+        self.close_reason = reason
+        self.closed.set()
+        self.broadcaster._discard(self)
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        if self._send is None:
+            # 대기 중인 소비자를 깨워 종료시킴
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_CLOSED)
+        if self._on_close is not None and reason != "closed":
+            asyncio.get_running_loop().create_task(self._safe_on_close(reason))
+
+    async def _safe_on_close(self, reason: str) -> None:
+        try:
+            await self._on_close(reason)
+        except Exception:
+            pass
+
+
+class Broadcaster:
+    """같은 메시지를 여러 클라이언트 큐로 나눠 주는 브로드캐스터"""
+
+    def __init__(
+        self,
+        name: str,
+        max_queue_size: int = 100,
+        policy: str = DROP_OLDEST,
+        send_timeout: float = 5.0,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"지원하지 않는 정책입니다: {policy}")
+        self.name = name
+        self.max_queue_size = max_queue_size
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self.channels: Dict[Hashable, ClientChannel] = {}
+        self.sent = 0
+        self.dropped = 0
+        self.evicted = 0
+        self.broadcasts = 0
+
+    @classmethod
+    def from_settings(cls, name: str) -> "Broadcaster":
+        """REALTIME_* 설정으로 생성"""
+        return cls(
+            name,
+            max_queue_size=settings.REALTIME_CLIENT_QUEUE_SIZE,
+            policy=settings.REALTIME_SLOW_CONSUMER_POLICY,
+            send_timeout=settings.REALTIME_SEND_TIMEOUT_SECONDS,
+        )
+
+    def __len__(self) -> int:
+        return len(self.channels)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.channels
+
+    def add(
+        self,
+        key: Hashable,
+        send: Optional[SendFn] = None,
+        on_close: Optional[CloseFn] = None,
+    ) -> ClientChannel:
+        """클라이언트 등록. send 가 있으면 전송 태스크가 큐를 비움 (이벤트 루프 안에서 호출)"""
+        self.remove(key)
+        channel = ClientChannel(self, key, send, on_close)
+        self.channels[key] = channel
+        return channel
+
+    def remove(self, key: Hashable) -> None:
+        channel = self.channels.get(key)
+        if channel is not None:
+            channel.close()
+
+    def close_all(self) -> None:
+        for channel in list(self.channels.values()):
+            channel.close()
+
+    def _discard(self, channel: ClientChannel) -> None:
+        if self.channels.get(channel.key) is channel:
+            del self.channels[channel.key]
+
+    def broadcast(self, message: Any) -> int:
+        """인코딩된 메시지를 모든 클라이언트 큐에 넣음 (대기하지 않음). 받은 클라이언트 수 반환"""
+        self.broadcasts += 1
+        delivered = 0
+        for channel in list(self.channels.values()):
+            if channel.offer(message):
+                delivered += 1
+        return delivered
+
+    def metrics(self) -> Dict[str, Any]:
+        depths = [channel.depth for channel in self.channels.values()]
+        return {
+            "clients": len(depths),
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "max_queue_size": self.max_queue_size,
+            "policy": self.policy,
+            "broadcasts": self.broadcasts,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "evicted": self.evicted,
+        }
+
+
+class ReplayBuffer:
+    """단조 증가 이벤트 ID와 최근 이벤트 ring buffer (SSE Last-Event-ID 재전송)
+
+    이벤트 ID는 "<epoch>-<seq>" 형식입니다. epoch 는 버퍼(프로세스)마다 새로 정해지므로
+    서버가 재시작되었거나 다른 워커에 재연결한 경우에는 잘못된 이벤트를 재전송하지 않고
+    전체 재동기화가 필요하다고 판단합니다.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.epoch = uuid.uuid4().hex[:8]
+        self.seq = 0
+        self._items: deque = deque(maxlen=capacity)  # (seq, 인코딩된 이벤트), seq 는 연속
+        self.replayed = 0
+        self.resyncs = 0
+
+    @property
+    def last_id(self) -> str:
+        return f"{self.epoch}-{self.seq}"
+
+    def append(self, build: Callable[[str], Any]) -> Any:
+        """다음 이벤트 ID로 build(event_id) 를 호출해 인코딩된 이벤트를 만들고 버퍼에 보관"""
+        self.seq += 1
+        item = build(f"{self.epoch}-{self.seq}")
+        self._items.append((self.seq, item))
+        return item
+
+    def since(self, last_event_id: Optional[str]) -> Optional[List[Any]]:
+        """last_event_id 이후의 이벤트 목록. 버퍼 범위를 벗어났거나 알 수 없는 ID이면 None (재동기화 필요)"""
+        if not last_event_id:
+            return []
+        epoch, _, seq_text = last_event_id.rpartition("-")
+        if epoch != self.epoch or not seq_text.isdigit() or int(seq_text) > self.seq:
+            self.resyncs += 1
+            return None
+        seq = int(seq_text)
+        oldest = self._items[0][0] if self._items else self.seq + 1
+        if seq + 1 < oldest:
+            self.resyncs += 1
+            return None
+        missed = [item for _, item in islice(self._items, seq + 1 - oldest, None)]
+        self.replayed += len(missed)
+        return missed
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "last_id": self.last_id,
+            "buffered": len(self._items),
+            "capacity": self.capacity,
+            "replayed": self.replayed,
+            "resyncs": self.resyncs,
+        }
@@ -1,4 +1,4 @@
-from typing import Any, Dict, Optional, Callable, Union
+from typing import Any, Dict, Optional, Callable, Set, Union
 import time
 import hashlib
 import json
@@ -9,6 +9,9 @@ from .config import settings
 # 메모리 캐시 (실제 서비스에서는 Redis 등을 사용하는 것이 좋음)
 _CACHE: Dict[str, Dict[str, Any]] = {}
 
+# 태그 -> 캐시 키 (키가 해시이므로 접두사/대상 ID 단위로 무효화할 때 사용)
+_TAGS: Dict[str, Set[str]] = {}
+
 class CacheItem:
     """캐시 항목 클래스"""
     def __init__(self, value: Any, expire_at: float):
@@ -133,6 +136,31 @@ def cache_delete(key: str) -> None:
 def cache_clear() -> None:
     """모든 캐시 항목을 삭제하는 함수"""
     _CACHE.clear()
+    _TAGS.clear()
+
+def cache_tag(key: str, *tags: str) -> None:
+    """캐시 키에 무효화용 태그를 붙이는 함수"""
+    for tag in tags:
+        _TAGS.setdefault(tag, set()).add(key)
+
+def cache_delete_tag(tag: str) -> int:
+    """
+    태그가 붙은 캐시 항목을 모두 삭제하는 함수
+    
+    Args:
+        tag: 캐시 태그 (cached 데코레이터는 접두사와 "접두사:<*_id 인자 값>" 태그를 붙임)
+    
+    Returns:
+        int: 삭제한 항목 수
+    """
+    keys = _TAGS.pop(tag, set())
+    for key in keys:
+        _CACHE.pop(key, None)
+    return len(keys)
+
+def _tags_for(prefix: str, kwargs: Dict[str, Any]) -> list:
+    """cached 데코레이터가 붙이는 태그: 접두사, 대상 ID 별 태그 (예: menu_detail:3)"""
+    return [prefix] + [f"{prefix}:{value}" for name, value in kwargs.items() if name.endswith("_id")]
 
 def cached(prefix: str, timeout: Optional[int] = None):
     """
@@ -162,6 +190,7 @@ def cached(prefix: str, timeout: Optional[int] = None):
             # 함수 실행 및 결과 캐싱
             result = func(*args, **kwargs)
             cache_set(cache_key, result, timeout)
+            cache_tag(cache_key, *_tags_for(prefix, kwargs))
             
             return result
         return wrapper
@@ -195,6 +224,7 @@ async def async_cached(prefix: str, timeout: Optional[int] = None):
             # 비동기 함수 실행 및 결과 캐싱
             result = await func(*args, **kwargs)
             cache_set(cache_key, result, timeout)
+            cache_tag(cache_key, *_tags_for(prefix, kwargs))
             
             return result
         return wrapper
@@ -36,6 +36,45 @@ class Settings(BaseSettings):
     # 데이터베이스 설정 (필수: .env에서 로드, 경로 보정 필요시 수행)
     DATABASE_URL: str 
 
+    # 단일 writer 큐 설정 (그룹 커밋)
+    DB_WRITER_MAX_BATCH_SIZE: int = 64  # 한 트랜잭션으로 묶을 최대 쓰기 작업 수
+    DB_WRITER_MAX_LATENCY_MS: float = 2.0  # 배치를 모으기 위해 기다리는 최대 시간(ms)
+
+    # 읽기 전용 커넥션 풀 설정 (대시보드 집계 병렬 실행)
+    DB_READ_POOL_SIZE: int = 4  # query_only 읽기 커넥션 수 (= 동시 실행 쿼리 수)
+    DB_READ_QUERY_TIMEOUT_SECONDS: float = 5.0  # 쿼리별 제한 시간(초)
+
+    # 주문 급증/이상 패턴 스트리밍 감지 설정
+    ORDER_SURGE_WINDOW_MINUTES: int = 30  # 급증 판정 슬라이딩 윈도우(분)
+    ORDER_SURGE_MIN_ORDERS: int = 10  # 윈도우 내 최소 주문 수
+    ORDER_SURGE_RATIO: float = 1.5  # 기준선 대비 급증 배율
+    ORDER_ANOMALY_Z: float = 2.0  # 요일/시간대 기준선 대비 이상 판정 표준편차 배수
+
+    # 실시간 매출 WebSocket 스냅샷 설정 (모든 구독자가 하나의 스냅샷을 공유)
+    REALTIME_SALES_TICK_SECONDS: float = 5.0  # 주문 이벤트가 없을 때 재계산 주기(초)
+    REALTIME_SALES_MIN_INTERVAL_SECONDS: float = 0.5  # 주문 이벤트로 인한 재계산 최소 간격(초)
+
+    # 관리자 실시간 연결(WebSocket/SSE) 브로드캐스트 설정
+    REALTIME_CLIENT_QUEUE_SIZE: int = 100  # 클라이언트별 전송 대기 메시지 수 상한
+    REALTIME_SLOW_CONSUMER_POLICY: str = "drop_oldest"  # 큐가 가득 찬 경우: drop_oldest 또는 disconnect
+    REALTIME_SEND_TIMEOUT_SECONDS: float = 5.0  # 메시지 하나의 전송 제한 시간(초), 넘으면 연결 정리
+    REALTIME_SSE_REPLAY_SIZE: int = 1000  # SSE 재연결 시 재전송할 수 있는 최근 주문 이벤트 수
+    ORDER_STATUS_LONG_POLL_SECONDS: float = 25.0  # 고객 주문 상태 long-poll 최대 대기 시간(초)
+
+    # 재고 원장 일일 스냅샷 (오늘 스냅샷이 없으면 생성)
+    INVENTORY_SNAPSHOT_CHECK_SECONDS: float = 3600.0  # 오늘 스냅샷 존재 여부 확인 주기(초)
+
+    # 재고 소진 예측 / 동적 발주점
+    STOCK_FORECAST_HISTORY_DAYS: int = 28  # 소비 속도/계절성 계산에 쓰는 최근 이력 기간(일)
+    STOCK_FORECAST_HORIZON_DAYS: int = 14  # 소진 시각을 예측하는 최대 기간(일)
+    STOCK_REORDER_LEAD_TIME_DAYS: float = 2.0  # 발주 후 입고까지 걸리는 기간(일)
+    STOCK_REORDER_SERVICE_Z: float = 1.65  # 안전 재고 계수 (1.65 = 리드타임 중 품절 확률 약 5%)
+
+    # 워커 간 이벤트 전달 (SQLite event_log 테이블 tailing)
+    EVENT_LOG_ENABLED: bool = True  # 여러 uvicorn 워커의 관리자 실시간 화면에 같은 이벤트 전달
+    EVENT_LOG_POLL_SECONDS: float = 0.25  # 새 이벤트 확인 주기(초)
+    EVENT_LOG_RETENTION_SECONDS: int = 3600  # 이벤트 로그 보관 시간(초)
+
     # CORS 설정 (.env에서 로드, 문자열을 리스트로 변환)
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
     # ALLOWED_ORIGINS: str = "http://localhost:15030" # BACKEND_CORS_ORIGINS로 통합 관리
@@ -62,6 +101,12 @@ class Settings(BaseSettings):
     CACHE_EXPIRATION_SECONDS: int = 60 * 10
     CACHE_ENABLED: bool = True
     CACHE_TIMEOUT: int = 300
+    ORDER_COUNT_CACHE_SECONDS: int = 30  # 주문 목록 전체 건수(COUNT) 캐시 시간
+    ORDER_ANALYTICS_CACHE_SECONDS: int = 300  # 주문 분석 큐브 캐시 시간 (주문 변경 커밋 시 즉시 무효화)
+    
+    # 멱등성 키 설정 (주문 생성/결제 API 재시도 처리)
+    IDEMPOTENCY_TTL_SECONDS: int = 60 * 60 * 24  # Idempotency-Key 헤더로 요청한 결과 보관 시간
+    IDEMPOTENCY_DERIVED_TTL_SECONDS: int = 30  # 헤더 없이 세션+요청 내용으로 식별한 결과 보관 시간
     
     # 카카오페이 설정 (필수: .env에서 로드)
     KAKAO_SECRET_KEY_DEV: str
@@ -0,0 +1,185 @@
+"""
+프로세스 내부 비동기 pub/sub 이벤트 버스
+
+주문/결제/재고 쓰기가 일어나면 토픽으로 이벤트를 발행하고, 실시간 대시보드(WebSocket/SSE),
+관리자 알림, 캐시 무효화, 집계/감지기 등은 필요한 토픽을 구독합니다.
+각 쓰기 경로가 알림 함수를 직접 기억해서 부를 필요가 없습니다.
+
+- 토픽: "order.created", "order.status_changed", "payment.approved", "stock.low" 등
+- 구독 패턴: 정확한 토픽, 접두어 와일드카드("order.*"), 전체("*")
+- 동기 핸들러는 발행한 스레드에서 즉시 호출되고 (캐시 무효화처럼 가볍고 스레드 안전한 작업),
+  비동기 핸들러는 버스에 연결된 이벤트 루프에서 태스크로 실행됩니다.
+  (writer 큐 스레드나 동기 엔드포인트의 스레드풀에서 발행해도 안전)
+- 핸들러 예외는 로그만 남기고 다른 구독자/발행자에게 전파하지 않습니다.
+
+DB 트랜잭션 안에서 발생한 이벤트는 stage_event() 로 세션에 모아 두었다가 바깥 트랜잭션이
+커밋된 뒤에만 발행됩니다. (롤백되면 버려짐, 세이브포인트 해제는 커밋으로 보지 않음)
+
+이벤트는 {"topic", "data", "timestamp"} 형태의 dict 이며 data 는 JSON 직렬화 가능한 값만 담습니다.
+"""
+import asyncio
+import inspect
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# 토픽
+ORDER_CREATED = "order.created"
+ORDER_STATUS_CHANGED = "order.status_changed"
+ORDER_ITEM_STATUS_CHANGED = "order.item_status_changed"
+ORDER_UPDATED = "order.updated"  # 상태 외 변경 (금액 수정 등)
+ORDER_DELETED = "order.deleted"
+PAYMENT_APPROVED = "payment.approved"
+STOCK_LOW = "stock.low"
+STOCK_CHANGED = "stock.changed"  # 재료 재고 수량 변경
+MENU_RECIPE_CHANGED = "menu.ingredients_changed"  # 메뉴-재료(필요량) 변경
+MENU_AVAILABILITY_CHANGED = "menu.availability_changed"  # 재고에 따른 메뉴 판매 가능 여부 변경
+ORDER_ALERT = "alert.order"  # 주문 급증/이상 패턴 감지
+
+Event = Dict[str, Any]
+Handler = Callable[[Event], Union[None, Awaitable[None]]]
+
+
+def make_event(topic: str, data: Dict[str, Any]) -> Event:
+    return {"topic": topic, "data": data, "timestamp": datetime.now().isoformat()}
+
+
+class EventBus:
+    """토픽 기반 프로세스 내부 pub/sub"""
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._resolved: Dict[str, List[Handler]] = {}  # 토픽별 핸들러 목록 캐시
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks = set()
+        self.published = 0
+        self.errors = 0
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        """비동기 핸들러를 실행할 이벤트 루프 (애플리케이션 시작 시 연결)"""
+        self._loop = loop
+
+    def subscribe(self, pattern: str, handler: Handler) -> Handler:
+        """pattern: 토픽, "prefix.*" 또는 "*" """
+        if handler not in self._handlers[pattern]:
+            self._handlers[pattern].append(handler)
+        self._resolved.clear()
+        return handler
+
+    def unsubscribe(self, pattern: str, handler: Handler) -> None:
+        if handler in self._handlers.get(pattern, []):
+            self._handlers[pattern].remove(handler)
+        self._resolved.clear()
+
+    def handlers_for(self, topic: str) -> List[Handler]:
+        handlers = self._resolved.get(topic)
+        if handlers is None:
+            handlers = list(self._handlers.get(topic, []))
+            parts = topic.split(".")
+            for i in range(len(parts) - 1, 0, -1):
+                handlers += self._handlers.get(".".join(parts[:i]) + ".*", [])
+            handlers += self._handlers.get("*", [])
+            self._resolved[topic] = handlers
+        return handlers
+
+    def publish(self, topic: str, data: Optional[Dict[str, Any]] = None) -> Event:
+        """이벤트 발행 (어느 스레드에서나 호출 가능, 구독자 처리를 기다리지 않음)"""
+        return self.publish_event(make_event(topic, data or {}))
+
+    def publish_event(self, event: Event) -> Event:
+        self.published += 1
+        handlers = self.handlers_for(event["topic"])
+        if not handlers:
+            return event
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        loop = running
+        if loop is None and self._loop is not None and not self._loop.is_closed():
+            loop = self._loop
+
+        for handler in handlers:
+            if inspect.iscoroutinefunction(handler):
+                if loop is None:
+                    logger.debug("이벤트 루프가 없어 비동기 구독자를 건너뜁니다: %s", event["topic"])
+                elif loop is running:
+                    self._track(loop.create_task(handler(event)))
+                else:
+                    loop.call_soon_threadsafe(lambda h=handler: self._track(loop.create_task(h(event))))
+            else:
+                try:
+                    handler(event)
+                except Exception:
+                    self.errors += 1
+                    logger.exception("이벤트 구독자 처리 실패: %s", event["topic"])
+        return event
+
+    def _track(self, task: "asyncio.Task") -> None:
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: "asyncio.Task") -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+            logger.error("이벤트 구독자 처리 실패", exc_info=task.exception())
+
+
+event_bus = EventBus()
+
+
+# --- 트랜잭션 단위 발행: 커밋된 뒤에만 이벤트 발행 ---
+
+_PENDING_KEY = "event_bus_pending"
+
+
+def _pending(session: Session) -> Dict[Any, List[Event]]:
+    """트랜잭션(세이브포인트 포함)별로 모아 둔 이벤트 {SessionTransaction: [event, ...]}"""
+    return session.info.setdefault(_PENDING_KEY, {})
+
+
+def stage_event(session: Session, topic: str, data: Dict[str, Any]) -> None:
+    """
+    세션이 커밋되면 발행할 이벤트 등록 (롤백되면 버려짐)
+
+    현재 가장 안쪽 트랜잭션(세이브포인트)에 등록하므로, writer 큐처럼 작업마다 세이브포인트를 쓰면
+    세이브포인트 롤백은 그 작업의 이벤트만 버리고, 해제(release)되면 바깥 트랜잭션으로 합쳐져
+    최종 COMMIT 뒤에 한 번에 발행됩니다.
+    """
+    transaction = session.get_nested_transaction() or session.get_transaction()
+    _pending(session).setdefault(transaction, []).append(make_event(topic, data))
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _publish_on_commit(session: Session) -> None:
+    pending = session.info.get(_PENDING_KEY)
+    if not pending:
+        return
+    if session.in_nested_transaction():
+        # 세이브포인트 해제: 아직 커밋된 것이 아니므로 바깥 트랜잭션으로 옮겨 둠
+        savepoint = session.get_nested_transaction()
+        staged = pending.pop(savepoint, None)
+        if staged:
+            pending.setdefault(savepoint.parent, []).extend(staged)
+        return
+    # 트랜잭션 시작 전에 등록된 이벤트(None)가 먼저
+    staged = pending.pop(None, []) + pending.pop(session.get_transaction(), [])
+    for event in staged:
+        event_bus.publish_event(event)
+
+
+@sa_event.listens_for(Session, "after_transaction_end")
+def _discard_on_end(session: Session, transaction) -> None:
+    """커밋으로 옮기거나 발행하지 않은 채 끝난 트랜잭션(롤백, 세이브포인트 롤백)의 이벤트는 버림"""
+    pending = session.info.get(_PENDING_KEY)
+    if pending:
+        pending.pop(transaction, None)
+        if transaction.parent is None:
+            pending.pop(None, None)
@@ -0,0 +1,178 @@
+"""
+주문 생성/결제 API용 멱등성(idempotency) 키 저장소
+
+클라이언트가 타임아웃 후 같은 요청을 재시도하면 주문이 중복 생성되거나 PG 요청이 반복됩니다.
+요청마다 멱등성 키를 정하고 첫 요청의 결과를 TTL 동안 보관하여,
+같은 키로 들어온 요청에는 DB/PG 작업을 다시 실행하지 않고 저장된 응답을 돌려줍니다.
+
+- 키: `Idempotency-Key` 헤더가 있으면 그 값을, 없으면 요청 본문(장바구니) 해시를 사용하며
+  항상 API 범위(scope)와 세션 ID를 함께 묶어 다른 사용자의 응답이 재생되지 않도록 합니다.
+- 첫 요청이 처리 중일 때 도착한 재시도는 새로 실행하지 않고 첫 요청의 결과를 기다립니다.
+  (부하 상황에서 재시도가 쓰기 작업을 늘리지 않음)
+- 성공한 결과만 저장하며, 실패한 요청은 같은 키로 다시 시도할 수 있습니다.
+
+메모리 저장소이므로 워커 프로세스 단위로 동작합니다. (rate_limiter의 MemoryStore와 동일)
+"""
+import asyncio
+import hashlib
+import heapq
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Response
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 응답이 재생된 경우 표시하는 헤더
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class IdempotencyRecord:
+    """멱등성 키 하나에 대한 처리 상태와 결과"""
+    __slots__ = ("fingerprint", "future", "result", "expires_at")
+
+    def __init__(self, fingerprint: str, future: "asyncio.Future"):
+        self.fingerprint = fingerprint
+        self.future = future
+        self.result: Any = None
+        self.expires_at: Optional[float] = None  # None 이면 처리 중
+
+    @property
+    def completed(self) -> bool:
+        return self.expires_at is not None
+
+
+class IdempotencyStore:
+    """TTL 기반 메모리 멱등성 저장소"""
+
+    def __init__(self):
+        self.records: Dict[str, IdempotencyRecord] = {}
+        # 완료된 기록의 (만료 시각, 키, 기록) 힙 - 만료된 앞부분만 꺼내서 정리
+        self._expiry_heap: List[Tuple[float, str, IdempotencyRecord]] = []
+        self.replays = 0
+        self.executions = 0
+
+    def purge_expired(self) -> None:
+        """
+        만료된 완료 기록 삭제
+
+        만료 시각 순 힙의 앞에서 만료된 항목만 꺼내므로 요청마다 전체 기록을 훑지 않습니다.
+        (이미 삭제되었거나 같은 키로 새 기록이 들어간 항목은 건너뜀)
+        """
+        now = time.time()
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            _, key, record = heapq.heappop(heap)
+            if self.records.get(key) is record:
+                del self.records[key]
+
+    def get(self, key: str) -> Optional[IdempotencyRecord]:
+        record = self.records.get(key)
+        if record and record.completed and record.expires_at <= time.time():
+            del self.records[key]
+            return None
+        return record
+
+    async def run(
+        self,
+        key: str,
+        fingerprint: str,
+        fn: Callable[[], Awaitable[Any]],
+        ttl: int,
+    ) -> Tuple[Any, bool]:
+        """
+        키에 대한 작업을 최대 한 번만 실행하고 (결과, 재생 여부)를 반환합니다.
+
+        Raises:
+            HTTPException(422): 같은 키가 내용이 다른 요청에 사용된 경우
+        """
+        self.purge_expired()
+        record = self.get(key)
+        if record is not None:
+            if record.fingerprint != fingerprint:
+                raise HTTPException(
+                    status_code=422,
+                    detail="같은 Idempotency-Key가 다른 요청 내용으로 사용되었습니다."
+                )
+            self.replays += 1
+            if record.completed:
+                return record.result, True
+            # 첫 요청이 처리 중이면 그 결과를 함께 기다림
+            return await asyncio.shield(record.future), True
+
+        record = IdempotencyRecord(fingerprint, asyncio.get_running_loop().create_future())
+        self.records[key] = record
+        self.executions += 1
+        try:
+            result = await fn()
+        except Exception as e:
+            # 실패한 요청은 저장하지 않고, 기다리던 재시도에는 같은 오류를 전달
+            self.records.pop(key, None)
+            record.future.set_exception(e)
+            record.future.exception()  # 기다리는 쪽이 없을 때 경고 방지
+            raise
+        except BaseException:
+            # 요청 취소(클라이언트 연결 종료 등)
+            self.records.pop(key, None)
+            record.future.cancel()
+            raise
+        record.result = result
+        record.expires_at = time.time() + ttl
+        heapq.heappush(self._expiry_heap, (record.expires_at, key, record))
+        record.future.set_result(result)
+        return result, False
+
+    def clear(self) -> None:
+        self.records.clear()
+        self._expiry_heap.clear()
+
+
+# 멱등성 저장소 인스턴스 생성
+idempotency_store = IdempotencyStore()
+
+
+def request_fingerprint(payload: Any) -> str:
+    """요청 내용(dict/list 등)을 정렬된 JSON으로 직렬화한 SHA-256 해시"""
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def run_idempotent(
+    scope: str,
+    session_id: Optional[str],
+    payload: Any,
+    fn: Callable[[], Awaitable[Any]],
+    *,
+    idempotency_key: Optional[str] = None,
+    response: Optional[Response] = None,
+) -> Any:
+    """
+    멱등성 키 단위로 fn을 한 번만 실행하고 결과를 재사용합니다.
+
+    Args:
+        scope: API 구분자 (예: "payments:order")
+        session_id: 요청한 사용자의 세션 ID
+        payload: 요청 내용 (키가 없을 때 키로, 키가 있을 때 내용 검증용으로 사용)
+        fn: 실제 처리 코루틴 함수 (성공 시 반환값이 저장됨)
+        idempotency_key: 클라이언트가 보낸 Idempotency-Key 헤더 값
+        response: 재생된 응답에 Idempotent-Replayed 헤더를 붙일 Response
+    """
+    fingerprint = request_fingerprint(payload)
+    if idempotency_key:
+        key = f"{scope}:{session_id}:key:{idempotency_key}"
+        ttl = settings.IDEMPOTENCY_TTL_SECONDS
+    else:
+        # 헤더가 없으면 같은 세션의 같은 요청 내용을 짧은 시간 동안 같은 요청으로 취급
+        key = f"{scope}:{session_id}:body:{fingerprint}"
+        ttl = settings.IDEMPOTENCY_DERIVED_TTL_SECONDS
+
+    result, replayed = await idempotency_store.run(key, fingerprint, fn, ttl)
+    if replayed:
+        logger.info(f"멱등성 키 재사용: scope={scope}, session={session_id}")
+        if response is not None:
+            response.headers[REPLAYED_HEADER] = "true"
+    return result
@@ -0,0 +1,137 @@
+"""
+관리자 실시간 WebSocket 메시지 인코딩 (JSON / MessagePack)
+
+실시간 매출(/api/admin/realtime-sales)과 알림(/api/admin/notifications/ws) WebSocket 은 기본적으로
+JSON 텍스트를 보내며, 매 메시지마다 order_number, total_amount, created_at 같은 키가 반복됩니다.
+클라이언트가 WebSocket 서브프로토콜(또는 ?encoding=msgpack)로 요청하면 MessagePack 바이너리로 보냅니다.
+
+- 서브프로토콜: "cafe.msgpack.v1" (MessagePack), "cafe.json.v1" (JSON, 기본값)
+- MessagePack 인코딩은 고정 필드 테이블(FIELD_TABLE)로 dict 키를 정수로 바꾸고,
+  정수 값인 float(원 단위 금액)는 정수로 보냅니다. 테이블에 없는 키는 문자열 그대로 둡니다.
+  FIELD_TABLE 은 클라이언트와 공유하는 약속이므로 항목을 지우거나 순서를 바꾸지 말고 끝에만 추가합니다.
+  (호환되지 않게 바꿔야 하면 서브프로토콜 버전을 올림)
+- WireMessage 는 인코딩 결과를 형식별로 한 번만 만들어 캐시하므로, 같은 메시지를 받는 모든
+  클라이언트가 같은 str/bytes 객체를 공유합니다.
+- permessage-deflate 압축은 서버(uvicorn websockets 구현, --ws-per-message-deflate)가
+  클라이언트가 지원할 때 핸드셰이크에서 협상합니다.
+
+msgpack 패키지가 없으면 항상 JSON 으로 동작합니다.
+"""
+import json
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import WebSocket
+
+try:
+    import msgpack
+except ImportError:  # msgpack 미설치 시 JSON 만 사용
+    msgpack = None
+
+JSON = "json"
+MSGPACK = "msgpack"
+
+SUBPROTOCOLS = {
+    "cafe.msgpack.v1": MSGPACK,
+    "cafe.json.v1": JSON,
+}
+
+# 끝에만 추가 (인덱스가 곧 키)
+FIELD_TABLE = (
+    "type", "data", "timestamp", "version", "base_version", "message",
+    "today_sales", "sales_delta", "hourly_data", "hour", "count", "amount",
+    "recent_orders", "new_orders", "latest_order",
+    "id", "order_id", "order_number", "session_id", "status", "previous_status",
+    "total_amount", "payment_method", "created_at", "updated_at",
+    "items", "item_id", "menu_id", "menu_name", "quantity", "unit_price", "total_price",
+    "options", "special_requests", "customer_name", "table_number",
+    "ingredient_id", "ingredient_name", "current_quantity", "min_stock_level", "unit",
+    "is_surge", "recent_order_count", "previous_order_count", "baseline", "time_window_minutes",
+    "severity", "is_anomaly", "direction", "order_count", "expected", "std_dev",
+)
+FIELD_INDEX = {name: index for index, name in enumerate(FIELD_TABLE)}
+
+
+def compact(value: Any) -> Any:
+    """MessagePack 인코딩 전 변환: dict 키 -> 필드 번호, 정수 값 float -> int"""
+    if isinstance(value, dict):
+        return {FIELD_INDEX.get(key, key): compact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [compact(item) for item in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def expand(value: Any) -> Any:
+    """compact() 의 역변환 (파이썬 클라이언트/테스트용, 정수로 바뀐 금액은 그대로 int)"""
+    if isinstance(value, dict):
+        return {
+            (FIELD_TABLE[key] if isinstance(key, int) and key < len(FIELD_TABLE) else key): expand(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [expand(item) for item in value]
+    return value
+
+
+def encode_msgpack(payload: Any) -> bytes:
+    return msgpack.packb(compact(payload), use_bin_type=True, default=str)
+
+
+def decode_msgpack(data: bytes) -> Any:
+    return expand(msgpack.unpackb(data, raw=False, strict_map_key=False))
+
+
+class WireMessage:
+    """형식별 인코딩 결과를 한 번만 만들어 공유하는 브로드캐스트 메시지"""
+
+    __slots__ = ("payload", "_json", "_msgpack")
+
+    def __init__(self, payload: Any, json_text: Optional[str] = None):
+        self.payload = payload
+        self._json = json_text
+        self._msgpack: Optional[bytes] = None
+
+    @property
+    def json(self) -> str:
+        if self._json is None:
+            self._json = json.dumps(self.payload, ensure_ascii=False, default=str)
+        return self._json
+
+    @property
+    def msgpack(self) -> bytes:
+        if self._msgpack is None:
+            self._msgpack = encode_msgpack(self.payload)
+        return self._msgpack
+
+
+def negotiate_encoding(websocket: WebSocket) -> tuple:
+    """(인코딩, 응답할 서브프로토콜). 서브프로토콜 목록을 먼저 보고 없으면 ?encoding= 쿼리 사용"""
+    for protocol in websocket.scope.get("subprotocols") or []:
+        encoding = SUBPROTOCOLS.get(protocol)
+        if encoding == MSGPACK and msgpack is None:
+            continue
+        if encoding is not None:
+            return encoding, protocol
+    if websocket.query_params.get("encoding") == MSGPACK and msgpack is not None:
+        return MSGPACK, None
+    return JSON, None
+
+
+async def accept_websocket(websocket: WebSocket) -> str:
+    """인코딩을 협상해 연결을 수락하고 인코딩 이름 반환"""
+    encoding, subprotocol = negotiate_encoding(websocket)
+    await websocket.accept(subprotocol=subprotocol)
+    return encoding
+
+
+def message_sender(websocket: WebSocket, encoding: str = JSON) -> Callable[[WireMessage], Awaitable[None]]:
+    """브로드캐스터 전송 태스크가 사용할 전송 함수 (클라이언트 인코딩에 맞춰 캐시된 결과 전송)"""
+    if encoding == MSGPACK:
+        return lambda message: websocket.send_bytes(message.msgpack)
+    return lambda message: websocket.send_text(message.json)
+
+
+def field_table() -> Dict[str, Any]:
+    """클라이언트가 MessagePack 키를 해석할 때 쓰는 필드 테이블"""
+    return {"subprotocol": "cafe.msgpack.v1", "fields": list(FIELD_TABLE)}
@@ -62,32 +62,73 @@ def get_or_create_cart(db: Session, session_id: str) -> Cart:
         logger.error(f"Error in get_or_create_cart for session {session_id}: {str(e)}")
         raise
 
+# --- 커밋하지 않는 쓰기 단계 (단일 writer 큐 작업에서 사용) ---
+
+def stage_add_item(db: Session, cart_id: int, item: CartItemCreate) -> None:
+    """장바구니에 항목을 추가하거나 수량을 늘립니다. (커밋하지 않음)"""
+    # 기존 아이템이 있는지 확인
+    existing_item = db.query(CartItem).filter(
+        CartItem.cart_id == cart_id,
+        CartItem.menu_id == item.menu_id
+    ).first()
+
+    if existing_item:
+        # 기존 아이템이 있으면 수량만 증가
+        existing_item.quantity += item.quantity
+        logger.info(f"Updated quantity of existing item {existing_item.id} in cart {cart_id}")
+    else:
+        # 새 아이템 추가
+        db_item = CartItem(
+            cart_id=cart_id,
+            menu_id=item.menu_id,
+            quantity=item.quantity,
+            special_requests=item.special_requests
+        )
+        db.add(db_item)
+        logger.info(f"Added new item to cart {cart_id}")
+
+def stage_update_item(db: Session, cart_id: int, item_id: int, item: CartItemUpdate) -> None:
+    """장바구니 항목을 수정합니다. (커밋하지 않음)"""
+    db_item = db.query(CartItem).filter(
+        CartItem.id == item_id,
+        CartItem.cart_id == cart_id
+    ).first()
+    
+    if not db_item:
+        logger.error(f"Cart item {item_id} not found in cart {cart_id}")
+        raise HTTPException(status_code=404, detail="장바구니 항목을 찾을 수 없습니다")
+    
+    for field, value in item.dict(exclude_unset=True).items():
+        setattr(db_item, field, value)
+    logger.info(f"Updated item {item_id} in cart {cart_id}")
+
+def stage_remove_item(db: Session, cart_id: int, item_id: int) -> None:
+    """장바구니 항목을 삭제합니다. (커밋하지 않음)"""
+    deleted = db.query(CartItem).filter(
+        CartItem.id == item_id,
+        CartItem.cart_id == cart_id
+    ).delete()
+    
+    if not deleted:
+        logger.error(f"Cart item {item_id} not found in cart {cart_id}")
+        raise HTTPException(status_code=404, detail="장바구니 항목을 찾을 수 없습니다")
+    logger.info(f"Removed item {item_id} from cart {cart_id}")
+
+def stage_clear_session_cart(db: Session, session_id: str) -> int:
+    """세션의 장바구니 항목을 모두 삭제합니다. (커밋하지 않음, 삭제된 항목 수 반환)"""
+    cart_id = db.query(Cart.id).filter(Cart.session_id == session_id).scalar()
+    if cart_id is None:
+        return 0
+    deleted = db.query(CartItem).filter(CartItem.cart_id == cart_id).delete()
+    logger.info(f"Cleared {deleted} items from cart {cart_id} (session {session_id})")
+    return deleted
+
 def add_item_to_cart(
     db: Session, cart_id: int, item: CartItemCreate
 ) -> Cart:
     try:
-        # 기존 아이템이 있는지 확인
-        existing_item = db.query(CartItem).filter(
-            CartItem.cart_id == cart_id,
-            CartItem.menu_id == item.menu_id
-        ).first()
-
-        if existing_item:
-            # 기존 아이템이 있으면 수량만 증가
-            existing_item.quantity += item.quantity
-            logger.info(f"Updated quantity of existing item {existing_item.id} in cart {cart_id}")
-            db.commit()
-        else:
-            # 새 아이템 추가
-            db_item = CartItem(
-                cart_id=cart_id,
-                menu_id=item.menu_id,
-                quantity=item.quantity,
-                special_requests=item.special_requests
-            )
-            db.add(db_item)
-            logger.info(f"Added new item to cart {cart_id}")
-            db.commit()
+        stage_add_item(db, cart_id, item)
+        db.commit()
         
         # 업데이트된 장바구니 반환
         cart = db.query(Cart).options(
@@ -108,19 +149,7 @@ def update_cart_item(
     db: Session, cart_id: int, item_id: int, item: CartItemUpdate
 ) -> Cart:
     try:
-        db_item = db.query(CartItem).filter(
-            CartItem.id == item_id,
-            CartItem.cart_id == cart_id
-        ).first()
-        
-        if not db_item:
-            logger.error(f"Cart item {item_id} not found in cart {cart_id}")
-            raise HTTPException(status_code=404, detail="장바구니 항목을 찾을 수 없습니다")
-        
-        for field, value in item.dict(exclude_unset=True).items():
-            setattr(db_item, field, value)
-        
-        logger.info(f"Updated item {item_id} in cart {cart_id}")
+        stage_update_item(db, cart_id, item_id, item)
         db.commit()
         
         # 업데이트된 장바구니 반환
@@ -142,17 +171,7 @@ def update_cart_item(
 
 def remove_cart_item(db: Session, cart_id: int, item_id: int) -> Cart:
     try:
-        db_item = db.query(CartItem).filter(
-            CartItem.id == item_id,
-            CartItem.cart_id == cart_id
-        ).first()
-        
-        if not db_item:
-            logger.error(f"Cart item {item_id} not found in cart {cart_id}")
-            raise HTTPException(status_code=404, detail="장바구니 항목을 찾을 수 없습니다")
-        
-        db.delete(db_item)
-        logger.info(f"Removed item {item_id} from cart {cart_id}")
+        stage_remove_item(db, cart_id, item_id)
         db.commit()
         
         # 업데이트된 장바구니 반환
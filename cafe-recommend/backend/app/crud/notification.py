@@ -0,0 +1,169 @@
+"""
+관리자 알림 저장소 (알림 테이블 + 관리자별 읽음 커서)
+
+기존 알림 목록은 호출마다 모든 재료를 조회해 알림을 다시 만들고 파이썬에서 정렬/슬라이스했으며,
+읽지 않은 알림 수는 전체 개수를 그대로 반환했습니다.
+
+- 알림은 발생 시점에 admin_notifications 에 한 행씩 추가 (add_notification)
+- 목록은 id 내림차순 키셋 페이지네이션 (cursor 이후 limit 건만 읽음)
+- 읽지 않은 알림 수는 관리자별 커서 행(admin_notification_cursors)의 카운터를
+  알림 추가/읽음 처리와 같은 트랜잭션에서 증감 -> 조회는 기본키 한 행 읽기
+- 읽음 커서(last_read_id) 이전은 모두 읽음, 이후에 개별로 읽은 알림만 admin_notification_reads 에 기록
+
+쓰기 함수(add_notification, mark_read, mark_all_read, ensure_cursor)는 커밋하지 않으며
+writer 큐(run_write/submit_write) 안에서 실행합니다.
+"""
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.crud.pagination import decode_cursor, next_cursor
+from app.models.notification import AdminNotification, AdminNotificationCursor, AdminNotificationRead
+
+
+def add_notification(
+    session: Session,
+    type: str,
+    payload: Dict[str, Any],
+    severity: str = "low",
+    dedupe_key: Optional[str] = None,
+) -> Optional[int]:
+    """알림 추가 후 모든 관리자의 읽지 않은 알림 수 증가. dedupe_key 가 이미 있으면 None"""
+    result = session.execute(
+        sqlite_insert(AdminNotification)
+        .values(
+            type=type,
+            severity=severity,
+            payload=json.dumps(payload, ensure_ascii=False, default=str),
+            dedupe_key=dedupe_key,
+        )
+        .on_conflict_do_nothing(index_elements=["dedupe_key"])
+    )
+    if not result.rowcount:
+        return None
+    session.execute(
+        update(AdminNotificationCursor).values(unread_count=AdminNotificationCursor.unread_count + 1)
+    )
+    return result.inserted_primary_key[0]
+
+
+def ensure_cursor(session: Session, admin_id: int) -> None:
+    """
+    관리자 커서 행이 없으면 생성 (처음 한 번만 기존 알림 수를 셈)
+
+    INSERT ... SELECT 한 문장으로 만들기 때문에 그 사이에 추가된 알림이 빠지지 않습니다.
+    """
+    session.execute(
+        text(
+            "INSERT OR IGNORE INTO admin_notification_cursors (admin_id, last_read_id, unread_count, updated_at) "
+            "SELECT :admin_id, 0, count(*), CURRENT_TIMESTAMP FROM admin_notifications"
+        ),
+        {"admin_id": admin_id},
+    )
+
+
+def get_cursor(db: Session, admin_id: int) -> Optional[AdminNotificationCursor]:
+    return db.get(AdminNotificationCursor, admin_id)
+
+
+def get_unread_count(db: Session, admin_id: int) -> Optional[int]:
+    """읽지 않은 알림 수 (커서 행이 아직 없으면 None)"""
+    return db.execute(
+        select(AdminNotificationCursor.unread_count).where(AdminNotificationCursor.admin_id == admin_id)
+    ).scalar()
+
+
+def _to_item(row: AdminNotification, is_read: bool) -> Dict[str, Any]:
+    item = json.loads(row.payload)
+    item.update({
+        "id": row.id,
+        "type": row.type,
+        "severity": row.severity,
+        "created_at": row.created_at,
+        "is_read": is_read,
+    })
+    return item
+
+
+def list_notifications(
+    db: Session,
+    cursor_row: AdminNotificationCursor,
+    *,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    type: Optional[str] = None,
+    unread_only: bool = False,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    알림 한 페이지 (id 내림차순)와 다음 페이지 커서
+
+    Raises:
+        ValueError: 형식이 잘못된 커서인 경우
+    """
+    query = db.query(AdminNotification)
+    if cursor:
+        _, before_id = decode_cursor(cursor)
+        query = query.filter(AdminNotification.id < before_id)
+    if type:
+        query = query.filter(AdminNotification.type == type)
+
+    admin_id = cursor_row.admin_id
+    if unread_only:
+        read_ids = select(AdminNotificationRead.notification_id).where(AdminNotificationRead.admin_id == admin_id)
+        query = query.filter(
+            AdminNotification.id > cursor_row.last_read_id,
+            AdminNotification.id.notin_(read_ids),
+        )
+    rows = query.order_by(AdminNotification.id.desc()).limit(limit).all()
+
+    # 커서 이후 알림 중 개별로 읽은 것만 이 페이지 id 로 한 번에 확인
+    unread_ids = [row.id for row in rows if row.id > cursor_row.last_read_id]
+    read = set()
+    if unread_ids and not unread_only:
+        read = set(db.execute(
+            select(AdminNotificationRead.notification_id).where(
+                AdminNotificationRead.admin_id == admin_id,
+                AdminNotificationRead.notification_id.in_(unread_ids),
+            )
+        ).scalars())
+    items = [_to_item(row, row.id <= cursor_row.last_read_id or row.id in read) for row in rows]
+    return items, next_cursor(rows, limit)
+
+
+def mark_read(session: Session, admin_id: int, notification_id: int) -> Optional[bool]:
+    """
+    알림 하나를 읽음 처리. 알림이 없으면 None, 새로 읽음 처리했으면 True, 이미 읽었으면 False
+    """
+    if session.get(AdminNotification, notification_id) is None:
+        return None
+    ensure_cursor(session, admin_id)
+    cursor_row = session.get(AdminNotificationCursor, admin_id)
+    if notification_id <= cursor_row.last_read_id:
+        return False
+    result = session.execute(
+        sqlite_insert(AdminNotificationRead)
+        .values(admin_id=admin_id, notification_id=notification_id)
+        .on_conflict_do_nothing()
+    )
+    if not result.rowcount:
+        return False
+    cursor_row.unread_count = max((cursor_row.unread_count or 0) - 1, 0)
+    cursor_row.updated_at = datetime.utcnow()
+    return True
+
+
+def mark_all_read(session: Session, admin_id: int) -> int:
+    """현재까지의 알림을 모두 읽음 처리 (커서를 마지막 알림으로 이동). 새로 읽음 처리한 수 반환"""
+    ensure_cursor(session, admin_id)
+    cursor_row = session.get(AdminNotificationCursor, admin_id)
+    last_id = session.execute(select(func.max(AdminNotification.id))).scalar() or 0
+    marked = cursor_row.unread_count or 0
+    cursor_row.last_read_id = max(cursor_row.last_read_id, last_id)
+    cursor_row.unread_count = 0
+    cursor_row.updated_at = datetime.utcnow()
+    session.execute(delete(AdminNotificationRead).where(AdminNotificationRead.admin_id == admin_id))
+    return marked
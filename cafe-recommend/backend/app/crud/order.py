@@ -1,15 +1,21 @@
 from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy import func, desc, and_, or_, text
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 import pytz
 import json
 import logging
 
 from app.crud.base import CRUDBase
+from app.crud.pagination import cached_total, paginate
+from app.crud.order_search import has_order_search_index, match_subquery, search_order_ids
+from app.core.events import ORDER_STATUS_CHANGED, PAYMENT_APPROVED, event_bus, stage_event
 from app.models.order import Order, OrderItem
 from app.models.menu import Menu
 from app.schemas.order import OrderCreate, OrderUpdate
+from app.services.order_events import order_event_data
+from app.services.stock_deduction import track_order_stock
+from app.services.sales_rollup import get_daily_order_totals
 
 class CRUDOrder(CRUDBase[Order, OrderCreate, OrderUpdate]):
     def get_by_user(self, db: Session, *, user_id: int, skip: int = 0, limit: int = 100) -> Tuple[List[Order], int]:
@@ -27,41 +33,41 @@ class CRUDOrder(CRUDBase[Order, OrderCreate, OrderUpdate]):
             
         return orders, total
 
-    def get_by_session(self, db: Session, *, session_id: str, skip: int = 0, limit: int = 100) -> Tuple[List[Order], int]:
-        """세션 ID로 주문 조회 - 세션 기반 사용자 추적용"""
-        # 쿼리 최적화: 전체 결과 수 계산
-        total = db.query(func.count(self.model.id)).filter(self.model.session_id == session_id).scalar()
+    def get_by_session(self, db: Session, *, session_id: str, skip: int = 0, limit: int = 100,
+                       cursor: Optional[str] = None, with_total: bool = True) -> Tuple[List[Order], Optional[int]]:
+        """세션 ID로 주문 조회 - 세션 기반 사용자 추적용 (cursor가 있으면 키셋 페이지네이션)"""
+        query = db.query(self.model).filter(self.model.session_id == session_id)
         
-        # 주문 조회 최적화: 주문 관련 데이터 한 번에 로딩
-        orders = db.query(self.model)\
-            .filter(self.model.session_id == session_id)\
-            .order_by(desc(self.model.created_at))\
-            .offset(skip)\
-            .limit(limit)\
-            .all()
-            
+        # 전체 결과 수는 짧게 캐싱하여 페이지마다 COUNT를 반복하지 않음
+        total = None
+        if with_total:
+            count_query = db.query(func.count(self.model.id)).filter(self.model.session_id == session_id)
+            total = cached_total(count_query, "order_count:session", session_id)
+        
+        orders = paginate(query, self.model, skip=skip, limit=limit, cursor=cursor)
         return orders, total
 
-    def get_by_status(self, db: Session, *, status: str, skip: int = 0, limit: int = 100) -> Tuple[List[Order], int]:
-        """상태로 주문 조회 - 관리자용 주문 관리 기능"""
-        # 쿼리 최적화: 전체 결과 수 계산
-        total = db.query(func.count(self.model.id)).filter(self.model.status == status).scalar()
+    def get_by_status(self, db: Session, *, status: str, skip: int = 0, limit: int = 100,
+                      cursor: Optional[str] = None, with_total: bool = True) -> Tuple[List[Order], Optional[int]]:
+        """상태로 주문 조회 - 관리자용 주문 관리 기능 (cursor가 있으면 키셋 페이지네이션)"""
+        query = db.query(self.model).filter(self.model.status == status)
         
-        # 주문 조회 최적화: 최신 주문 먼저 표시
-        orders = db.query(self.model)\
-            .filter(self.model.status == status)\
-            .order_by(desc(self.model.created_at))\
-            .offset(skip)\
-            .limit(limit)\
-            .all()
-            
+        total = None
+        if with_total:
+            count_query = db.query(func.count(self.model.id)).filter(self.model.status == status)
+            total = cached_total(count_query, "order_count:status", status)
+        
+        # 최신 주문 먼저 표시
+        orders = paginate(query, self.model, skip=skip, limit=limit, cursor=cursor)
         return orders, total
 
     def get_orders_with_items(self, db: Session, *, skip: int = 0, limit: int = 100, 
                              status: Optional[str] = None, 
                              date_from: Optional[datetime] = None,
-                             date_to: Optional[datetime] = None) -> Tuple[List[Order], int]:
-        """주문 목록 조회 - 필터링, 페이지네이션, 정렬 지원"""
+                             date_to: Optional[datetime] = None,
+                             cursor: Optional[str] = None,
+                             with_total: bool = True) -> Tuple[List[Order], Optional[int]]:
+        """주문 목록 조회 - 필터링, 페이지네이션(offset 또는 cursor), 정렬 지원"""
         query = db.query(self.model)
         count_query = db.query(func.count(self.model.id))
         
@@ -79,10 +85,14 @@ class CRUDOrder(CRUDBase[Order, OrderCreate, OrderUpdate]):
             count_query = count_query.filter(self.model.created_at <= date_to)
         
         # 전체 결과 수
-        total = count_query.scalar()
+        total = None
+        if with_total:
+            total = cached_total(count_query, "order_count:list", status,
+                                 date_from.isoformat() if date_from else None,
+                                 date_to.isoformat() if date_to else None)
         
         # 정렬 및 페이지네이션
-        orders = query.order_by(desc(self.model.created_at)).offset(skip).limit(limit).all()
+        orders = paginate(query, self.model, skip=skip, limit=limit, cursor=cursor)
         
         return orders, total
 
@@ -185,8 +195,12 @@ class CRUDOrder(CRUDBase[Order, OrderCreate, OrderUpdate]):
         if not result:
             return None
             
+        track_order_stock(db, [order_id])  # raw SQL 변경: 커밋 직전 재고 차감/복원
         db.commit()
-        return self.get(db=db, id=order_id)
+        order = self.get(db=db, id=order_id)
+        # raw SQL 변경은 ORM 이벤트 훅을 거치지 않으므로 직접 발행
+        event_bus.publish(ORDER_STATUS_CHANGED, order_event_data(order))
+        return order
 
     def get_recent_orders(self, db: Session, *, days: int = 30, status: Optional[str] = None) -> List[Order]:
         """최근 주문 조회 - 날짜 범위 필터링"""
@@ -210,28 +224,16 @@ class CRUDOrder(CRUDBase[Order, OrderCreate, OrderUpdate]):
         if not date_to:
             date_to = datetime.now().date()
             
-        # Raw SQL 쿼리로 통계 집계 최적화
-        stats = db.execute(
-            text("""
-            SELECT 
-                DATE(created_at) as order_date,
-                COUNT(*) as order_count,
-                SUM(total_amount) as total_sales
-            FROM 
-                orders
-            WHERE 
-                DATE(created_at) BETWEEN :date_from AND :date_to
-                AND status != 'cancelled'
-            GROUP BY 
-                DATE(created_at)
-            ORDER BY 
-                order_date
-            """),
-            {"date_from": date_from, "date_to": date_to}
-        ).fetchall()
-        
+        # 시간대별 매출 집계 테이블에서 일 단위로 합산 (주문 수와 무관하게 기간에 비례)
+        stats = get_daily_order_totals(
+            db,
+            start=date_from,
+            end=date_to + timedelta(days=1),
+            exclude_statuses=['cancelled'],
+        )
+
         return [
-            {"date": row[0], "count": row[1], "sales": float(row[2])}
+            {"date": row.date, "count": row.order_count, "sales": float(row.total_amount)}
             for row in stats
         ]
 
@@ -272,88 +274,97 @@ class CRUDOrder(CRUDBase[Order, OrderCreate, OrderUpdate]):
             "total_amount": total_amount
         }
 
-def create_order(db: Session, order_data: OrderCreate) -> Order:
-    """새로운 주문 생성 (주문번호는 결제 완료 시 생성)"""
-    try:
-        # KST 시간대 생성
-        kst = pytz.timezone('Asia/Seoul')
-        now_kst = datetime.now(kst)
-        
-        # 5. Order 객체 생성 (order_number=None 으로 설정)
-        db_order = Order(
-            order_number=None, # 주문번호는 결제 완료 시 생성
-            status="pending",
-            payment_method=order_data.payment_method,
-            session_id=order_data.session_id, 
-            delivery_address=getattr(order_data, 'delivery_address', None),
-            delivery_request=getattr(order_data, 'delivery_request', None),
-            phone_number=getattr(order_data, 'phone_number', None),
-            created_at=now_kst
-            # total_amount 와 items 는 아래에서 처리
-        )
-        db.add(db_order)
-        db.flush()  # ID 생성을 위해 flush
+def build_order(db: Session, order_data: OrderCreate) -> Order:
+    """
+    주문과 주문 항목을 세션에 추가하고 flush 합니다. (커밋하지 않음)
 
-        # 메뉴 ID 목록 생성 - 단일 쿼리로 모든 메뉴 정보 가져오기
-        menu_ids = [item.menu_id for item in order_data.items]
-        menus = {
-            menu.id: menu for menu in 
-            db.query(Menu).filter(Menu.id.in_(menu_ids)).all()
-        }
+    단일 writer 큐의 작업 안에서 다른 쓰기와 함께 그룹 커밋될 수 있도록
+    트랜잭션 경계는 호출하는 쪽(create_order 또는 writer)이 결정합니다.
+    """
+    # KST 시간대 생성
+    kst = pytz.timezone('Asia/Seoul')
+    now_kst = datetime.now(kst)
+    
+    # 5. Order 객체 생성 (order_number=None 으로 설정)
+    db_order = Order(
+        order_number=None, # 주문번호는 결제 완료 시 생성
+        status="pending",
+        payment_method=order_data.payment_method,
+        session_id=order_data.session_id, 
+        delivery_address=getattr(order_data, 'delivery_address', None),
+        delivery_request=getattr(order_data, 'delivery_request', None),
+        phone_number=getattr(order_data, 'phone_number', None),
+        created_at=now_kst
+        # total_amount 와 items 는 아래에서 처리
+    )
+    db.add(db_order)
+    db.flush()  # ID 생성을 위해 flush
 
-        total_amount = 0
-        order_items_data_for_json = [] # JSON 저장을 위한 데이터
-        order_items = [] # 트랜잭션 최적화를 위해 일괄 추가
-        
-        for item in order_data.items:
-            menu_item = menus.get(item.menu_id)
-            if not menu_item:
-                # 메뉴 못 찾으면 롤백하고 에러 발생
-                db.rollback()
-                raise ValueError(f"Menu item with id {item.menu_id} not found") 
-                
-            unit_price = item.unit_price if item.unit_price is not None else menu_item.price
-            item_total = unit_price * item.quantity
-            
-            # 로그 추가: OrderItem 생성 직전 값 확인
-            logging.info(f"CRUDOrder.create_order: Preparing OrderItem - Menu ID: {item.menu_id}, Menu Name: '{menu_item.name}', Menu Price: {menu_item.price}, Quantity: {item.quantity}, Calculated Unit Price: {unit_price}, Calculated Item Total: {item_total}")
+    # 메뉴 ID 목록 생성 - 단일 쿼리로 모든 메뉴 정보 가져오기
+    menu_ids = [item.menu_id for item in order_data.items]
+    menus = {
+        menu.id: menu for menu in 
+        db.query(Menu).filter(Menu.id.in_(menu_ids)).all()
+    }
 
-            # OrderItem 객체 생성 및 추가
-            order_items.append(
-                OrderItem(
-                    order_id=db_order.id,
-                    menu_id=item.menu_id,
-                    quantity=item.quantity,
-                    unit_price=unit_price,
-                    total_price=item_total
-                )
-            )
-            total_amount += item_total
+    total_amount = 0
+    order_items_data_for_json = [] # JSON 저장을 위한 데이터
+    order_items = [] # 트랜잭션 최적화를 위해 일괄 추가
+    
+    for item in order_data.items:
+        menu_item = menus.get(item.menu_id)
+        if not menu_item:
+            raise ValueError(f"Menu item with id {item.menu_id} not found") 
             
-            # JSON 저장용 데이터 구성
-            order_items_data_for_json.append({
-                 "menu_id": item.menu_id,
-                 "menu_name": menu_item.name,
-                 "quantity": item.quantity,
-                 "unit_price": unit_price,
-                 "total_price": item_total
-            })
-
-        # Order 객체에 계산된 총액과 JSON 아이템 목록 업데이트
-        db_order.total_amount = total_amount
-        db_order.items = json.dumps(order_items_data_for_json, ensure_ascii=False) # ensure_ascii=False 추가 (한글 처리)
-        
-        # 일괄 추가로 쿼리 수 최적화
-        db.bulk_save_objects(order_items)
+        unit_price = item.unit_price if item.unit_price is not None else menu_item.price
+        item_total = unit_price * item.quantity
         
-        # 주문 카운트 업데이트 - 단일 쿼리로 여러 메뉴 업데이트
-        menu_qty_pairs = [(item.menu_id, item.quantity) for item in order_data.items]
-        for menu_id, quantity in menu_qty_pairs:
-            db.execute(
-                text("UPDATE menus SET order_count = order_count + :qty WHERE id = :menu_id"),
-                {"qty": quantity, "menu_id": menu_id}
+        # 로그 추가: OrderItem 생성 직전 값 확인
+        logging.info(f"CRUDOrder.create_order: Preparing OrderItem - Menu ID: {item.menu_id}, Menu Name: '{menu_item.name}', Menu Price: {menu_item.price}, Quantity: {item.quantity}, Calculated Unit Price: {unit_price}, Calculated Item Total: {item_total}")
+
+        # OrderItem 객체 생성 및 추가
+        order_items.append(
+            OrderItem(
+                order_id=db_order.id,
+                menu_id=item.menu_id,
+                quantity=item.quantity,
+                unit_price=unit_price,
+                total_price=item_total
             )
+        )
+        total_amount += item_total
         
+        # JSON 저장용 데이터 구성
+        order_items_data_for_json.append({
+             "menu_id": item.menu_id,
+             "menu_name": menu_item.name,
+             "quantity": item.quantity,
+             "unit_price": unit_price,
+             "total_price": item_total
+        })
+
+    # Order 객체에 계산된 총액과 JSON 아이템 목록 업데이트
+    db_order.total_amount = total_amount
+    db_order.items = json.dumps(order_items_data_for_json, ensure_ascii=False) # ensure_ascii=False 추가 (한글 처리)
+    
+    # 일괄 추가로 쿼리 수 최적화
+    db.bulk_save_objects(order_items)
+    
+    # 주문 카운트 업데이트 - 단일 쿼리로 여러 메뉴 업데이트
+    menu_qty_pairs = [(item.menu_id, item.quantity) for item in order_data.items]
+    for menu_id, quantity in menu_qty_pairs:
+        db.execute(
+            text("UPDATE menus SET order_count = order_count + :qty WHERE id = :menu_id"),
+            {"qty": quantity, "menu_id": menu_id}
+        )
+    
+    db.flush()
+    return db_order
+
+def create_order(db: Session, order_data: OrderCreate) -> Order:
+    """새로운 주문 생성 (주문번호는 결제 완료 시 생성)"""
+    try:
+        db_order = build_order(db, order_data)
         db.commit()
         db.refresh(db_order)
         return db_order
@@ -363,6 +374,65 @@ def create_order(db: Session, order_data: OrderCreate) -> Order:
         # DB 제약 조건 위반 등 커밋 시 오류 처리 (예: unique constraint)
         raise ValueError(f"Failed to commit order: {str(e)}")
 
+def generate_order_number(db: Session) -> str:
+    """오늘 날짜(KST) 기준 다음 주문번호 생성 (YYYYMMDD-NNN)"""
+    today_str = datetime.now(timezone(timedelta(hours=9))).strftime('%Y%m%d')
+    last_order_number = db.query(Order.order_number).filter(
+        Order.order_number.like(f"{today_str}-%")
+    ).order_by(Order.order_number.desc()).limit(1).scalar()
+    
+    next_seq = 1
+    if last_order_number:
+        try:
+            next_seq = int(last_order_number.split('-')[-1]) + 1
+        except (ValueError, IndexError):
+            logging.warning(f"이전 주문 번호 형식 오류: {last_order_number}")
+    return f"{today_str}-{next_seq:03d}"
+
+def mark_order_paid(db: Session, order_id: int, payment_key: Optional[str] = None) -> Optional[str]:
+    """
+    결제 승인된 주문을 paid 상태로 변경하고 주문번호를 부여합니다. (커밋하지 않음)
+
+    writer 큐 안에서 실행하면 주문번호 채번이 직렬화되어 동시 승인 시 번호 중복이 생기지 않습니다.
+    
+    Returns:
+        부여된 주문번호, 주문이 없으면 None
+    """
+    order = db.query(Order).filter(Order.id == order_id).first()
+    if not order:
+        return None
+    if order.status == "paid" and order.order_number:
+        # 중복 콜백: 이미 처리된 주문은 그대로 둠
+        return order.order_number
+    
+    order.order_number = generate_order_number(db)
+    order.status = "paid"
+    if payment_key:
+        order.payment_key = payment_key
+    db.flush()
+    stage_event(db, PAYMENT_APPROVED, order_event_data(order))
+    logging.info(f"새 주문 번호 생성: {order.order_number} (Order ID: {order.id})")
+    return order.order_number
+
+def update_order_fields(db: Session, order_id: int, expected_status: Optional[str] = None,
+                        **values: Any) -> Optional[Order]:
+    """
+    주문 컬럼을 변경합니다. (커밋하지 않음, writer 작업 안에서 사용)
+
+    ORM 객체를 변경하므로 주문 이벤트 발행과 재고 동기화 훅이 그대로 적용됩니다.
+    expected_status 가 주어지면 현재 상태가 그 값일 때만 변경합니다.
+
+    Returns:
+        변경된 주문, 주문이 없거나 상태가 다르면 None
+    """
+    order = db.query(Order).filter(Order.id == order_id).first()
+    if not order or (expected_status is not None and order.status != expected_status):
+        return None
+    for key, value in values.items():
+        setattr(order, key, value)
+    db.flush()
+    return order
+
 def get_order_by_number(db: Session, order_number: str) -> Optional[Order]:
     """주문번호로 주문 조회"""
     return db.query(Order).filter(Order.order_number == order_number).first()
@@ -382,17 +452,45 @@ def update_order_status(db: Session, order_id: int, status: str) -> Optional[Ord
     if not result:
         return None
         
+    track_order_stock(db, [order_id])  # raw SQL 변경: 커밋 직전 재고 차감/복원
     db.commit()
     
-    # 업데이트된 주문 반환
-    return db.query(Order).filter(Order.id == order_id).first()
+    # 업데이트된 주문 반환 (raw SQL 변경은 ORM 이벤트 훅을 거치지 않으므로 직접 발행)
+    order = db.query(Order).filter(Order.id == order_id).first()
+    event_bus.publish(ORDER_STATUS_CHANGED, order_event_data(order))
+    return order
 
 def get_pending_orders(db: Session) -> List[Order]:
     """처리 대기 중인 주문 목록 조회 - 인덱스 활용 최적화"""
     return db.query(Order).filter(Order.status == "pending").order_by(Order.created_at).all()
 
-def search_orders(db: Session, *, search_term: str, skip: int = 0, limit: int = 100) -> Tuple[List[Order], int]:
-    """주문 검색 기능 - 여러 필드 기반 검색 및 페이지네이션"""
+def search_orders(db: Session, *, search_term: str, skip: int = 0, limit: int = 100,
+                  cursor: Optional[str] = None, with_total: bool = True) -> Tuple[List[Order], Optional[int]]:
+    """
+    주문 검색 기능 - 주문번호, 전화번호, 주소 기반 검색 및 페이지네이션
+
+    orders_fts 전문 검색 인덱스가 있으면 인덱스로 검색합니다.
+    일치하는 주문이 한 페이지(limit) 안에 모두 들어가면 관련도순으로 정렬하고,
+    그보다 많으면 처음 페이지부터 최신순으로 정렬하여 마지막 행의 커서로 키셋 페이지네이션을 이어갈 수 있게 합니다.
+    인덱스를 쓸 수 없는 경우(3글자 미만 검색어 등)에는 LIKE 검색으로 대체합니다.
+    """
+    search_term = search_term.strip()
+    if has_order_search_index(db):
+        candidates = match_subquery(search_term)
+        if candidates is not None:
+            search_filter = Order.id.in_(candidates)
+            total = cached_total(db.query(func.count(Order.id)).filter(search_filter),
+                                 "order_count:search", search_term)
+            if cursor is None and total <= limit:
+                result = search_order_ids(db, search_term, skip=skip, limit=limit)
+                if result is not None:
+                    order_ids, _ = result
+                    orders_by_id = {o.id: o for o in db.query(Order).filter(Order.id.in_(order_ids)).all()}
+                    orders = [orders_by_id[order_id] for order_id in order_ids if order_id in orders_by_id]
+                    return orders, (total if with_total else None)
+            orders = paginate(db.query(Order).filter(search_filter), Order, skip=skip, limit=limit, cursor=cursor)
+            return orders, (total if with_total else None)
+
     search_pattern = f"%{search_term}%"
     
     # 주문번호, 전화번호, 주소에서 검색
@@ -403,10 +501,12 @@ def search_orders(db: Session, *, search_term: str, skip: int = 0, limit: int =
     )
     
     # 전체 결과 수
-    total = db.query(func.count(Order.id)).filter(search_filter).scalar()
+    total = None
+    if with_total:
+        total = cached_total(db.query(func.count(Order.id)).filter(search_filter), "order_count:search", search_term)
     
     # 검색 결과
-    orders = db.query(Order).filter(search_filter).order_by(desc(Order.created_at)).offset(skip).limit(limit).all()
+    orders = paginate(db.query(Order).filter(search_filter), Order, skip=skip, limit=limit, cursor=cursor)
     
     return orders, total
 
@@ -0,0 +1,209 @@
+"""
+관리자 주문 검색용 FTS5 전문 검색 인덱스
+
+`orders_fts`는 orders 테이블의 검색 대상 컬럼(주문번호, 전화번호, 배달 주소)을 복제한
+FTS5 가상 테이블(trigram 토크나이저)이며, rowid는 orders.id와 같습니다.
+orders의 INSERT/UPDATE/DELETE 트리거가 인덱스를 동기화하므로 애플리케이션 코드에서
+별도로 갱신할 필요가 없습니다.
+
+- trigram 토크나이저는 3글자 이상의 부분 문자열 검색을 인덱스로 처리합니다.
+  (LIKE '%term%' 전체 스캔 대체)
+- 전화번호는 '-'를 제거한 숫자만 저장하여 '1234', '010-1234' 등 어떤 형태로 입력해도 찾을 수 있고,
+  뒷자리(suffix)가 일치하는 주문을 우선 정렬합니다.
+- 3글자 미만 검색어나 FTS5/trigram을 지원하지 않는 SQLite에서는 기존 LIKE 검색으로 동작합니다.
+"""
+import logging
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Integer, column, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# trigram 토크나이저가 인덱스를 사용할 수 있는 최소 검색어 길이
+MIN_FTS_TERM_LENGTH = 3
+
+# bm25 컬럼 가중치 (order_number, phone, delivery_address)
+BM25_WEIGHTS = (10.0, 5.0, 1.0)
+
+# 일치 건수가 이보다 많으면 관련도 정렬 대신 최신순(rowid 역순)으로 반환
+# ('강남구'처럼 흔한 검색어는 모든 후보의 점수를 계산하는 비용이 크고, 관련도 차이도 거의 없음)
+MAX_RANKED_MATCHES = 5000
+
+FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS orders_fts USING fts5(
+        order_number, phone, delivery_address,
+        tokenize = 'trigram'
+    )
+    """,
+    # 전화번호는 하이픈/공백을 제거한 숫자만 인덱싱
+    """
+    CREATE TRIGGER IF NOT EXISTS orders_fts_ai AFTER INSERT ON orders BEGIN
+        INSERT INTO orders_fts (rowid, order_number, phone, delivery_address)
+        VALUES (new.id, new.order_number,
+                replace(replace(new.phone_number, '-', ''), ' ', ''),
+                new.delivery_address);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS orders_fts_ad AFTER DELETE ON orders BEGIN
+        DELETE FROM orders_fts WHERE rowid = old.id;
+    END
+    """,
+    # 검색 대상 컬럼이 바뀔 때만 재색인 (상태 변경 등은 무시)
+    """
+    CREATE TRIGGER IF NOT EXISTS orders_fts_au AFTER UPDATE OF order_number, phone_number, delivery_address ON orders BEGIN
+        DELETE FROM orders_fts WHERE rowid = old.id;
+        INSERT INTO orders_fts (rowid, order_number, phone, delivery_address)
+        VALUES (new.id, new.order_number,
+                replace(replace(new.phone_number, '-', ''), ' ', ''),
+                new.delivery_address);
+    END
+    """,
+]
+
+DROP_DDL = [
+    "DROP TRIGGER IF EXISTS orders_fts_ai",
+    "DROP TRIGGER IF EXISTS orders_fts_ad",
+    "DROP TRIGGER IF EXISTS orders_fts_au",
+    "DROP TABLE IF EXISTS orders_fts",
+]
+
+BACKFILL_SQL = """
+    INSERT INTO orders_fts (rowid, order_number, phone, delivery_address)
+    SELECT id, order_number, replace(replace(phone_number, '-', ''), ' ', ''), delivery_address
+    FROM orders
+"""
+
+# 엔진(URL)별 FTS 인덱스 사용 가능 여부 캐시
+_fts_available = {}
+
+
+def create_order_search_index(conn: Connection) -> None:
+    """FTS5 테이블과 동기화 트리거를 만들고, 새로 만든 경우 기존 주문을 색인합니다."""
+    exists = conn.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'orders_fts'"
+    )).first()
+    for ddl in FTS_DDL:
+        conn.execute(text(ddl))
+    if not exists:
+        conn.execute(text(BACKFILL_SQL))
+        logger.info("orders_fts 검색 인덱스 생성 및 기존 주문 색인 완료")
+    _fts_available.pop(str(conn.engine.url), None)
+
+
+def drop_order_search_index(conn: Connection) -> None:
+    for ddl in DROP_DDL:
+        conn.execute(text(ddl))
+    _fts_available.pop(str(conn.engine.url), None)
+
+
+def rebuild_order_search_index(conn: Connection) -> None:
+    """인덱스를 삭제 후 다시 생성 (데이터 불일치 복구용)"""
+    drop_order_search_index(conn)
+    create_order_search_index(conn)
+
+
+def has_order_search_index(db: Session) -> bool:
+    """현재 데이터베이스에 orders_fts 인덱스가 있는지 확인 (엔진별로 캐싱)"""
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _fts_available:
+        if bind.dialect.name != "sqlite":
+            _fts_available[key] = False
+        else:
+            _fts_available[key] = db.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'orders_fts'"
+            )).first() is not None
+    return _fts_available[key]
+
+
+def normalize_phone(term: str) -> Optional[str]:
+    """전화번호 형태의 검색어면 숫자만 남겨 반환, 아니면 None"""
+    if re.fullmatch(r"[\d\-\s]+", term):
+        digits = re.sub(r"\D", "", term)
+        return digits or None
+    return None
+
+
+def _fts_phrase(term: str) -> str:
+    """FTS5 MATCH 구문용 문자열 리터럴 (따옴표 이스케이프)"""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def build_match_query(term: str) -> Optional[str]:
+    """
+    검색어를 FTS5 MATCH 식으로 변환합니다. trigram으로 처리할 수 없으면 None.
+
+    숫자로만 된 검색어는 전화번호 컬럼과 주문번호 컬럼에서, 그 외에는 모든 컬럼에서 찾습니다.
+    """
+    term = term.strip()
+    phone = normalize_phone(term)
+    if phone is not None:
+        if len(phone) < MIN_FTS_TERM_LENGTH:
+            return None
+        # 주문번호(YYYYMMDD-NNN)는 하이픈을 포함한 원문으로 검색
+        if len(term) >= MIN_FTS_TERM_LENGTH:
+            return f"phone : {_fts_phrase(phone)} OR order_number : {_fts_phrase(term)}"
+        return f"phone : {_fts_phrase(phone)}"
+    if len(term) < MIN_FTS_TERM_LENGTH:
+        return None
+    return _fts_phrase(term)
+
+
+def search_order_ids(
+    db: Session, term: str, *, skip: int = 0, limit: int = 100
+) -> Optional[Tuple[List[int], int]]:
+    """
+    FTS 인덱스로 검색하여 관련도순 주문 ID 목록과 전체 건수를 반환합니다.
+
+    정렬 기준: 주문번호 완전 일치 > 전화번호 뒷자리 일치 > bm25 점수 > 최신순
+    (일치 건수가 MAX_RANKED_MATCHES 보다 많으면 최신순)
+    인덱스를 쓸 수 없는 검색어/환경이면 None을 반환하여 호출자가 LIKE 검색으로 대체하도록 합니다.
+    """
+    match = build_match_query(term)
+    if match is None or not has_order_search_index(db):
+        return None
+
+    total = db.execute(
+        text("SELECT count(*) FROM orders_fts WHERE orders_fts MATCH :match"), {"match": match}
+    ).scalar()
+
+    params = {"match": match, "skip": skip, "limit": limit}
+    if total > MAX_RANKED_MATCHES:
+        rows = db.execute(text("""
+            SELECT rowid FROM orders_fts
+            WHERE orders_fts MATCH :match
+            ORDER BY rowid DESC
+            LIMIT :limit OFFSET :skip
+        """), params).fetchall()
+        return [row[0] for row in rows], total
+
+    params.update(term=term.strip(), phone=normalize_phone(term.strip()) or "")
+    rows = db.execute(text(f"""
+        SELECT rowid
+        FROM orders_fts
+        WHERE orders_fts MATCH :match
+        ORDER BY
+            (order_number = :term) DESC,
+            (:phone != '' AND substr(phone, -length(:phone)) = :phone) DESC,
+            bm25(orders_fts, {BM25_WEIGHTS[0]}, {BM25_WEIGHTS[1]}, {BM25_WEIGHTS[2]}),
+            rowid DESC
+        LIMIT :limit OFFSET :skip
+    """), params).fetchall()
+    return [row[0] for row in rows], total
+
+
+def match_subquery(term: str):
+    """orders.id IN (...) 필터로 사용할 FTS 후보 서브쿼리 (키셋 페이지네이션용)"""
+    match = build_match_query(term)
+    if match is None:
+        return None
+    return (
+        text("SELECT rowid FROM orders_fts WHERE orders_fts MATCH :match")
+        .bindparams(match=match)
+        .columns(column("rowid", Integer))
+    )
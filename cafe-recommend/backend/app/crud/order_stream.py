@@ -0,0 +1,116 @@
+"""
+관리자 주문 목록 스트리밍 조회
+
+주문 전체를 ORM 객체로 적재한 뒤 한 번에 직렬화하면 주문 이력이 쌓일수록 메모리 사용량이
+함께 늘어납니다. 이 모듈은 필요한 컬럼만 선택(projection)하고, 커서에서 chunk 단위로 읽은 주문의
+항목들을 IN 쿼리 한 번으로 묶어 가져와(selectin 방식 배치 로딩) chunk 단위로 내보냅니다.
+어느 시점에도 메모리에는 chunk 하나 분량의 주문만 존재합니다.
+"""
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.menu import MenuItem
+from app.models.order import Order, OrderItem
+
+# 목록 응답(AdminOrderResponse)에 필요한 컬럼만 조회
+ORDER_COLUMNS = (
+    Order.id,
+    Order.order_number,
+    Order.total_amount,
+    Order.status,
+    Order.payment_method,
+    Order.created_at,
+)
+
+ITEM_COLUMNS = (
+    OrderItem.order_id,
+    OrderItem.id,
+    OrderItem.menu_id,
+    MenuItem.name.label("menu_name"),
+    OrderItem.quantity,
+    OrderItem.unit_price,
+    OrderItem.total_price,
+    OrderItem.status,
+    OrderItem.created_at,
+)
+
+
+def _isoformat(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def load_items_for(db: Session, order_ids: Sequence[int]) -> Dict[int, List[dict]]:
+    """주문 ID 묶음에 대한 주문 항목을 한 번의 쿼리로 조회하여 주문별로 그룹핑"""
+    items_by_order: Dict[int, List[dict]] = {order_id: [] for order_id in order_ids}
+    if not order_ids:
+        return items_by_order
+
+    rows = db.execute(
+        select(*ITEM_COLUMNS)
+        .outerjoin(MenuItem, MenuItem.id == OrderItem.menu_id)
+        .where(OrderItem.order_id.in_(order_ids))
+        .order_by(OrderItem.order_id, OrderItem.id)
+    )
+    for row in rows:
+        items_by_order[row.order_id].append({
+            "id": row.id,
+            "menu_id": row.menu_id,
+            "menu_name": row.menu_name or "알 수 없는 메뉴",
+            "quantity": row.quantity,
+            "unit_price": row.unit_price,
+            "total_price": row.total_price,
+            "status": row.status,
+            "created_at": _isoformat(row.created_at),
+        })
+    return items_by_order
+
+
+def iter_order_chunks(db: Session, filters: Sequence[Any], chunk_size: int = 500) -> Iterator[List[dict]]:
+    """
+    조건에 맞는 주문을 최신순으로 chunk_size 개씩 dict 목록으로 반환합니다.
+
+    주문 쿼리는 yield_per로 커서에서 chunk 단위로만 가져오고,
+    각 chunk마다 주문 항목 쿼리를 한 번 실행합니다. (주문 N건 → 1 + N/chunk_size 쿼리)
+    """
+    stmt = (
+        select(*ORDER_COLUMNS)
+        .where(*filters)
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .execution_options(yield_per=chunk_size)
+    )
+    for partition in db.execute(stmt).partitions():
+        items_by_order = load_items_for(db, [row.id for row in partition])
+        yield [
+            {
+                "id": row.id,
+                "order_number": row.order_number or f"ORD-{row.id:06d}",
+                "user_id": None,
+                "total_amount": row.total_amount,
+                "status": row.status,
+                "payment_method": row.payment_method,
+                "created_at": _isoformat(row.created_at),
+                "items": items_by_order.get(row.id, []),
+            }
+            for row in partition
+        ]
+
+
+def stream_orders_ndjson(db: Session, filters: Sequence[Any], chunk_size: int = 500) -> Iterator[bytes]:
+    """주문을 한 줄에 하나씩 JSON으로 내보내는 NDJSON 스트림"""
+    for chunk in iter_order_chunks(db, filters, chunk_size):
+        yield "".join(json.dumps(order, ensure_ascii=False) + "\n" for order in chunk).encode("utf-8")
+
+
+def stream_orders_json_array(db: Session, filters: Sequence[Any], chunk_size: int = 500) -> Iterator[bytes]:
+    """기존 목록 응답과 같은 JSON 배열을 점진적으로 내보내는 스트림"""
+    yield b"["
+    first = True
+    for chunk in iter_order_chunks(db, filters, chunk_size):
+        body = ",".join(json.dumps(order, ensure_ascii=False) for order in chunk)
+        yield (body if first else "," + body).encode("utf-8")
+        first = False
+    yield b"]"
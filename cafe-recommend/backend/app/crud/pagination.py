@@ -0,0 +1,117 @@
+"""
+주문 목록용 키셋(커서) 페이지네이션 유틸리티
+
+OFFSET 페이지네이션은 건너뛸 행을 모두 읽어야 하므로 페이지가 깊어질수록 느려지고,
+매 요청마다 COUNT(*)를 따로 실행합니다.
+여기서는 (created_at, id) 내림차순을 기준으로 마지막 행 다음부터 읽는 키셋 방식을 제공합니다.
+
+커서는 API 사용자에게 불투명한 문자열(base64url로 인코딩한 JSON)로 노출됩니다.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional
+
+from sqlalchemy import and_, desc, or_
+from sqlalchemy.orm import Query
+
+from app.core.cache import cache_get, cache_set, generate_cache_key
+from app.core.config import settings
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: int) -> str:
+    """(created_at, id)를 불투명한 커서 문자열로 인코딩"""
+    payload = {"t": created_at.isoformat() if created_at else None, "i": row_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    커서 문자열을 (created_at, id)로 디코딩
+
+    Raises:
+        ValueError: 형식이 잘못된 커서인 경우
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromisoformat(payload["t"]) if payload["t"] else None
+        row_id = int(payload["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    return created_at, row_id
+
+
+def cursor_for(row: Any) -> str:
+    """주문 객체(또는 created_at, id 속성을 가진 행)의 커서 생성"""
+    return encode_cursor(row.created_at, row.id)
+
+
+def next_cursor(rows: List[Any], limit: int) -> Optional[str]:
+    """
+    다음 페이지 커서 반환
+
+    limit 만큼 가져왔다면 다음 페이지가 있을 수 있으므로 마지막 행의 커서를,
+    그보다 적으면 마지막 페이지이므로 None을 반환합니다.
+    """
+    if not rows or len(rows) < limit:
+        return None
+    return cursor_for(rows[-1])
+
+
+def order_by_keyset(query: Query, model: Any) -> Query:
+    """키셋 기준 정렬 (created_at, id 내림차순) 적용"""
+    return query.order_by(desc(model.created_at), desc(model.id))
+
+
+def apply_keyset(query: Query, model: Any, cursor: Optional[str]) -> Query:
+    """
+    커서 이후 행만 조회하도록 필터와 정렬을 적용합니다.
+
+    created_at이 NULL인 과거 주문은 내림차순 정렬에서 가장 뒤에 오므로,
+    커서가 NULL 구간에 들어간 뒤에는 id만으로 이어서 조회합니다.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        if created_at is None:
+            query = query.filter(model.created_at.is_(None), model.id < row_id)
+        else:
+            query = query.filter(or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < row_id),
+                model.created_at.is_(None),
+            ))
+    return order_by_keyset(query, model)
+
+
+def cached_total(count_query: Query, cache_prefix: str, *key_parts: Any) -> int:
+    """
+    COUNT 결과를 짧은 시간 캐싱하여 반환합니다.
+
+    페이지를 넘길 때마다 같은 조건으로 COUNT(*)를 다시 실행하지 않도록 하며,
+    새 주문이 들어오면 최대 ORDER_COUNT_CACHE_SECONDS 동안 근사값이 될 수 있습니다.
+    """
+    cache_key = generate_cache_key(cache_prefix, *key_parts)
+    total = cache_get(cache_key)
+    if total is None:
+        total = count_query.scalar() or 0
+        cache_set(cache_key, total, settings.ORDER_COUNT_CACHE_SECONDS)
+    return total
+
+
+def paginate(
+    query: Query,
+    model: Any,
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> List[Any]:
+    """
+    커서가 있으면 키셋 방식으로, 없으면 기존 OFFSET 방식으로 한 페이지를 조회합니다.
+    두 방식 모두 (created_at, id) 내림차순으로 정렬하여 결과 순서가 같습니다.
+    """
+    if cursor:
+        return apply_keyset(query, model, cursor).limit(limit).all()
+    return order_by_keyset(query, model).offset(skip).limit(limit).all()
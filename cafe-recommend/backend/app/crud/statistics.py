@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from app.models.order import Order, OrderItem
 from app.models.menu import Menu
 from app.models.user import User
+from app.services.sales_rollup import get_order_rollups
 from app.schemas.statistics import (
     MenuStatistics,
     UserStatistics,
@@ -116,41 +117,19 @@ class Statistics:
         """시간대별 주문 통계 조회"""
         start_date = datetime.utcnow() - timedelta(days=days)
 
-        # 시간대별 주문 수
-        hourly_stats = (
-            db.query(
-                func.strftime("%H:00", Order.created_at).label("hour"),
-                func.count(Order.id).label("count")
-            )
-            .filter(Order.created_at >= start_date)
-            .group_by(func.strftime("%H:00", Order.created_at))
-            .all()
-        )
-
-        # 일별 주문 수
-        daily_stats = (
-            db.query(
-                func.strftime("%Y-%m-%d", Order.created_at).label("date"),
-                func.count(Order.id).label("count")
-            )
-            .filter(Order.created_at >= start_date)
-            .group_by(func.strftime("%Y-%m-%d", Order.created_at))
-            .all()
-        )
-
-        # 월별 주문 수
-        monthly_stats = (
-            db.query(
-                func.strftime("%Y-%m", Order.created_at).label("month"),
-                func.count(Order.id).label("count")
-            )
-            .filter(Order.created_at >= start_date)
-            .group_by(func.strftime("%Y-%m", Order.created_at))
-            .all()
-        )
+        # 시간대별 주문 집계 행을 한 번 읽어 시간대/일/월 단위로 합산
+        hourly_orders: Dict[str, int] = {}
+        daily_orders: Dict[str, int] = {}
+        monthly_orders: Dict[str, int] = {}
+        for row in get_order_rollups(db, start=start_date):
+            hour = row.bucket_hour[11:16]  # 'HH:00'
+            day = row.bucket_hour[:10]
+            month = row.bucket_hour[:7]
+            hourly_orders[hour] = hourly_orders.get(hour, 0) + row.order_count
+            daily_orders[day] = daily_orders.get(day, 0) + row.order_count
+            monthly_orders[month] = monthly_orders.get(month, 0) + row.order_count
 
         # 피크 시간대 계산
-        hourly_orders = {hour: count for hour, count in hourly_stats}
         peak_hours = sorted(
             hourly_orders.items(),
             key=lambda x: x[1],
@@ -158,13 +137,12 @@ class Statistics:
         )[:3]
 
         # 일평균 주문 수 계산
-        daily_orders = {date: count for date, count in daily_stats}
         avg_orders = sum(daily_orders.values()) / len(daily_orders) if daily_orders else 0
 
         return TimeBasedStatistics(
             hourly_orders=hourly_orders,
-            daily_orders={date: count for date, count in daily_stats},
-            monthly_orders={month: count for month, count in monthly_stats},
+            daily_orders=daily_orders,
+            monthly_orders=monthly_orders,
             peak_hours=[hour for hour, _ in peak_hours],
             average_orders_per_day=avg_orders
         )
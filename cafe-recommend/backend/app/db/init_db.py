@@ -7,6 +7,7 @@ from app.db.base import Base
 from app.db.session import engine
 from app.models.payment import PaymentConfig
 from app.models.menu import Menu
+from app.services.sales_rollup import create_sales_rollup_triggers, rebuild_sales_rollups
 
 def init_admin(db: Session) -> None:
     """관리자 계정 초기화"""
@@ -97,6 +98,11 @@ def init_db(db: Session) -> None:
     # 데이터베이스 테이블 생성
     Base.metadata.create_all(bind=engine)
     print("데이터베이스 테이블이 생성되었습니다.")
+
+    # 매출 집계 트리거 생성 및 기존 주문 반영
+    with engine.begin() as conn:
+        create_sales_rollup_triggers(conn)
+        rebuild_sales_rollups(conn)
     
     # 관리자 계정 생성
     admin = init_admin(db)
@@ -0,0 +1,22 @@
+"""
+alembic 리비전 공통 도우미
+
+초기 리비전(0b8c5a8ec24e)은 실행 시점의 Base.metadata 전체를 create_all 로 만듭니다.
+그래서 새 DB 에 upgrade head 를 실행하면 이후 리비전이 추가하는 테이블/인덱스가 첫 단계에서 이미 생기고,
+기존 DB 에는 없습니다. 이후 리비전은 여기 함수로 "없을 때만 생성" 해서 두 경우 모두 같은 스키마가 되게 합니다.
+"""
+from sqlalchemy import Table
+from sqlalchemy.engine import Connection
+
+
+def create_tables(bind: Connection, *tables: Table) -> None:
+    """테이블이 없으면 생성 (모델에 선언된 인덱스 포함)"""
+    for table in tables:
+        table.create(bind=bind, checkfirst=True)
+
+
+def create_indexes(bind: Connection, table: Table, *names: str) -> None:
+    """기존 테이블에 모델에 선언된 인덱스 중 이름으로 지정한 것을 없으면 생성"""
+    indexes = {index.name: index for index in table.indexes}
+    for name in names:
+        indexes[name].create(bind=bind, checkfirst=True)
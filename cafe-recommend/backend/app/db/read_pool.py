@@ -0,0 +1,210 @@
+"""
+읽기 전용 SQLite 커넥션 풀과 병렬 조회 실행기
+
+대시보드처럼 서로 독립적인 집계 쿼리 여러 개를 한 요청에서 실행할 때,
+요청 세션 하나로 순서대로 실행하면 응답 시간이 모든 쿼리 시간의 합이 됩니다.
+이 모듈은 `PRAGMA query_only` 가 설정된 읽기 전용 커넥션 풀과 스레드 풀을 두고
+쿼리들을 동시에 실행하여 응답 시간이 가장 느린 쿼리 하나에 맞춰지도록 합니다.
+(WAL 모드에서는 읽기 커넥션들이 writer와 서로를 막지 않음)
+
+쿼리마다 제한 시간이 있으며, 시간을 넘긴 쿼리는 sqlite3 interrupt()로 중단하고
+ReadQueryTimeout 을 발생시킵니다.
+
+사용 예:
+    results = await run_read_queries(db, {
+        "today": lambda s: s.query(func.sum(Order.total_amount)).scalar(),
+        "recent": lambda s: [o.id for o in s.query(Order).limit(10)],
+    })
+
+쿼리 함수는 세션이 닫힌 뒤에도 안전하도록 ORM 객체 대신 단순 값을 반환해야 합니다.
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+ReadFn = Callable[[Session], T]
+
+
+class ReadQueryTimeout(Exception):
+    """읽기 쿼리가 제한 시간 안에 끝나지 않음"""
+
+    def __init__(self, name: str, timeout: float):
+        super().__init__(f"읽기 쿼리 '{name}'가 제한 시간({timeout:.1f}초)을 초과했습니다.")
+        self.name = name
+        self.timeout = timeout
+
+
+class _QueryHandle:
+    """실행 중인 쿼리의 DBAPI 커넥션 (타임아웃 시 interrupt 용)"""
+    __slots__ = ("connection", "cancelled", "lock")
+
+    def __init__(self):
+        self.connection = None
+        self.cancelled = False
+        self.lock = threading.Lock()
+
+    def interrupt(self) -> None:
+        with self.lock:
+            self.cancelled = True
+            if self.connection is not None:
+                self.connection.interrupt()
+
+
+def _create_read_engine(database_url: str, pool_size: int) -> Engine:
+    """읽기 전용 엔진 생성 (query_only 커넥션 pool_size 개)"""
+    engine = create_engine(
+        database_url,
+        connect_args={"check_same_thread": False},
+        pool_size=pool_size,
+        max_overflow=0,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA query_only = ON")
+        cursor.close()
+
+    return engine
+
+
+class ReadQueryExecutor:
+    """
+    읽기 전용 커넥션 풀에서 여러 조회를 병렬로 실행하는 실행기
+
+    Args:
+        database_url: SQLAlchemy 데이터베이스 URL (sqlite 파일)
+        pool_size: 읽기 커넥션 수 (= 동시에 실행할 쿼리 수)
+        timeout: 쿼리별 기본 제한 시간(초)
+    """
+
+    def __init__(self, database_url: str, *, pool_size: int = 4, timeout: float = 5.0):
+        self.database_url = database_url
+        self.pool_size = max(1, pool_size)
+        self.timeout = timeout
+        self.timeouts = 0
+        self._engine = _create_read_engine(database_url, self.pool_size)
+        self._session_factory = sessionmaker(bind=self._engine, autoflush=False)
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="db-read")
+
+    def _execute(self, fn: ReadFn, handle: _QueryHandle) -> Any:
+        session: Session = self._session_factory()
+        try:
+            connection = session.connection().connection.dbapi_connection
+            with handle.lock:
+                if handle.cancelled:  # 실행 전에 제한 시간이 지난 쿼리
+                    return None
+                handle.connection = connection
+            return fn(session)
+        finally:
+            with handle.lock:
+                handle.connection = None
+            session.close()
+
+    async def run_one(self, name: str, fn: ReadFn, timeout: Optional[float] = None) -> Any:
+        """쿼리 하나를 읽기 풀에서 실행 (제한 시간 초과 시 중단 후 ReadQueryTimeout)"""
+        timeout = self.timeout if timeout is None else timeout
+        handle = _QueryHandle()
+        future = asyncio.get_running_loop().run_in_executor(self._executor, self._execute, fn, handle)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            handle.interrupt()
+            self.timeouts += 1
+            logger.warning(f"읽기 쿼리 제한 시간 초과: {name} ({timeout:.1f}s)")
+            raise ReadQueryTimeout(name, timeout) from None
+
+    async def run(
+        self,
+        queries: Dict[str, ReadFn],
+        timeouts: Optional[Dict[str, float]] = None,
+    ) -> Dict[str, Any]:
+        """쿼리들을 동시에 실행하고 이름별 결과를 반환 (하나라도 실패하면 그 예외를 발생)"""
+        timeouts = timeouts or {}
+        names = list(queries)
+        results = await asyncio.gather(
+            *(self.run_one(name, queries[name], timeouts.get(name)) for name in names),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return dict(zip(names, results))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        self._engine.dispose()
+
+
+_executors: Dict[str, ReadQueryExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def _is_shareable_sqlite_file(url) -> bool:
+    """별도 커넥션으로 같은 데이터를 볼 수 있는 SQLite 파일 DB 인지 여부"""
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def get_read_executor(db: Optional[Session] = None) -> Optional[ReadQueryExecutor]:
+    """
+    요청 세션과 같은 데이터베이스를 가리키는 읽기 실행기 반환
+
+    인메모리 SQLite처럼 다른 커넥션에서 볼 수 없는 DB이면 None을 반환합니다.
+    """
+    url = db.get_bind().url if db is not None else None
+    if url is None:
+        url = make_url(settings.DATABASE_URL)
+    if not _is_shareable_sqlite_file(url):
+        return None
+    key = url.render_as_string(hide_password=False)
+    executor = _executors.get(key)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(key)
+            if executor is None:
+                executor = ReadQueryExecutor(
+                    key,
+                    pool_size=settings.DB_READ_POOL_SIZE,
+                    timeout=settings.DB_READ_QUERY_TIMEOUT_SECONDS,
+                )
+                _executors[key] = executor
+    return executor
+
+
+async def run_read_queries(
+    db: Session,
+    queries: Dict[str, ReadFn],
+    timeouts: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    독립적인 조회들을 읽기 풀에서 병렬 실행하고 이름별 결과를 반환합니다.
+
+    읽기 풀을 쓸 수 없는 DB(인메모리 등)에서는 요청 세션으로 순서대로 실행합니다.
+    """
+    executor = get_read_executor(db)
+    if executor is None:
+        return {name: fn(db) for name, fn in queries.items()}
+    started = time.perf_counter()
+    results = await executor.run(queries, timeouts)
+    logger.debug(f"병렬 읽기 쿼리 {len(queries)}개: {(time.perf_counter() - started) * 1000:.1f}ms")
+    return results
+
+
+def shutdown_read_executors() -> None:
+    """애플리케이션 종료 시 읽기 풀 정리"""
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.close()
+        _executors.clear()
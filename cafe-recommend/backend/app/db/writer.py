@@ -0,0 +1,310 @@
+"""
+SQLite 단일 writer 큐
+
+SQLite는 동시에 하나의 writer만 허용하기 때문에, 요청 스레드마다 각자 커밋하면
+부하 상황에서 `database is locked` 오류와 재시도가 반복됩니다.
+이 모듈은 전용 writer 스레드 하나가 단일 커넥션으로 모든 쓰기 작업을 직렬화하고,
+동시에 들어온 작업들을 하나의 트랜잭션으로 묶어 커밋(group commit)합니다.
+
+사용 예:
+    def job(session: Session) -> int:
+        order = build_order(session, order_data)   # flush 까지만 수행, 커밋 금지
+        return order.id                            # ORM 객체 대신 단순 값을 반환
+
+    order_id = await get_db_writer().submit(job)   # 비동기 라우트
+    order_id = get_db_writer().run(job)            # 동기 라우트 (스레드풀)
+"""
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+WriteFn = Callable[[Session], T]
+
+# 큐 종료 신호
+_STOP = object()
+
+
+class WriteJob:
+    """writer 큐에 들어가는 단일 쓰기 작업"""
+    __slots__ = ("fn", "future", "enqueued_at")
+
+    def __init__(self, fn: WriteFn, future: Future):
+        self.fn = fn
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class WriterStats:
+    """writer 처리 통계 (벤치마크 및 모니터링용)"""
+
+    def __init__(self):
+        self.jobs = 0
+        self.failed_jobs = 0
+        self.batches = 0
+        self.commit_errors = 0
+        self.max_batch_size = 0
+        self.total_wait_seconds = 0.0
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self.jobs / self.batches if self.batches else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "jobs": self.jobs,
+            "failed_jobs": self.failed_jobs,
+            "batches": self.batches,
+            "commit_errors": self.commit_errors,
+            "avg_batch_size": round(self.avg_batch_size, 2),
+            "max_batch_size": self.max_batch_size,
+            "avg_wait_ms": round(self.total_wait_seconds / self.jobs * 1000, 3) if self.jobs else 0.0,
+        }
+
+
+def _create_writer_engine(database_url: str, busy_timeout_ms: int) -> Engine:
+    """writer 전용 엔진 생성 (커넥션 1개, BEGIN IMMEDIATE, WAL 모드)"""
+    engine = create_engine(
+        database_url,
+        connect_args={"check_same_thread": False},
+        pool_size=1,
+        max_overflow=0,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        # pysqlite의 암묵적 트랜잭션 처리를 끄고 BEGIN을 직접 발행해야 SAVEPOINT가 올바르게 동작함
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        # 배치 시작 시점에 쓰기 잠금을 선점하여 커밋 단계의 잠금 경합을 없앰
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return engine
+
+
+class SQLiteWriter:
+    """
+    단일 커넥션으로 쓰기 작업을 직렬화하고 그룹 커밋하는 writer
+
+    Args:
+        database_url: SQLAlchemy 데이터베이스 URL (sqlite 파일)
+        max_batch_size: 한 번에 커밋할 최대 작업 수
+        max_latency_ms: 첫 작업이 도착한 뒤 추가 작업을 기다리는 최대 시간(ms)
+        busy_timeout_ms: 다른 프로세스가 잠금을 가진 경우 대기할 시간(ms)
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        *,
+        max_batch_size: int = 64,
+        max_latency_ms: float = 2.0,
+        busy_timeout_ms: int = 5000,
+    ):
+        self.database_url = database_url
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_latency = max(0.0, max_latency_ms) / 1000.0
+        self.busy_timeout_ms = busy_timeout_ms
+        self.stats = WriterStats()
+
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._engine: Optional[Engine] = None
+        self._session_factory: Optional[sessionmaker] = None
+
+    # --- 수명 주기 ---
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """writer 스레드 시작 (이미 실행 중이면 무시)"""
+        with self._lock:
+            if self.is_running:
+                return
+            self._engine = _create_writer_engine(self.database_url, self.busy_timeout_ms)
+            self._session_factory = sessionmaker(bind=self._engine, autoflush=False)
+            self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+            self._thread.start()
+            logger.info(
+                f"SQLite writer started (max_batch_size={self.max_batch_size}, "
+                f"max_latency_ms={self.max_latency * 1000:.1f})"
+            )
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """큐에 남은 작업을 모두 처리한 뒤 writer 스레드 종료"""
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put(_STOP)
+            thread.join(timeout)
+            self._thread = None
+            if self._engine is not None:
+                self._engine.dispose()
+                self._engine = None
+            logger.info(f"SQLite writer stopped: {self.stats.as_dict()}")
+
+    # --- 작업 제출 ---
+
+    def submit_nowait(self, fn: WriteFn) -> Future:
+        """쓰기 작업을 큐에 넣고 concurrent Future 반환 (배치 커밋 후 완료됨)"""
+        if not self.is_running:
+            self.start()
+        future: Future = Future()
+        self._queue.put(WriteJob(fn, future))
+        return future
+
+    async def submit(self, fn: WriteFn) -> Any:
+        """비동기 라우트용: 작업이 포함된 배치가 커밋될 때까지 대기 후 결과 반환"""
+        return await asyncio.wrap_future(self.submit_nowait(fn))
+
+    def run(self, fn: WriteFn, timeout: Optional[float] = None) -> Any:
+        """동기 코드용: 작업이 포함된 배치가 커밋될 때까지 블로킹"""
+        return self.submit_nowait(fn).result(timeout)
+
+    # --- writer 스레드 ---
+
+    def _collect_batch(self, first: WriteJob) -> Tuple[List[WriteJob], bool]:
+        """첫 작업 이후 max_latency 동안 도착한 작업을 max_batch_size까지 모음"""
+        batch = [first]
+        stopping = False
+        deadline = time.monotonic() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stopping = True
+                break
+            batch.append(item)
+        return batch, stopping
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch, stopping = self._collect_batch(item)
+            self._commit_batch(batch)
+            if stopping:
+                break
+        # 종료 신호 이후 남은 작업도 모두 처리
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                self._commit_batch([item])
+
+    def _commit_batch(self, batch: List[WriteJob]) -> None:
+        """배치의 각 작업을 SAVEPOINT 안에서 실행하고 한 번에 커밋"""
+        outcomes = []
+        session: Session = self._session_factory()
+        try:
+            for job in batch:
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                savepoint = session.begin_nested()
+                try:
+                    result = job.fn(session)
+                    session.flush()
+                    savepoint.commit()
+                    outcomes.append((job, result, None))
+                except Exception as e:
+                    # 실패한 작업만 되돌리고 나머지 작업은 같은 배치로 커밋
+                    savepoint.rollback()
+                    outcomes.append((job, None, e))
+
+            try:
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                self.stats.commit_errors += 1
+                logger.error(f"SQLite writer batch commit failed ({len(outcomes)} jobs): {str(e)}")
+                outcomes = [(job, None, error or e) for job, _, error in outcomes]
+        finally:
+            session.close()
+
+        now = time.monotonic()
+        self.stats.batches += 1
+        self.stats.max_batch_size = max(self.stats.max_batch_size, len(outcomes))
+        for job, result, error in outcomes:
+            self.stats.jobs += 1
+            self.stats.total_wait_seconds += now - job.enqueued_at
+            if error is not None:
+                self.stats.failed_jobs += 1
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
+
+
+_writer: Optional[SQLiteWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_db_writer() -> SQLiteWriter:
+    """애플리케이션 전역 writer 인스턴스 반환 (최초 사용 시 시작)"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = SQLiteWriter(
+                    settings.DATABASE_URL,
+                    max_batch_size=settings.DB_WRITER_MAX_BATCH_SIZE,
+                    max_latency_ms=settings.DB_WRITER_MAX_LATENCY_MS,
+                )
+    return _writer
+
+
+def run_write(fn: WriteFn, db: Optional[Session] = None) -> Any:
+    """
+    동기 라우트에서 writer를 통해 쓰기 작업을 실행합니다.
+
+    db가 주어지면 커밋 이후 해당 요청 세션의 캐시된 객체를 만료시켜
+    이어지는 조회가 writer가 커밋한 최신 데이터를 읽도록 합니다.
+    """
+    result = get_db_writer().run(fn)
+    if db is not None:
+        db.expire_all()
+    return result
+
+
+async def submit_write(fn: WriteFn, db: Optional[Session] = None) -> Any:
+    """비동기 라우트에서 writer를 통해 쓰기 작업을 실행합니다."""
+    result = await get_db_writer().submit(fn)
+    if db is not None:
+        db.expire_all()
+    return result
+
+
+def shutdown_db_writer() -> None:
+    """애플리케이션 종료 시 writer 정리"""
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.stop()
+            _writer = None
@@ -10,7 +10,7 @@ from .routers.menus import router as menus_router
 from .routers.cart import router as cart_router
 from .routers.order import router as order_router
 from .routers.user_identity import router as user_identity_router
-from .api.admin import auth, dashboard, menu, orders, realtime, settings  # , inventory  # inventory 모델 문제로 임시 비활성화
+from .api.admin import auth, dashboard, menu, orders, realtime, settings, inventory
 from .api.menu import router as menu_api_router
 from .routers.payment import router as payment_router
 # from .routers import reviews_router # 리뷰 라우터 임포트 주석 처리 (이미 routers/__init__.py에서 처리됨)
@@ -18,6 +18,16 @@ from .routers.admin import notifications_router, alerts_router, auth_router as c
 from .core.config import settings as app_settings
 from .core.security import generate_csrf_token, hash_csrf_token, verify_csrf_token
 from .core.rate_limiter import RateLimitMiddleware
+from .db.writer import shutdown_db_writer
+from .db.read_pool import shutdown_read_executors
+from .db.session import SessionLocal
+from .services.surge_detector import surge_detector
+from .services.realtime_sales import sales_snapshot_poller
+from .services.event_relay import event_relay
+from .services.inventory_ledger import run_daily_snapshots
+from .core.events import ORDER_ALERT, event_bus
+import asyncio
+import logging
 from datetime import datetime
 from typing import Optional
 
@@ -184,7 +194,7 @@ app.include_router(menu.router, prefix="/api/admin", tags=["admin", "admin:menus
 app.include_router(orders.router, prefix="/api/admin", tags=["admin", "admin:orders"])
 app.include_router(realtime.router, prefix="/api/admin", tags=["admin", "admin:realtime"])
 app.include_router(settings.router, prefix="/api/admin/settings", tags=["admin", "admin:settings"])
-# app.include_router(inventory.router, prefix="/api/admin/inventory", tags=["admin", "admin:inventory"]) # inventory 모델 문제로 임시 비활성화
+app.include_router(inventory.router, prefix="/api/admin/inventory", tags=["admin", "admin:inventory"])
 
 # 관리자 알림 시스템 라우터 등록
 app.include_router(notifications_router, prefix="/api/admin/notifications", tags=["admin", "admin:notifications"])
@@ -195,6 +205,70 @@ app.include_router(alerts_router, prefix="/api/admin/alerts", tags=["admin", "ad
 # app.api.admin.auth.router 하나만 사용하도록 정리 필요. 여기서는 custom_admin_auth_router도 변경.
 # app.include_router(custom_admin_auth_router, prefix="/api/admin/auth", tags=["admin", "admin:auth"])
 
+# 주문 급증/이상 패턴 감지기: 과거 주문으로 기준선을 채우고 상태 변화를 이벤트 버스로 발행
+# (관리자 알림 WebSocket 이 alert.order 토픽을 구독)
+_surge_ticker: Optional[asyncio.Task] = None
+
+async def publish_order_alert(notification: dict):
+    event_bus.publish(ORDER_ALERT, notification)
+
+@app.on_event("startup")
+async def start_surge_detector():
+    global _surge_ticker
+    event_bus.bind_loop(asyncio.get_running_loop())
+    surge_detector.bind_loop(asyncio.get_running_loop())
+    surge_detector.add_listener(publish_order_alert)
+    try:
+        with SessionLocal() as db:
+            surge_detector.warm_up(db)
+    except Exception:
+        logging.getLogger(__name__).exception("주문 급증 감지기 기준선 초기화 실패")
+    _surge_ticker = asyncio.create_task(surge_detector.run_ticker())
+
+@app.on_event("shutdown")
+async def stop_surge_detector():
+    if _surge_ticker is not None:
+        _surge_ticker.cancel()
+
+@app.on_event("shutdown")
+async def stop_realtime_sales_poller():
+    await sales_snapshot_poller.stop()
+
+# 재고 원장 일일 스냅샷: 과거 시점 재고/기간 소비량을 스냅샷 + 이후 트랜잭션만으로 계산
+_inventory_snapshotter: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def start_inventory_snapshots():
+    global _inventory_snapshotter
+    _inventory_snapshotter = asyncio.create_task(
+        run_daily_snapshots(app_settings.INVENTORY_SNAPSHOT_CHECK_SECONDS)
+    )
+
+@app.on_event("shutdown")
+async def stop_inventory_snapshots():
+    if _inventory_snapshotter is not None:
+        _inventory_snapshotter.cancel()
+
+# 워커 간 이벤트 전달: 다른 워커에서 발행된 주문/결제 이벤트도 이 워커의 구독자에게 전달
+@app.on_event("startup")
+async def start_event_relay():
+    if not app_settings.EVENT_LOG_ENABLED:
+        return
+    try:
+        event_relay.start()
+    except Exception:
+        logging.getLogger(__name__).exception("이벤트 로그 relay 시작 실패 (워커 간 이벤트 전달 비활성화)")
+
+@app.on_event("shutdown")
+async def stop_event_relay():
+    await event_relay.stop()
+
+# 애플리케이션 종료 시 단일 writer 큐에 남은 쓰기 작업을 처리하고 정리
+@app.on_event("shutdown")
+def stop_db_writer():
+    shutdown_db_writer()
+    shutdown_read_executors()
+
 # 메인 루트 경로
 @app.get("/", tags=["status"])
 async def root():
@@ -1,19 +1,25 @@
 # from .user import User # User 모델 사용 안 함
 from .menu import MenuItem # Menu 별칭 대신 MenuItem 사용 고려
 from .order import Order, OrderItem
-# from .inventory import MenuIngredient, Ingredient, IngredientStock # 현재 없는 모델들 주석 처리
+from .inventory import MenuIngredient, Ingredient, IngredientStock, InventoryTransaction, InventorySnapshot
 # from .admin import Admin # 현재 없는 모델 주석 처리
 from .cart import Cart, CartItem
 # from .review import Review # 현재 없는 모델 주석 처리
 # from .payment_settings import PaymentSettings # 현재 없는 모델 주석 처리
 from .payment import Payment
+from .sales_rollup import SalesHourlyOrder, SalesHourlyItem
+from .event_log import EventLogEntry
+from .notification import AdminNotification, AdminNotificationCursor, AdminNotificationRead
 
 __all__ = [
     # "User", 
     "MenuItem", "Order", "OrderItem", 
-    # "MenuIngredient", "Ingredient", "IngredientStock", 
+    "MenuIngredient", "Ingredient", "IngredientStock", "InventoryTransaction", "InventorySnapshot",
     # "Admin", 
     "Cart", "CartItem", 
     # "Review", "PaymentSettings", 
-    "Payment"
+    "Payment",
+    "SalesHourlyOrder", "SalesHourlyItem",
+    "EventLogEntry",
+    "AdminNotification", "AdminNotificationCursor", "AdminNotificationRead"
 ] 
\ No newline at end of file
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class EventLogEntry(Base):
+    """
+    워커 간 이벤트 전달용 append-only 로그
+
+    각 워커는 이벤트 버스에 발행된 이벤트를 이 테이블에 추가하고, 다른 워커가 추가한 행을
+    id 순으로 tailing 하여 자신의 이벤트 버스에 다시 발행합니다. (app/services/event_relay.py 참고)
+    AUTOINCREMENT 로 오래된 행을 지워도 id 가 재사용되지 않습니다.
+    """
+    __tablename__ = "event_log"
+    __table_args__ = (
+        Index("ix_event_log_created_at", "created_at"),
+        {"sqlite_autoincrement": True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    topic = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)  # {"data": ..., "timestamp": ...} JSON
+    origin = Column(String, nullable=False)  # 발행한 워커 ID
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, UniqueConstraint
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Float, Boolean, Date, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
-from app.database import Base
+from app.db.base import Base
 
 class Ingredient(Base):
     """원재료 정보를 저장하는 모델"""
@@ -64,6 +66,10 @@ class MenuIngredient(Base):
 class InventoryTransaction(Base):
     """재고 변동 기록을 저장하는 모델"""
     __tablename__ = "inventory_transactions"
+    __table_args__ = (
+        # 재료별 시점 조회(스냅샷 이후 구간)와 재료별 원장 키셋 페이지네이션용
+        Index("ix_inventory_transactions_ingredient_created", "ingredient_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     ingredient_id = Column(Integer, ForeignKey("ingredients.id"), nullable=False)
@@ -71,8 +77,32 @@ class InventoryTransaction(Base):
     quantity = Column(Float, nullable=False)  # 변동량 (양수: 입고, 음수: 출고)
     notes = Column(String, nullable=True)  # 메모
     created_by = Column(String, nullable=True)  # 작업자
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    order_id = Column(Integer, nullable=True)  # 주문으로 인한 출고일 경우 주문 ID
+    # 키셋 커서 비교가 정확하도록 앱에서 기록하는 행은 파이썬 UTC 시각(마이크로초 포함)으로 통일
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now())
+    order_id = Column(Integer, nullable=True, index=True)  # 주문으로 인한 출고일 경우 주문 ID
 
     # 재료와의 관계
-    ingredient = relationship("Ingredient") 
\ No newline at end of file
+    ingredient = relationship("Ingredient")
+
+
+class InventorySnapshot(Base):
+    """
+    재료별 일일 재고 스냅샷
+
+    스냅샷 시점의 재고량과 누적 소비량, 그때까지 반영된 마지막 트랜잭션 ID 를 기록해
+    과거 시점 재고/기간 소비량을 가장 가까운 스냅샷 + 이후 트랜잭션만으로 계산합니다.
+    (app/services/inventory_ledger.py 참고)
+    """
+    __tablename__ = "inventory_snapshots"
+    __table_args__ = (
+        UniqueConstraint("ingredient_id", "snapshot_date", name="uix_inventory_snapshot_day"),
+        Index("ix_inventory_snapshots_ingredient_taken", "ingredient_id", "taken_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    ingredient_id = Column(Integer, ForeignKey("ingredients.id"), nullable=False)
+    snapshot_date = Column(Date, nullable=False)  # 스냅샷 날짜 (재료별 하루 1건)
+    taken_at = Column(DateTime, nullable=False)  # 스냅샷 시각 (UTC, 트랜잭션 created_at 과 같은 기준)
+    quantity = Column(Float, nullable=False, default=0)  # 스냅샷 시점 재고량
+    consumed_total = Column(Float, nullable=False, default=0)  # 스냅샷 시점까지 누적 소비량
+    last_transaction_id = Column(Integer, nullable=False, default=0)  # 스냅샷에 반영된 마지막 트랜잭션 ID
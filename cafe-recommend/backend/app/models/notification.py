@@ -0,0 +1,50 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class AdminNotification(Base):
+    """
+    관리자 알림 (재고 부족, 주문 급증/이상 패턴 등 알림이 발생할 때 한 행씩 추가)
+
+    id 가 발생 순서이므로 목록은 id 내림차순 키셋 페이지네이션으로 조회합니다.
+    워커마다 같은 알림을 계산하는 경우(alert.*)는 dedupe_key 로 한 번만 저장합니다.
+    """
+    __tablename__ = "admin_notifications"
+    __table_args__ = (
+        Index("ix_admin_notifications_type_id", "type", "id"),
+        Index("ux_admin_notifications_dedupe_key", "dedupe_key", unique=True),
+        {"sqlite_autoincrement": True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    type = Column(String, nullable=False)  # stock_low, order_surge, order_anomaly ...
+    severity = Column(String, nullable=False, default="low")
+    payload = Column(Text, nullable=False)  # 알림 내용 JSON
+    dedupe_key = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
+class AdminNotificationCursor(Base):
+    """
+    관리자별 읽음 커서와 읽지 않은 알림 수
+
+    id <= last_read_id 인 알림은 모두 읽음이고, 그 이후에 개별로 읽은 알림은
+    admin_notification_reads 에 기록합니다. unread_count 는 알림 추가/읽음 처리와
+    같은 트랜잭션에서 증감하므로 조회 시 COUNT 가 필요 없습니다.
+    """
+    __tablename__ = "admin_notification_cursors"
+
+    admin_id = Column(Integer, primary_key=True)
+    last_read_id = Column(Integer, nullable=False, default=0)
+    unread_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+
+
+class AdminNotificationRead(Base):
+    """읽음 커서 이후의 알림 중 개별로 읽음 처리한 알림"""
+    __tablename__ = "admin_notification_reads"
+
+    admin_id = Column(Integer, primary_key=True)
+    notification_id = Column(Integer, primary_key=True)
@@ -1,5 +1,5 @@
 from typing import TYPE_CHECKING
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Enum, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Enum, JSON, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -28,6 +28,11 @@ class OrderItem(Base):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # 키셋 페이지네이션용 복합 인덱스: 필터 후 (created_at, id) 순으로 바로 읽음
+        Index("ix_orders_session_created", "session_id", "created_at"),
+        Index("ix_orders_status_created", "status", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     order_number = Column(String, unique=True, index=True, nullable=True)
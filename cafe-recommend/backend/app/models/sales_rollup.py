@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Float, Integer, String
+
+from app.db.base import Base
+
+
+class SalesHourlyOrder(Base):
+    """
+    시간대별 주문 집계 (영업 시간 단위 x 결제 수단 x 주문 상태)
+
+    orders 테이블의 트리거가 주문 생성/상태 변경과 같은 트랜잭션에서 증감합니다.
+    (app/services/sales_rollup.py 참고)
+    """
+    __tablename__ = "sales_hourly_orders"
+
+    bucket_hour = Column(String, primary_key=True)  # 'YYYY-MM-DD HH:00:00' (주문 시각 기준)
+    payment_method = Column(String, primary_key=True, default="")  # 결제 수단 없음 = ''
+    status = Column(String, primary_key=True, default="")
+    order_count = Column(Integer, nullable=False, default=0)
+    total_amount = Column(Float, nullable=False, default=0.0)
+
+
+class SalesHourlyItem(Base):
+    """
+    시간대별 메뉴 판매 집계 (영업 시간 단위 x 메뉴 x 결제 수단 x 주문 상태)
+
+    카테고리는 기존 통계와 같이 조회 시점의 menus.category 를 조인하여 사용합니다.
+    """
+    __tablename__ = "sales_hourly_items"
+
+    bucket_hour = Column(String, primary_key=True)
+    menu_id = Column(Integer, primary_key=True)  # 메뉴 없음 = 0
+    payment_method = Column(String, primary_key=True, default="")
+    status = Column(String, primary_key=True, default="")
+    quantity = Column(Integer, nullable=False, default=0)
+    total_sales = Column(Float, nullable=False, default=0.0)
+    item_count = Column(Integer, nullable=False, default=0)  # 주문 항목(order_items) 행 수
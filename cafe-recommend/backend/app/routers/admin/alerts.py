@@ -1,13 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func, desc, and_
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
-import json
 
 from app.api.deps import get_db
-from app.models.order import Order
 from app.schemas.notifications import OrderSurgeNotification
+from app.services.surge_detector import surge_detector
+from app.services.time_buckets import bucket_orders, count_orders_in_windows
 
 router = APIRouter()
 
@@ -21,25 +20,20 @@ def get_order_surge(
     # 현재 시간 기준으로 지정된 시간 창 내의 주문 수 계산
     time_threshold = datetime.utcnow() - timedelta(minutes=time_window_minutes)
     
-    # 최근 주문 수 계산
-    recent_order_count = db.query(func.count(Order.id)).filter(
-        Order.created_at >= time_threshold
-    ).scalar() or 0
-    
-    # 이전 기간 (동일한 길이)의 주문 수 계산
+    # 이전 기간 (동일한 길이)과 최근 기간의 주문 수를 한 번에 계산
     previous_time_threshold = time_threshold - timedelta(minutes=time_window_minutes)
-    previous_order_count = db.query(func.count(Order.id)).filter(
-        and_(
-            Order.created_at >= previous_time_threshold,
-            Order.created_at < time_threshold
-        )
-    ).scalar() or 0
+    previous_order_count, recent_order_count = count_orders_in_windows(
+        db, [previous_time_threshold, time_threshold], open_end=True
+    )
     
     # 주문 급증 여부 확인
     is_surge = recent_order_count >= surge_threshold and recent_order_count > previous_order_count * 1.5
     
     return OrderSurgeNotification(
         id=1,  # ID는 API에서만 사용되는 값
+        order_count=recent_order_count,
+        time_window=time_window_minutes,
+        threshold=surge_threshold,
         is_surge=is_surge,
         recent_order_count=recent_order_count,
         previous_order_count=previous_order_count,
@@ -48,31 +42,30 @@ def get_order_surge(
         severity="high" if is_surge else "low"
     )
 
+@router.get("/live")
+def get_live_order_alert_state():
+    """
+    주문 이벤트로 갱신되는 급증/이상 패턴 감지 상태를 조회합니다. (DB 조회 없음)
+
+    상태가 바뀌는 순간에는 /api/admin/notifications/ws 로 order_surge, order_anomaly 알림이 전송됩니다.
+    """
+    return surge_detector.snapshot()
+
 @router.get("/hourly-order-trends")
 def get_hourly_order_trends(
     days_back: int = 7,
     db: Session = Depends(get_db)
 ):
     """시간대별 주문 추세를 분석합니다."""
-    # 지정된 일수만큼 이전 날짜부터 현재까지의 데이터 분석
-    start_date = datetime.utcnow() - timedelta(days=days_back)
+    # 지정된 일수만큼 이전 날짜(정시 기준)부터 현재까지의 데이터 분석
+    start_date = (datetime.utcnow() - timedelta(days=days_back)).replace(minute=0, second=0, microsecond=0)
     
-    # 시간대별 주문 데이터 집계 (0-23시간)
-    hourly_data = []
-    
-    for hour in range(24):
-        # 특정 시간에 대한 주문 수 쿼리
-        order_count = db.query(func.count(Order.id)).filter(
-            and_(
-                Order.created_at >= start_date,
-                func.extract('hour', Order.created_at) == hour
-            )
-        ).scalar() or 0
-        
-        hourly_data.append({
-            "hour": hour,
-            "count": order_count
-        })
+    # 시간대별 주문 데이터 집계 (0-23시간, 주문이 없는 시간대는 0)
+    hourly_counts = bucket_orders(db, "hour_of_day", start=start_date)
+    hourly_data = [
+        {"hour": hour, "count": count}
+        for hour, count in hourly_counts.items()
+    ]
     
     # 피크 시간대 찾기 (주문량이 가장 많은 시간)
     peak_hour = max(hourly_data, key=lambda x: x["count"])
@@ -93,30 +86,16 @@ def detect_unusual_patterns(
     db: Session = Depends(get_db)
 ):
     """비정상적인 주문 패턴을 탐지합니다."""
-    # 지난 30일 동안의 일별 주문 데이터 수집
-    end_date = datetime.utcnow()
-    start_date = end_date - timedelta(days=30)
-    
-    daily_orders = []
-    current_date = start_date
-    
-    while current_date <= end_date:
-        next_date = current_date + timedelta(days=1)
-        
-        # 해당 날짜의 주문 수 계산
-        order_count = db.query(func.count(Order.id)).filter(
-            and_(
-                Order.created_at >= current_date,
-                Order.created_at < next_date
-            )
-        ).scalar() or 0
-        
-        daily_orders.append({
-            "date": current_date.strftime("%Y-%m-%d"),
-            "count": order_count
-        })
-        
-        current_date = next_date
+    # 지난 30일 동안(오늘 포함 31일)의 일별 주문 데이터 수집
+    today = datetime.utcnow().date()
+    start_date = today - timedelta(days=30)
+    end_date = today + timedelta(days=1)
+    
+    daily_counts = bucket_orders(db, "day", start=start_date, end=end_date)
+    daily_orders = [
+        {"date": day, "count": count}
+        for day, count in daily_counts.items()
+    ]
     
     # 주문 수에 대한 평균 및 표준편차 계산
     counts = [day["count"] for day in daily_orders]
@@ -1,14 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
 from sqlalchemy import func, desc, and_
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import asyncio
 import json
+import logging
 
-from app.api.deps import get_db
-# from app.models.inventory import Ingredient, IngredientStock  # inventory 모델 문제로 임시 비활성화
+from app.api.deps import get_current_active_admin, get_db
+from app.core.broadcast import Broadcaster
+from app.core.wire import WireMessage, accept_websocket, message_sender
+from app.core.events import ORDER_ALERT, PAYMENT_APPROVED, STOCK_LOW, event_bus
+from app.crud import notification as notification_crud
+from app.db.writer import run_write, submit_write
+from app.models.admin import Admin
 from app.models.order import Order
+from app.services.stock_forecast import stock_forecaster
+from app.services.stock_levels import LOW, OUT, stock_levels
 from app.schemas.notifications import (
     StockAlertNotification,
     OrderSurgeNotification,
@@ -18,89 +26,130 @@ from app.schemas.notifications import (
 
 router = APIRouter()
 
-# 활성 WebSocket 연결을 저장하는 딕셔너리
-active_connections: List[WebSocket] = []
+logger = logging.getLogger(__name__)
+
+# 활성 WebSocket 연결 (클라이언트별 bounded 큐와 전송 태스크, 전송 실패 시 자동 정리)
+notification_clients = Broadcaster.from_settings("admin-notifications")
 
 # WebSocket 연결 관리
 @router.websocket("/ws")
 async def websocket_notifications(websocket: WebSocket):
-    await websocket.accept()
-    active_connections.append(websocket)
+    encoding = await accept_websocket(websocket)  # JSON 또는 MessagePack (서브프로토콜 협상)
+    notification_clients.add(websocket, message_sender(websocket, encoding))
     try:
         while True:
             # 클라이언트와의 연결 유지를 위한 ping
             await websocket.receive_text()
     except WebSocketDisconnect:
-        active_connections.remove(websocket)
+        pass
+    finally:
+        notification_clients.remove(websocket)
 
-# 모든 활성 클라이언트에 알림 브로드캐스트
+# 모든 활성 클라이언트에 알림 브로드캐스트 (인코딩 형식별로 한 번만 직렬화)
 async def broadcast_notification(notification: Dict[str, Any]):
-    for connection in active_connections:
-        try:
-            await connection.send_json(notification)
-        except Exception:
-            # 연결 오류가 있는 클라이언트 처리 (나중에 연결 정리)
-            pass
+    notification_clients.broadcast(WireMessage(notification))
+
+# 알림 테이블에 저장하는 토픽 (결제 승인은 실시간 푸시만)
+STORED_TOPICS = (STOCK_LOW, ORDER_ALERT)
+
+
+def notification_dedupe_key(event: Dict[str, Any]) -> Optional[str]:
+    """
+    워커마다 독립적으로 계산되는 주문 급증/이상 패턴 알림(alert.*)의 중복 저장 방지 키
+
+    감지기는 같은 주문 스트림에서 같은 시각의 상태 변화를 계산하므로 (종류, 상태, 기준 시각)이 같습니다.
+    """
+    if event["topic"] != ORDER_ALERT:
+        return None
+    data = event["data"]
+    if data.get("type") == "order_surge":
+        return f"order_surge:{data.get('is_surge')}:{data.get('created_at')}"
+    if data.get("type") == "order_anomaly":
+        return f"order_anomaly:{data.get('direction')}:{data.get('hour')}"
+    return None
+
+
+async def store_notification_event(event: Dict[str, Any]) -> Optional[int]:
+    """알림을 테이블에 저장하고 id 반환 (다른 워커에서 전달된 이벤트는 발생한 워커가 저장)"""
+    if event["topic"] not in STORED_TOPICS or "origin" in event:
+        return None
+    data = event["data"]
+    try:
+        return await submit_write(lambda session: notification_crud.add_notification(
+            session,
+            data.get("type") or event["topic"].replace(".", "_"),
+            {"timestamp": event["timestamp"], **data},
+            severity=data.get("severity") or "medium",
+            dedupe_key=notification_dedupe_key(event),
+        ))
+    except Exception:
+        logger.exception("관리자 알림 저장 실패")
+        return None
+
+
+# 이벤트 버스 구독: 재고 부족, 결제 승인, 주문 급증/이상 패턴 알림을 저장하고 관리자에게 푸시
+async def push_notification_event(event: Dict[str, Any]):
+    notification_id = await store_notification_event(event)
+    if not len(notification_clients):
+        return
+    notification = {
+        "type": event["topic"].replace(".", "_"),
+        "timestamp": event["timestamp"],
+        **event["data"],
+    }
+    if notification_id is not None:
+        notification["notification_id"] = notification_id
+    await broadcast_notification(notification)
+
+for _topic in (STOCK_LOW, PAYMENT_APPROVED, ORDER_ALERT):
+    event_bus.subscribe(_topic, push_notification_event)
+
+
+def _admin_cursor(db: Session, admin_id: int):
+    """관리자 읽음 커서 (처음 조회하는 관리자는 writer 큐로 한 번 생성)"""
+    cursor_row = notification_crud.get_cursor(db, admin_id)
+    if cursor_row is None:
+        run_write(lambda session: notification_crud.ensure_cursor(session, admin_id), db)
+        cursor_row = notification_crud.get_cursor(db, admin_id)
+    return cursor_row
 
 # 재고 관련 알림 엔드포인트
 @router.get("/stock-alerts", response_model=List[StockAlertNotification])
 def get_stock_alerts(db: Session = Depends(get_db)):
-    """재고 부족 알림을 조회합니다."""
-    # 재고 부족 또는 소진된 재료 찾기
+    """재고 부족 알림을 조회합니다. (재료 LEFT JOIN 재고 쿼리 한 번, 실시간 알림은 stock.low 이벤트로 푸시)"""
     alerts = []
-    ingredients = db.query(Ingredient).filter(Ingredient.is_active == True).all()
-    
-    for ingredient in ingredients:
-        stock = db.query(IngredientStock).filter(
-            IngredientStock.ingredient_id == ingredient.id
-        ).first()
-        
-        if not stock:
-            # 재고 정보가 없는 경우
-            alerts.append(
-                StockAlertNotification(
-                    id=ingredient.id,
-                    ingredient_name=ingredient.name,
-                    ingredient_id=ingredient.id,
-                    current_quantity=0,
-                    min_stock_level=ingredient.min_stock_level,
-                    unit=ingredient.unit,
-                    status="재고 없음",
-                    created_at=datetime.utcnow(),
-                    severity="high"
-                )
-            )
-        elif stock.current_quantity <= 0:
-            # 재고가 소진된 경우
-            alerts.append(
-                StockAlertNotification(
-                    id=ingredient.id,
-                    ingredient_name=ingredient.name,
-                    ingredient_id=ingredient.id,
-                    current_quantity=stock.current_quantity,
-                    min_stock_level=ingredient.min_stock_level,
-                    unit=ingredient.unit,
-                    status="재고 없음",
-                    created_at=datetime.utcnow(),
-                    severity="high"
-                )
-            )
-        elif stock.current_quantity < ingredient.min_stock_level:
+    forecasts = stock_forecaster.forecast(db)
+    now = datetime.utcnow()
+
+    for row in stock_levels(db):
+        forecast = forecasts.get(row["id"], {})
+        if row["status"] == OUT:
+            # 재고 정보가 없거나 소진된 경우
+            status, severity = "재고 없음", "high"
+        elif row["status"] == LOW:
             # 재고가 최소 재고 수준보다 낮은 경우
-            alerts.append(
-                StockAlertNotification(
-                    id=ingredient.id,
-                    ingredient_name=ingredient.name,
-                    ingredient_id=ingredient.id,
-                    current_quantity=stock.current_quantity,
-                    min_stock_level=ingredient.min_stock_level,
-                    unit=ingredient.unit,
-                    status="재고 부족",
-                    created_at=datetime.utcnow(),
-                    severity="medium"
-                )
+            status, severity = "재고 부족", "medium"
+        elif forecast.get("needs_reorder"):
+            # 최소 재고 이상이지만 리드타임 안에 소진될 것으로 예측되는 경우
+            status, severity = "발주 필요", "low"
+        else:
+            continue
+        alerts.append(
+            StockAlertNotification(
+                id=row["id"],
+                ingredient_name=row["name"],
+                ingredient_id=row["id"],
+                current_quantity=row["current_quantity"],
+                min_stock_level=row["min_stock_level"],
+                unit=row["unit"],
+                status=status,
+                created_at=now,
+                severity=severity,
+                reorder_point=forecast.get("reorder_point"),
+                predicted_stockout_at=forecast.get("predicted_stockout_at"),
             )
-    
+        )
+
     return alerts
 
 # 주문 급증 알림 엔드포인트는 /api/admin/alerts/order-surge로 이동됨
@@ -109,46 +158,60 @@ def get_stock_alerts(db: Session = Depends(get_db)):
 @router.post("/mark-as-read/{notification_id}", response_model=NotificationStatus)
 def mark_notification_as_read(
     notification_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_active_admin),
 ):
-    """특정 알림을 읽음 상태로 표시합니다."""
-    # 실제 구현에서는 알림 데이터베이스 테이블에 저장하고 상태를 업데이트하는 코드 필요
-    # 현재는 단순 응답 반환
+    """특정 알림을 현재 관리자에 대해 읽음 상태로 표시합니다."""
+    result = run_write(
+        lambda session: notification_crud.mark_read(session, current_admin.id, notification_id), db
+    )
+    if result is None:
+        raise HTTPException(status_code=404, detail="알림을 찾을 수 없습니다.")
     return NotificationStatus(
         notification_id=notification_id,
         is_read=True,
         updated_at=datetime.utcnow()
     )
 
+@router.post("/mark-all-as-read")
+def mark_all_notifications_as_read(
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_active_admin),
+):
+    """현재까지의 알림을 모두 읽음 상태로 표시합니다."""
+    marked = run_write(lambda session: notification_crud.mark_all_read(session, current_admin.id), db)
+    return {"marked": marked, "unread_count": 0}
+
+# 읽지 않은 알림 수 (관리자별 카운터 한 행 조회)
+@router.get("/unread-count")
+def get_unread_notification_count(
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_active_admin),
+):
+    """읽지 않은 알림 수를 조회합니다."""
+    return {"unread_count": _admin_cursor(db, current_admin.id).unread_count}
+
 # 모든 알림 조회 엔드포인트
 @router.get("/all", response_model=NotificationResponse)
 def get_all_notifications(
-    skip: int = 0,
-    limit: int = 20,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor (키셋 페이지네이션)"),
+    limit: int = Query(20, ge=1, le=100),
+    type: Optional[str] = Query(None, description="알림 종류 (stock_low, order_surge, order_anomaly ...)"),
+    unread_only: bool = False,
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_active_admin),
 ):
-    """모든 알림을 조회합니다."""
-    # 재고 알림 가져오기
-    stock_alerts = get_stock_alerts(db)
-    
-    # 주문 급증 알림은 /api/admin/alerts/order-surge에서 확인
-    # alerts.py의 API를 직접 호출하는 대신 HTTP 요청을 사용하는 것이 이상적이지만,
-    # 간단한 구현을 위해 여기서는 주문 급증 알림 없이 재고 알림만 표시
-    
-    # 알림 통합 및 페이징
-    all_notifications = []
-    if stock_alerts:
-        all_notifications.extend(stock_alerts)
-    
-    # 생성 시간 기준으로 정렬
-    all_notifications.sort(key=lambda x: x.created_at, reverse=True)
-    
-    # 페이징 적용
-    total = len(all_notifications)
-    paginated_notifications = all_notifications[skip:skip+limit]
-    
+    """저장된 알림을 최신순으로 조회합니다."""
+    cursor_row = _admin_cursor(db, current_admin.id)
+    try:
+        items, next_page = notification_crud.list_notifications(
+            db, cursor_row, cursor=cursor, limit=limit, type=type, unread_only=unread_only
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="잘못된 커서입니다.")
+
     return NotificationResponse(
-        items=paginated_notifications,
-        total=total,
-        unread_count=total  # 실제 구현에서는 읽지 않은 알림 수를 계산
-    ) 
\ No newline at end of file
+        items=items,
+        unread_count=cursor_row.unread_count,
+        next_cursor=next_page,
+    )
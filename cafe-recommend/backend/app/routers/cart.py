@@ -8,6 +8,7 @@ from app import crud
 from app.schemas import cart as cart_schema
 from app.api import deps
 from app.db.session import get_db
+from app.db.writer import run_write
 from app.models.cart import Cart, CartItem
 
 router = APIRouter()
@@ -90,8 +91,9 @@ def add_item_to_cart(
         if not menu:
             raise HTTPException(status_code=404, detail="메뉴를 찾을 수 없습니다.")
         
-        # 장바구니에 항목 추가
-        cart_item = crud.cart.add_item_to_cart(db, cart.id, item)
+        # 장바구니에 항목 추가 (단일 writer 큐를 통해 그룹 커밋)
+        cart_id = cart.id
+        run_write(lambda session: crud.cart.stage_add_item(session, cart_id, item), db)
         return crud.cart.get_cart(db, effective_session_id)
     except Exception as e:
         logger.error(f"장바구니 항목 추가 중 오류 발생: {str(e)}")
@@ -114,10 +116,9 @@ def update_cart_item(
         if not cart:
             raise HTTPException(status_code=404, detail="장바구니를 찾을 수 없습니다.")
         
-        # 장바구니 항목 업데이트
-        updated_item = crud.cart.update_cart_item(db, cart.id, item_id, item)
-        if not updated_item:
-            raise HTTPException(status_code=404, detail="장바구니 항목을 찾을 수 없습니다.")
+        # 장바구니 항목 업데이트 (항목이 없으면 작업 안에서 404 발생)
+        cart_id = cart.id
+        run_write(lambda session: crud.cart.stage_update_item(session, cart_id, item_id, item), db)
         
         return crud.cart.get_cart(db, effective_session_id)
     except Exception as e:
@@ -140,10 +141,9 @@ def remove_cart_item(
         if not cart:
             raise HTTPException(status_code=404, detail="장바구니를 찾을 수 없습니다.")
         
-        # 장바구니 항목 삭제
-        deleted = crud.cart.remove_cart_item(db, cart.id, item_id)
-        if not deleted:
-            raise HTTPException(status_code=404, detail="장바구니 항목을 찾을 수 없습니다.")
+        # 장바구니 항목 삭제 (항목이 없으면 작업 안에서 404 발생)
+        cart_id = cart.id
+        run_write(lambda session: crud.cart.stage_remove_item(session, cart_id, item_id), db)
         
         return crud.cart.get_cart(db, effective_session_id)
     except Exception as e:
@@ -171,23 +171,16 @@ def clear_cart(
             return cart
         
         try:
-            # 장바구니 아이템 삭제
-            items_count = db.query(CartItem).filter(CartItem.cart_id == cart.id).count()
-            logger.info(f"삭제할 장바구니 아이템 수: {items_count}")
-            
-            # 장바구니 아이템 삭제
-            db.query(CartItem).filter(CartItem.cart_id == cart.id).delete()
-            
-            # 장바구니 업데이트
-            cart.total_price = 0
-            db.commit()
-            db.refresh(cart)
+            # 장바구니 아이템 삭제 (단일 writer 큐를 통해 그룹 커밋)
+            items_count = run_write(
+                lambda session: crud.cart.stage_clear_session_cart(session, effective_session_id), db
+            )
+            logger.info(f"삭제된 장바구니 아이템 수: {items_count}")
             
             logger.info(f"장바구니 비우기 성공 - 세션 ID: {effective_session_id}")
-            return cart
+            return crud.cart.get_cart(db, effective_session_id)
             
         except Exception as e:
-            db.rollback()
             logger.error(f"장바구니 비우기 중 오류 발생: {str(e)}")
             raise HTTPException(
                 status_code=500,
@@ -1,31 +1,197 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, Cookie, Header
+from fastapi import APIRouter, HTTPException, Depends, Query, Cookie, Header, Response, WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
+import asyncio
 
+from sse_starlette.sse import EventSourceResponse
+
+from app.core.config import settings
+from app.core.wire import WireMessage, accept_websocket, message_sender
 from app.database import get_db
+from app.db.session import SessionLocal
 from app.schemas.order import Order, OrderWithItems
 from app.crud import order as order_crud
+from app.crud.pagination import next_cursor, paginate
+from app.models.order import Order as OrderModel
+from app.services.order_status_push import order_status_hub
 
 router = APIRouter()
 
+# 실시간 상태 스트림 연결 시 보내는 최근 주문 수
+STATUS_SNAPSHOT_LIMIT = 20
+
 @router.get("/orders", response_model=List[Order])
 async def get_orders(
+    response: Response,
     skip: int = 0,
-    limit: int = 10,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값"),
     session_id: Optional[str] = Cookie(None),
     x_session_id: Optional[str] = Header(None, alias="X-Session-ID"),
     db: Session = Depends(get_db)
 ):
-    """사용자 주문 목록 조회"""
+    """
+    사용자 주문 목록 조회
+
+    skip/limit(offset) 또는 cursor(키셋) 방식으로 페이지를 지정할 수 있습니다.
+    다음 페이지 커서는 X-Next-Cursor, 전체 건수는 X-Total-Count 헤더로 반환합니다.
+    """
     effective_session_id = x_session_id or session_id
     if not effective_session_id:
         raise HTTPException(status_code=400, detail="세션 ID가 필요합니다.")
     
     # 세션 ID로 주문 조회
-    orders, _ = order_crud.get_by_session(db, session_id=effective_session_id, skip=skip, limit=limit)
+    try:
+        orders, total = order_crud.get_by_session(
+            db, session_id=effective_session_id, skip=skip, limit=limit, cursor=cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="잘못된 커서입니다.")
+    
+    response.headers["X-Total-Count"] = str(total)
+    next_page = next_cursor(orders, limit)
+    if next_page:
+        response.headers["X-Next-Cursor"] = next_page
     return orders
 
+# --- 주문 상태 푸시 (폴링 대체) ---
+
+def _lookup_order_status(order_id: int):
+    with SessionLocal() as db:
+        return db.query(
+            OrderModel.id, OrderModel.session_id, OrderModel.status, OrderModel.order_number,
+            OrderModel.updated_at, OrderModel.created_at,
+        ).filter(OrderModel.id == order_id).first()
+
+
+def _lookup_session_orders(session_id: str) -> list:
+    # ix_orders_session_created 인덱스 사용
+    with SessionLocal() as db:
+        return db.query(
+            OrderModel.id, OrderModel.session_id, OrderModel.status, OrderModel.order_number,
+            OrderModel.updated_at, OrderModel.created_at,
+        ).filter(OrderModel.session_id == session_id).order_by(
+            OrderModel.created_at.desc()
+        ).limit(STATUS_SNAPSHOT_LIMIT).all()
+
+
+def _remember_row(row) -> Dict[str, Any]:
+    changed_at = row.updated_at or row.created_at
+    return order_status_hub.remember(
+        row.id, row.session_id, row.status, row.order_number, changed_at.isoformat() if changed_at else None
+    )
+
+
+async def _current_status(order_id: int, session_id: str) -> Dict[str, Any]:
+    """주문 상태 (캐시에 없을 때만 주문 1건의 상태 컬럼만 조회) + 세션 접근 제어"""
+    state = order_status_hub.get(order_id)
+    if state is None:
+        row = await asyncio.to_thread(_lookup_order_status, order_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail="주문을 찾을 수 없습니다.")
+        state = _remember_row(row)
+    if state["session_id"] != session_id:
+        raise HTTPException(status_code=403, detail="이 주문에 접근할 권한이 없습니다.")
+    return state
+
+
+async def _session_snapshot(session_id: str) -> WireMessage:
+    rows = await asyncio.to_thread(_lookup_session_orders, session_id)
+    # 조회하는 동안 반영된 이벤트가 있으면 캐시의 최신 상태가 우선
+    states = [_remember_row(row) for row in rows]
+    return WireMessage({"type": "snapshot", "data": [order_status_hub.public(s) for s in states]})
+
+
+@router.get("/orders/events", response_class=EventSourceResponse)
+async def order_status_events(
+    session_id: Optional[str] = Cookie(None),
+    x_session_id: Optional[str] = Header(None, alias="X-Session-ID"),
+):
+    """
+    세션의 주문 상태 변경 SSE 스트림
+
+    연결 시 최근 주문 상태(snapshot)를 한 번 보내고, 이후 이 세션 주문의 상태가 바뀔 때만
+    order_status 메시지를 보냅니다.
+    """
+    effective_session_id = x_session_id or session_id
+    if not effective_session_id:
+        raise HTTPException(status_code=400, detail="세션 ID가 필요합니다.")
+    snapshot = await _session_snapshot(effective_session_id)
+    key = object()
+    channel = order_status_hub.subscribe(effective_session_id, key)
+
+    async def stream():
+        try:
+            yield snapshot.json
+            while True:
+                message = await channel.get()
+                if message is None:
+                    break
+                yield message.json
+        finally:
+            order_status_hub.unsubscribe(effective_session_id, key)
+
+    return EventSourceResponse(stream())
+
+
+@router.websocket("/orders/ws")
+async def order_status_websocket(websocket: WebSocket):
+    """세션의 주문 상태 변경 WebSocket (session_id 쿠키로 인증, 메시지 형식은 SSE 와 동일)"""
+    session_id = websocket.headers.get("x-session-id") or websocket.cookies.get("session_id")
+    if not session_id:
+        await websocket.close(code=4001, reason="세션 ID가 필요합니다.")
+        return
+    encoding = await accept_websocket(websocket)
+    try:
+        snapshot = await _session_snapshot(session_id)
+        channel = order_status_hub.subscribe(session_id, websocket, message_sender(websocket, encoding))
+        channel.offer(snapshot)
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        order_status_hub.unsubscribe(session_id, websocket)
+
+
+@router.get("/orders/{order_id}/status")
+async def get_order_status(
+    order_id: int,
+    session_id: Optional[str] = Cookie(None),
+    x_session_id: Optional[str] = Header(None, alias="X-Session-ID"),
+):
+    """주문 상태만 조회 (주문 항목 조인 없음, 캐시된 상태 사용)"""
+    effective_session_id = x_session_id or session_id
+    if not effective_session_id:
+        raise HTTPException(status_code=400, detail="세션 ID가 필요합니다.")
+    return order_status_hub.public(await _current_status(order_id, effective_session_id))
+
+
+@router.get("/orders/{order_id}/status/wait")
+async def wait_order_status(
+    order_id: int,
+    since: int = Query(0, ge=0, description="마지막으로 받은 version"),
+    timeout: float = Query(settings.ORDER_STATUS_LONG_POLL_SECONDS, gt=0, le=settings.ORDER_STATUS_LONG_POLL_SECONDS),
+    session_id: Optional[str] = Cookie(None),
+    x_session_id: Optional[str] = Header(None, alias="X-Session-ID"),
+):
+    """
+    주문 상태 long-poll (SSE/WebSocket 을 쓸 수 없는 클라이언트용)
+
+    since 이후 상태가 바뀌었으면 즉시, 아니면 바뀔 때까지(최대 timeout 초) 기다렸다가 응답합니다.
+    대기 중에는 DB를 조회하지 않으며, 시간 초과 시 204 를 반환합니다.
+    """
+    effective_session_id = x_session_id or session_id
+    if not effective_session_id:
+        raise HTTPException(status_code=400, detail="세션 ID가 필요합니다.")
+    await _current_status(order_id, effective_session_id)
+    state = await order_status_hub.wait(order_id, since, timeout)
+    if state is None:
+        return Response(status_code=204)
+    return order_status_hub.public(state)
+
+
 @router.get("/orders/{order_id}", response_model=OrderWithItems)
 async def get_order_details(
     order_id: int,
@@ -52,8 +218,10 @@ async def get_order_details(
 @router.get("/orders/status/{status}", response_model=List[Order])
 async def get_orders_by_status(
     status: str,
+    response: Response,
     skip: int = 0,
-    limit: int = 10,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값"),
     session_id: Optional[str] = Cookie(None),
     x_session_id: Optional[str] = Header(None, alias="X-Session-ID"),
     db: Session = Depends(get_db)
@@ -63,12 +231,17 @@ async def get_orders_by_status(
     if not effective_session_id:
         raise HTTPException(status_code=400, detail="세션 ID가 필요합니다.")
     
-    # 세션 ID + 상태로 주문 조회 (해당 구현 추가 필요)
-    orders = []
-    for order in db.query(Order).filter(
-        Order.session_id == effective_session_id,
-        Order.status == status
-    ).order_by(Order.created_at.desc()).offset(skip).limit(limit):
-        orders.append(order)
+    # 세션 ID + 상태로 주문 조회 (ix_orders_session_created 인덱스 사용)
+    query = db.query(OrderModel).filter(
+        OrderModel.session_id == effective_session_id,
+        OrderModel.status == status
+    )
+    try:
+        orders = paginate(query, OrderModel, skip=skip, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="잘못된 커서입니다.")
     
+    next_page = next_cursor(orders, limit)
+    if next_page:
+        response.headers["X-Next-Cursor"] = next_page
     return orders 
\ No newline at end of file
@@ -10,7 +10,10 @@ from ..schemas.payment import (
     OrderResponse, RefundRequest, RefundResponse
 )
 from ..schemas.order import OrderCreate, OrderItemCreate
-from ..crud.order import create_order as crud_create_order
+from ..crud.order import build_order, mark_order_paid, update_order_fields
+from ..crud.cart import stage_clear_session_cart
+from ..db.writer import submit_write
+from ..core.idempotency import run_idempotent
 import httpx
 import json
 from urllib.parse import urlencode
@@ -60,6 +63,14 @@ async def get_payment_config(provider: str, db: Session):
         raise HTTPException(status_code=400, detail=f"{provider} 결제가 설정되지 않았습니다.")
     return config
 
+async def write_order_fields(db: Session, order_id: int, **values) -> None:
+    """
+    요청 세션에서 커밋하지 않고 writer 큐로 주문 컬럼을 변경합니다.
+    (요청 스레드의 커밋이 writer 와 SQLite 쓰기 잠금을 다투지 않도록 함)
+    """
+    await submit_write(lambda session: update_order_fields(session, order_id, **values), db)
+
+
 def set_session_cookie(response: Response, session_id: str):
     response.set_cookie(
         key="session_id",
@@ -71,15 +82,24 @@ def set_session_cookie(response: Response, session_id: str):
         max_age=3600 * 24 * 7  # 7일 유효
     )
 
+def cart_payload(request: OrderRequest) -> dict:
+    """멱등성 키 계산용 요청 내용 (아이템 순서와 무관하도록 정렬)"""
+    return {
+        "payment_method": request.payment_method,
+        "total_amount": request.total_amount,
+        "items": sorted((item.menu_id, item.quantity) for item in request.items),
+    }
+
 @router.post("/order")
 async def create_order_route(
     request: OrderRequest,
     response: Response,
     session_id: Optional[str] = Cookie(None),
     x_session_id: Optional[str] = Header(None, alias="X-Session-ID"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db)
 ):
-    """주문 생성 API (crud.order 사용)"""
+    """주문 생성 API (crud.order 사용, 같은 요청의 재시도는 처음 생성된 주문을 반환)"""
     try:
         # 세션 ID 확인 및 설정
         effective_session_id = x_session_id or session_id
@@ -88,45 +108,50 @@ async def create_order_route(
             raise HTTPException(status_code=400, detail="세션 ID가 필요합니다.")
         set_session_cookie(response, effective_session_id)
         
-        # 결제 설정 확인
-        try:
-            await get_payment_config(request.payment_method, db)
-        except Exception as e:
-            logging.error(f"결제 설정 확인 중 오류: {str(e)}")
-            raise
+        async def create_order() -> dict:
+            # 결제 설정 확인
+            try:
+                await get_payment_config(request.payment_method, db)
+            except Exception as e:
+                logging.error(f"결제 설정 확인 중 오류: {str(e)}")
+                raise
+                
+            # OrderRequest 를 OrderCreate 스키마에 맞게 변환
+            order_items_create = [
+                OrderItemCreate(menu_id=item.menu_id, quantity=item.quantity)
+                for item in request.items
+            ]
+            
+            # OrderCreate 객체 생성
+            order_create_data = OrderCreate(
+                payment_method=request.payment_method,
+                session_id=effective_session_id,
+                items=order_items_create,
+                # user_id 등 필요한 다른 필드도 request에서 가져와 할당 가능
+                # 예: user_id=request.user_id (OrderRequest에 user_id가 있다면)
+            )
+            
+            # 주문 생성과 장바구니 비우기를 하나의 writer 작업으로 묶어 그룹 커밋
+            def create_order_job(session: Session) -> int:
+                created_order = build_order(session, order_create_data)
+                stage_clear_session_cart(session, effective_session_id)
+                return created_order.id
+            
+            try:
+                created_order_id = await submit_write(create_order_job, db)
+            except ValueError as ve:
+                raise HTTPException(status_code=400, detail=f"Failed to create order: {str(ve)}")
+            
+            logging.info(f"주문 생성 성공 (via writer): order_id={created_order_id}")
             
-        # OrderRequest 를 OrderCreate 스키마에 맞게 변환
-        order_items_create = [
-            OrderItemCreate(menu_id=item.menu_id, quantity=item.quantity)
-            for item in request.items
-        ]
+            # 생성된 주문의 ID만 반환 (기존 로직 유지)
+            return {"order_id": created_order_id}
         
-        # OrderCreate 객체 생성
-        order_create_data = OrderCreate(
-            payment_method=request.payment_method,
-            session_id=effective_session_id,
-            items=order_items_create,
-            # user_id 등 필요한 다른 필드도 request에서 가져와 할당 가능
-            # 예: user_id=request.user_id (OrderRequest에 user_id가 있다면)
+        return await run_idempotent(
+            "payments:order", effective_session_id, cart_payload(request), create_order,
+            idempotency_key=idempotency_key, response=response
         )
         
-        # crud 함수 호출하여 주문 생성
-        created_order = crud_create_order(db=db, order_data=order_create_data)
-        
-        logging.info(f"주문 생성 성공 (via crud): order_id={created_order.id}, order_number={created_order.order_number}")
-        
-        # 장바구니 비우기 (주문 성공 후)
-        cart = db.query(Cart).filter(Cart.session_id == effective_session_id).first()
-        if cart:
-            db.query(CartItem).filter(CartItem.cart_id == cart.id).delete()
-            # 필요 시 Cart 자체도 삭제 or 상태 변경
-            # db.delete(cart)
-            db.commit()
-            logging.info(f"Cart cleared for session {effective_session_id}")
-        
-        # 생성된 주문의 ID만 반환 (기존 로직 유지)
-        return {"order_id": created_order.id} 
-        
     except HTTPException as he:
         logging.error(f"HTTP 오류 발생: {he.detail}")
         raise
@@ -140,9 +165,15 @@ async def prepare_naver_payment(
     response: Response,
     session_id: Optional[str] = Cookie(None),
     x_session_id: Optional[str] = Header(None, alias="X-Session-ID"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db)
 ):
-    """네이버페이 결제를 위한 주문 정보 생성 및 프론트엔드 SDK 파라미터 반환"""
+    """
+    네이버페이 결제를 위한 주문 정보 생성 및 프론트엔드 SDK 파라미터 반환
+
+    같은 세션의 같은 장바구니(또는 같은 Idempotency-Key) 재요청은 주문을 새로 만들지 않고
+    처음 생성한 주문의 SDK 파라미터를 그대로 반환합니다.
+    """
     effective_session_id = x_session_id or session_id
     if not effective_session_id:
         raise HTTPException(status_code=400, detail="세션 ID가 필요합니다.")
@@ -152,47 +183,8 @@ async def prepare_naver_payment(
     # 네이버페이 설정 존재 여부 확인 (필요시)
     # await get_payment_config("naver", db)
 
-    # ****** 중복 주문 확인 로직 추가 시작 ******
-    logging.info(f"Checking for existing pending Naver Pay order for session: {effective_session_id}")
-    existing_pending_order = db.query(Order).filter(
-        Order.session_id == effective_session_id,
-        Order.payment_method == "naver",
-        Order.status == "pending"
-    ).order_by(Order.created_at.desc()).first()
-
-    # 기존 pending 주문이 있고, 아이템 내용이 현재 요청과 동일한지 비교 (간단 비교)
-    if existing_pending_order:
-        # 주의: 아이템 비교 로직은 더 정교해야 할 수 있음 (순서 무관 비교 등)
-        current_item_ids_quantities = sorted([(item.menu_id, item.quantity) for item in request.items])
-        existing_items_data = []
-        try:
-            # DB의 items 필드(JSON 문자열) 파싱
-            items_json_str = existing_pending_order.items
-            if isinstance(items_json_str, str): # 문자열인지 확인 후 파싱
-                 existing_items_list = json.loads(items_json_str)
-                 existing_items_data = sorted([(item.get('menu_id'), item.get('quantity')) for item in existing_items_list])
-            elif isinstance(items_json_str, list): # 이미 리스트 형태일 경우 (이전 저장 방식)
-                 existing_items_data = sorted([(item.get('menu_id'), item.get('quantity')) for item in items_json_str])
-            # else: None 이거나 다른 타입이면 빈 리스트 유지
-        except (json.JSONDecodeError, TypeError) as e:
-            logging.warning(f"Error decoding existing order items JSON for order {existing_pending_order.id}: {e}")
-            # 아이템 비교 불가 시, 안전하게 새 주문 생성 진행
-            existing_pending_order = None # 비교 실패 시 새 주문 생성하도록 리셋
-
-        if existing_pending_order and current_item_ids_quantities == existing_items_data:
-            logging.warning(f"Found existing identical pending Naver Pay order {existing_pending_order.id} for session {effective_session_id}. Reusing this order.")
-            created_order = existing_pending_order # 기존 주문 사용
-        else:
-            # 기존 주문이 없거나 내용이 다르면 새로 생성 진행
-            existing_pending_order = None 
-            logging.info("No identical pending order found, creating a new one.")
-    else:
-        existing_pending_order = None
-        logging.info("No existing pending Naver Pay order found for this session.")
-    # ****** 중복 주문 확인 로직 추가 끝 ******
-
-    # 주문 생성 (기존 주문이 없을 경우에만)
-    if not existing_pending_order:
+    async def prepare() -> dict:
+        # 주문 생성
         try:
             order_items_create = [
                 OrderItemCreate(menu_id=item.menu_id, quantity=item.quantity)
@@ -204,77 +196,83 @@ async def prepare_naver_payment(
                 items=order_items_create,
                 total_amount=request.total_amount # 요청 받은 금액 사용
             )
-            created_order = crud_create_order(db=db, order_data=order_create_data)
+            created_order_id = await submit_write(
+                lambda session: build_order(session, order_create_data).id, db
+            )
+            created_order = db.query(Order).filter(Order.id == created_order_id).first()
             logging.info(f"새로운 네이버페이 주문 생성됨: Order ID={created_order.id}, Order Number={created_order.order_number}")
         except ValueError as ve:
-            db.rollback()
             logging.error(f"주문 생성 중 오류 (ValueError): {str(ve)}")
             raise HTTPException(status_code=400, detail=str(ve))
         except Exception as e:
-            db.rollback()
             logging.exception("네이버페이 준비 - 주문 생성 중 예상치 못한 오류 발생")
             raise HTTPException(status_code=500, detail="주문 생성 중 오류 발생")
-    
-    # --- 여기서부터는 created_order 변수에 기존 주문 또는 새로 생성된 주문이 할당됨 ---
-    try:
-        # productItems 구성 (SDK 전달용)
-        # created_order의 items 는 DB에서 로드 필요 (기존 주문 재사용 시)
-        # !! 중요: created_order.items 가 JSON 문자열일 수 있으므로 파싱 필요 !!
-        product_items_for_sdk = []
-        final_order_items = [] # DB에서 로드하거나 새로 생성된 아이템 객체 저장용
+        
+        # --- 여기서부터는 created_order 변수에 새로 생성된 주문이 할당됨 ---
+        try:
+            # productItems 구성 (SDK 전달용)
+            # created_order의 items 는 DB에서 로드 필요 (기존 주문 재사용 시)
+            # !! 중요: created_order.items 가 JSON 문자열일 수 있으므로 파싱 필요 !!
+            product_items_for_sdk = []
+            final_order_items = [] # DB에서 로드하거나 새로 생성된 아이템 객체 저장용
 
-        if created_order.items and isinstance(created_order.items, str):
-            try:
-                parsed_items = json.loads(created_order.items)
-                # JSON 파싱 성공 시, 메뉴 정보 로드를 위해 DB 재조회 필요
-                # 여기서는 간단히 파싱된 이름 사용 (정확한 메뉴 이름은 DB 재조회 필요)
-                for item_data in parsed_items:
+            if created_order.items and isinstance(created_order.items, str):
+                try:
+                    parsed_items = json.loads(created_order.items)
+                    # JSON 파싱 성공 시, 메뉴 정보 로드를 위해 DB 재조회 필요
+                    # 여기서는 간단히 파싱된 이름 사용 (정확한 메뉴 이름은 DB 재조회 필요)
+                    for item_data in parsed_items:
+                         product_items_for_sdk.append({
+                             "categoryType": "FOOD", "categoryId": "CAFE", 
+                             "uid": str(item_data.get('menu_id')),
+                             "name": item_data.get('menu_name', 'Unknown'), # 파싱된 이름 사용
+                             "count": item_data.get('quantity')
+                         })
+                    # final_order_items 는 이 경우 비워둠 (DB 재조회 안 했으므로)
+                except json.JSONDecodeError:
+                     logging.error(f"Failed to parse items JSON for order {created_order.id}")
+                     # 파싱 실패 시 빈 리스트 사용
+            elif created_order.order_items: # OrderItem 객체들이 로드되어 있는 경우 (새로 생성된 경우)
+                 final_order_items = created_order.order_items
+                 for item in final_order_items:
                      product_items_for_sdk.append({
                          "categoryType": "FOOD", "categoryId": "CAFE", 
-                         "uid": str(item_data.get('menu_id')),
-                         "name": item_data.get('menu_name', 'Unknown'), # 파싱된 이름 사용
-                         "count": item_data.get('quantity')
+                         "uid": str(item.menu.id), "name": item.menu.name, "count": item.quantity,
                      })
-                # final_order_items 는 이 경우 비워둠 (DB 재조회 안 했으므로)
-            except json.JSONDecodeError:
-                 logging.error(f"Failed to parse items JSON for order {created_order.id}")
-                 # 파싱 실패 시 빈 리스트 사용
-        elif created_order.order_items: # OrderItem 객체들이 로드되어 있는 경우 (새로 생성된 경우)
-             final_order_items = created_order.order_items
-             for item in final_order_items:
-                 product_items_for_sdk.append({
-                     "categoryType": "FOOD", "categoryId": "CAFE", 
-                     "uid": str(item.menu.id), "name": item.menu.name, "count": item.quantity,
-                 })
         
-        # productName 구성 시 final_order_items 또는 product_items_for_sdk 사용
-        product_name = "주문 상품" # 기본값
-        if product_items_for_sdk:
-            first_item_name = product_items_for_sdk[0].get('name', '상품')
-            item_count = len(product_items_for_sdk)
-            product_name = f"{first_item_name}" + (f" 외 {item_count - 1}건" if item_count > 1 else "")
+            # productName 구성 시 final_order_items 또는 product_items_for_sdk 사용
+            product_name = "주문 상품" # 기본값
+            if product_items_for_sdk:
+                first_item_name = product_items_for_sdk[0].get('name', '상품')
+                item_count = len(product_items_for_sdk)
+                product_name = f"{first_item_name}" + (f" 외 {item_count - 1}건" if item_count > 1 else "")
         
-        # SDK 파라미터 구성
-        sdk_params = {
-            "merchantUserKey": effective_session_id,
-            "merchantPayKey": str(created_order.id), # 우리 시스템 주문 ID
-            "productName": product_name,
-            "totalPayAmount": int(created_order.total_amount), 
-            "taxScopeAmount": int(created_order.total_amount),
-            "taxExScopeAmount": 0,
-            "returnUrl": f"{settings.FRONTEND_URL}/payments/naver/callback", 
-            "productItems": product_items_for_sdk
-        }
+            # SDK 파라미터 구성
+            sdk_params = {
+                "merchantUserKey": effective_session_id,
+                "merchantPayKey": str(created_order.id), # 우리 시스템 주문 ID
+                "productName": product_name,
+                "totalPayAmount": int(created_order.total_amount), 
+                "taxScopeAmount": int(created_order.total_amount),
+                "taxExScopeAmount": 0,
+                "returnUrl": f"{settings.FRONTEND_URL}/payments/naver/callback", 
+                "productItems": product_items_for_sdk
+            }
         
-        logging.info(f"네이버페이 SDK 파라미터 생성 완료 (Order ID: {created_order.id}): {sdk_params}")
+            logging.info(f"네이버페이 SDK 파라미터 생성 완료 (Order ID: {created_order.id}): {sdk_params}")
 
-        # SDK 파라미터 반환
-        return sdk_params
+            # SDK 파라미터 반환
+            return sdk_params
 
-    except Exception as e:
-        # 기존 주문 재사용 시에도 SDK 파라미터 생성 중 오류 발생 가능
-        logging.exception(f"네이버페이 준비 - SDK 파라미터 생성 중 예상치 못한 오류 발생 (Order ID: {created_order.id})")
-        raise HTTPException(status_code=500, detail="결제 준비 중 오류 발생")
+        except Exception as e:
+            # 기존 주문 재사용 시에도 SDK 파라미터 생성 중 오류 발생 가능
+            logging.exception(f"네이버페이 준비 - SDK 파라미터 생성 중 예상치 못한 오류 발생 (Order ID: {created_order.id})")
+            raise HTTPException(status_code=500, detail="결제 준비 중 오류 발생")
+
+    return await run_idempotent(
+        "payments:naver:prepare", effective_session_id, cart_payload(request), prepare,
+        idempotency_key=idempotency_key, response=response
+    )
 
 @router.get("/naver/callback")
 async def verify_and_approve_naver_payment(
@@ -369,8 +367,7 @@ async def verify_and_approve_naver_payment(
                  error_message = approve_data.get("message") if approve_data else "API 응답 오류"
                  logging.error(f"네이버페이 결제 승인 API 호출 실패 ({approve_response.status_code}): {error_message}")
                  # 주문 상태를 'failed'로 변경하는 것을 고려
-                 order.status = "payment_failed"
-                 db.commit()
+                 await write_order_fields(db, order_id_int, status="payment_failed")
                  raise HTTPException(status_code=400, detail=f"결제 승인 실패: {error_message}")
 
             # 6. 승인 응답 검증 (API 응답 구조 확인 후 수정 필요)
@@ -383,38 +380,20 @@ async def verify_and_approve_naver_payment(
                 if admission_state == "SUCCESS" and paid_amount == int(order.total_amount):
                     logging.info("네이버페이 결제 최종 승인 및 검증 성공.")
                     
-                    # --- 주문 번호 생성 (paid 상태 업데이트 직전) ---
-                    today_str = datetime.now(timezone(timedelta(hours=9))).strftime('%Y%m%d')
-                    # 마지막 주문 조회 시 with_for_update() 추가 (동시성 제어 시도)
-                    last_order_today = db.query(Order).filter(Order.order_number.like(f"{today_str}-%")).order_by(Order.order_number.desc()).with_for_update().first()
-                    next_seq = 1
-                    if last_order_today and last_order_today.order_number:
-                        try:
-                            last_seq = int(last_order_today.order_number.split('-')[-1])
-                            next_seq = last_seq + 1
-                        except (ValueError, IndexError):
-                            logging.warning(f"이전 주문 번호 형식 오류: {last_order_today.order_number}")
-                            pass
-                    new_order_number = f"{today_str}-{next_seq:03d}"
-                    order.order_number = new_order_number
-                    logging.info(f"새 주문 번호 생성: {new_order_number}")
-                    # --- 주문 번호 생성 끝 ---
+                    # 주문번호 부여, paid 상태 변경, 장바구니 비우기를 하나의 writer 작업으로 처리
+                    # (writer 큐가 채번을 직렬화하므로 동시 승인 시에도 주문번호가 중복되지 않음)
+                    order_id_to_pay = order.id
+                    order_session_id = order.session_id
+                    
+                    def mark_paid_job(session: Session) -> Optional[str]:
+                        order_number = mark_order_paid(session, order_id_to_pay, payment_key=paymentId)
+                        if order_session_id:
+                            stage_clear_session_cart(session, order_session_id)
+                        return order_number
                     
-                    # 주문 상태 업데이트
-                    order.status = "paid"
-                    order.payment_key = paymentId # 최종 paymentId로 업데이트
-                    # 필요시 상세 정보 저장
-                    # order.payment_details = json.dumps(payment_detail, ensure_ascii=False)
-                    db.commit()
+                    await submit_write(mark_paid_job, db)
                     db.refresh(order)
                     logging.info(f"주문 상태 'paid'로 업데이트 성공: Order ID={order.id}")
-                    
-                    # 장바구니 비우기 (최종 성공 시점에)
-                    cart = db.query(Cart).filter(Cart.session_id == order.session_id).first()
-                    if cart:
-                        db.query(CartItem).filter(CartItem.cart_id == cart.id).delete()
-                        db.commit()
-                        logging.info(f"Cart cleared for session {order.session_id} after successful payment.")
                         
                     # 성공 페이지로 리다이렉트
                     return RedirectResponse(url=f"{settings.FRONTEND_URL}/payments/success?order_id={order.id}")
@@ -434,8 +413,7 @@ async def verify_and_approve_naver_payment(
     except Exception as verify_err:
         logging.exception("네이버페이 결제 승인 중 예상치 못한 오류")
         # 오류 발생 시 주문 상태 업데이트 고려 (예: 'payment_failed')
-        order.status = "payment_failed"
-        db.commit()
+        await write_order_fields(db, order_id_int, status="payment_failed")
         raise HTTPException(status_code=500, detail=f"결제 승인 중 오류 발생: {str(verify_err)}")
 
 @router.post("/kakao")
@@ -444,8 +422,10 @@ async def process_kakao_payment(
     response: Response,
     session_id: Optional[str] = Cookie(None),
     x_session_id: Optional[str] = Header(None, alias="X-Session-ID"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db)
 ):
+    """카카오페이 결제 준비 (같은 주문/금액의 재요청은 PG 호출 없이 처음 받은 tid와 URL을 반환)"""
     effective_session_id = x_session_id or session_id
     if not effective_session_id:
         raise HTTPException(status_code=400, detail="세션 ID가 필요합니다.")
@@ -458,95 +438,133 @@ async def process_kakao_payment(
     kakao_secret_key = payment_provider_config["secret_key"]
     kakao_cid = payment_provider_config["additional_settings"]["cid"]
 
-    try:
-        order_id_int = int(request.order_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="잘못된 주문 ID 형식입니다.")
-    order = db.query(Order).filter(Order.id == order_id_int).first()
-    if not order:
-        raise HTTPException(status_code=404, detail="주문을 찾을 수 없습니다.")
+    async def ready() -> dict:
+        try:
+            order_id_int = int(request.order_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="잘못된 주문 ID 형식입니다.")
+        order = db.query(Order).filter(Order.id == order_id_int).first()
+        if not order:
+            raise HTTPException(status_code=404, detail="주문을 찾을 수 없습니다.")
 
-    try:
-        async with httpx.AsyncClient() as client:
-            request_data = {
-                "cid": kakao_cid,
-                "partner_order_id": str(order.id),
-                "partner_user_id": effective_session_id,
-                "item_name": request.item_name,
-                "quantity": request.quantity,
-                "total_amount": request.total_amount, # API 명세상 Integer, KakaoPayRequest는 int
-                "tax_free_amount": 0, # API 명세상 Integer
-                "approval_url": f"{settings.FRONTEND_URL}/payments/callback",
-                "cancel_url": f"{settings.FRONTEND_URL}/payments/cancel",
-                "fail_url": f"{settings.FRONTEND_URL}/payments/fail",
-            }
-            # vat_amount는 자동 계산되도록 명시적으로 보내지 않음
-            
-            logging.info(f"카카오페이 결제 준비 요청 데이터 (JSON): {request_data}")
+        try:
+            async with httpx.AsyncClient() as client:
+                request_data = {
+                    "cid": kakao_cid,
+                    "partner_order_id": str(order.id),
+                    "partner_user_id": effective_session_id,
+                    "item_name": request.item_name,
+                    "quantity": request.quantity,
+                    "total_amount": request.total_amount, # API 명세상 Integer, KakaoPayRequest는 int
+                    "tax_free_amount": 0, # API 명세상 Integer
+                    "approval_url": f"{settings.FRONTEND_URL}/payments/callback",
+                    "cancel_url": f"{settings.FRONTEND_URL}/payments/cancel",
+                    "fail_url": f"{settings.FRONTEND_URL}/payments/fail",
+                }
+                # vat_amount는 자동 계산되도록 명시적으로 보내지 않음
             
-            # URL 결합 시 이중 슬래시 방지
-            base_url = str(settings.KAKAO_PAY_API_URL).rstrip('/')
-            api_response = await client.post(
-                f"{base_url}/online/v1/payment/ready", # 이중 슬래시 방지
-                headers={
-                    "Authorization": f"SECRET_KEY {kakao_secret_key}", # 새 인증 방식
-                    "Content-Type": "application/json"  # Content-Type 문서 규격에 맞게 수정
-                },
-                json=request_data # httpx는 json 파라미터로 dict를 바로 전달 가능
-            )
+                logging.info(f"카카오페이 결제 준비 요청 데이터 (JSON): {request_data}")
             
-            if api_response.status_code == 200:
-                response_data = api_response.json()
-                logging.info(f"카카오페이 결제 준비 응답 원본: {api_response.text}")
-                logging.info(f"파싱된 카카오페이 결제 준비 응답 데이터: {response_data}")
-                tid = response_data.get("tid")
-                if not tid:
-                    logging.error("카카오페이 응답에 tid가 없습니다.")
-                    raise HTTPException(status_code=500, detail="카카오페이 처리 중 오류 발생: tid 누락")
-                order.payment_key = tid # tid를 주문 정보에 저장
-                db.commit()
-                # next_redirect_pc_url 등 필요한 정보를 클라이언트에 반환
-                return {
-                    "tid": tid,
-                    "next_redirect_pc_url": response_data.get("next_redirect_pc_url"),
-                    "next_redirect_mobile_url": response_data.get("next_redirect_mobile_url"),
-                    "next_redirect_app_url": response_data.get("next_redirect_app_url"),
-                    "android_app_scheme": response_data.get("android_app_scheme"),
-                    "ios_app_scheme": response_data.get("ios_app_scheme"),
-                    "created_at": response_data.get("created_at")
-                }
-            else:
-                error_response_text = api_response.text
-                try:
-                    error_details = api_response.json()
-                except json.JSONDecodeError:
-                    error_details = {"raw_response": error_response_text}
-                logging.error(f"카카오페이 결제 준비 요청 실패 ({api_response.status_code}): {error_details}")
-                # API 문서의 오류 응답 형식에 맞춰서 메시지 추출
-                detail_msg = f"카카오페이 결제 준비 실패: {error_details.get('error_message', error_details.get('msg', error_details))}"
-                if 'error_code' in error_details:
-                     detail_msg += f" (코드: {error_details['error_code']})"
-                elif 'code' in error_details: # 이전 형식 호환
-                     detail_msg += f" (코드: {error_details['code']})"
-
-                raise HTTPException(
-                    status_code=api_response.status_code,
-                    detail=detail_msg
+                # URL 결합 시 이중 슬래시 방지
+                base_url = str(settings.KAKAO_PAY_API_URL).rstrip('/')
+                api_response = await client.post(
+                    f"{base_url}/online/v1/payment/ready", # 이중 슬래시 방지
+                    headers={
+                        "Authorization": f"SECRET_KEY {kakao_secret_key}", # 새 인증 방식
+                        "Content-Type": "application/json"  # Content-Type 문서 규격에 맞게 수정
+                    },
+                    json=request_data # httpx는 json 파라미터로 dict를 바로 전달 가능
                 )
-    except httpx.RequestError as exc:
-        logging.error(f"카카오페이 API 요청 중 네트워크 오류: {exc}")
-        raise HTTPException(status_code=503, detail="카카오페이 서비스와 통신 중 오류가 발생했습니다.")
-    except Exception as e:
-        logging.exception(f"카카오페이 처리 중 예상치 못한 서버 내부 오류 (order_id: {order.id if order else 'unknown'}): {str(e)}")
-        raise HTTPException(status_code=500, detail=f"서버 내부 오류: {str(e)}")
+            
+                if api_response.status_code == 200:
+                    response_data = api_response.json()
+                    logging.info(f"카카오페이 결제 준비 응답 원본: {api_response.text}")
+                    logging.info(f"파싱된 카카오페이 결제 준비 응답 데이터: {response_data}")
+                    tid = response_data.get("tid")
+                    if not tid:
+                        logging.error("카카오페이 응답에 tid가 없습니다.")
+                        raise HTTPException(status_code=500, detail="카카오페이 처리 중 오류 발생: tid 누락")
+                    await write_order_fields(db, order_id_int, payment_key=tid) # tid를 주문 정보에 저장
+                    # next_redirect_pc_url 등 필요한 정보를 클라이언트에 반환
+                    return {
+                        "tid": tid,
+                        "next_redirect_pc_url": response_data.get("next_redirect_pc_url"),
+                        "next_redirect_mobile_url": response_data.get("next_redirect_mobile_url"),
+                        "next_redirect_app_url": response_data.get("next_redirect_app_url"),
+                        "android_app_scheme": response_data.get("android_app_scheme"),
+                        "ios_app_scheme": response_data.get("ios_app_scheme"),
+                        "created_at": response_data.get("created_at")
+                    }
+                else:
+                    error_response_text = api_response.text
+                    try:
+                        error_details = api_response.json()
+                    except json.JSONDecodeError:
+                        error_details = {"raw_response": error_response_text}
+                    logging.error(f"카카오페이 결제 준비 요청 실패 ({api_response.status_code}): {error_details}")
+                    # API 문서의 오류 응답 형식에 맞춰서 메시지 추출
+                    detail_msg = f"카카오페이 결제 준비 실패: {error_details.get('error_message', error_details.get('msg', error_details))}"
+                    if 'error_code' in error_details:
+                         detail_msg += f" (코드: {error_details['error_code']})"
+                    elif 'code' in error_details: # 이전 형식 호환
+                         detail_msg += f" (코드: {error_details['code']})"
+
+                    raise HTTPException(
+                        status_code=api_response.status_code,
+                        detail=detail_msg
+                    )
+        except httpx.RequestError as exc:
+            logging.error(f"카카오페이 API 요청 중 네트워크 오류: {exc}")
+            raise HTTPException(status_code=503, detail="카카오페이 서비스와 통신 중 오류가 발생했습니다.")
+        except Exception as e:
+            logging.exception(f"카카오페이 처리 중 예상치 못한 서버 내부 오류 (order_id: {order.id if order else 'unknown'}): {str(e)}")
+            raise HTTPException(status_code=500, detail=f"서버 내부 오류: {str(e)}")
+
+    return await run_idempotent(
+        "payments:kakao:ready", effective_session_id, request.model_dump(), ready,
+        idempotency_key=idempotency_key, response=response
+    )
+
+def kakao_complete_response(db_order: Order) -> dict:
+    """카카오페이 결제 완료 응답 구성"""
+    order_items_data = [
+        {
+            "id": item.id, "menu_id": item.menu_id,
+            "menu_name": item.menu.name if item.menu else "알 수 없음",
+            "quantity": item.quantity, "unit_price": item.unit_price,
+            "total_price": item.total_price
+        } for item in db_order.order_items
+    ]
+    
+    final_order_response = OrderResponse(
+        id=db_order.id,
+        order_number=db_order.order_number,
+        user_id=None,
+        total_amount=db_order.total_amount,
+        status=db_order.status,
+        payment_method=db_order.payment_method,
+        payment_key=db_order.payment_key,
+        session_id=db_order.session_id,
+        delivery_address=db_order.delivery_address,
+        delivery_request=db_order.delivery_request,
+        phone_number=db_order.phone_number,
+        created_at=db_order.created_at,
+        updated_at=db_order.updated_at,
+        items=order_items_data
+    )
+    return {"status": "success", "message": "결제가 성공적으로 완료되었습니다.", "order": final_order_response.model_dump()}
+
 
 @router.post("/kakao/complete")
 async def complete_kakao_payment(
+    response: Response,
     tid: str = Query(...),
     pg_token: str = Query(...),
     order_id: int = Query(...), # 프론트에서 order_id도 함께 전달
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db)
 ):
+    """카카오페이 결제 승인 (재시도/중복 호출 시 승인 API를 다시 호출하지 않음)"""
     payment_provider_config = await get_payment_config("kakao", db)
     if not payment_provider_config or not payment_provider_config.get("secret_key") or not payment_provider_config.get("additional_settings", {}).get("cid"):
         raise HTTPException(status_code=500, detail="카카오페이 설정(Secret Key 또는 CID)이 누락되었습니다.")
@@ -566,110 +584,76 @@ async def complete_kakao_payment(
          logging.warning(f"TID 불일치: 요청 TID={tid}, DB 주문 TID={db_order.payment_key} (Order ID: {order_id})")
          raise HTTPException(status_code=400, detail="결제 정보(TID)가 일치하지 않습니다.")
 
-    try:
-        async with httpx.AsyncClient() as client:
-            approve_request_data = {
-                "cid": kakao_cid,
-                "tid": tid,
-                "partner_order_id": str(db_order.id),
-                "partner_user_id": db_order.session_id, # 결제 준비 시 사용한 partner_user_id와 동일해야 함
-                "pg_token": pg_token
-                # total_amount는 새 API 명세에서 선택사항이며, 없으면 tid 기준으로 처리
-            }
-            logging.info(f"카카오페이 결제 승인 요청 데이터 (JSON): {approve_request_data}")
+    # 이미 같은 TID로 승인 완료된 주문이면 (서버 재시작 등으로 멱등성 기록이 없어도) 그대로 성공 응답
+    if db_order.status == "paid" and db_order.order_number:
+        logging.info(f"이미 승인 완료된 주문 (Order ID: {order_id}), 승인 API 재호출 생략")
+        return kakao_complete_response(db_order)
+
+    async def approve() -> dict:
+        try:
+            async with httpx.AsyncClient() as client:
+                approve_request_data = {
+                    "cid": kakao_cid,
+                    "tid": tid,
+                    "partner_order_id": str(db_order.id),
+                    "partner_user_id": db_order.session_id, # 결제 준비 시 사용한 partner_user_id와 동일해야 함
+                    "pg_token": pg_token
+                    # total_amount는 새 API 명세에서 선택사항이며, 없으면 tid 기준으로 처리
+                }
+                logging.info(f"카카오페이 결제 승인 요청 데이터 (JSON): {approve_request_data}")
             
-            # URL 결합 시 이중 슬래시 방지
-            base_url = str(settings.KAKAO_PAY_API_URL).rstrip('/')
-            api_response = await client.post(
-                f"{base_url}/online/v1/payment/approve", # 이중 슬래시 방지
-                headers={
-                    "Authorization": f"SECRET_KEY {kakao_secret_key}", # 새 인증 방식
-                    "Content-Type": "application/json"  # Content-Type 문서 규격에 맞게 수정
-                },
-                json=approve_request_data # httpx는 json 파라미터로 dict를 바로 전달 가능
-            )
+                # URL 결합 시 이중 슬래시 방지
+                base_url = str(settings.KAKAO_PAY_API_URL).rstrip('/')
+                api_response = await client.post(
+                    f"{base_url}/online/v1/payment/approve", # 이중 슬래시 방지
+                    headers={
+                        "Authorization": f"SECRET_KEY {kakao_secret_key}", # 새 인증 방식
+                        "Content-Type": "application/json"  # Content-Type 문서 규격에 맞게 수정
+                    },
+                    json=approve_request_data # httpx는 json 파라미터로 dict를 바로 전달 가능
+                )
             
-            approval_data = api_response.json()
-            logging.info(f"카카오페이 결제 승인 응답 ({api_response.status_code}): {approval_data}")
+                approval_data = api_response.json()
+                logging.info(f"카카오페이 결제 승인 응답 ({api_response.status_code}): {approval_data}")
             
-            if api_response.status_code != 200:
-                logging.error(f"카카오페이 결제 승인 실패: {approval_data}")
-                db_order.status = "payment_failed"
-                db.commit()
-                # API 문서의 오류 응답 형식에 맞춰서 메시지 추출
-                detail_msg = f"카카오페이 결제 승인 실패: {approval_data.get('error_message', approval_data.get('msg', approval_data))}"
-                if 'error_code' in approval_data:
-                     detail_msg += f" (코드: {approval_data['error_code']})"
-                elif 'code' in approval_data: # 이전 형식 호환
-                     detail_msg += f" (코드: {approval_data['code']})"
-
-                raise HTTPException(
-                    status_code=api_response.status_code,
-                    detail=detail_msg
-                )
-
-        # --- 주문 번호 생성 (paid 상태 업데이트 직전) ---
-        today_str = datetime.now(timezone(timedelta(hours=9))).strftime('%Y%m%d')
-        last_order_today = db.query(Order).filter(Order.order_number.like(f"{today_str}-%")).order_by(Order.order_number.desc()).with_for_update().first()
-        next_seq = 1
-        if last_order_today and last_order_today.order_number:
-            try:
-                last_seq = int(last_order_today.order_number.split('-')[-1])
-                next_seq = last_seq + 1
-            except (ValueError, IndexError):
-                logging.warning(f"이전 주문 번호 형식 오류: {last_order_today.order_number}")
-                pass
-        new_order_number = f"{today_str}-{next_seq:03d}"
-        db_order.order_number = new_order_number
-        logging.info(f"새 주문 번호 생성: {new_order_number}")
-        # --- 주문 번호 생성 끝 ---
+                if api_response.status_code != 200:
+                    logging.error(f"카카오페이 결제 승인 실패: {approval_data}")
+                    await write_order_fields(db, order_id, status="payment_failed")
+                    # API 문서의 오류 응답 형식에 맞춰서 메시지 추출
+                    detail_msg = f"카카오페이 결제 승인 실패: {approval_data.get('error_message', approval_data.get('msg', approval_data))}"
+                    if 'error_code' in approval_data:
+                         detail_msg += f" (코드: {approval_data['error_code']})"
+                    elif 'code' in approval_data: # 이전 형식 호환
+                         detail_msg += f" (코드: {approval_data['code']})"
+
+                    raise HTTPException(
+                        status_code=api_response.status_code,
+                        detail=detail_msg
+                    )
+
+            # 주문번호 부여 및 paid 상태 변경 (writer 큐에서 직렬화하여 그룹 커밋)
+            # 카카오페이 응답의 aid (승인번호) 등 필요 정보 저장 가능
+            await submit_write(lambda session: mark_order_paid(session, order_id), db)
+            db.refresh(db_order)
+            logging.info(f"주문 ID {order_id} 상태 'paid'로 업데이트 완료, 결제 승인 데이터: {approval_data}")
         
-        db_order.status = "paid"
-        # 카카오페이 응답의 aid (승인번호) 등 필요 정보 저장 가능
-        # db_order.payment_details = json.dumps(payment_detail, ensure_ascii=False) 
-        db.commit()
-        db.refresh(db_order)
-        logging.info(f"주문 ID {order_id} 상태 'paid'로 업데이트 완료, 결제 승인 데이터: {approval_data}")
-        
-        order_items_data = [
-            {
-                "id": item.id, "menu_id": item.menu_id,
-                "menu_name": item.menu.name if item.menu else "알 수 없음",
-                "quantity": item.quantity, "unit_price": item.unit_price,
-                "total_price": item.total_price
-            } for item in db_order.order_items
-        ]
-        
-        final_order_response = OrderResponse(
-            id=db_order.id,
-            order_number=db_order.order_number,
-            user_id=None,
-            total_amount=db_order.total_amount,
-            status=db_order.status,
-            payment_method=db_order.payment_method,
-            payment_key=db_order.payment_key,
-            session_id=db_order.session_id,
-            delivery_address=db_order.delivery_address,
-            delivery_request=db_order.delivery_request,
-            phone_number=db_order.phone_number,
-            created_at=db_order.created_at,
-            updated_at=db_order.updated_at,
-            items=order_items_data
-        )
-        return {"status": "success", "message": "결제가 성공적으로 완료되었습니다.", "order": final_order_response.model_dump()}
+            return kakao_complete_response(db_order)
 
-    except httpx.RequestError as exc:
-        logging.error(f"카카오페이 결제 승인 API 요청 중 네트워크 오류: {exc}")
-        db_order.status = "payment_failed"
-        db.commit()
-        raise HTTPException(status_code=503, detail="카카오페이 서비스와 통신 중 오류가 발생했습니다.")
-    except Exception as e:
-        db.rollback()
-        logging.exception(f"카카오페이 결제 완료 처리 중 예상치 못한 서버 내부 오류 (Order ID: {order_id}): {str(e)}")
-        if db_order and db_order.status == "pending": # 아직 paid로 변경 전이면
-            db_order.status = "payment_failed"
-            db.commit()
-        raise HTTPException(status_code=500, detail=f"서버 내부 오류: {str(e)}")
+        except httpx.RequestError as exc:
+            logging.error(f"카카오페이 결제 승인 API 요청 중 네트워크 오류: {exc}")
+            await write_order_fields(db, order_id, status="payment_failed")
+            raise HTTPException(status_code=503, detail="카카오페이 서비스와 통신 중 오류가 발생했습니다.")
+        except Exception as e:
+            db.rollback()
+            logging.exception(f"카카오페이 결제 완료 처리 중 예상치 못한 서버 내부 오류 (Order ID: {order_id}): {str(e)}")
+            # 아직 paid로 변경 전이면
+            await write_order_fields(db, order_id, expected_status="pending", status="payment_failed")
+            raise HTTPException(status_code=500, detail=f"서버 내부 오류: {str(e)}")
+
+    return await run_idempotent(
+        "payments:kakao:complete", str(order_id), {"order_id": order_id, "tid": tid, "pg_token": pg_token}, approve,
+        idempotency_key=idempotency_key, response=response
+    )
 
 @router.get("/orders/{order_id}", response_model=OrderResponse)
 async def get_order(
@@ -811,10 +795,9 @@ async def cancel_naver_payment(order_id: int, db: Session = Depends(get_db)):
                 cancel_body = cancel_data.get("body", {})
                 pay_hist_id = cancel_body.get("payHistId") # 취소 결제 번호
                 
-                order.status = "CANCELLED"
                 # 필요시 취소 관련 정보 저장 (예: 취소 트랜잭션 ID)
-                # order.cancel_transaction_id = pay_hist_id 
-                db.commit()
+                # cancel_transaction_id=pay_hist_id
+                await write_order_fields(db, order_id, status="CANCELLED")
                 db.refresh(order)
                 logging.info(f"Order {order.id} cancelled successfully. Naver Pay Cancel ID: {pay_hist_id}")
                 
@@ -936,8 +919,7 @@ async def cancel_kakao_payment(order_id: int, db: Session = Depends(get_db)) ->
                 cancelled_amount_info = cancel_data.get("canceled_amount", {})
                 cancelled_total = cancelled_amount_info.get("total", 0)
                 
-                order.status = "CANCELLED"
-                db.commit()
+                await write_order_fields(db, order_id, status="CANCELLED")
                 db.refresh(order)
                 logging.info(f"Order {order.id} cancelled successfully. Kakao Pay Cancelled Amount: {cancelled_total}")
                 
@@ -964,16 +946,12 @@ async def cancel_kakao_payment(order_id: int, db: Session = Depends(get_db)) ->
                 raise HTTPException(status_code=400, detail=f"Kakao Pay cancellation failed: {error_msg}")
 
     except httpx.RequestError as exc:
-        logging.error(f"카카오페이 결제 승인 API 요청 중 네트워크 오류: {exc}")
-        db_order.status = "payment_failed"
-        db.commit()
+        # 취소 요청이 실패해도 결제는 그대로이므로 주문 상태는 바꾸지 않음
+        logging.error(f"카카오페이 결제 취소 API 요청 중 네트워크 오류: {exc}")
         raise HTTPException(status_code=503, detail="카카오페이 서비스와 통신 중 오류가 발생했습니다.")
     except Exception as e:
         db.rollback()
-        logging.exception(f"카카오페이 결제 완료 처리 중 예상치 못한 서버 내부 오류 (Order ID: {order_id}): {str(e)}")
-        if db_order and db_order.status == "pending": # 아직 paid로 변경 전이면
-            db_order.status = "payment_failed"
-            db.commit()
+        logging.exception(f"카카오페이 결제 취소 처리 중 예상치 못한 서버 내부 오류 (Order ID: {order_id}): {str(e)}")
         raise HTTPException(status_code=500, detail=f"서버 내부 오류: {str(e)}")
 
 @router.post("/refund", response_model=RefundResponse)
@@ -1007,13 +985,15 @@ async def refund_payment(
         
         # 4. 환불 결과 업데이트
         now = datetime.now(timezone(timedelta(hours=9)))
-        order.is_refunded = True
-        order.refund_amount = refund_amount
-        order.refund_reason = request.reason
-        order.refund_id = refund_id
-        order.refunded_at = now
-        order.status = "refunded"
-        db.commit()
+        await write_order_fields(
+            db, order.id,
+            is_refunded=True,
+            refund_amount=refund_amount,
+            refund_reason=request.reason,
+            refund_id=refund_id,
+            refunded_at=now,
+            status="refunded",
+        )
         
         # 5. 주문 상세 정보 반환
         return RefundResponse(
@@ -47,6 +47,8 @@ class InventoryTransactionBase(BaseModel):
     created_by: Optional[str] = None
     order_id: Optional[int] = None
 
+# 재고 트랜잭션 생성 스키마 (주문출고/주문취소는 주문 결제/취소 시 자동 기록되므로 직접 생성 불가)
+class InventoryTransactionCreate(InventoryTransactionBase):
     @validator('transaction_type')
     def validate_transaction_type(cls, v):
         valid_types = ["입고", "출고", "폐기", "조정"]
@@ -54,10 +56,6 @@ class InventoryTransactionBase(BaseModel):
             raise ValueError(f"트랜잭션 타입은 {', '.join(valid_types)} 중 하나여야 합니다.")
         return v
 
-# 재고 트랜잭션 생성 스키마
-class InventoryTransactionCreate(InventoryTransactionBase):
-    pass
-
 # 메뉴-재료 연결 기본 스키마
 class MenuIngredientBase(BaseModel):
     menu_id: int
@@ -128,7 +126,9 @@ class StockAlert(BaseModel):
     current_quantity: float
     min_stock_level: float
     unit: str
-    status: str  # "부족", "재고 없음"
+    status: str  # "부족", "재고 없음", "발주 필요"
+    reorder_point: Optional[float] = None  # 예측 기반 동적 발주점
+    predicted_stockout_at: Optional[datetime] = None  # 예상 소진 시각 (KST)
 
 # 재고 대시보드 요약 정보
 class InventorySummary(BaseModel):
@@ -136,4 +136,34 @@ class InventorySummary(BaseModel):
     out_of_stock_count: int
     low_stock_count: int
     total_stock_value: float  # 전체 재고의 추정 가치
-    stock_alerts: List[StockAlert] = [] 
\ No newline at end of file
+    stock_alerts: List[StockAlert] = []
+
+# 시점 재고 조회 응답 모델 (스냅샷 + 이후 트랜잭션)
+class StockAtTime(BaseModel):
+    ingredient_id: int
+    at: datetime
+    quantity: float
+    snapshot_at: datetime  # 계산에 사용한 스냅샷 시각
+    tail_transactions: int  # 스냅샷 이후 반영한 트랜잭션 수
+
+# 기간 소비량 응답 모델
+class IngredientConsumption(BaseModel):
+    ingredient_id: int
+    start: datetime
+    end: datetime
+    consumed: float
+
+# 재료별 소진 예측 / 동적 발주점 응답 모델
+class StockForecast(BaseModel):
+    ingredient_id: int
+    ingredient_name: str
+    unit: str
+    current_quantity: float
+    min_stock_level: float
+    daily_consumption: float  # 최근 이력 기간의 일 평균 소비량
+    hourly_rate_now: float  # 현재 시간대 예상 시간당 소비량
+    hours_until_stockout: Optional[float] = None  # 예측 기간 내 소진되지 않으면 None
+    predicted_stockout_at: Optional[datetime] = None  # 예상 소진 시각 (KST)
+    safety_stock: float
+    reorder_point: float  # 리드타임 예상 소비량 + 안전 재고
+    needs_reorder: bool
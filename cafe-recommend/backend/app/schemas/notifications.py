@@ -12,6 +12,8 @@ class StockAlertNotification(BaseModel):
     status: str
     created_at: datetime
     severity: str
+    reorder_point: Optional[float] = None  # 예측 기반 동적 발주점
+    predicted_stockout_at: Optional[datetime] = None  # 예상 소진 시각 (KST)
 
 class OrderSurgeNotification(BaseModel):
     id: int
@@ -28,5 +30,6 @@ class NotificationStatus(BaseModel):
 
 class NotificationResponse(BaseModel):
     items: List[Any]  # StockAlertNotification, OrderSurgeNotification 등을 포함할 수 있음
-    total: int
+    total: Optional[int] = None  # 키셋 페이지네이션에서는 전체 개수를 세지 않음
     unread_count: int
+    next_cursor: Optional[str] = None  # 다음 페이지 커서 (마지막 페이지면 None)
@@ -0,0 +1,214 @@
+"""
+워커 간 이벤트 전달 (SQLite append-only 이벤트 로그 tailing)
+
+이벤트 버스와 관리자 WebSocket/SSE 연결 목록은 워커 프로세스마다 따로 존재하므로,
+uvicorn 워커가 여러 개이면 2번 워커에서 결제된 주문이 1번 워커에 연결된 관리자에게
+보이지 않습니다. 별도 브로커 없이 같은 SQLite DB의 event_log 테이블로 이벤트를 전달합니다.
+
+- 송신: 이벤트 버스의 모든 이벤트("*")를 outbox 에 모았다가 poll 주기마다 writer 큐로
+  한 번에 INSERT (다른 쓰기와 함께 그룹 커밋)
+- 수신: 마지막으로 읽은 id 이후의 행을 id 순으로 읽어, 다른 워커가 추가한 이벤트만
+  자신의 이벤트 버스에 다시 발행 (origin, log_id 표시 -> 다시 송신하지 않음)
+- 시작 시점 이전의 이벤트는 재생하지 않으며, EVENT_LOG_RETENTION_SECONDS 가 지난 행은 삭제
+- 워커마다 독립적으로 계산되는 토픽(alert.*: 각 워커의 감지기가 같은 주문 스트림을 받음)은
+  전달하지 않음
+
+인메모리 SQLite(테스트)에서는 동작하지 않습니다.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine, make_url
+
+from app.core.config import settings
+from app.core.events import Event, EventBus, event_bus
+from app.db.writer import SQLiteWriter, get_db_writer
+from app.models.event_log import EventLogEntry
+
+logger = logging.getLogger(__name__)
+
+LOCAL_ONLY_TOPICS = ("alert.*",)
+
+
+def make_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _matches(topic: str, pattern: str) -> bool:
+    if pattern.endswith(".*"):
+        return topic.startswith(pattern[:-1])
+    return pattern == "*" or topic == pattern
+
+
+class EventLogRelay:
+    """event_log 테이블을 통해 이벤트 버스를 다른 워커와 연결"""
+
+    def __init__(
+        self,
+        database_url: str,
+        worker_id: Optional[str] = None,
+        poll_interval: float = 0.25,
+        retention_seconds: int = 3600,
+        batch_size: int = 500,
+        writer: Optional[SQLiteWriter] = None,
+        bus: EventBus = event_bus,
+        local_only: Iterable[str] = LOCAL_ONLY_TOPICS,
+    ):
+        self.database_url = database_url
+        self.worker_id = worker_id or make_worker_id()
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.batch_size = batch_size
+        self.bus = bus
+        self.local_only = tuple(local_only)
+        self._writer = writer
+        self._engine: Optional[Engine] = None
+        self._outbox: deque = deque()
+        self._cursor = 0
+        self._task: Optional[asyncio.Task] = None
+        self._poll_lock = asyncio.Lock()  # tailing 태스크와 직접 호출(종료 시 등)이 겹치지 않도록
+        self._last_prune: Optional[datetime] = None
+        self.sent = 0
+        self.received = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _is_relayed(self, topic: str) -> bool:
+        return not any(_matches(topic, pattern) for pattern in self.local_only)
+
+    def _on_event(self, event: Event) -> None:
+        """이벤트 버스 구독: 이 워커에서 발행된 이벤트만 outbox 에 추가 (스레드 안전)"""
+        if "origin" in event or not self._is_relayed(event["topic"]):
+            return
+        self._outbox.append(event)
+
+    # --- 시작/종료 ---
+
+    def start(self) -> None:
+        """테이블 확인, 현재 마지막 id 부터 tailing 시작 (이벤트 루프 안에서 호출)"""
+        if self.is_running:
+            return
+        url = make_url(self.database_url)
+        if not url.drivername.startswith("sqlite") or url.database in (None, "", ":memory:"):
+            raise ValueError("이벤트 로그는 파일 SQLite 데이터베이스에서만 사용할 수 있습니다.")
+        self._engine = create_engine(
+            self.database_url,
+            connect_args={"check_same_thread": False},
+            pool_size=1,
+            max_overflow=0,
+        )
+        EventLogEntry.__table__.create(bind=self._engine, checkfirst=True)
+        with self._engine.connect() as conn:
+            self._cursor = conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM event_log")).scalar()
+        self.bus.subscribe("*", self._on_event)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(f"이벤트 로그 relay 시작: worker={self.worker_id}, cursor={self._cursor}")
+
+    async def stop(self) -> None:
+        """tailing 중지, 남은 outbox 전송 후 정리"""
+        self.bus.unsubscribe("*", self._on_event)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("이벤트 로그 outbox 전송 실패")
+        if self._engine is not None:
+            self._engine.dispose()
+            self._engine = None
+
+    # --- 송수신 ---
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll_once()
+            except Exception:
+                logger.exception("이벤트 로그 처리 실패")
+            await asyncio.sleep(self.poll_interval)
+
+    async def poll_once(self) -> int:
+        """outbox 전송 + 새 행 수신 1회. 다시 발행한 원격 이벤트 수 반환"""
+        async with self._poll_lock:
+            return await self._poll()
+
+    async def _poll(self) -> int:
+        await self.flush()
+        received = 0
+        while True:
+            rows = await asyncio.to_thread(self._read_after, self._cursor)
+            for row in rows:
+                self._cursor = row.id
+                if row.origin == self.worker_id:
+                    continue
+                payload = json.loads(row.payload)
+                self.bus.publish_event({
+                    "topic": row.topic,
+                    "data": payload.get("data", {}),
+                    "timestamp": payload.get("timestamp"),
+                    "origin": row.origin,
+                    "log_id": row.id,
+                })
+                received += 1
+            if len(rows) < self.batch_size:
+                break
+        self.received += received
+        await self._prune_if_due()
+        return received
+
+    async def flush(self) -> None:
+        """outbox 의 이벤트를 writer 큐로 한 번에 INSERT"""
+        if not self._outbox:
+            return
+        rows: List[Dict[str, Any]] = []
+        while self._outbox:
+            event = self._outbox.popleft()
+            rows.append({
+                "topic": event["topic"],
+                "payload": json.dumps({"data": event["data"], "timestamp": event["timestamp"]},
+                                      ensure_ascii=False, default=str),
+                "origin": self.worker_id,
+            })
+        writer = self._writer or get_db_writer()
+        await writer.submit(lambda session: session.execute(EventLogEntry.__table__.insert(), rows))
+        self.sent += len(rows)
+
+    def _read_after(self, cursor: int) -> list:
+        with self._engine.connect() as conn:
+            return conn.execute(
+                text("SELECT id, topic, payload, origin FROM event_log WHERE id > :cursor ORDER BY id LIMIT :limit"),
+                {"cursor": cursor, "limit": self.batch_size},
+            ).all()
+
+    async def _prune_if_due(self) -> None:
+        now = datetime.utcnow()
+        if self._last_prune is not None and now - self._last_prune < timedelta(seconds=60):
+            return
+        self._last_prune = now
+        cutoff = (now - timedelta(seconds=self.retention_seconds)).strftime("%Y-%m-%d %H:%M:%S")
+        writer = self._writer or get_db_writer()
+        await writer.submit(
+            lambda session: session.execute(text("DELETE FROM event_log WHERE created_at < :cutoff"), {"cutoff": cutoff})
+        )
+
+
+event_relay = EventLogRelay(
+    settings.DATABASE_URL,
+    poll_interval=settings.EVENT_LOG_POLL_SECONDS,
+    retention_seconds=settings.EVENT_LOG_RETENTION_SECONDS,
+)
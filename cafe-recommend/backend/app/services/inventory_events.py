@@ -0,0 +1,90 @@
+"""
+재고 ORM 변경 -> 이벤트 버스 연결
+
+IngredientStock 의 재고 수량 변경과 MenuIngredient(메뉴별 필요 재료)의 추가/수정/삭제를
+flush 시점에 감지해 stage_event() 로 모아 두고, 커밋된 뒤 이벤트 버스로 발행합니다.
+재고 수정, 재고 트랜잭션(입고/출고/폐기/조정) 등 어느 경로로 바뀌어도 메뉴 가용성이 따라갑니다.
+재고 상태가 나빠지면(충분 -> 부족 -> 재고 없음) 같은 flush 에서 stock.low 알림도 등록합니다.
+
+ORM 을 거치지 않는 raw SQL 재고 변경은 해당 코드가 직접 STOCK_CHANGED 를 발행합니다.
+"""
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.events import MENU_RECIPE_CHANGED, STOCK_CHANGED, stage_event
+from app.models.inventory import IngredientStock, MenuIngredient
+from app.services.stock_levels import stage_threshold_crossings
+
+
+def _stage(target, topic: str, data: dict) -> None:
+    session = Session.object_session(target)
+    if session is not None:
+        stage_event(session, topic, data)
+
+
+def _stock_data(target: IngredientStock, previous=None) -> dict:
+    return {
+        "ingredient_id": target.ingredient_id,
+        "current_quantity": target.current_quantity,
+        "previous_quantity": previous,
+    }
+
+
+@event.listens_for(IngredientStock, "after_insert")
+def _stock_inserted(mapper, connection, target: IngredientStock) -> None:
+    _stage(target, STOCK_CHANGED, _stock_data(target))
+
+
+@event.listens_for(IngredientStock, "after_update")
+def _stock_updated(mapper, connection, target: IngredientStock) -> None:
+    quantity = inspect(target).attrs.current_quantity.history
+    if quantity.has_changes():
+        _stage(target, STOCK_CHANGED, _stock_data(target, quantity.deleted[0] if quantity.deleted else None))
+
+
+@event.listens_for(IngredientStock.current_quantity, "set", active_history=True)
+def _load_previous_quantity(target, value, oldvalue, initiator):
+    """만료된 객체에 새 수량을 넣어도 이전 수량이 history 에 남도록 (커밋 뒤 재수정 시 증감량 계산용)"""
+
+
+@event.listens_for(Session, "after_flush")
+def _check_stock_thresholds(session: Session, flush_context) -> None:
+    """이번 flush 에서 바뀐 재고의 증감량으로 기준선 통과 확인 (바뀐 재료만 한 번 조회)"""
+    deltas = {}
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, IngredientStock):
+            continue
+        quantity = inspect(obj).attrs.current_quantity.history
+        if obj in session.new:
+            deltas[obj.ingredient_id] = obj.current_quantity or 0
+        elif quantity.has_changes() and quantity.deleted:
+            deltas[obj.ingredient_id] = (obj.current_quantity or 0) - (quantity.deleted[0] or 0)
+    if deltas:
+        stage_threshold_crossings(session, deltas)
+
+
+def _recipe_data(target: MenuIngredient, action: str) -> dict:
+    return {"menu_id": target.menu_id, "ingredient_id": target.ingredient_id, "action": action}
+
+
+@event.listens_for(MenuIngredient, "after_insert")
+def _recipe_inserted(mapper, connection, target: MenuIngredient) -> None:
+    _stage(target, MENU_RECIPE_CHANGED, _recipe_data(target, "added"))
+
+
+@event.listens_for(MenuIngredient, "after_update")
+def _recipe_updated(mapper, connection, target: MenuIngredient) -> None:
+    state = inspect(target).attrs
+    previous = {}
+    for key in ("menu_id", "ingredient_id"):
+        history = getattr(state, key).history
+        previous[key] = history.deleted[0] if history.has_changes() and history.deleted else getattr(target, key)
+    if (previous["menu_id"], previous["ingredient_id"]) != (target.menu_id, target.ingredient_id):
+        # 다른 메뉴/재료로 옮긴 경우 이전 연결은 제거
+        _stage(target, MENU_RECIPE_CHANGED, {**previous, "action": "removed"})
+    _stage(target, MENU_RECIPE_CHANGED, _recipe_data(target, "updated"))
+
+
+@event.listens_for(MenuIngredient, "after_delete")
+def _recipe_deleted(mapper, connection, target: MenuIngredient) -> None:
+    _stage(target, MENU_RECIPE_CHANGED, _recipe_data(target, "removed"))
@@ -0,0 +1,284 @@
+"""
+재고 원장(inventory_transactions) 시점 조회와 일일 스냅샷
+
+inventory_transactions 는 재고 변동을 추가만 하는 기록(이벤트 로그)이지만, 지금까지 과거 시점의
+재고를 알려면 처음부터 다시 재생해야 했습니다. 재료별로 하루 한 번 스냅샷을 남겨 두고
+"시점 T 의 재고"와 "T1 ~ T2 소비량"을 가장 가까운 이전 스냅샷 + 그 이후 트랜잭션(최대 하루치)만으로 계산합니다.
+
+- 스냅샷: 재고량, 누적 소비량, 반영된 마지막 트랜잭션 ID (inventory_snapshots, 재료 x 날짜 1건)
+- 이후 구간: (ingredient_id, created_at) 인덱스로 스냅샷 시각 ~ T 범위만 읽음
+- 소비량(T1, T2) = 누적 소비량(T2) - 누적 소비량(T1)
+
+트랜잭션 유형별 재고 반영:
+- 입고: +수량, 출고/폐기: -수량 (관리자 API 는 양수로 기록), 조정: 재고를 수량으로 설정
+- 주문출고/주문취소: 부호가 있는 수량 그대로 (app/services/stock_deduction.py)
+소비량은 출고, 폐기, 주문출고(주문취소 차감)의 합입니다.
+
+첫 스냅샷 이전 시점의 재고는 계산할 수 없으며(None), 누적 소비량은 원장 전체 합으로 계산합니다.
+
+관리자 재고 수정/트랜잭션은 change_stock() 으로 writer 작업 안에서 `current_quantity + 증감량` SQL 로 반영합니다.
+(요청 세션에서 읽은 수량을 덮어쓰면 같은 시각 writer 가 반영한 주문 차감이 사라짐)
+
+스냅샷은 앱 실행 중 주기적으로 확인해 오늘 스냅샷이 없으면 만들며, 수동으로도 만들 수 있습니다.
+(테이블/인덱스는 alembic 리비전 9d4f6b2e8a57)
+    python -m app.services.inventory_ledger snapshot
+"""
+import argparse
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import and_, case, func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.events import STOCK_CHANGED, stage_event
+from app.models.inventory import IngredientStock, InventorySnapshot, InventoryTransaction
+from app.services.stock_deduction import ORDER_DEDUCTION, ORDER_RESTORE
+from app.services.stock_levels import stage_threshold_crossings
+
+logger = logging.getLogger(__name__)
+
+RESTOCK = "입고"
+ADJUSTMENT = "조정"
+OUTFLOW_TYPES = ("출고", "폐기")
+
+# 스냅샷 시각 직전에 시작해 직후에 커밋된 트랜잭션까지 이후 구간에 포함하기 위한 여유 (ID 로 중복 제거)
+TAIL_MARGIN = timedelta(minutes=1)
+
+
+def stock_delta(transaction_type: str, quantity: float) -> float:
+    """트랜잭션 한 건의 재고 증감량 (조정은 apply_transaction 에서 처리)"""
+    if transaction_type in OUTFLOW_TYPES:
+        return -abs(quantity)
+    return quantity
+
+
+def apply_transaction(current: float, transaction_type: str, quantity: float) -> float:
+    if transaction_type == ADJUSTMENT:
+        return quantity
+    return current + stock_delta(transaction_type, quantity)
+
+
+class InsufficientStockError(ValueError):
+    """출고/폐기 수량이 현재 재고보다 많은 경우"""
+
+
+def change_stock(
+    db: Session,
+    ingredient_id: int,
+    delta: float = 0.0,
+    *,
+    set_to: Optional[float] = None,
+    require_available: bool = False,
+    values: Optional[Dict[str, Any]] = None,
+) -> Tuple[float, float]:
+    """
+    재고 수량을 SQL 증감식으로 변경합니다. (커밋하지 않음, writer 작업 안에서 사용)
+
+    재고 행이 없으면 0 으로 만들고, set_to 가 주어지면 같은 작업 안에서 읽은 현재 수량과의 차이만큼 반영합니다.
+    ORM 을 거치지 않으므로 stock.changed 와 기준선 통과(stock.low)를 직접 등록합니다.
+    values 는 함께 바꿀 다른 재고 컬럼 (last_restock_date 등)
+
+    Returns:
+        (이전 수량, 변경 후 수량)
+
+    Raises:
+        InsufficientStockError: require_available 이고 변경 후 수량이 음수인 경우
+    """
+    conn = db.connection()
+    stocks = IngredientStock.__table__
+    row = conn.execute(select(stocks.c.current_quantity).where(stocks.c.ingredient_id == ingredient_id)).first()
+    if row is None:
+        conn.execute(stocks.insert().values(ingredient_id=ingredient_id, current_quantity=0))
+    previous = (row[0] if row else None) or 0.0
+    if set_to is not None:
+        delta = set_to - previous
+    if require_available and previous + delta < 0:
+        raise InsufficientStockError(f"재고 부족: 재료 {ingredient_id}, 현재 {previous}, 변경 {delta}")
+
+    if delta or values:
+        conn.execute(
+            update(stocks)
+            .where(stocks.c.ingredient_id == ingredient_id)
+            .values(current_quantity=stocks.c.current_quantity + delta, **(values or {}))
+        )
+    if delta:
+        stage_event(db, STOCK_CHANGED, {
+            "ingredient_id": ingredient_id,
+            "current_quantity": previous + delta,
+            "previous_quantity": previous,
+        })
+        stage_threshold_crossings(db, {ingredient_id: delta})
+    return previous, previous + delta
+
+
+def consumed_expr():
+    """트랜잭션 한 건의 소비량 SQL 식 (출고/폐기, 주문출고 - 주문취소)"""
+    tx = InventoryTransaction.__table__
+    return case(
+        (tx.c.transaction_type.in_(OUTFLOW_TYPES), func.abs(tx.c.quantity)),
+        (tx.c.transaction_type.in_((ORDER_DEDUCTION, ORDER_RESTORE)), -tx.c.quantity),
+        else_=0,
+    )
+
+
+def nearest_snapshot(db: Session, ingredient_id: int, at: datetime) -> Optional[InventorySnapshot]:
+    """시점 at 이전의 가장 최근 스냅샷"""
+    return (
+        db.query(InventorySnapshot)
+        .filter(InventorySnapshot.ingredient_id == ingredient_id, InventorySnapshot.taken_at <= at)
+        .order_by(InventorySnapshot.taken_at.desc())
+        .first()
+    )
+
+
+def _tail_filter(snapshot: InventorySnapshot, at: datetime):
+    tx = InventoryTransaction.__table__
+    return and_(
+        tx.c.ingredient_id == snapshot.ingredient_id,
+        tx.c.created_at >= snapshot.taken_at - TAIL_MARGIN,
+        tx.c.created_at <= at,
+        tx.c.id > snapshot.last_transaction_id,
+    )
+
+
+def stock_at(db: Session, ingredient_id: int, at: datetime) -> Optional[Dict[str, Any]]:
+    """
+    시점 at 의 재고량 (가장 가까운 이전 스냅샷 + 이후 트랜잭션)
+
+    Returns:
+        {"quantity", "snapshot_at", "tail_transactions"}, 이전 스냅샷이 없으면 None
+    """
+    snapshot = nearest_snapshot(db, ingredient_id, at)
+    if snapshot is None:
+        return None
+    tx = InventoryTransaction.__table__
+    rows = db.execute(
+        select(tx.c.transaction_type, tx.c.quantity).where(_tail_filter(snapshot, at)).order_by(tx.c.id)
+    ).all()
+    quantity = snapshot.quantity
+    for transaction_type, amount in rows:
+        quantity = apply_transaction(quantity, transaction_type, amount)
+    return {"quantity": quantity, "snapshot_at": snapshot.taken_at, "tail_transactions": len(rows)}
+
+
+def consumed_until(db: Session, ingredient_id: int, at: datetime) -> float:
+    """시점 at 까지의 누적 소비량"""
+    tx = InventoryTransaction.__table__
+    snapshot = nearest_snapshot(db, ingredient_id, at)
+    if snapshot is None:
+        condition, base = and_(tx.c.ingredient_id == ingredient_id, tx.c.created_at <= at), 0.0
+    else:
+        condition, base = _tail_filter(snapshot, at), snapshot.consumed_total
+    tail = db.execute(select(func.coalesce(func.sum(consumed_expr()), 0)).where(condition)).scalar()
+    return base + (tail or 0)
+
+
+def consumption_between(db: Session, ingredient_id: int, start: datetime, end: datetime) -> float:
+    """start 초과 ~ end 이하 구간의 소비량"""
+    if end <= start:
+        return 0.0
+    return consumed_until(db, ingredient_id, end) - consumed_until(db, ingredient_id, start)
+
+
+def take_daily_snapshots(db: Session, at: Optional[datetime] = None) -> int:
+    """
+    모든 재료의 현재 재고로 오늘(UTC) 스냅샷을 만들거나 갱신 (커밋은 호출자/writer 큐)
+
+    누적 소비량은 어제까지의 마지막 스냅샷 + 그 이후 트랜잭션으로 계산하며,
+    첫 스냅샷은 원장 전체를 한 번 집계합니다.
+    """
+    taken_at = at or datetime.utcnow()
+    today = taken_at.date()
+    tx = InventoryTransaction.__table__
+    snapshots = InventorySnapshot.__table__
+
+    last_id = db.execute(select(func.coalesce(func.max(tx.c.id), 0))).scalar()
+
+    latest = (
+        select(snapshots.c.ingredient_id, func.max(snapshots.c.snapshot_date).label("snapshot_date"))
+        .where(snapshots.c.snapshot_date < today)
+        .group_by(snapshots.c.ingredient_id)
+        .subquery()
+    )
+    previous = (
+        select(snapshots.c.ingredient_id, snapshots.c.consumed_total, snapshots.c.last_transaction_id)
+        .join(latest, and_(latest.c.ingredient_id == snapshots.c.ingredient_id,
+                           latest.c.snapshot_date == snapshots.c.snapshot_date))
+        .subquery()
+    )
+    consumed = {ingredient_id: base for ingredient_id, base, _ in db.execute(select(previous))}
+    rows = db.execute(
+        select(tx.c.ingredient_id, func.sum(consumed_expr()))
+        .select_from(tx.outerjoin(previous, previous.c.ingredient_id == tx.c.ingredient_id))
+        .where(tx.c.id > func.coalesce(previous.c.last_transaction_id, 0), tx.c.id <= last_id)
+        .group_by(tx.c.ingredient_id)
+    )
+    for ingredient_id, amount in rows:
+        consumed[ingredient_id] = consumed.get(ingredient_id, 0.0) + (amount or 0)
+
+    stocks = IngredientStock.__table__
+    quantities = dict(db.execute(select(stocks.c.ingredient_id, stocks.c.current_quantity)).all())
+    values = [
+        {
+            "ingredient_id": ingredient_id,
+            "snapshot_date": today,
+            "taken_at": taken_at,
+            "quantity": quantities.get(ingredient_id) or 0.0,
+            "consumed_total": consumed.get(ingredient_id, 0.0),
+            "last_transaction_id": last_id,
+        }
+        for ingredient_id in sorted(set(quantities) | set(consumed))
+    ]
+    if not values:
+        return 0
+    statement = sqlite_insert(snapshots)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=["ingredient_id", "snapshot_date"],
+            set_={key: statement.excluded[key]
+                  for key in ("taken_at", "quantity", "consumed_total", "last_transaction_id")},
+        ),
+        values,
+    )
+    return len(values)
+
+
+def has_snapshot(db: Session, day: date) -> bool:
+    return db.query(InventorySnapshot.id).filter(InventorySnapshot.snapshot_date == day).first() is not None
+
+
+async def run_daily_snapshots(interval_seconds: float) -> None:
+    """주기적으로 오늘 스냅샷이 있는지 확인하고 없으면 writer 큐에서 생성"""
+    from app.db.session import SessionLocal
+    from app.db.writer import get_db_writer
+
+    while True:
+        try:
+            with SessionLocal() as db:
+                missing = not has_snapshot(db, datetime.utcnow().date())
+            if missing:
+                count = await get_db_writer().submit(take_daily_snapshots)
+                logger.info(f"재고 스냅샷 생성: 재료 {count}개")
+        except Exception:
+            logger.exception("재고 스냅샷 생성 실패")
+        await asyncio.sleep(interval_seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="재고 일일 스냅샷 관리")
+    parser.add_argument("command", choices=["snapshot"], help="snapshot: 현재 재고로 오늘 스냅샷 생성/갱신")
+    parser.parse_args()
+
+    from app.db.session import SessionLocal
+
+    with SessionLocal() as db:
+        count = take_daily_snapshots(db)
+        db.commit()
+    print(f"재고 스냅샷 생성 완료: 재료 {count}개")
+
+
+if __name__ == "__main__":
+    main()
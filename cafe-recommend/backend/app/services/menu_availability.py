@@ -0,0 +1,389 @@
+"""
+재고 기반 메뉴 가용성 계산 (집합 연산)
+
+기존 가용성 API 는 메뉴마다 재료 목록을 조회하고 재료마다 Ingredient, IngredientStock 을
+다시 조회했으며(메뉴 100개 x 재료 8개면 1,600번 이상), 루프 안에서 커밋했습니다.
+
+- 쿼리 1: 메뉴 x 재료 필요량 행렬 (menus LEFT JOIN menu_ingredients, 희소 좌표 형식)
+- 쿼리 2: 재료별 재고 벡터 (ingredients LEFT JOIN ingredient_stocks)
+- 모든 메뉴의 가용성을 한 번에 비교 (재고[재료] < 필요량) 후 메뉴별로 합산(np.bincount)
+- 바뀐 is_available 만 executemany UPDATE 한 번으로 기록 (writer 큐에서 실행)
+
+판정 기준은 기존과 같습니다.
+- 재고 행이 없거나 재고 < 1개 분량인 필수 재료가 있으면 판매 불가 (선택 재료는 영향 없음)
+- 재고가 충분하지만 최소 재고 수준보다 낮으면 low_stock
+
+재고가 바뀌면 전체 메뉴를 다시 계산하지 않고, 재료 -> 메뉴 역의존 인덱스(dependency_index)로
+그 재료를 쓰는 메뉴만 다시 계산합니다. (이벤트 버스의 stock.changed / menu.ingredients_changed 구독)
+- 바뀐 is_available 은 writer 큐로 한 번에 기록하고 menu.availability_changed 를 메뉴별로 발행
+- menu.availability_changed 를 받으면 해당 메뉴의 메뉴 목록/상세 캐시를 무효화
+- 인덱스는 처음 사용할 때 menu_ingredients 를 한 번 읽어 만들고, 이후 메뉴-재료 변경 이벤트로 갱신
+  (다른 워커의 변경도 event_log relay 로 전달됨)
+
+NumPy가 설치되지 않은 환경에서는 같은 좌표 배열을 파이썬 루프로 비교합니다.
+"""
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from app.core.cache import cache_delete_tag
+from app.core.events import MENU_AVAILABILITY_CHANGED, MENU_RECIPE_CHANGED, STOCK_CHANGED, Event, event_bus
+from app.models.inventory import Ingredient, IngredientStock, MenuIngredient
+from app.models.menu import MenuItem
+from app.services import inventory_events  # noqa: F401 (재고 ORM 변경 -> 이벤트 발행 훅 등록)
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 미설치 시 파이썬 비교 경로 사용
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# 재고 행이 없는 재료 (어떤 필요량보다도 작음)
+NO_STOCK = float("-inf")
+
+
+class AvailabilityMatrix:
+    """메뉴 x 재료 필요량 행렬(좌표 형식)과 재고 벡터"""
+
+    def __init__(self, menu_rows, ingredient_rows):
+        # 메뉴: 행 번호 <-> 메뉴 ID, 현재 저장된 is_available
+        self.menu_ids: List[int] = []
+        self.current: List[bool] = []
+        menu_index: Dict[int, int] = {}
+        # 필요량 좌표: (메뉴 행, 재료 ID, 필요량, 선택 재료 여부)
+        req_menu: List[int] = []
+        req_ingredient: List[int] = []
+        req_quantity: List[float] = []
+        req_optional: List[bool] = []
+        for row in menu_rows:
+            index = menu_index.get(row.menu_id)
+            if index is None:
+                index = menu_index[row.menu_id] = len(self.menu_ids)
+                self.menu_ids.append(row.menu_id)
+                self.current.append(bool(row.is_available))
+            if row.ingredient_id is not None:
+                req_menu.append(index)
+                req_ingredient.append(row.ingredient_id)
+                req_quantity.append(row.quantity_required or 0.0)
+                req_optional.append(bool(row.is_optional))
+
+        # 재고 벡터: 재료 행 번호 <-> 재료 ID
+        self.ingredient_ids: List[int] = []
+        self.ingredient_names: List[str] = []
+        stock: List[float] = []
+        min_level: List[float] = []
+        ingredient_index: Dict[int, int] = {}
+        for row in ingredient_rows:
+            ingredient_index[row.id] = len(self.ingredient_ids)
+            self.ingredient_ids.append(row.id)
+            self.ingredient_names.append(row.name)
+            stock.append(NO_STOCK if row.current_quantity is None else row.current_quantity)
+            min_level.append(row.min_stock_level or 0.0)
+        self.ingredient_index = ingredient_index
+
+        # 재료 행이 없는 필요량은 건너뜀 (삭제된 재료 등)
+        keep = [i for i, ingredient_id in enumerate(req_ingredient) if ingredient_id in ingredient_index]
+        self.req_menu = [req_menu[i] for i in keep]
+        self.req_ingredient = [ingredient_index[req_ingredient[i]] for i in keep]
+        self.req_quantity = [req_quantity[i] for i in keep]
+        self.req_optional = [req_optional[i] for i in keep]
+        self.stock = stock
+        self.min_level = min_level
+
+    @property
+    def menu_count(self) -> int:
+        return len(self.menu_ids)
+
+    def _flags(self) -> Tuple[List[int], List[int], List[bool]]:
+        """(부족한 필요량 좌표, 최소 수준 미만 좌표, 메뉴별 가용 여부)"""
+        if np is not None:
+            stock = np.asarray(self.stock, dtype=np.float64)
+            min_level = np.asarray(self.min_level, dtype=np.float64)
+            ingredient = np.asarray(self.req_ingredient, dtype=np.int64)
+            menu = np.asarray(self.req_menu, dtype=np.int64)
+            optional = np.asarray(self.req_optional, dtype=bool)
+            have = stock[ingredient]
+            short = have < np.asarray(self.req_quantity, dtype=np.float64)
+            low = ~short & (have < min_level[ingredient])
+            blocking = np.bincount(menu[short & ~optional], minlength=self.menu_count)
+            return np.flatnonzero(short).tolist(), np.flatnonzero(low).tolist(), (blocking == 0).tolist()
+
+        short, low = [], []
+        available = [True] * self.menu_count
+        for k, ingredient in enumerate(self.req_ingredient):
+            have = self.stock[ingredient]
+            if have < self.req_quantity[k]:
+                short.append(k)
+                if not self.req_optional[k]:
+                    available[self.req_menu[k]] = False
+            elif have < self.min_level[ingredient]:
+                low.append(k)
+        return short, low, available
+
+    def evaluate(self) -> Dict[int, Dict[str, Any]]:
+        """모든 메뉴의 가용성 (메뉴 ID -> MenuAvailability 형태 dict + 저장된 값 current)"""
+        short, low, available = self._flags()
+        result = {
+            menu_id: {
+                "menu_id": menu_id,
+                "is_available": available[index],
+                "unavailable_ingredients": [],
+                "low_stock_ingredients": [],
+                "current": self.current[index],
+            }
+            for index, menu_id in enumerate(self.menu_ids)
+        }
+        # 이름 목록은 부족/최소 수준 미만 좌표만 순회
+        for k in short:
+            if not self.req_optional[k]:
+                menu_id = self.menu_ids[self.req_menu[k]]
+                result[menu_id]["unavailable_ingredients"].append(self.ingredient_names[self.req_ingredient[k]])
+        for k in low:
+            menu_id = self.menu_ids[self.req_menu[k]]
+            result[menu_id]["low_stock_ingredients"].append(self.ingredient_names[self.req_ingredient[k]])
+        return result
+
+
+def load_availability_matrix(
+    db: Session,
+    *,
+    category: Optional[str] = None,
+    menu_ids: Optional[Iterable[int]] = None,
+    active_only: bool = True,
+) -> AvailabilityMatrix:
+    """필요량 행렬과 재고 벡터를 쿼리 두 번으로 적재"""
+    menu_query = (
+        select(
+            MenuItem.id.label("menu_id"),
+            MenuItem.is_available,
+            MenuIngredient.ingredient_id,
+            MenuIngredient.quantity_required,
+            MenuIngredient.is_optional,
+        )
+        .outerjoin(MenuIngredient, MenuIngredient.menu_id == MenuItem.id)
+        .order_by(MenuItem.id)
+    )
+    if active_only:
+        menu_query = menu_query.where(MenuItem.is_active == True)  # noqa: E712
+    if category:
+        menu_query = menu_query.where(MenuItem.category == category)
+    ingredient_query = select(
+        Ingredient.id,
+        Ingredient.name,
+        Ingredient.min_stock_level,
+        IngredientStock.current_quantity,
+    ).outerjoin(IngredientStock, IngredientStock.ingredient_id == Ingredient.id)
+    if menu_ids is not None:
+        menu_ids = list(menu_ids)
+        menu_query = menu_query.where(MenuItem.id.in_(menu_ids))
+        # 일부 메뉴만 계산할 때는 그 메뉴들이 쓰는 재료의 재고만 읽음
+        ingredient_query = ingredient_query.where(Ingredient.id.in_(
+            select(MenuIngredient.ingredient_id).where(MenuIngredient.menu_id.in_(menu_ids))
+        ))
+
+    return AvailabilityMatrix(db.execute(menu_query).all(), db.execute(ingredient_query).all())
+
+
+def changed_flags(result: Dict[int, Dict[str, Any]]) -> List[Tuple[int, bool]]:
+    """저장된 is_available 과 계산 결과가 다른 메뉴 (메뉴 ID, 새 값)"""
+    return [
+        (menu_id, availability["is_available"])
+        for menu_id, availability in result.items()
+        if availability["current"] != availability["is_available"]
+    ]
+
+
+def write_availability_flags(session: Session, changes: List[Tuple[int, bool]]) -> int:
+    """바뀐 is_available 을 executemany UPDATE 한 번으로 기록 (커밋은 호출자/writer 큐)"""
+    if not changes:
+        return 0
+    menus = MenuItem.__table__
+    session.execute(
+        update(menus)
+        .where(menus.c.id == bindparam("b_id"))
+        .values(is_available=bindparam("b_available")),
+        [{"b_id": menu_id, "b_available": available} for menu_id, available in changes],
+    )
+    return len(changes)
+
+
+def public(availability: Dict[str, Any]) -> Dict[str, Any]:
+    """응답 형태 (저장된 값 current 제외)"""
+    return {key: value for key, value in availability.items() if key != "current"}
+
+
+class MenuDependencyIndex:
+    """재료 ID -> 그 재료가 필요한 메뉴 ID 집합 (역의존 인덱스)"""
+
+    def __init__(self):
+        self._menus: Dict[int, Set[int]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.loads = 0
+
+    def load(self, db: Session) -> None:
+        """menu_ingredients 전체를 (menu_id, ingredient_id) 만 읽어 다시 구성"""
+        rows = db.execute(select(MenuIngredient.menu_id, MenuIngredient.ingredient_id)).all()
+        menus: Dict[int, Set[int]] = defaultdict(set)
+        for menu_id, ingredient_id in rows:
+            menus[ingredient_id].add(menu_id)
+        with self._lock:
+            self._menus = menus
+            self.loaded = True
+            self.loads += 1
+
+    def ensure_loaded(self, db: Session) -> None:
+        if not self.loaded:
+            self.load(db)
+
+    def menus_for(self, ingredient_ids: Iterable[int]) -> Set[int]:
+        with self._lock:
+            result: Set[int] = set()
+            for ingredient_id in ingredient_ids:
+                result |= self._menus.get(ingredient_id, set())
+            return result
+
+    def apply(self, menu_id: int, ingredient_id: int, action: str) -> None:
+        """메뉴-재료 변경 반영 (아직 적재 전이면 다음 load 에서 읽으므로 무시)"""
+        if not self.loaded:
+            return
+        with self._lock:
+            if action == "removed":
+                menus = self._menus.get(ingredient_id)
+                if menus is not None:
+                    menus.discard(menu_id)
+                    if not menus:
+                        del self._menus[ingredient_id]
+            else:
+                self._menus[ingredient_id].add(menu_id)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "ingredients": len(self._menus),
+                "edges": sum(len(menus) for menus in self._menus.values()),
+                "loads": self.loads,
+            }
+
+
+dependency_index = MenuDependencyIndex()
+
+
+def _write_with_db_writer(fn: Callable[[Session], Any]) -> Any:
+    from app.db.writer import get_db_writer
+    return get_db_writer().run(fn)
+
+
+def recompute_menu_availability(
+    db: Session,
+    *,
+    ingredient_ids: Iterable[int] = (),
+    menu_ids: Iterable[int] = (),
+    write: Optional[Callable[[Callable[[Session], Any]], Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    바뀐 재료를 쓰는 메뉴(와 지정한 메뉴)만 다시 계산하고, 바뀐 is_available 을 한 번에 기록한 뒤
+    메뉴별 menu.availability_changed 발행. 가용성이 바뀐 메뉴 목록 반환
+
+    write 는 쓰기 함수를 실행해 커밋하는 함수 (기본값: writer 큐)
+    """
+    dependency_index.ensure_loaded(db)
+    targets = dependency_index.menus_for(ingredient_ids) | set(menu_ids)
+    if not targets:
+        return []
+    result = load_availability_matrix(db, menu_ids=targets).evaluate()
+    changes = changed_flags(result)
+    if not changes:
+        return []
+    (write or _write_with_db_writer)(lambda session: write_availability_flags(session, changes))
+    changed = [public(result[menu_id]) for menu_id, _ in changes]
+    for availability in changed:
+        event_bus.publish(MENU_AVAILABILITY_CHANGED, availability)
+    return changed
+
+
+def invalidate_menu_caches(menu_id: int) -> None:
+    """메뉴 목록 캐시(필터별 키 전체)와 해당 메뉴의 상세 캐시 무효화 (app/routers/menus.py)"""
+    cache_delete_tag("menus_list")
+    cache_delete_tag(f"menu_detail:{menu_id}")
+
+
+class AvailabilityRecomputer:
+    """
+    재고/메뉴-재료 변경 이벤트를 모아 영향받는 메뉴만 다시 계산
+
+    이벤트가 몰려도 재계산은 한 번에 하나씩 실행되며, 실행 중에 들어온 변경은 모아 다음 한 번에 처리합니다.
+    DB 작업은 이벤트 루프를 막지 않도록 스레드에서 실행합니다.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        write: Optional[Callable[[Callable[[Session], Any]], Any]] = None,
+    ):
+        self._session_factory = session_factory
+        self._write = write
+        self._ingredients: Set[int] = set()
+        self._menus: Set[int] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.changed = 0
+
+    def _session(self) -> Session:
+        if self._session_factory is None:
+            from app.db.session import SessionLocal
+            return SessionLocal()
+        return self._session_factory()
+
+    def _run_once(self, ingredient_ids: Set[int], menu_ids: Set[int]) -> int:
+        with self._session() as db:
+            return len(recompute_menu_availability(
+                db, ingredient_ids=ingredient_ids, menu_ids=menu_ids, write=self._write
+            ))
+
+    async def _drain(self) -> None:
+        while self._ingredients or self._menus:
+            ingredient_ids, self._ingredients = self._ingredients, set()
+            menu_ids, self._menus = self._menus, set()
+            try:
+                self.changed += await asyncio.to_thread(self._run_once, ingredient_ids, menu_ids)
+                self.runs += 1
+            except Exception:
+                logger.exception("메뉴 가용성 재계산 실패")
+
+    def schedule(self, ingredient_ids: Iterable[int] = (), menu_ids: Iterable[int] = ()) -> None:
+        self._ingredients.update(ingredient_ids)
+        self._menus.update(menu_ids)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._drain())
+
+    async def wait_idle(self) -> None:
+        if self._task is not None:
+            await self._task
+
+    async def on_event(self, event: Event) -> None:
+        """이벤트 버스 구독 (메뉴-재료 변경은 모든 워커의 인덱스에 반영, 재계산은 발생한 워커만)"""
+        data = event["data"]
+        if event["topic"] == MENU_RECIPE_CHANGED:
+            dependency_index.apply(data["menu_id"], data["ingredient_id"], data.get("action"))
+        if "origin" in event:
+            return
+        if event["topic"] == STOCK_CHANGED:
+            # 여러 재료를 한 번에 바꾼 경우 ingredient_ids 로 발행
+            self.schedule(ingredient_ids=data.get("ingredient_ids") or [data["ingredient_id"]])
+        elif event["topic"] == MENU_RECIPE_CHANGED:
+            self.schedule(menu_ids=[data["menu_id"]])
+
+
+availability_recomputer = AvailabilityRecomputer()
+
+event_bus.subscribe(STOCK_CHANGED, availability_recomputer.on_event)
+event_bus.subscribe(MENU_RECIPE_CHANGED, availability_recomputer.on_event)
+event_bus.subscribe(MENU_AVAILABILITY_CHANGED, lambda event: invalidate_menu_caches(event["data"]["menu_id"]))
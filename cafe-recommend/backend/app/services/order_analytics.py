@@ -0,0 +1,311 @@
+"""
+관리자 주문 분석용 인메모리 OLAP 큐브
+
+/api/admin/order-analytics 는 메뉴, 시간대, 결제 수단, 상태, 카테고리, 일자별 분석을 한 번에
+돌려줍니다. 기간별로 시간대 집계(sales_hourly_*) 행을 한 번만 읽어 NumPy 컬럼 배열로
+적재하고, 모든 분석을 벡터화된 group-by(np.bincount)로 계산합니다.
+
+- 메뉴, 카테고리, 결제 수단, 상태는 사전 인코딩(dictionary encoding)된 정수 코드로 저장
+- 시간 버킷은 int64 초 단위 타임스탬프, 금액은 float64 배열
+- 큐브는 기간(start, end)별로 캐시되며 주문 생성/상태 변경이 커밋되면 무효화됩니다.
+  (이벤트 버스의 order.* 토픽 구독. 다른 워커 변경에 대비해 ORDER_ANALYTICS_CACHE_SECONDS TTL 도 적용)
+
+NumPy가 설치되지 않은 환경에서는 같은 집계 행을 파이썬 루프로 합산합니다.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import event_bus
+from app.services import order_events  # noqa: F401 (주문 ORM 변경 -> 이벤트 발행 훅 등록)
+from app.models.menu import Menu
+from app.models.sales_rollup import SalesHourlyItem, SalesHourlyOrder
+from app.db.read_pool import run_read_queries
+from app.services.sales_rollup import get_menu_sales, get_order_rollups, range_filters
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 미설치 시 파이썬 합산 경로 사용
+    np = None
+
+logger = logging.getLogger(__name__)
+
+CANCELLED = "cancelled"
+COMPLETED = "completed"
+
+
+def _encode(values: List[Any]) -> Tuple["np.ndarray", "np.ndarray"]:
+    """값 목록을 (사전, 코드 배열)로 사전 인코딩"""
+    dictionary, codes = np.unique(np.asarray(values, dtype=object).astype(str), return_inverse=True)
+    return dictionary, codes.astype(np.int64)
+
+
+def _group_sum(codes: "np.ndarray", size: int, *weights: "np.ndarray") -> List["np.ndarray"]:
+    """코드별 가중치 합계 (벡터화된 group-by)"""
+    return [np.bincount(codes, weights=w, minlength=size) for w in weights]
+
+
+class OrderCube:
+    """기간 하나에 대한 주문/주문 항목 팩트 컬럼 배열"""
+
+    def __init__(self, order_rows, item_rows):
+        # 주문 팩트: (시간 버킷, 결제 수단, 상태) 단위
+        self.order_ts = np.array([r.bucket_hour for r in order_rows], dtype="datetime64[s]").astype(np.int64)
+        self.methods, self.order_method = _encode([r.payment_method for r in order_rows])
+        self.statuses, self.order_status = _encode([r.status for r in order_rows])
+        self.order_count = np.array([r.order_count for r in order_rows], dtype=np.int64)
+        self.order_amount = np.array([r.total_amount for r in order_rows], dtype=np.float64)
+
+        # 주문 항목 팩트: (시간 버킷, 메뉴, 결제 수단, 상태) 단위, 메뉴 이름/카테고리는 조회 시점 값
+        menu_ids = np.array([r.menu_id for r in item_rows], dtype=np.int64)
+        self.menu_ids, first, self.item_menu = np.unique(menu_ids, return_index=True, return_inverse=True)
+        self.menu_names = [item_rows[i].name for i in first]
+        self.menu_categories = [item_rows[i].category for i in first]
+        self.categories, self.item_category = _encode([r.category for r in item_rows])
+        self.item_cancelled = np.array([r.status == CANCELLED for r in item_rows], dtype=bool)
+        self.item_quantity = np.array([r.quantity for r in item_rows], dtype=np.float64)
+        self.item_sales = np.array([r.total_sales for r in item_rows], dtype=np.float64)
+        self.item_count = np.array([r.item_count for r in item_rows], dtype=np.float64)
+
+    @staticmethod
+    def order_rows(db: Session, start: Optional[datetime], end: Optional[datetime]):
+        return db.query(
+            SalesHourlyOrder.bucket_hour,
+            SalesHourlyOrder.payment_method,
+            SalesHourlyOrder.status,
+            SalesHourlyOrder.order_count,
+            SalesHourlyOrder.total_amount,
+        ).filter(*range_filters(SalesHourlyOrder, start, end)).all()
+
+    @staticmethod
+    def item_rows(db: Session, start: Optional[datetime], end: Optional[datetime]):
+        return db.query(
+            SalesHourlyItem.menu_id,
+            Menu.name,
+            Menu.category,
+            SalesHourlyItem.status,
+            SalesHourlyItem.quantity,
+            SalesHourlyItem.total_sales,
+            SalesHourlyItem.item_count,
+        ).join(
+            Menu, Menu.id == SalesHourlyItem.menu_id
+        ).filter(*range_filters(SalesHourlyItem, start, end)).all()
+
+    @classmethod
+    async def load(cls, db: Session, start: Optional[datetime], end: Optional[datetime]) -> "OrderCube":
+        """기간 내 주문/메뉴 집계 행을 두 쿼리로 동시에 읽어 큐브 생성"""
+        rows = await run_read_queries(db, {
+            "orders": lambda s: cls.order_rows(s, start, end),
+            "items": lambda s: cls.item_rows(s, start, end),
+        })
+        return cls(rows["orders"], rows["items"])
+
+    def analytics(self) -> Dict[str, Any]:
+        """모든 분석 결과를 /order-analytics 응답 형식(기간 정보 제외)으로 계산"""
+        active = self.order_status != self._status_code(CANCELLED)
+        counts = np.where(active, self.order_count, 0).astype(np.float64)
+        amounts = np.where(active, self.order_amount, 0.0)
+
+        # 메뉴별 판매량 (취소 제외)
+        item_active = ~self.item_cancelled
+        quantity = np.where(item_active, self.item_quantity, 0.0)
+        sales = np.where(item_active, self.item_sales, 0.0)
+        items = np.where(item_active, self.item_count, 0.0)
+        menu_qty, menu_sales, menu_rows = _group_sum(
+            self.item_menu, len(self.menu_ids), quantity, sales, item_active.astype(np.float64)
+        )
+        menu_order = [i for i in np.argsort(-menu_qty, kind="stable") if menu_rows[i] > 0]
+
+        # 카테고리별 매출
+        cat_sales, cat_items, cat_rows = _group_sum(
+            self.item_category, len(self.categories), sales, items, item_active.astype(np.float64)
+        )
+        cat_order = [i for i in np.argsort(-cat_sales, kind="stable") if cat_rows[i] > 0]
+
+        # 시간대별 주문량 (0~23시)
+        hours = (self.order_ts // 3600) % 24
+        hour_count, hour_amount, hour_rows = _group_sum(hours, 24, counts, amounts, active.astype(np.float64))
+
+        # 결제 수단별 매출
+        method_count, method_amount, method_rows = _group_sum(
+            self.order_method, len(self.methods), counts, amounts, active.astype(np.float64)
+        )
+        method_order = [i for i in np.argsort(-method_amount, kind="stable") if method_rows[i] > 0]
+
+        # 상태별 주문 수 (취소 포함 전체)
+        (status_count,) = _group_sum(self.order_status, len(self.statuses), self.order_count.astype(np.float64))
+        total_orders = int(self.order_count.sum())
+
+        # 일별 매출 동향
+        days, day_codes = np.unique(self.order_ts // 86400, return_inverse=True)
+        day_count, day_amount, day_rows = _group_sum(day_codes, len(days), counts, amounts, active.astype(np.float64))
+
+        total_sales = float(amounts.sum())
+        status_counts = {str(s): int(c) for s, c in zip(self.statuses, status_count)}
+        return _response(
+            menu_sales=[
+                (int(self.menu_ids[i]), self.menu_names[i], self.menu_categories[i], menu_qty[i], menu_sales[i])
+                for i in menu_order
+            ],
+            hourly=[(h, hour_count[h], hour_amount[h]) for h in range(24) if hour_rows[h] > 0],
+            methods=[(str(self.methods[i]), method_count[i], method_amount[i]) for i in method_order],
+            status_counts=status_counts,
+            categories=[(self.categories[i], cat_sales[i], cat_items[i]) for i in cat_order],
+            daily=[
+                (str(np.datetime64(int(d), "D")), day_count[i], day_amount[i])
+                for i, d in enumerate(days) if day_rows[i] > 0
+            ],
+            total_orders=total_orders,
+            total_sales=total_sales,
+        )
+
+    def _status_code(self, status: str) -> int:
+        matches = np.nonzero(self.statuses == status)[0]
+        return int(matches[0]) if len(matches) else -1
+
+
+def _response(menu_sales, hourly, methods, status_counts, categories, daily, total_orders, total_sales):
+    completion_rate = 0
+    cancellation_rate = 0
+    if total_orders > 0:
+        completion_rate = (status_counts.get(COMPLETED, 0) / total_orders) * 100
+        cancellation_rate = (status_counts.get(CANCELLED, 0) / total_orders) * 100
+
+    return {
+        "menu_sales": [
+            {"id": menu_id, "name": name, "category": category, "quantity": int(qty), "total_sales": float(sales)}
+            for menu_id, name, category, qty, sales in menu_sales
+        ],
+        "hourly_orders": [
+            {"hour": int(hour), "order_count": int(count), "total_amount": float(amount)}
+            for hour, count, amount in hourly
+        ],
+        "payment_method_sales": [
+            {"method": method or "알수없음", "order_count": int(count), "total_amount": float(amount)}
+            for method, count, amount in methods
+        ],
+        "order_status": [
+            {
+                "status": status or "알수없음",
+                "count": int(count),
+                "percentage": (int(count) / total_orders * 100) if total_orders > 0 else 0
+            }
+            for status, count in sorted(status_counts.items())
+        ],
+        "completion_rate": completion_rate,
+        "cancellation_rate": cancellation_rate,
+        "category_sales": [
+            {"category": category or "미분류", "total_sales": float(sales), "item_count": int(item_count)}
+            for category, sales, item_count in categories
+        ],
+        "daily_trend": [
+            {"date": day, "order_count": int(count), "total_amount": float(amount)}
+            for day, count, amount in daily
+        ],
+        "summary": {
+            "total_orders": total_orders,
+            "total_sales": total_sales,
+            "avg_order_value": total_sales / total_orders if total_orders > 0 else 0,
+        },
+    }
+
+
+async def _analytics_without_numpy(db: Session, start: Optional[datetime], end: Optional[datetime]) -> Dict[str, Any]:
+    """NumPy가 없을 때: 같은 집계 행을 파이썬 루프로 합산"""
+    rows = await run_read_queries(db, {
+        "menus": lambda s: get_menu_sales(s, start=start, end=end, exclude_statuses=[CANCELLED]),
+        "orders": lambda s: get_order_rollups(s, start=start, end=end),
+    })
+    menu_rows = rows["menus"]
+
+    hourly, methods, daily, status_counts = {}, {}, {}, {}
+    total_orders = 0
+    for row in rows["orders"]:
+        total_orders += row.order_count
+        status_counts[row.status] = status_counts.get(row.status, 0) + row.order_count
+        if row.status == CANCELLED:
+            continue
+        for bucket, key in ((hourly, int(row.bucket_hour[11:13])), (methods, row.payment_method),
+                            (daily, row.bucket_hour[:10])):
+            count, amount = bucket.get(key, (0, 0.0))
+            bucket[key] = (count + row.order_count, amount + row.total_amount)
+
+    categories = {}
+    for item in menu_rows:
+        sales, item_count = categories.get(item.category, (0.0, 0))
+        categories[item.category] = (sales + (item.total_sales or 0), item_count + (item.item_count or 0))
+
+    return _response(
+        menu_sales=[(m.id, m.name, m.category, m.quantity or 0, m.total_sales or 0) for m in menu_rows],
+        hourly=[(h, c, a) for h, (c, a) in sorted(hourly.items())],
+        methods=[(m, c, a) for m, (c, a) in sorted(methods.items(), key=lambda x: (-x[1][1], x[0]))],
+        status_counts=status_counts,
+        categories=[(k, s, n) for k, (s, n) in sorted(categories.items(), key=lambda x: (-x[1][0], x[0]))],
+        daily=[(d, c, a) for d, (c, a) in sorted(daily.items())],
+        total_orders=total_orders,
+        total_sales=sum(a for c, a in daily.values()),
+    )
+
+
+class OrderCubeCache:
+    """기간별 큐브 캐시 (주문 변경 커밋 시 세대(generation)를 올려 전체 무효화)"""
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Tuple, Tuple[float, OrderCube]]" = OrderedDict()
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+
+    async def get(self, db: Session, start: Optional[datetime], end: Optional[datetime]) -> OrderCube:
+        key = (start, end)
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            generation = self.generation
+            self.misses += 1
+
+        cube = await OrderCube.load(db, start, end)
+        with self.lock:
+            # 적재 중에 주문이 바뀌었으면 캐시하지 않음
+            if generation == self.generation:
+                self.entries[key] = (now + settings.ORDER_ANALYTICS_CACHE_SECONDS, cube)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+        return cube
+
+
+# 큐브 캐시 인스턴스 생성
+order_cube_cache = OrderCubeCache()
+
+
+async def get_order_analytics_data(
+    db: Session,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """[start, end) 기간의 주문 분석 결과 (summary.period 제외)"""
+    if np is None:
+        return await _analytics_without_numpy(db, start, end)
+    return (await order_cube_cache.get(db, start, end)).analytics()
+
+
+# 커밋된 주문 생성/변경 이벤트를 받으면 큐브 캐시 무효화
+event_bus.subscribe("order.*", lambda event: order_cube_cache.invalidate())
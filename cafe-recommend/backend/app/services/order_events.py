@@ -0,0 +1,81 @@
+"""
+주문 ORM 변경 -> 이벤트 버스 연결
+
+Order/OrderItem 의 INSERT/UPDATE/DELETE 를 flush 시점에 감지해 stage_event() 로 세션에 모아 두고,
+커밋된 뒤 이벤트 버스로 발행합니다. 주문을 만들거나 상태를 바꾸는 코드 경로(고객 주문,
+결제 승인, 관리자 상태 변경, writer 큐 작업)가 따로 알림을 보내지 않아도 됩니다.
+
+ORM 을 거치지 않는 raw SQL 상태 변경은 해당 CRUD 함수가 직접 발행합니다.
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.events import (
+    ORDER_CREATED,
+    ORDER_DELETED,
+    ORDER_ITEM_STATUS_CHANGED,
+    ORDER_STATUS_CHANGED,
+    ORDER_UPDATED,
+    stage_event,
+)
+from app.models.order import Order, OrderItem
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def order_event_data(order: Order, **extra) -> Dict[str, Any]:
+    """주문 이벤트 공통 데이터 (JSON 직렬화 가능)"""
+    data = {
+        "order_id": order.id,
+        "order_number": order.order_number,
+        "session_id": order.session_id,
+        "status": order.status,
+        "total_amount": float(order.total_amount or 0),
+        "payment_method": order.payment_method,
+        "created_at": _isoformat(order.created_at),
+    }
+    data.update(extra)
+    return data
+
+
+def _stage(target, topic: str, data: Dict[str, Any]) -> None:
+    session = Session.object_session(target)
+    if session is not None:
+        stage_event(session, topic, data)
+
+
+@event.listens_for(Order, "after_insert")
+def _order_inserted(mapper, connection, target: Order) -> None:
+    _stage(target, ORDER_CREATED, order_event_data(target))
+
+
+@event.listens_for(Order, "after_update")
+def _order_updated(mapper, connection, target: Order) -> None:
+    status = inspect(target).attrs.status.history
+    if status.has_changes():
+        previous = status.deleted[0] if status.deleted else None
+        _stage(target, ORDER_STATUS_CHANGED, order_event_data(target, previous_status=previous))
+    else:
+        _stage(target, ORDER_UPDATED, order_event_data(target))
+
+
+@event.listens_for(Order, "after_delete")
+def _order_deleted(mapper, connection, target: Order) -> None:
+    _stage(target, ORDER_DELETED, order_event_data(target))
+
+
+@event.listens_for(OrderItem, "after_update")
+def _order_item_updated(mapper, connection, target: OrderItem) -> None:
+    status = inspect(target).attrs.status.history
+    if status.has_changes():
+        _stage(target, ORDER_ITEM_STATUS_CHANGED, {
+            "order_id": target.order_id,
+            "item_id": target.id,
+            "status": target.status,
+            "previous_status": status.deleted[0] if status.deleted else None,
+        })
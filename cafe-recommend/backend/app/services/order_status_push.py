@@ -0,0 +1,189 @@
+"""
+고객 주문 상태 푸시 (세션별 SSE/WebSocket + long-poll)
+
+주문 상세/결제 완료 화면은 주문 상태가 바뀌었는지 보려고 /api/orders/{id} 를 주기적으로
+호출했고, 호출마다 주문 항목을 조인하는 ORM 조회가 실행되었습니다.
+
+- 이벤트 버스의 주문 이벤트(order.*)로 주문별 최신 상태를 메모리에 유지
+  (워커 간에는 event_log relay 로 전달된 이벤트로 갱신)
+- 세션별 브로드캐스터로 그 세션의 주문 상태 변경만 SSE/WebSocket 구독자에게 푸시
+- long-poll(wait) 은 DB를 조회하지 않고 주문별 asyncio.Event 에서 대기
+- 처음 보는 주문은 한 번만 (id, session_id, status) 만 조회해 캐시 (remember)
+
+version 은 허브 전체에서 단조 증가하는 변경 번호로, long-poll 클라이언트가 마지막으로 본
+version 을 보내면 그 이후의 변경이 있을 때만 응답합니다.
+"""
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from app.core.broadcast import Broadcaster, ClientChannel
+from app.core.events import ORDER_CREATED, ORDER_DELETED, ORDER_STATUS_CHANGED, Event, event_bus
+from app.core.wire import WireMessage
+from app.services import order_events  # noqa: F401 (주문 ORM 변경 -> 이벤트 발행 훅 등록)
+
+logger = logging.getLogger(__name__)
+
+STATUS_DESCRIPTIONS = {
+    "pending": "주문이 접수되었습니다.",
+    "pending_payment": "결제를 기다리고 있습니다.",
+    "paid": "결제가 완료되었습니다.",
+    "preparing": "메뉴를 준비하고 있습니다.",
+    "ready": "메뉴가 준비되었습니다. 픽업해 주세요.",
+    "completed": "주문이 완료되었습니다.",
+    "cancelled": "주문이 취소되었습니다.",
+    "failed": "결제에 실패했습니다.",
+    "refunded": "환불되었습니다.",
+    "deleted": "주문이 삭제되었습니다.",
+}
+
+_TOPICS = (ORDER_CREATED, ORDER_STATUS_CHANGED, ORDER_DELETED)
+
+
+class OrderStatusHub:
+    """주문별 최신 상태와 세션별 푸시 채널"""
+
+    def __init__(self, capacity: int = 10000):
+        self.capacity = capacity
+        self.version = 0
+        self._orders: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()  # LRU
+        self._sessions: Dict[str, Broadcaster] = {}
+        self._waiters: Dict[int, asyncio.Event] = {}  # 주문별 long-poll 대기
+        self._waiting: Dict[int, int] = {}  # 주문별 대기 중인 요청 수
+        self.pushed = 0
+        self.lookups = 0  # 캐시에 없어 DB에서 읽은 주문 수
+
+    # --- 상태 ---
+
+    def _store(self, state: Dict[str, Any]) -> None:
+        self._orders[state["order_id"]] = state
+        self._orders.move_to_end(state["order_id"])
+        while len(self._orders) > self.capacity:
+            self._orders.popitem(last=False)
+
+    def get(self, order_id: int) -> Optional[Dict[str, Any]]:
+        return self._orders.get(order_id)
+
+    def remember(
+        self,
+        order_id: int,
+        session_id: Optional[str],
+        status: str,
+        order_number: Optional[str] = None,
+        updated_at: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """DB에서 읽은 현재 상태를 캐시 (변경이 아니므로 version 은 올리지 않음)"""
+        self.lookups += 1
+        state = self._orders.get(order_id)
+        if state is None:
+            state = self._state(order_id, session_id, order_number, status, None, updated_at, 0)
+            self._store(state)
+        return state
+
+    @staticmethod
+    def _state(order_id, session_id, order_number, status, previous_status, updated_at, version) -> Dict[str, Any]:
+        return {
+            "order_id": order_id,
+            "session_id": session_id,
+            "order_number": order_number,
+            "status": status,
+            "previous_status": previous_status,
+            "description": STATUS_DESCRIPTIONS.get(status, status),
+            "updated_at": updated_at,
+            "version": version,
+        }
+
+    @staticmethod
+    def public(state: Dict[str, Any]) -> Dict[str, Any]:
+        """클라이언트에 보내는 형태 (session_id 제외)"""
+        return {key: value for key, value in state.items() if key != "session_id"}
+
+    def apply(self, topic: str, data: Dict[str, Any], timestamp: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """주문 이벤트 반영 (이벤트 루프 스레드에서 호출)"""
+        order_id = data.get("order_id")
+        if order_id is None:
+            return None
+        status = "deleted" if topic == ORDER_DELETED else data.get("status")
+        previous = self._orders.get(order_id)
+        if previous is not None and previous["status"] == status and topic != ORDER_DELETED:
+            return previous  # 같은 상태 (다른 워커에서 중복 전달 등)
+        previous = previous or {}
+        self.version += 1
+        state = self._state(
+            order_id,
+            data.get("session_id") or previous.get("session_id"),
+            data.get("order_number") or previous.get("order_number"),
+            status,
+            data.get("previous_status") or previous.get("status"),
+            timestamp,
+            self.version,
+        )
+        self._store(state)
+
+        waiter = self._waiters.pop(order_id, None)
+        if waiter is not None:
+            waiter.set()
+        clients = self._sessions.get(state["session_id"]) if state["session_id"] else None
+        if clients is not None and len(clients):
+            clients.broadcast(WireMessage({"type": "order_status", "data": self.public(state)}))
+            self.pushed += 1
+        return state
+
+    async def _on_event(self, event: Event) -> None:
+        """이벤트 버스 구독 (비동기 핸들러이므로 어느 스레드에서 발행되어도 이벤트 루프에서 실행)"""
+        if event["topic"] in _TOPICS:
+            self.apply(event["topic"], event["data"], event.get("timestamp"))
+
+    # --- long-poll ---
+
+    async def wait(self, order_id: int, since_version: int, timeout: float) -> Optional[Dict[str, Any]]:
+        """since_version 이후 이 주문의 상태가 바뀔 때까지 대기. 시간 초과 시 None (DB 조회 없음)"""
+        state = self._orders.get(order_id)
+        if state is not None and state["version"] > since_version:
+            return state
+        waiter = self._waiters.setdefault(order_id, asyncio.Event())
+        self._waiting[order_id] = self._waiting.get(order_id, 0) + 1
+        try:
+            await asyncio.wait_for(waiter.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            remaining = self._waiting.pop(order_id) - 1
+            if remaining:
+                self._waiting[order_id] = remaining
+            elif self._waiters.get(order_id) is waiter:
+                del self._waiters[order_id]
+        return self._orders.get(order_id)
+
+    # --- SSE/WebSocket ---
+
+    def subscribe(self, session_id: str, key: Hashable, send=None) -> ClientChannel:
+        clients = self._sessions.get(session_id)
+        if clients is None:
+            clients = self._sessions[session_id] = Broadcaster.from_settings(f"order-status:{session_id[:8]}")
+        return clients.add(key, send)
+
+    def unsubscribe(self, session_id: str, key: Hashable) -> None:
+        clients = self._sessions.get(session_id)
+        if clients is None:
+            return
+        clients.remove(key)
+        if not len(clients):
+            del self._sessions[session_id]
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "orders_cached": len(self._orders),
+            "sessions": len(self._sessions),
+            "subscribers": sum(len(clients) for clients in self._sessions.values()),
+            "long_poll_waiting": len(self._waiters),
+            "version": self.version,
+            "pushed": self.pushed,
+            "lookups": self.lookups,
+        }
+
+
+order_status_hub = OrderStatusHub()
+
+event_bus.subscribe("order.*", order_status_hub._on_event)
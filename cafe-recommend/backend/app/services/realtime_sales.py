@@ -0,0 +1,292 @@
+"""
+실시간 매출 스냅샷 공유 poller
+
+/api/admin/realtime-sales WebSocket 은 연결마다 5초 주기로 sqlite3 커넥션을 새로 열어
+같은 집계를 반복했습니다. 이 모듈의 백그라운드 producer 하나가 스냅샷을
+
+- REALTIME_SALES_TICK_SECONDS 주기로 (구독자가 있을 때만), 또는
+- 주문 생성/변경 이벤트(order.*)가 발행되었을 때 (REALTIME_SALES_MIN_INTERVAL_SECONDS 단위로 묶어서)
+
+한 번만 계산하고, 메시지를 형식(JSON/MessagePack)별로 한 번만 직렬화해 모든 구독자에게 같은 결과를 보냅니다.
+연결 시 버전이 붙은 전체 스냅샷(initial_data)을 보낸 뒤에는 바뀐 시간대/새 주문/매출 증가분만
+delta 로 보내고, 바뀐 것이 없는 tick 은 보내지 않습니다.
+전송은 구독자별 bounded 큐와 전송 태스크(app.core.broadcast)가 맡으므로 느린 구독자가
+다른 구독자나 다음 계산을 늦추지 않습니다.
+새 구독자의 initial_data 도 최근 스냅샷이 tick 주기 이내이면 다시 조회하지 않습니다.
+
+오늘 매출/시간대별 집계는 시간대별 매출 집계 테이블(sales_hourly_orders)에서,
+최근 주문은 orders 에서 읽으며 읽기 전용 커넥션 풀에서 병렬로 실행됩니다.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from fastapi import WebSocket
+from sqlalchemy import Integer, cast, func
+from sqlalchemy.orm import Session
+
+from app.core.broadcast import Broadcaster
+from app.core.config import settings
+from app.core.wire import JSON, WireMessage, message_sender
+from app.core.events import event_bus
+from app.services import order_events  # noqa: F401 (주문 ORM 변경 -> 이벤트 발행 훅 등록)
+from app.db.read_pool import run_read_queries
+from app.db.session import SessionLocal
+from app.models.order import Order
+from app.models.sales_rollup import SalesHourlyOrder
+from app.services.sales_rollup import range_filters
+
+logger = logging.getLogger(__name__)
+
+EXCLUDED_STATUSES = ["cancelled", "failed", "pending_payment"]
+RECENT_ORDER_LIMIT = 5
+
+
+def _order_summary(order: Optional[Order]) -> Optional[Dict[str, Any]]:
+    if order is None:
+        return None
+    return {
+        "id": order.id,
+        "order_number": order.order_number or str(order.id),
+        "total_amount": float(order.total_amount or 0.0),
+        "status": order.status,
+        "created_at": order.created_at.isoformat() if order.created_at else None,
+    }
+
+
+async def compute_sales_snapshot(db: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """오늘 매출, 시간대별 주문, 최근 주문 스냅샷 (쿼리 3회, 병렬 실행)"""
+    now = now or datetime.now()
+    today_start = datetime.combine(now.date(), datetime.min.time())
+    tomorrow_start = today_start + timedelta(days=1)
+    hour = cast(func.strftime("%H", SalesHourlyOrder.bucket_hour), Integer)
+
+    results = await run_read_queries(db, {
+        "hourly": lambda s: s.query(
+            hour.label("hour"),
+            func.sum(SalesHourlyOrder.order_count).label("count"),
+            func.sum(SalesHourlyOrder.total_amount).label("amount"),
+        ).filter(
+            *range_filters(SalesHourlyOrder, today_start, tomorrow_start),
+            SalesHourlyOrder.status.notin_(EXCLUDED_STATUSES),
+        ).group_by(hour).order_by(hour).all(),
+        "recent": lambda s: [
+            _order_summary(o) for o in s.query(Order)
+            .filter(Order.status.notin_(EXCLUDED_STATUSES))
+            .order_by(Order.created_at.desc())
+            .limit(RECENT_ORDER_LIMIT).all()
+        ],
+        "latest": lambda s: _order_summary(s.query(Order).order_by(Order.created_at.desc()).first()),
+    })
+
+    hourly_data = [
+        {"hour": int(row.hour or 0), "count": int(row.count or 0), "amount": float(row.amount or 0.0)}
+        for row in results["hourly"]
+    ]
+    return {
+        "today_sales": float(sum(h["amount"] for h in hourly_data)),
+        "hourly_data": hourly_data,
+        "recent_orders": results["recent"],
+        "latest_order": results["latest"],
+        "timestamp": now.isoformat(),
+    }
+
+
+def diff_sales_snapshots(previous: Dict[str, Any], current: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """두 스냅샷의 차이 (바뀐 시간대, 새 주문, 매출 증가분). 바뀐 것이 없으면 None"""
+    previous_hours = {h["hour"]: h for h in previous["hourly_data"]}
+    current_hours = {h["hour"]: h for h in current["hourly_data"]}
+    changed_hours = [h for hour, h in current_hours.items() if previous_hours.get(hour) != h]
+    # 취소 등으로 사라진 시간대는 0으로 전달
+    changed_hours += [
+        {"hour": hour, "count": 0, "amount": 0.0} for hour in previous_hours if hour not in current_hours
+    ]
+    known_ids = {o["id"] for o in previous["recent_orders"]}
+    new_orders = [o for o in current["recent_orders"] if o["id"] not in known_ids]
+    latest_changed = current["latest_order"] != previous["latest_order"]
+    sales_delta = current["today_sales"] - previous["today_sales"]
+    if not (changed_hours or new_orders or latest_changed or sales_delta):
+        return None
+
+    delta: Dict[str, Any] = {
+        "today_sales": current["today_sales"],
+        "sales_delta": sales_delta,
+        "timestamp": current["timestamp"],
+    }
+    if changed_hours:
+        delta["hourly_data"] = sorted(changed_hours, key=lambda h: h["hour"])
+    if new_orders:
+        delta["new_orders"] = new_orders
+    if latest_changed:
+        delta["latest_order"] = current["latest_order"]
+    return delta
+
+
+class SalesSnapshotPoller:
+    """실시간 매출 스냅샷을 한 번 계산해 모든 WebSocket 구독자에게 전송하는 producer
+
+    구독자는 버전이 붙은 initial_data 를 한 번 받고, 이후에는 이전 버전과 달라진 부분만
+    delta 메시지(version, base_version)로 받습니다. 바뀐 것이 없는 tick 은 전송하지 않습니다.
+    클라이언트는 base_version 이 자신의 버전과 다르면(큐에서 버려진 메시지 등)
+    {"type": "resync"} 를 보내 initial_data 를 다시 받습니다.
+    """
+
+    def __init__(self, tick_seconds: float = 5.0, min_interval_seconds: float = 0.5, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self.tick_seconds = tick_seconds
+        self.min_interval_seconds = min_interval_seconds
+        self.subscribers = Broadcaster.from_settings("realtime-sales")
+        self.computations = 0
+        self.version = 0
+        self.suppressed = 0  # 바뀐 것이 없어 전송하지 않은 tick 수
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_at = 0.0
+        self._initial: Optional[WireMessage] = None
+        self._compute_lock: Optional[asyncio.Lock] = None
+        self._wakeup: Optional[asyncio.Event] = None  # 주문 이벤트
+        self._subscribed: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_running_loop()
+            self._compute_lock = asyncio.Lock()
+            self._wakeup = asyncio.Event()
+            self._subscribed = asyncio.Event()
+            self._task = self._loop.create_task(self._run())
+
+    async def _refresh(self) -> Optional[WireMessage]:
+        """스냅샷을 다시 계산해 이전 버전과 비교. 바뀌었으면 버전을 올리고 현재 구독자에게 보낼 메시지 반환"""
+        async with self._compute_lock:
+            with self.session_factory() as db:
+                snapshot = await compute_sales_snapshot(db)
+            previous, self._snapshot = self._snapshot, snapshot
+            self._snapshot_at = time.monotonic()
+            self.computations += 1
+            if previous is None:
+                self.version += 1
+                self._initial = None
+                return None
+            if previous["timestamp"][:10] != snapshot["timestamp"][:10]:
+                # 날짜가 바뀌면 시간대 집계가 초기화되므로 전체 스냅샷 전송
+                self.version += 1
+                self._initial = None
+                return self._initial_message()
+            delta = diff_sales_snapshots(previous, snapshot)
+            if delta is None:
+                self.suppressed += 1
+                return None
+            self.version += 1
+            self._initial = None
+            return WireMessage({"type": "delta", "version": self.version, "base_version": self.version - 1, "data": delta})
+
+    def _initial_message(self) -> WireMessage:
+        """현재 버전의 initial_data (버전이 바뀔 때까지 모든 구독자가 같은 인코딩 결과를 공유)"""
+        if self._initial is None:
+            snapshot = self._snapshot
+            self._initial = WireMessage({"type": "initial_data", "version": self.version, "data": {
+                "today_sales": snapshot["today_sales"],
+                "hourly_data": snapshot["hourly_data"],
+                "recent_orders": snapshot["recent_orders"],
+                "latest_order": snapshot["latest_order"],
+                "timestamp": snapshot["timestamp"],
+            }})
+        return self._initial
+
+    async def subscribe(self, websocket: WebSocket, encoding: str = JSON) -> None:
+        """구독자 등록 후 initial_data 전송 (최근 스냅샷이 있으면 재사용, encoding: json/msgpack)"""
+        self._ensure_started()
+        try:
+            if self._snapshot is None or time.monotonic() - self._snapshot_at > self.tick_seconds:
+                self._publish_change(await self._refresh())
+            initial = self._initial_message()
+        except Exception as e:
+            logger.exception("실시간 매출 초기 데이터 계산 실패")
+            initial = WireMessage({"type": "error", "message": str(e)})
+
+        async def close_slow_consumer(reason: str) -> None:
+            await websocket.close(code=1013, reason=reason)  # 재연결 후 initial_data 로 다시 동기화
+
+        # 등록과 initial_data 적재 사이에 await 가 없으므로 이후 delta 는 모두 이 버전 다음부터 전달됨
+        channel = self.subscribers.add(websocket, message_sender(websocket, encoding), on_close=close_slow_consumer)
+        channel.offer(initial)
+        self._subscribed.set()
+
+    def resync(self, websocket: WebSocket) -> None:
+        """클라이언트가 버전 차이를 발견한 경우 현재 버전의 initial_data 를 다시 전송"""
+        channel = self.subscribers.channels.get(websocket)
+        if channel is not None and self._snapshot is not None:
+            channel.offer(self._initial_message())
+
+    def unsubscribe(self, websocket: WebSocket) -> None:
+        self.subscribers.remove(websocket)
+
+    def notify(self) -> None:
+        """주문 이벤트 발생 알림 (다른 스레드에서도 호출 가능)"""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            wakeup.set()
+        else:
+            loop.call_soon_threadsafe(wakeup.set)
+
+    def publish(self, message: WireMessage) -> int:
+        """메시지 하나를 모든 구독자 큐에 넣음 (형식별 인코딩은 한 번만, 전송 실패한 연결은 자동으로 구독 해제)"""
+        return self.subscribers.broadcast(message)
+
+    def _publish_change(self, message: Optional[WireMessage]) -> None:
+        if message is not None:
+            self.publish(message)
+
+    async def _run(self) -> None:
+        while True:
+            if not self.subscribers:
+                # 구독자가 없으면 다음 구독까지 대기 (계산하지 않음)
+                self._subscribed.clear()
+                await self._subscribed.wait()
+                self._wakeup.clear()
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.tick_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if not self.subscribers:
+                continue
+            # 주문이 몰릴 때 이벤트마다 계산하지 않도록 최소 간격 유지
+            wait = self.min_interval_seconds - (time.monotonic() - self._snapshot_at)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                self._publish_change(await self._refresh())
+            except Exception as e:
+                logger.exception("실시간 매출 스냅샷 계산 실패")
+                self.publish(WireMessage({"type": "error", "message": str(e)}))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.subscribers.close_all()
+
+
+sales_snapshot_poller = SalesSnapshotPoller(
+    tick_seconds=settings.REALTIME_SALES_TICK_SECONDS,
+    min_interval_seconds=settings.REALTIME_SALES_MIN_INTERVAL_SECONDS,
+)
+
+
+# 커밋된 주문 생성/변경 이벤트를 받으면 스냅샷 재계산 요청
+event_bus.subscribe("order.*", lambda event: sales_snapshot_poller.notify())
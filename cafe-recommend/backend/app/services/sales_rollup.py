@@ -0,0 +1,308 @@
+"""
+시간대별 매출 집계(rollup) 테이블 관리
+
+대시보드/통계 API가 요청마다 orders, order_items 전체를 다시 집계하지 않도록
+영업 시간(1시간) 단위 집계 테이블 두 개를 유지합니다.
+
+- sales_hourly_orders: (시간, 결제 수단, 상태)별 주문 수와 매출
+- sales_hourly_items:  (시간, 메뉴, 결제 수단, 상태)별 판매 수량과 매출
+
+집계는 orders/order_items 트리거가 주문 생성, 상태 변경(paid, cancelled, refunded 등),
+금액 변경과 같은 트랜잭션 안에서 증감하므로 ORM, 단일 writer 큐, raw SQL 어느 경로로
+변경해도 항상 일치합니다. 조회 비용은 주문 수가 아니라 기간(시간 수)에 비례합니다.
+
+데이터가 어긋난 경우 다음 명령으로 원본 테이블에서 다시 만들 수 있습니다.
+    python -m app.services.sales_rollup rebuild
+"""
+import argparse
+import logging
+from datetime import date, datetime
+from typing import List, Optional, Union
+
+from sqlalchemy import func, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.menu import Menu
+from app.models.sales_rollup import SalesHourlyItem, SalesHourlyOrder
+
+logger = logging.getLogger(__name__)
+
+# 주문 시각을 영업 시간 단위로 자르는 식 (created_at은 KST 로컬 시각으로 저장됨)
+BUCKET_FORMAT = "%Y-%m-%d %H:00:00"
+
+
+def _bucket(column: str) -> str:
+    return f"strftime('{BUCKET_FORMAT}', {column})"
+
+
+def _upsert_order(prefix: str, sign: str) -> str:
+    """prefix(old/new) 주문 한 건을 sales_hourly_orders 에 sign(+/-) 방향으로 반영"""
+    return f"""
+        INSERT INTO sales_hourly_orders (bucket_hour, payment_method, status, order_count, total_amount)
+        SELECT {_bucket(f'{prefix}.created_at')}, coalesce({prefix}.payment_method, ''), coalesce({prefix}.status, ''),
+               {sign}1, {sign}coalesce({prefix}.total_amount, 0)
+        WHERE {prefix}.created_at IS NOT NULL
+        ON CONFLICT (bucket_hour, payment_method, status) DO UPDATE SET
+            order_count = order_count + excluded.order_count,
+            total_amount = total_amount + excluded.total_amount;
+    """
+
+
+def _upsert_items_of_order(prefix: str, sign: str) -> str:
+    """prefix(old/new) 주문에 속한 주문 항목 전체를 sales_hourly_items 에 반영"""
+    return f"""
+        INSERT INTO sales_hourly_items (bucket_hour, menu_id, payment_method, status, quantity, total_sales, item_count)
+        SELECT {_bucket(f'{prefix}.created_at')}, coalesce(oi.menu_id, 0),
+               coalesce({prefix}.payment_method, ''), coalesce({prefix}.status, ''),
+               {sign}sum(coalesce(oi.quantity, 0)), {sign}sum(coalesce(oi.total_price, 0)), {sign}count(*)
+        FROM order_items oi
+        WHERE oi.order_id = {prefix}.id AND {prefix}.created_at IS NOT NULL
+        GROUP BY coalesce(oi.menu_id, 0)
+        ON CONFLICT (bucket_hour, menu_id, payment_method, status) DO UPDATE SET
+            quantity = quantity + excluded.quantity,
+            total_sales = total_sales + excluded.total_sales,
+            item_count = item_count + excluded.item_count;
+    """
+
+
+def _upsert_item(prefix: str, sign: str) -> str:
+    """prefix(old/new) 주문 항목 한 건을 소속 주문의 현재 속성으로 sales_hourly_items 에 반영"""
+    return f"""
+        INSERT INTO sales_hourly_items (bucket_hour, menu_id, payment_method, status, quantity, total_sales, item_count)
+        SELECT {_bucket('o.created_at')}, coalesce({prefix}.menu_id, 0),
+               coalesce(o.payment_method, ''), coalesce(o.status, ''),
+               {sign}coalesce({prefix}.quantity, 0), {sign}coalesce({prefix}.total_price, 0), {sign}1
+        FROM orders o
+        WHERE o.id = {prefix}.order_id AND o.created_at IS NOT NULL
+        ON CONFLICT (bucket_hour, menu_id, payment_method, status) DO UPDATE SET
+            quantity = quantity + excluded.quantity,
+            total_sales = total_sales + excluded.total_sales,
+            item_count = item_count + excluded.item_count;
+    """
+
+
+# 증감 후 0이 된 집계 행 정리
+_PRUNE = """
+    DELETE FROM sales_hourly_orders WHERE order_count = 0 AND total_amount = 0;
+    DELETE FROM sales_hourly_items WHERE item_count = 0 AND quantity = 0;
+"""
+
+TRIGGER_DDL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS orders_rollup_ai AFTER INSERT ON orders BEGIN
+        {_upsert_order('new', '+')}
+    END
+    """,
+    # 금액/상태/결제 수단/주문 시각이 바뀌면 이전 키에서 빼고 새 키에 더함
+    f"""
+    CREATE TRIGGER IF NOT EXISTS orders_rollup_au
+    AFTER UPDATE OF status, payment_method, total_amount, created_at ON orders BEGIN
+        {_upsert_order('old', '-')}
+        {_upsert_order('new', '+')}
+        {_PRUNE}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS orders_rollup_items_au
+    AFTER UPDATE OF status, payment_method, created_at ON orders
+    WHEN old.status IS NOT new.status
+      OR old.payment_method IS NOT new.payment_method
+      OR old.created_at IS NOT new.created_at
+    BEGIN
+        {_upsert_items_of_order('old', '-')}
+        {_upsert_items_of_order('new', '+')}
+        {_PRUNE}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS orders_rollup_ad AFTER DELETE ON orders BEGIN
+        {_upsert_order('old', '-')}
+        {_upsert_items_of_order('old', '-')}
+        {_PRUNE}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS order_items_rollup_ai AFTER INSERT ON order_items BEGIN
+        {_upsert_item('new', '+')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS order_items_rollup_au
+    AFTER UPDATE OF order_id, menu_id, quantity, total_price ON order_items BEGIN
+        {_upsert_item('old', '-')}
+        {_upsert_item('new', '+')}
+        {_PRUNE}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS order_items_rollup_ad AFTER DELETE ON order_items BEGIN
+        {_upsert_item('old', '-')}
+        {_PRUNE}
+    END
+    """,
+]
+
+TRIGGER_NAMES = [
+    "orders_rollup_ai", "orders_rollup_au", "orders_rollup_items_au", "orders_rollup_ad",
+    "order_items_rollup_ai", "order_items_rollup_au", "order_items_rollup_ad",
+]
+
+REBUILD_SQL = [
+    "DELETE FROM sales_hourly_orders",
+    "DELETE FROM sales_hourly_items",
+    f"""
+    INSERT INTO sales_hourly_orders (bucket_hour, payment_method, status, order_count, total_amount)
+    SELECT {_bucket('created_at')}, coalesce(payment_method, ''), coalesce(status, ''),
+           count(*), sum(coalesce(total_amount, 0))
+    FROM orders
+    WHERE created_at IS NOT NULL
+    GROUP BY 1, 2, 3
+    """,
+    f"""
+    INSERT INTO sales_hourly_items (bucket_hour, menu_id, payment_method, status, quantity, total_sales, item_count)
+    SELECT {_bucket('o.created_at')}, coalesce(oi.menu_id, 0), coalesce(o.payment_method, ''), coalesce(o.status, ''),
+           sum(coalesce(oi.quantity, 0)), sum(coalesce(oi.total_price, 0)), count(*)
+    FROM order_items oi
+    JOIN orders o ON o.id = oi.order_id
+    WHERE o.created_at IS NOT NULL
+    GROUP BY 1, 2, 3, 4
+    """,
+]
+
+
+def create_sales_rollup_triggers(conn: Connection) -> None:
+    """집계 트리거 생성 (이미 있으면 유지)"""
+    for ddl in TRIGGER_DDL:
+        conn.execute(text(ddl))
+
+
+def drop_sales_rollup_triggers(conn: Connection) -> None:
+    for name in TRIGGER_NAMES:
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+
+
+def rebuild_sales_rollups(conn: Connection) -> None:
+    """집계 테이블을 비우고 orders/order_items 원본에서 다시 계산"""
+    for sql in REBUILD_SQL:
+        conn.execute(text(sql))
+    logger.info("매출 집계 테이블 재생성 완료")
+
+
+# --- 조회 헬퍼 ---
+
+DateLike = Union[date, datetime, str]
+
+
+def bucket_bound(value: Optional[DateLike]) -> Optional[str]:
+    """날짜/시각을 bucket_hour 비교용 문자열로 변환 ('YYYY-MM-DD' 문자열은 그날 0시)"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.strptime(value, "%Y-%m-%d")
+    elif not isinstance(value, datetime):
+        value = datetime.combine(value, datetime.min.time())
+    return value.strftime(BUCKET_FORMAT)
+
+
+def range_filters(model, start: Optional[DateLike], end: Optional[DateLike]) -> list:
+    """[start, end) 범위의 시간 버킷 필터. 경계가 시각이면 해당 시간 버킷을 포함"""
+    filters = []
+    if start is not None:
+        filters.append(model.bucket_hour >= bucket_bound(start))
+    if end is not None:
+        bound = bucket_bound(end)
+        if isinstance(end, datetime) and end.strftime(BUCKET_FORMAT) != end.strftime("%Y-%m-%d %H:%M:%S"):
+            filters.append(model.bucket_hour <= bound)
+        else:
+            filters.append(model.bucket_hour < bound)
+    return filters
+
+
+def get_order_rollups(
+    db: Session,
+    start: Optional[DateLike] = None,
+    end: Optional[DateLike] = None,
+    exclude_statuses: Optional[List[str]] = None,
+) -> List[SalesHourlyOrder]:
+    """기간 내 시간대별 주문 집계 행 조회 (행 수는 기간 x 결제 수단 x 상태 수)"""
+    query = db.query(SalesHourlyOrder).filter(*range_filters(SalesHourlyOrder, start, end))
+    if exclude_statuses:
+        query = query.filter(SalesHourlyOrder.status.notin_(exclude_statuses))
+    return query.order_by(SalesHourlyOrder.bucket_hour).all()
+
+
+def get_daily_order_totals(
+    db: Session,
+    start: Optional[DateLike] = None,
+    end: Optional[DateLike] = None,
+    exclude_statuses: Optional[List[str]] = None,
+):
+    """일자별 주문 수/매출 합계 ((date 'YYYY-MM-DD', order_count, total_amount) 목록)"""
+    day = func.substr(SalesHourlyOrder.bucket_hour, 1, 10)
+    query = db.query(
+        day.label("date"),
+        func.sum(SalesHourlyOrder.order_count).label("order_count"),
+        func.sum(SalesHourlyOrder.total_amount).label("total_amount"),
+    ).filter(*range_filters(SalesHourlyOrder, start, end))
+    if exclude_statuses:
+        query = query.filter(SalesHourlyOrder.status.notin_(exclude_statuses))
+    return query.group_by(day).order_by(day).all()
+
+
+def get_sales_total(
+    db: Session,
+    start: Optional[DateLike] = None,
+    end: Optional[DateLike] = None,
+    exclude_statuses: Optional[List[str]] = None,
+) -> float:
+    """기간 내 매출 합계"""
+    query = db.query(func.sum(SalesHourlyOrder.total_amount)).filter(
+        *range_filters(SalesHourlyOrder, start, end)
+    )
+    if exclude_statuses:
+        query = query.filter(SalesHourlyOrder.status.notin_(exclude_statuses))
+    return float(query.scalar() or 0)
+
+
+def get_menu_sales(
+    db: Session,
+    start: Optional[DateLike] = None,
+    end: Optional[DateLike] = None,
+    exclude_statuses: Optional[List[str]] = None,
+):
+    """기간 내 메뉴별 판매 수량/매출/항목 수 (메뉴 이름과 카테고리는 menus 조인)"""
+    query = db.query(
+        Menu.id,
+        Menu.name,
+        Menu.category,
+        func.sum(SalesHourlyItem.quantity).label("quantity"),
+        func.sum(SalesHourlyItem.total_sales).label("total_sales"),
+        func.sum(SalesHourlyItem.item_count).label("item_count"),
+    ).join(
+        Menu, Menu.id == SalesHourlyItem.menu_id
+    ).filter(*range_filters(SalesHourlyItem, start, end))
+    if exclude_statuses:
+        query = query.filter(SalesHourlyItem.status.notin_(exclude_statuses))
+    return query.group_by(Menu.id).order_by(func.sum(SalesHourlyItem.quantity).desc(), Menu.id).all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="시간대별 매출 집계 테이블 관리")
+    parser.add_argument("command", choices=["rebuild"], help="rebuild: 트리거 생성 후 집계 테이블 재계산")
+    parser.parse_args()
+
+    from app.db.session import engine
+
+    SalesHourlyOrder.__table__.create(bind=engine, checkfirst=True)
+    SalesHourlyItem.__table__.create(bind=engine, checkfirst=True)
+    with engine.begin() as conn:
+        create_sales_rollup_triggers(conn)
+        rebuild_sales_rollups(conn)
+        orders = conn.execute(text("SELECT count(*) FROM sales_hourly_orders")).scalar()
+        items = conn.execute(text("SELECT count(*) FROM sales_hourly_items")).scalar()
+    print(f"집계 재생성 완료: sales_hourly_orders={orders}행, sales_hourly_items={items}행")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+주문 결제/취소 -> 재료 재고 자동 차감/복원
+
+주문이 결제(paid)되면 주문 항목 x menu_ingredients 로 재료 소비량을 계산해 재고에서 빼고,
+취소/환불되면 그 주문으로 뺀 양을 그대로 되돌립니다.
+
+- 트랜잭션 안에서 상태가 바뀐 주문 ID 를 모아 두었다가 커밋 직전에 한 번에 처리
+  (writer 큐 group commit 이면 같은 배치의 주문 전체가 한 번에 처리됨)
+- 쿼리 1: 대상 주문의 현재 상태
+- 쿼리 2: 주문별로 이미 반영된 재고 변동 (inventory_transactions.order_id 합계)
+- 쿼리 3: 새로 차감할 주문의 재료 소비량 (order_items JOIN menu_ingredients, 주문 x 재료 GROUP BY)
+- InventoryTransaction 행을 executemany INSERT 한 번으로 기록
+- 재료별로 합산한 증감량을 executemany UPDATE 한 번으로 반영 (재료마다 UPDATE 문 1개)
+- 쿼리 4: 바뀐 재료의 재고 상태 확인, 부족/재고 없음으로 넘어가면 stock.low 등록 (app/services/stock_levels.py)
+
+주문별 변동 합계를 기준으로 "차감된 상태/복원된 상태"를 맞추므로 같은 주문을 여러 번 처리해도
+중복 차감되지 않고, 복원은 레시피가 그 사이 바뀌었어도 실제로 뺀 양만큼만 되돌립니다.
+선택 재료(is_optional)는 주문마다 사용 여부를 알 수 없어 차감하지 않으며,
+결제는 이미 끝난 뒤이므로 재고가 부족해도 막지 않습니다 (음수 재고는 판매 불가로 표시됨).
+
+raw SQL 로 주문 상태를 바꾸는 코드는 커밋 전에 track_order_stock() 을 호출합니다.
+재고 테이블이 없는 DB(주문만 다루는 도구/테스트 DB 등)에서는 아무것도 하지 않습니다. (엔진별로 한 번 확인)
+"""
+import weakref
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import bindparam, event, func, inspect, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.core.events import STOCK_CHANGED, stage_event
+from app.models.inventory import IngredientStock, InventoryTransaction, MenuIngredient
+from app.models.order import Order, OrderItem
+from app.services.stock_levels import stage_threshold_crossings
+
+ORDER_DEDUCTION = "주문출고"
+ORDER_RESTORE = "주문취소"
+ORDER_TRANSACTION_TYPES = (ORDER_DEDUCTION, ORDER_RESTORE)
+
+# 재고가 차감되어 있어야 하는 상태 / 되돌려져 있어야 하는 상태 (그 외: pending 등은 그대로 둠)
+CONSUMING_STATUSES = {"paid", "preparing", "ready", "completed"}
+RELEASING_STATUSES = {"cancelled", "refunded", "failed", "payment_failed"}
+
+# 부동소수점 합계 오차 허용치
+EPSILON = 1e-9
+
+_TRACKED_KEY = "stock_deduction_orders"
+
+# 재고 차감에 필요한 테이블과 엔진별 확인 결과
+REQUIRED_TABLES = {"menu_ingredients", "ingredient_stocks", "inventory_transactions"}
+_enabled_engines: "weakref.WeakKeyDictionary[Engine, bool]" = weakref.WeakKeyDictionary()
+
+
+def inventory_enabled(conn: Connection) -> bool:
+    """재고 테이블이 있는 DB 인지 (엔진별로 처음 한 번만 스키마 확인)"""
+    enabled = _enabled_engines.get(conn.engine)
+    if enabled is None:
+        enabled = REQUIRED_TABLES <= set(inspect(conn).get_table_names())
+        _enabled_engines[conn.engine] = enabled
+    return enabled
+
+
+def target_state(status: Optional[str], is_refunded: bool = False) -> Optional[bool]:
+    """True: 차감되어 있어야 함, False: 복원되어 있어야 함, None: 변경 없음"""
+    status = (status or "").lower()
+    if is_refunded or status in RELEASING_STATUSES:
+        return False
+    if status in CONSUMING_STATUSES:
+        return True
+    return None
+
+
+def _applied(conn: Connection, order_ids: List[int]) -> Dict[int, Dict[int, float]]:
+    """주문별, 재료별로 이미 반영된 재고 변동 합계 (차감은 음수)"""
+    tx = InventoryTransaction.__table__
+    rows = conn.execute(
+        select(tx.c.order_id, tx.c.ingredient_id, func.sum(tx.c.quantity))
+        .where(tx.c.order_id.in_(order_ids), tx.c.transaction_type.in_(ORDER_TRANSACTION_TYPES))
+        .group_by(tx.c.order_id, tx.c.ingredient_id)
+    )
+    applied: Dict[int, Dict[int, float]] = defaultdict(dict)
+    for order_id, ingredient_id, quantity in rows:
+        if abs(quantity or 0) > EPSILON:
+            applied[order_id][ingredient_id] = quantity
+    return applied
+
+
+def _consumption(conn: Connection, order_ids: List[int]) -> Dict[int, Dict[int, float]]:
+    """주문별, 재료별 소비량 (주문 수량 x 메뉴 1개당 필요량, 필수 재료만)"""
+    oi = OrderItem.__table__
+    mi = MenuIngredient.__table__
+    rows = conn.execute(
+        select(oi.c.order_id, mi.c.ingredient_id, func.sum(oi.c.quantity * mi.c.quantity_required))
+        .join(mi, mi.c.menu_id == oi.c.menu_id)
+        .where(oi.c.order_id.in_(order_ids), func.coalesce(mi.c.is_optional, False) == False)  # noqa: E712
+        .group_by(oi.c.order_id, mi.c.ingredient_id)
+    )
+    consumption: Dict[int, Dict[int, float]] = defaultdict(dict)
+    for order_id, ingredient_id, quantity in rows:
+        if quantity:
+            consumption[order_id][ingredient_id] = quantity
+    return consumption
+
+
+def sync_order_stock(conn: Connection, targets: Dict[int, bool], created_by: str = "system") -> Dict[int, float]:
+    """
+    주문별 목표 상태(True: 차감, False: 복원)에 맞게 재고 변동을 한 번에 기록
+
+    Returns:
+        재료 ID -> 재고 증감량 (바뀐 재료만)
+    """
+    if not targets:
+        return {}
+    applied = _applied(conn, list(targets))
+    deduct = [order_id for order_id, consume in targets.items() if consume and order_id not in applied]
+    consumption = _consumption(conn, deduct) if deduct else {}
+
+    rows = []
+    for order_id in deduct:
+        for ingredient_id, quantity in consumption.get(order_id, {}).items():
+            rows.append({"ingredient_id": ingredient_id, "transaction_type": ORDER_DEDUCTION,
+                         "quantity": -quantity, "notes": "주문 결제", "order_id": order_id})
+    for order_id, consume in targets.items():
+        if not consume:
+            for ingredient_id, quantity in applied.get(order_id, {}).items():
+                rows.append({"ingredient_id": ingredient_id, "transaction_type": ORDER_RESTORE,
+                             "quantity": -quantity, "notes": "주문 취소/환불", "order_id": order_id})
+    if not rows:
+        return {}
+
+    deltas: Dict[int, float] = defaultdict(float)
+    for row in rows:
+        row["created_by"] = created_by
+        deltas[row["ingredient_id"]] += row["quantity"]
+    deltas = {ingredient_id: delta for ingredient_id, delta in deltas.items() if abs(delta) > EPSILON}
+
+    conn.execute(InventoryTransaction.__table__.insert(), rows)
+    if deltas:
+        stocks = IngredientStock.__table__
+        conn.execute(
+            update(stocks)
+            .where(stocks.c.ingredient_id == bindparam("b_ingredient_id"))
+            .values(current_quantity=stocks.c.current_quantity + bindparam("b_delta")),
+            [{"b_ingredient_id": ingredient_id, "b_delta": delta} for ingredient_id, delta in deltas.items()],
+        )
+    return deltas
+
+
+def track_order_stock(session: Session, order_ids: Iterable[int]) -> None:
+    """커밋 직전에 재고를 맞출 주문 등록 (raw SQL 상태 변경용)"""
+    session.info.setdefault(_TRACKED_KEY, set()).update(order_ids)
+
+
+def apply_tracked_orders(session: Session) -> Dict[int, float]:
+    """등록된 주문들의 현재 상태를 읽어 재고 차감/복원을 한 번에 반영하고 stock.changed 등록"""
+    order_ids = session.info.pop(_TRACKED_KEY, None)
+    if not order_ids:
+        return {}
+    conn = session.connection()
+    if not inventory_enabled(conn):
+        return {}
+    orders = Order.__table__
+    rows = conn.execute(
+        select(orders.c.id, orders.c.status, orders.c.is_refunded).where(orders.c.id.in_(order_ids))
+    )
+    targets = {}
+    for order_id, status, is_refunded in rows:
+        state = target_state(status, bool(is_refunded))
+        if state is not None:
+            targets[order_id] = state
+    deltas = sync_order_stock(conn, targets)
+    if deltas:
+        stage_event(session, STOCK_CHANGED, {
+            "ingredient_ids": sorted(deltas),
+            "order_ids": sorted(targets),
+            "source": "order",
+        })
+        stage_threshold_crossings(session, deltas)
+    return deltas
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_orders(session: Session, flush_context) -> None:
+    order_ids = []
+    for obj in session.new:
+        if isinstance(obj, Order) and target_state(obj.status, bool(obj.is_refunded)) is not None:
+            order_ids.append(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Order):
+            state = inspect(obj).attrs
+            if state.status.history.has_changes() or state.is_refunded.history.has_changes():
+                order_ids.append(obj.id)
+    if order_ids:
+        track_order_stock(session, order_ids)
+
+
+@event.listens_for(Session, "before_commit")
+def _apply_before_commit(session: Session) -> None:
+    # 세이브포인트 커밋(writer 큐의 작업 단위)은 건너뛰고 바깥 트랜잭션 커밋에서 한 번에 처리
+    if session.in_nested_transaction():
+        return
+    # before_commit 은 커밋 시 flush 보다 먼저 호출되므로 남은 변경을 먼저 flush 해 주문을 모음
+    if session.new or session.dirty or session.deleted:
+        session.flush()
+    if _TRACKED_KEY in session.info:
+        apply_tracked_orders(session)
@@ -0,0 +1,389 @@
+"""
+재료 재고 소진 예측과 동적 발주점(reorder point) 계산
+
+재고 대시보드/재고 알림은 현재 재고를 고정된 min_stock_level 과만 비교했습니다.
+여기서는 최근 소비 이력에서 재료별 소비 속도를 구하고, 요일 x 시간대 계절성을 반영해
+모든 재료의 소진 예상 시각과 발주점을 한 번에(NumPy 행렬 연산) 계산합니다.
+
+소비 이력 (재료 x 로컬 시간 단위, 희소 좌표로 메모리에 보관):
+- inventory_transactions: 출고, 폐기, 주문출고(주문취소 차감)
+- order_items x menu_ingredients: 원장에 주문 차감 기록이 없는 과거 결제 주문 (자동 차감 도입 이전)
+
+예측:
+- 시간대 프로필 = α x (요일, 시각) 평균 + (1 - α) x 시각 평균  (α = 이력 주 수 / (이력 주 수 + 1))
+- 앞으로의 시간별 소비량 누적합이 현재 재고를 넘는 시점 = 소진 예상 시각
+- 발주점 = 리드타임 동안 예상 소비량 + 안전 재고 (z x 일 소비량 표준편차 x sqrt(리드타임 일수))
+
+캐시:
+- 처음 한 번 이력 기간 전체를 읽고, 이후에는 마지막으로 읽은 트랜잭션 ID 이후만 읽어 이력에 더함
+- stock.changed 이벤트(다른 워커 포함)를 받거나 시간이 바뀌면 다음 조회 때 증분 갱신 후 다시 계산
+- 변경이 없으면 계산 결과를 그대로 반환 (쿼리 없음)
+
+시각은 주문 created_at 과 같은 KST 로컬 시각 기준이며, UTC 로 기록되는 트랜잭션 시각은 변환해서 사용합니다.
+NumPy가 설치되지 않은 환경에서는 같은 계산을 파이썬 루프로 수행합니다.
+"""
+import logging
+import math
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import exists, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import STOCK_CHANGED, event_bus
+from app.models.inventory import Ingredient, IngredientStock, InventoryTransaction, MenuIngredient
+from app.models.order import Order, OrderItem
+from app.services.inventory_ledger import consumed_expr
+from app.services.stock_deduction import CONSUMING_STATUSES
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 미설치 시 파이썬 계산 경로 사용
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# 트랜잭션 created_at(UTC) -> 로컬(KST) 시각
+LOCAL_OFFSET = timedelta(hours=9)
+HOUR_FORMAT = "%Y-%m-%d %H:00:00"
+EPOCH = datetime(1970, 1, 1)
+WEEK_HOURS = 168
+# 1970-01-01 은 목요일: 시간 ID h 의 (요일 x 24 + 시) 슬롯 = (h + 72) % 168 (월요일 0시 = 0)
+WEEK_SLOT_OFFSET = 72
+
+
+def hour_id(value: datetime) -> int:
+    """로컬 시각 -> 1970-01-01 0시부터의 시간 수"""
+    return int((value - EPOCH).total_seconds() // 3600)
+
+
+def hour_start(value: int) -> datetime:
+    return EPOCH + timedelta(hours=value)
+
+
+def _parse_hour(value: str) -> int:
+    return hour_id(datetime.strptime(value, HOUR_FORMAT))
+
+
+def local_now() -> datetime:
+    return datetime.utcnow() + LOCAL_OFFSET
+
+
+class StockForecaster:
+    """재료별 소비 이력(희소 좌표)과 마지막 예측 결과 캐시"""
+
+    def __init__(
+        self,
+        history_days: Optional[int] = None,
+        horizon_days: Optional[int] = None,
+        clock: Callable[[], datetime] = local_now,
+    ):
+        self.history_days = history_days or settings.STOCK_FORECAST_HISTORY_DAYS
+        self.horizon_days = horizon_days or settings.STOCK_FORECAST_HORIZON_DAYS
+        self.clock = clock
+        self._cells: Dict[Tuple[int, int], float] = defaultdict(float)  # (재료 ID, 시간 ID) -> 소비량
+        self._last_transaction_id = 0
+        self._loaded = False
+        self._dirty = True
+        self._result: Optional[Dict[int, Dict[str, Any]]] = None
+        self._result_hour: Optional[int] = None
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.refreshes = 0
+        self.computes = 0
+
+    def invalidate(self) -> None:
+        """재고/원장이 바뀌었으니 다음 조회 때 증분 갱신"""
+        self._dirty = True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._cells.clear()
+            self._last_transaction_id = 0
+            self._loaded = False
+            self._dirty = True
+            self._result = None
+
+    # --- 이력 적재 ---
+
+    def _window_start(self, now_hour: int) -> int:
+        return now_hour - self.history_days * 24
+
+    def _add_rows(self, rows) -> None:
+        for ingredient_id, bucket, amount in rows:
+            if amount:
+                self._cells[(ingredient_id, _parse_hour(bucket))] += amount
+
+    def _load(self, db: Session, now_hour: int) -> None:
+        """이력 기간 전체: 트랜잭션 1회 + 원장 기록이 없는 결제 주문 1회"""
+        since = hour_start(self._window_start(now_hour))
+        tx = InventoryTransaction.__table__
+        self._last_transaction_id = db.execute(select(func.coalesce(func.max(tx.c.id), 0))).scalar()
+        tx_hour = func.strftime(HOUR_FORMAT, tx.c.created_at, "+9 hours")
+        self._add_rows(db.execute(
+            select(tx.c.ingredient_id, tx_hour, func.sum(consumed_expr()))
+            .where(tx.c.created_at >= since - LOCAL_OFFSET, tx.c.id <= self._last_transaction_id)
+            .group_by(tx.c.ingredient_id, tx_hour)
+        ))
+
+        orders, oi, mi = Order.__table__, OrderItem.__table__, MenuIngredient.__table__
+        order_hour = func.strftime(HOUR_FORMAT, orders.c.created_at)
+        self._add_rows(db.execute(
+            select(mi.c.ingredient_id, order_hour, func.sum(oi.c.quantity * mi.c.quantity_required))
+            .select_from(oi.join(orders, orders.c.id == oi.c.order_id).join(mi, mi.c.menu_id == oi.c.menu_id))
+            .where(
+                orders.c.created_at >= since,
+                func.lower(orders.c.status).in_(CONSUMING_STATUSES),
+                func.coalesce(orders.c.is_refunded, False) == False,  # noqa: E712
+                func.coalesce(mi.c.is_optional, False) == False,  # noqa: E712
+                ~exists().where(tx.c.order_id == orders.c.id),
+            )
+            .group_by(mi.c.ingredient_id, order_hour)
+        ))
+        self._loaded = True
+        self.loads += 1
+
+    def _refresh(self, db: Session, now_hour: int) -> None:
+        """마지막으로 읽은 트랜잭션 이후만 읽어 이력에 더하고, 기간을 벗어난 칸은 정리"""
+        tx = InventoryTransaction.__table__
+        rows = db.execute(
+            select(tx.c.id, tx.c.ingredient_id, func.strftime(HOUR_FORMAT, tx.c.created_at, "+9 hours"),
+                   consumed_expr())
+            .where(tx.c.id > self._last_transaction_id)
+        ).all()
+        for transaction_id, ingredient_id, bucket, amount in rows:
+            self._last_transaction_id = max(self._last_transaction_id, transaction_id)
+            if amount:
+                self._cells[(ingredient_id, _parse_hour(bucket))] += amount
+        start = self._window_start(now_hour)
+        for key in [key for key in self._cells if key[1] < start]:
+            del self._cells[key]
+        self.refreshes += 1
+
+    @staticmethod
+    def _stock_rows(db: Session):
+        return db.execute(
+            select(Ingredient.id, Ingredient.name, Ingredient.unit, Ingredient.min_stock_level,
+                   IngredientStock.current_quantity)
+            .outerjoin(IngredientStock, IngredientStock.ingredient_id == Ingredient.id)
+            .where(Ingredient.is_active == True)  # noqa: E712
+            .order_by(Ingredient.id)
+        ).all()
+
+    # --- 예측 ---
+
+    def forecast(self, db: Session) -> Dict[int, Dict[str, Any]]:
+        """활성 재료별 예측 결과 {ingredient_id: {...}} (변경이 없으면 캐시 반환)"""
+        now = self.clock()
+        now_hour = hour_id(now)
+        with self._lock:
+            if self._result is not None and not self._dirty and self._result_hour == now_hour:
+                return self._result
+            self._dirty = False
+            if not self._loaded:
+                self._load(db, now_hour)
+            else:
+                self._refresh(db, now_hour)
+            rows = self._stock_rows(db)
+            compute = _compute_numpy if np is not None else _compute_python
+            self._result = compute(self._history(now_hour), rows, now, self._params())
+            self._result_hour = now_hour
+            self.computes += 1
+            return self._result
+
+    def _history(self, now_hour: int) -> Tuple[int, int, List[Tuple[int, int, float]]]:
+        start = self._window_start(now_hour)
+        cells = [(i, h - start, v) for (i, h), v in self._cells.items() if start <= h < now_hour]
+        return start, now_hour - start, cells
+
+    def _params(self) -> Dict[str, float]:
+        return {
+            "horizon_hours": self.horizon_days * 24,
+            "lead_hours": int(round(settings.STOCK_REORDER_LEAD_TIME_DAYS * 24)),
+            "lead_days": settings.STOCK_REORDER_LEAD_TIME_DAYS,
+            "z": settings.STOCK_REORDER_SERVICE_Z,
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "loaded": self._loaded,
+            "cells": len(self._cells),
+            "last_transaction_id": self._last_transaction_id,
+            "loads": self.loads,
+            "refreshes": self.refreshes,
+            "computes": self.computes,
+        }
+
+
+def _result_row(row, now: datetime, hours_left: Optional[float], daily_mean: float, hourly_now: float,
+                lead_demand: float, safety: float) -> Dict[str, Any]:
+    current = float(row.current_quantity or 0)
+    reorder_point = lead_demand + safety
+    stockout_at = None
+    if hours_left is not None:
+        stockout_at = (now + timedelta(hours=hours_left)).replace(microsecond=0)
+    return {
+        "ingredient_id": row.id,
+        "ingredient_name": row.name,
+        "unit": row.unit,
+        "current_quantity": current,
+        "min_stock_level": float(row.min_stock_level or 0),
+        "daily_consumption": round(daily_mean, 4),
+        "hourly_rate_now": round(hourly_now, 4),
+        "hours_until_stockout": round(hours_left, 2) if hours_left is not None else None,
+        "predicted_stockout_at": stockout_at,
+        "safety_stock": round(safety, 4),
+        "reorder_point": round(reorder_point, 4),
+        "needs_reorder": current <= reorder_point and reorder_point > 0,
+    }
+
+
+def demand_weight(now: datetime) -> float:
+    """현재 시간 중 남은 비율"""
+    return 1 - (now.minute * 60 + now.second) / 3600
+
+
+def _compute_numpy(history, stock_rows, now: datetime, params) -> Dict[int, Dict[str, Any]]:
+    """모든 재료를 행렬로 한 번에 계산 (재료 x 시간)"""
+    start, hours, cells = history
+    ids = [row.id for row in stock_rows]
+    index = {ingredient_id: i for i, ingredient_id in enumerate(ids)}
+    n = len(ids)
+    if n == 0:
+        return {}
+
+    # 이력 행렬 C[재료, 시간]
+    matrix = np.zeros((n, hours))
+    cells = [(index[i], h, v) for i, h, v in cells if i in index]
+    if cells:
+        rows, cols, values = (np.array(c) for c in zip(*cells))
+        np.add.at(matrix, (rows.astype(np.int64), cols.astype(np.int64)), values.astype(np.float64))
+
+    # 요일 x 시각 / 시각 평균 프로필
+    hour_ids = start + np.arange(hours)
+    week_slot = (hour_ids + WEEK_SLOT_OFFSET) % WEEK_HOURS
+    day_slot = hour_ids % 24
+    weekly = _slot_mean(matrix, week_slot, WEEK_HOURS)
+    daily_profile = _slot_mean(matrix, day_slot, 24)
+    weeks = hours / WEEK_HOURS
+    alpha = weeks / (weeks + 1)
+
+    horizon = params["horizon_hours"]
+    now_hour = start + hours
+    future = now_hour + np.arange(horizon)
+    demand = alpha * weekly[:, (future + WEEK_SLOT_OFFSET) % WEEK_HOURS] + (1 - alpha) * daily_profile[:, future % 24]
+    # 현재 시각이 속한 시간은 남은 부분만
+    weight = demand_weight(now)
+    first_rate = demand[:, 0].copy()
+    demand[:, 0] *= weight
+    cumulative = np.cumsum(demand, axis=1)
+
+    stock = np.array([float(row.current_quantity or 0) for row in stock_rows])
+    reached = cumulative >= stock[:, None]
+    will_run_out = reached.any(axis=1) & (cumulative[:, -1] > 0)
+    first = np.argmax(reached, axis=1)
+    before = np.where(first > 0, cumulative[np.arange(n), np.maximum(first - 1, 0)], 0.0)
+    step = demand[np.arange(n), first]
+    fraction = np.divide(stock - before, step, out=np.zeros(n), where=step > 0)
+    # 첫 칸은 남은 weight 시간, 이후 칸은 1시간
+    fraction = np.clip(fraction, 0, 1)
+    hours_left = np.where(first > 0, weight + (first - 1) + fraction, fraction * weight)
+    hours_left = np.where(stock <= 0, 0.0, hours_left)
+
+    # 일 소비량 (이력을 24시간 단위로 묶음)
+    days = max(hours // 24, 1)
+    daily_totals = matrix[:, hours - days * 24:].reshape(n, days, 24).sum(axis=2)
+    daily_mean = daily_totals.mean(axis=1)
+    daily_std = daily_totals.std(axis=1, ddof=1) if days > 1 else np.zeros(n)
+    lead = min(params["lead_hours"], horizon)
+    lead_demand = cumulative[:, lead - 1] if lead > 0 else np.zeros(n)
+    safety = params["z"] * daily_std * math.sqrt(params["lead_days"])
+
+    return {
+        ids[i]: _result_row(
+            stock_rows[i], now,
+            float(max(hours_left[i], 0.0)) if will_run_out[i] or stock[i] <= 0 else None,
+            float(daily_mean[i]), float(first_rate[i]),
+            float(lead_demand[i]), float(safety[i]),
+        )
+        for i in range(n)
+    }
+
+
+def _slot_mean(matrix, slots, size: int):
+    """시간 열을 슬롯(요일 x 시각 또는 시각)별로 평균 -> (재료, 슬롯)"""
+    counts = np.bincount(slots, minlength=size).astype(np.float64)
+    one_hot = np.zeros((len(slots), size))
+    one_hot[np.arange(len(slots)), slots] = 1.0
+    sums = matrix @ one_hot
+    return np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+
+
+def _compute_python(history, stock_rows, now: datetime, params) -> Dict[int, Dict[str, Any]]:
+    """NumPy가 없을 때: 같은 계산을 재료별 파이썬 루프로"""
+    start, hours, cells = history
+    by_ingredient: Dict[int, Dict[int, float]] = defaultdict(lambda: defaultdict(float))
+    for ingredient_id, offset, value in cells:
+        by_ingredient[ingredient_id][offset] += value
+
+    week_counts = [0] * WEEK_HOURS
+    day_counts = [0] * 24
+    for offset in range(hours):
+        week_counts[(start + offset + WEEK_SLOT_OFFSET) % WEEK_HOURS] += 1
+        day_counts[(start + offset) % 24] += 1
+    weeks = hours / WEEK_HOURS
+    alpha = weeks / (weeks + 1)
+    now_hour = start + hours
+    horizon = params["horizon_hours"]
+    lead = min(params["lead_hours"], horizon)
+    days = max(hours // 24, 1)
+    weight = demand_weight(now)
+
+    result = {}
+    for row in stock_rows:
+        history_row = by_ingredient.get(row.id, {})
+        week_sums = [0.0] * WEEK_HOURS
+        day_sums = [0.0] * 24
+        daily_totals = [0.0] * days
+        for offset, value in history_row.items():
+            week_sums[(start + offset + WEEK_SLOT_OFFSET) % WEEK_HOURS] += value
+            day_sums[(start + offset) % 24] += value
+            day_index = offset - (hours - days * 24)
+            if day_index >= 0:
+                daily_totals[day_index // 24] += value
+
+        stock = float(row.current_quantity or 0)
+        cumulative, lead_demand, hours_left, first_demand = 0.0, 0.0, None, 0.0
+        for k in range(horizon):
+            h = now_hour + k
+            w, d = (h + WEEK_SLOT_OFFSET) % WEEK_HOURS, h % 24
+            demand = (alpha * (week_sums[w] / week_counts[w] if week_counts[w] else 0.0)
+                      + (1 - alpha) * (day_sums[d] / day_counts[d] if day_counts[d] else 0.0))
+            if k == 0:
+                first_demand = demand
+                demand *= weight
+            previous = cumulative
+            cumulative += demand
+            if k == lead - 1:
+                lead_demand = cumulative
+            if hours_left is None and stock > 0 and cumulative >= stock and cumulative > 0:
+                fraction = min(max((stock - previous) / demand if demand > 0 else 0.0, 0.0), 1.0)
+                hours_left = weight + (k - 1) + fraction if k > 0 else fraction * weight
+        if stock <= 0:
+            hours_left = 0.0
+
+        mean = sum(daily_totals) / days
+        std = math.sqrt(sum((x - mean) ** 2 for x in daily_totals) / (days - 1)) if days > 1 else 0.0
+        safety = params["z"] * std * math.sqrt(params["lead_days"])
+        result[row.id] = _result_row(row, now, max(hours_left, 0.0) if hours_left is not None else None,
+                                     mean, first_demand, lead_demand, safety)
+    return result
+
+
+stock_forecaster = StockForecaster()
+
+# 재고/원장 변경(주문 차감, 입출고, 다른 워커 변경 포함)이 커밋되면 다음 조회 때 증분 갱신
+event_bus.subscribe(STOCK_CHANGED, lambda event: stock_forecaster.invalidate())
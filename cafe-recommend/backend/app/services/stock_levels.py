@@ -0,0 +1,129 @@
+"""
+재료 재고 상태(재고 없음 / 부족 / 충분) 조회와 기준선 통과 감지
+
+재고 대시보드, 재고 목록, 재고 알림은 활성 재료마다 IngredientStock 을 따로 조회했습니다.
+여기서는 재료 LEFT JOIN 재고 한 번으로 상태를 SQL 에서 계산해 구간별 행과 개수를 바로 돌려줍니다.
+
+- 재고 없음(out): 재고 행이 없거나 수량 <= 0
+- 부족(low): 수량 < min_stock_level
+- 충분(ok): 그 외
+
+재고가 바뀔 때(ORM 수정, 주문 결제 일괄 차감) 바뀐 재료만 한 번 조회해 상태가 나빠진 경우
+(충분 -> 부족, 충분/부족 -> 재고 없음) stock.low 이벤트를 커밋 후 발행합니다.
+관리자 알림은 주기적으로 전체를 다시 훑지 않고 이 이벤트로 저장/푸시됩니다.
+"""
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.core.events import STOCK_LOW, stage_event
+from app.models.inventory import Ingredient, IngredientStock
+
+OUT = "out"
+LOW = "low"
+OK = "ok"
+
+# 상태가 나쁜 순서 (값이 클수록 나쁨)
+SEVERITY_ORDER = {OK: 0, LOW: 1, OUT: 2}
+SEVERITY = {LOW: "medium", OUT: "high"}
+LABELS = {OUT: "재고 없음", LOW: "부족", OK: "충분"}
+
+
+def stock_status(quantity: Optional[float], min_stock_level: Optional[float]) -> str:
+    """재고 수량 -> 상태 (재고 행이 없으면 quantity=None)"""
+    if quantity is None or quantity <= 0:
+        return OUT
+    if quantity < (min_stock_level or 0):
+        return LOW
+    return OK
+
+
+def status_expr():
+    """stock_status 와 같은 기준의 SQL 식 (재료 LEFT JOIN 재고)"""
+    return case(
+        (IngredientStock.id.is_(None), OUT),
+        (IngredientStock.current_quantity <= 0, OUT),
+        (IngredientStock.current_quantity < func.coalesce(Ingredient.min_stock_level, 0), LOW),
+        else_=OK,
+    )
+
+
+def _stock_query(statuses=None):
+    status = status_expr().label("status")
+    query = (
+        select(
+            Ingredient.id, Ingredient.name, Ingredient.description, Ingredient.unit, Ingredient.min_stock_level,
+            Ingredient.is_active, Ingredient.created_at, Ingredient.updated_at,
+            func.coalesce(IngredientStock.current_quantity, 0).label("current_quantity"),
+            status,
+        )
+        .outerjoin(IngredientStock, IngredientStock.ingredient_id == Ingredient.id)
+        .where(Ingredient.is_active == True)  # noqa: E712
+        .order_by(Ingredient.id)
+    )
+    if statuses:
+        query = query.where(status.in_(statuses))
+    return query
+
+
+def stock_levels(db: Session, statuses=None) -> List[Dict[str, Any]]:
+    """활성 재료별 재고와 상태 (statuses 를 주면 해당 상태만)"""
+    return [dict(row._mapping) for row in db.execute(_stock_query(statuses))]
+
+
+def stock_overview(db: Session) -> Dict[str, Any]:
+    """
+    대시보드용 요약: 쿼리 한 번으로 상태별 개수, 재고 합계, 경고 행(재고 없음/부족)
+
+    Returns:
+        {"total", "counts": {out, low, ok}, "total_quantity", "alerts": [...]}
+    """
+    counts = {OUT: 0, LOW: 0, OK: 0}
+    total_quantity = 0.0
+    alerts = []
+    for row in stock_levels(db):
+        counts[row["status"]] += 1
+        total_quantity += row["current_quantity"] or 0
+        if row["status"] != OK:
+            alerts.append(row)
+    return {"total": sum(counts.values()), "counts": counts, "total_quantity": total_quantity, "alerts": alerts}
+
+
+def stage_threshold_crossings(session: Session, deltas: Dict[int, float]) -> List[Dict[str, Any]]:
+    """
+    재고가 바뀐 재료들의 이전/현재 상태를 비교해 나빠진 경우 stock.low 이벤트 등록
+
+    Args:
+        deltas: 재료 ID -> 이번 변경의 증감량 (이미 DB 에 반영된 뒤 호출, 이전 수량 = 현재 - 증감량)
+    """
+    changed = {ingredient_id: delta for ingredient_id, delta in deltas.items() if delta}
+    if not changed:
+        return []
+    rows = session.connection().execute(
+        select(Ingredient.id, Ingredient.name, Ingredient.unit, Ingredient.min_stock_level,
+               IngredientStock.current_quantity)
+        .join(IngredientStock, IngredientStock.ingredient_id == Ingredient.id)
+        .where(Ingredient.id.in_(changed), Ingredient.is_active == True)  # noqa: E712
+    )
+    crossings = []
+    for ingredient_id, name, unit, min_stock_level, quantity in rows:
+        previous = quantity - changed[ingredient_id]
+        before, after = stock_status(previous, min_stock_level), stock_status(quantity, min_stock_level)
+        if SEVERITY_ORDER[after] <= SEVERITY_ORDER[before]:
+            continue
+        alert = {
+            "type": "stock_low",
+            "ingredient_id": ingredient_id,
+            "ingredient_name": name,
+            "unit": unit,
+            "current_quantity": quantity,
+            "previous_quantity": previous,
+            "min_stock_level": min_stock_level,
+            "status": after,
+            "previous_status": before,
+            "severity": SEVERITY[after],
+        }
+        stage_event(session, STOCK_LOW, alert)
+        crossings.append(alert)
+    return crossings
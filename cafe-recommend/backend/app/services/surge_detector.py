@@ -0,0 +1,409 @@
+"""
+주문 급증/이상 패턴 스트리밍 감지기
+
+/api/admin/alerts 의 order-surge, unusual-order-patterns 는 호출할 때마다 DB 를 다시
+집계합니다. 이 모듈은 주문 생성 이벤트를 받아 감지 상태를 메모리에서 점진적으로 갱신하고,
+임계값을 넘는 순간(상태가 바뀌는 순간) 등록된 리스너(관리자 알림 WebSocket)로 푸시합니다.
+
+- 분 단위 슬라이딩 윈도우: 최근 2W 분의 분별 주문 수를 링 버퍼(array('i'))에 저장하고
+  최근 W 분/이전 W 분 합계를 분이 넘어갈 때마다 증분 갱신
+- EWMA 기준선: 분이 닫힐 때마다 분당 주문 수의 지수 이동 평균/분산 갱신
+- 계절성 기준선: 요일x시간(168칸) 별 시간당 주문 수의 EWMA 평균/분산(array('d'))과 표본 수
+- 급증: 최근 W 분 주문 수 >= SURGE_MIN_ORDERS 이고
+  max(이전 W 분, EWMA 기준선, 같은 요일/시간대 기준선) 의 SURGE_RATIO 배 초과
+  (해제는 기준선 이하로 내려왔을 때)
+- 이상 패턴: 현재 시간의 주문 수가 같은 요일/시간대 평균 ± z·표준편차를 벗어남
+  (높음은 주문마다, 낮음은 시간이 닫힐 때 판정. 표준편차 하한은 포아송 sqrt(평균))
+
+snapshot() 은 DB 를 읽지 않고, 먼저 tick() 으로 마지막 갱신 이후의 시간을 진행시킨 뒤 상태를 읽습니다.
+진행 비용은 경과한 분/시간에 비례하며 최대 MAX_IDLE_MINUTES 번의 EWMA 갱신 + 168 시간 닫기로 제한됩니다.
+(run_ticker 가 1분마다 진행시키므로 평소에는 1분 이하) 주문 시각은 orders.created_at 과 같은 한국 시간(naive) 기준입니다.
+
+주문 이벤트는 이벤트 버스의 order.created 토픽을 구독해 받습니다.
+"""
+import asyncio
+import logging
+import math
+import threading
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+import pytz
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import ORDER_CREATED, event_bus
+from app.services import order_events  # noqa: F401 (주문 ORM 변경 -> 이벤트 발행 훅 등록)
+from app.services.time_buckets import bucket_orders, count_orders_in_windows
+
+logger = logging.getLogger(__name__)
+
+KST = pytz.timezone("Asia/Seoul")
+EPOCH = datetime(1970, 1, 1)  # 목요일
+HOURS_PER_WEEK = 168
+MAX_IDLE_MINUTES = 1440  # EWMA 에 반영할 최대 빈 분 수 (그 이상은 기준선이 사실상 0)
+
+Listener = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def kst_now() -> datetime:
+    """orders.created_at 과 같은 형식의 현재 시각 (한국 시간, tzinfo 없음)"""
+    return datetime.now(KST).replace(tzinfo=None)
+
+
+def _as_kst_naive(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        return value.astimezone(KST).replace(tzinfo=None)
+    return value
+
+
+def _minute_id(value: datetime) -> int:
+    return int((value - EPOCH).total_seconds() // 60)
+
+
+def _hour_of_week(hour_id: int) -> int:
+    """1970-01-01(목요일) 기준 시간 번호 -> 월요일 0시 기준 요일x시간 칸"""
+    day, hour = divmod(hour_id, 24)
+    return ((day + 3) % 7) * 24 + hour
+
+
+def _minute_to_datetime(minute_id: int) -> datetime:
+    return EPOCH + timedelta(minutes=minute_id)
+
+
+class OrderSurgeDetector:
+    """주문 생성 이벤트 기반 급증/이상 패턴 감지기"""
+
+    def __init__(
+        self,
+        window_minutes: int = 30,
+        surge_min_orders: int = 10,
+        surge_ratio: float = 1.5,
+        anomaly_z: float = 2.0,
+        ewma_alpha: float = 0.05,
+        seasonal_beta: float = 0.2,
+        min_seasonal_samples: int = 3,
+        clock: Callable[[], datetime] = kst_now,
+    ):
+        if window_minutes < 1:
+            raise ValueError("window_minutes 는 1 이상이어야 합니다.")
+        self.window_minutes = window_minutes
+        self.surge_min_orders = surge_min_orders
+        self.surge_ratio = surge_ratio
+        self.anomaly_z = anomaly_z
+        self.ewma_alpha = ewma_alpha
+        self.seasonal_beta = seasonal_beta
+        self.min_seasonal_samples = min_seasonal_samples
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._listeners: List[Listener] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reset_state()
+
+    def _reset_state(self) -> None:
+        size = 2 * self.window_minutes
+        self._ring = array("i", [0] * size)
+        self._minute: Optional[int] = None  # 링 버퍼의 마지막(현재) 분 번호
+        self._recent = 0  # (minute - W, minute] 주문 수
+        self._previous = 0  # (minute - 2W, minute - W] 주문 수
+        self._hour_count = 0  # 현재 시간의 주문 수
+
+        self._ewma_mean = 0.0  # 분당 주문 수
+        self._ewma_var = 0.0
+        self._ewma_samples = 0
+
+        self._seasonal_mean = array("d", [0.0] * HOURS_PER_WEEK)  # 시간당 주문 수
+        self._seasonal_var = array("d", [0.0] * HOURS_PER_WEEK)
+        self._seasonal_samples = array("i", [0] * HOURS_PER_WEEK)
+
+        self._surge = False
+        self._anomaly: Optional[str] = None  # "high" | "low" | None
+        self._events = 0
+
+    # --- 리스너 ---
+
+    def add_listener(self, listener: Listener) -> None:
+        """상태 변화 알림을 받을 비동기 콜백 등록"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        """다른 스레드(동기 엔드포인트)의 커밋에서도 알림을 보낼 이벤트 루프"""
+        self._loop = loop
+
+    def _dispatch(self, notifications: List[Dict[str, Any]]) -> None:
+        if not notifications or not self._listeners:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        loop = running or self._loop
+        if loop is None or loop.is_closed():
+            logger.info("주문 감지 알림을 보낼 이벤트 루프가 없습니다: %s", notifications)
+            return
+        for notification in notifications:
+            for listener in self._listeners:
+                if loop is running:
+                    loop.create_task(listener(notification))
+                else:
+                    asyncio.run_coroutine_threadsafe(listener(notification), loop)
+
+    # --- 기준선 갱신 ---
+
+    def _update_ewma(self, count: float) -> None:
+        if self._ewma_samples == 0:
+            self._ewma_mean, self._ewma_var = float(count), 0.0
+        else:
+            diff = count - self._ewma_mean
+            increment = self.ewma_alpha * diff
+            self._ewma_mean += increment
+            self._ewma_var = (1 - self.ewma_alpha) * (self._ewma_var + diff * increment)
+        self._ewma_samples += 1
+
+    def _update_seasonal(self, hour_id: int, count: float) -> None:
+        slot = _hour_of_week(hour_id)
+        if self._seasonal_samples[slot] == 0:
+            self._seasonal_mean[slot], self._seasonal_var[slot] = float(count), 0.0
+        else:
+            diff = count - self._seasonal_mean[slot]
+            increment = self.seasonal_beta * diff
+            self._seasonal_mean[slot] += increment
+            self._seasonal_var[slot] = (1 - self.seasonal_beta) * (self._seasonal_var[slot] + diff * increment)
+        self._seasonal_samples[slot] += 1
+
+    def _seasonal_expectation(self, hour_id: int):
+        """(평균, 표준편차) - 표본이 부족하면 None"""
+        slot = _hour_of_week(hour_id)
+        if self._seasonal_samples[slot] < self.min_seasonal_samples:
+            return None
+        mean = self._seasonal_mean[slot]
+        std = max(math.sqrt(self._seasonal_var[slot]), math.sqrt(mean), 1.0)
+        return mean, std
+
+    # --- 시간 진행 ---
+
+    def _advance(self, minute: int, notifications: List[Dict[str, Any]]) -> None:
+        """링 버퍼를 minute 까지 진행 (닫히는 분/시간은 기준선에 반영)"""
+        if self._minute is None:
+            self._minute = minute
+            return
+        if minute <= self._minute:
+            return
+        size = len(self._ring)
+        w = self.window_minutes
+        gap = minute - self._minute
+
+        # 닫히는 분들의 EWMA 갱신 (첫 분은 링 버퍼 값, 나머지는 0)
+        self._update_ewma(self._ring[self._minute % size])
+        for _ in range(min(gap, MAX_IDLE_MINUTES) - 1):
+            self._update_ewma(0)
+
+        # 닫히는 시간들의 계절성 기준선 갱신
+        closed_hour, new_hour = self._minute // 60, minute // 60
+        if new_hour > closed_hour:
+            self._close_hour(closed_hour, self._hour_count, notifications)
+            for hour_id in range(max(closed_hour + 1, new_hour - HOURS_PER_WEEK), new_hour):
+                self._close_hour(hour_id, 0, notifications)
+            self._hour_count = 0
+
+        if gap >= size:
+            for i in range(size):
+                self._ring[i] = 0
+            self._recent = self._previous = 0
+        else:
+            for m in range(self._minute + 1, minute + 1):
+                moving = self._ring[(m - w) % size]  # 최근 -> 이전 구간으로 이동
+                self._recent -= moving
+                self._previous += moving - self._ring[m % size]  # m - 2W 분은 구간에서 빠짐
+                self._ring[m % size] = 0
+        self._minute = minute
+        self._check_surge(notifications)
+
+    def _close_hour(self, hour_id: int, count: int, notifications: List[Dict[str, Any]]) -> None:
+        expected = self._seasonal_expectation(hour_id)
+        if expected is not None and count < expected[0] - self.anomaly_z * expected[1]:
+            self._set_anomaly("low", hour_id, count, expected, notifications)
+        else:  # 새 시간이 시작되면 이전 시간의 이상 상태는 해제
+            self._set_anomaly(None, hour_id, count, expected, notifications)
+        self._update_seasonal(hour_id, count)
+
+    # --- 판정 ---
+
+    def _baseline(self) -> float:
+        """최근 W 분에 기대되는 주문 수"""
+        w = self.window_minutes
+        baseline = max(float(self._previous), self._ewma_mean * w)
+        if self._minute is not None:
+            expected = self._seasonal_expectation(self._minute // 60)
+            if expected is not None:
+                baseline = max(baseline, expected[0] * w / 60)
+        return baseline
+
+    def _check_surge(self, notifications: List[Dict[str, Any]]) -> None:
+        baseline = self._baseline()
+        # 히스테리시스: 급증 중에는 기준선 이하로 내려와야 해제 (경계에서 알림이 반복되지 않도록)
+        ratio = 1.0 if self._surge else self.surge_ratio
+        is_surge = self._recent >= self.surge_min_orders and self._recent > baseline * ratio
+        if is_surge != self._surge:
+            self._surge = is_surge
+            notifications.append({
+                "type": "order_surge",
+                "is_surge": is_surge,
+                "recent_order_count": self._recent,
+                "previous_order_count": self._previous,
+                "baseline": round(baseline, 2),
+                "time_window_minutes": self.window_minutes,
+                "severity": "high" if is_surge else "low",
+                "created_at": _minute_to_datetime(self._minute).isoformat(),
+            })
+
+    def _check_high_anomaly(self, notifications: List[Dict[str, Any]]) -> None:
+        hour_id = self._minute // 60
+        expected = self._seasonal_expectation(hour_id)
+        if expected is None:
+            return
+        if self._hour_count > expected[0] + self.anomaly_z * expected[1] and self._anomaly != "high":
+            self._set_anomaly("high", hour_id, self._hour_count, expected, notifications)
+
+    def _set_anomaly(self, direction, hour_id, count, expected, notifications) -> None:
+        if direction == self._anomaly:
+            return
+        self._anomaly = direction
+        notifications.append({
+            "type": "order_anomaly",
+            "is_anomaly": direction is not None,
+            "direction": direction,
+            "hour": _minute_to_datetime(hour_id * 60).isoformat(),
+            "order_count": count,
+            "expected": round(expected[0], 2) if expected else None,
+            "std_dev": round(expected[1], 2) if expected else None,
+            "severity": "medium" if direction else "low",
+        })
+
+    # --- 공개 API ---
+
+    def record(self, created_at: Optional[datetime] = None) -> None:
+        """주문 1건 생성 이벤트 반영"""
+        self.record_many([created_at])
+
+    def record_many(self, timestamps: Iterable[Optional[datetime]]) -> None:
+        """주문 생성 이벤트 여러 건 반영 (한 트랜잭션에서 커밋된 주문들)"""
+        notifications: List[Dict[str, Any]] = []
+        with self._lock:
+            for created_at in timestamps:
+                minute = _minute_id(_as_kst_naive(created_at) if created_at else self.clock())
+                self._advance(minute, notifications)
+                age = self._minute - minute
+                if age >= len(self._ring):
+                    continue  # 윈도우보다 오래된 지연 이벤트는 무시
+                self._events += 1
+                self._ring[minute % len(self._ring)] += 1
+                if age < self.window_minutes:
+                    self._recent += 1
+                else:
+                    self._previous += 1
+                if minute // 60 == self._minute // 60:
+                    self._hour_count += 1
+                self._check_surge(notifications)
+                self._check_high_anomaly(notifications)
+        self._dispatch(notifications)
+
+    def tick(self, now: Optional[datetime] = None) -> None:
+        """주문이 없어도 시간을 진행시켜 윈도우/기준선을 갱신"""
+        notifications: List[Dict[str, Any]] = []
+        with self._lock:
+            self._advance(_minute_id(now or self.clock()), notifications)
+        self._dispatch(notifications)
+
+    async def run_ticker(self, interval_seconds: float = 60.0) -> None:
+        """주기적으로 tick() 을 호출 (주문이 끊긴 시간대의 '낮음' 이상 감지용)"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("주문 급증 감지기 tick 실패")
+
+    def snapshot(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        현재 급증/이상 패턴 상태
+
+        now 까지 시간을 진행시킨 뒤 읽습니다. 오래 갱신되지 않았다면 경과한 분만큼 EWMA 를 갱신하므로
+        (최대 MAX_IDLE_MINUTES 분 + 168 시간) 상수 시간은 아닙니다.
+        """
+        self.tick(now)
+        with self._lock:
+            hour_id = self._minute // 60 if self._minute is not None else None
+            expected = self._seasonal_expectation(hour_id) if hour_id is not None else None
+            return {
+                "time_window_minutes": self.window_minutes,
+                "recent_order_count": self._recent,
+                "previous_order_count": self._previous,
+                "baseline": round(self._baseline(), 2),
+                "ewma_orders_per_minute": round(self._ewma_mean, 4),
+                "is_surge": self._surge,
+                "current_hour_order_count": self._hour_count,
+                "expected_hour_order_count": round(expected[0], 2) if expected else None,
+                "expected_hour_std_dev": round(expected[1], 2) if expected else None,
+                "anomaly": self._anomaly,
+                "events": self._events,
+                "as_of": _minute_to_datetime(self._minute).isoformat() if self._minute is not None else None,
+            }
+
+    def warm_up(self, db: Session, weeks: int = 4, now: Optional[datetime] = None) -> None:
+        """
+        과거 주문으로 기준선과 윈도우를 채웁니다. (시작 시 1회, 쿼리 2회)
+
+        지난 weeks 주의 시간별 주문 수로 계절성/EWMA 기준선을, 최근 2W 분(및 현재 시간)의
+        분별 주문 수로 슬라이딩 윈도우를 초기화합니다.
+        """
+        now = now or self.clock()
+        hour_start = now.replace(minute=0, second=0, microsecond=0)
+        hourly = bucket_orders(db, "hour", hour_start - timedelta(weeks=weeks), hour_start)
+
+        minute = _minute_id(now)
+        first = min(minute - len(self._ring) + 1, _minute_id(hour_start))
+        edges = [_minute_to_datetime(m) for m in range(first, minute + 1)]
+        per_minute = count_orders_in_windows(db, edges, open_end=True)
+
+        with self._lock:
+            self._reset_state()
+            for key, count in hourly.items():
+                self._update_seasonal(_minute_id(datetime.strptime(key, "%Y-%m-%d %H:00:00")) // 60, count)
+            last_day = list(hourly.values())[-24:]
+            if last_day:
+                self._ewma_mean = sum(last_day) / (len(last_day) * 60)
+                self._ewma_var = self._ewma_mean  # 포아송 가정
+                self._ewma_samples = 1
+            self._minute = minute
+            for m, count in zip(range(first, minute + 1), per_minute):
+                age = minute - m
+                if age < len(self._ring):
+                    self._ring[m % len(self._ring)] = count
+                    if age < self.window_minutes:
+                        self._recent += count
+                    else:
+                        self._previous += count
+                if m // 60 == minute // 60:
+                    self._hour_count += count
+            self._surge = self._recent >= self.surge_min_orders and self._recent > self._baseline() * self.surge_ratio
+
+
+surge_detector = OrderSurgeDetector(
+    window_minutes=settings.ORDER_SURGE_WINDOW_MINUTES,
+    surge_min_orders=settings.ORDER_SURGE_MIN_ORDERS,
+    surge_ratio=settings.ORDER_SURGE_RATIO,
+    anomaly_z=settings.ORDER_ANOMALY_Z,
+)
+
+
+def _record_created_order(event: Dict[str, Any]) -> None:
+    created_at = event["data"].get("created_at")
+    surge_detector.record(datetime.fromisoformat(created_at) if created_at else None)
+
+
+# 커밋된 주문 생성 이벤트를 감지기에 전달
+event_bus.subscribe(ORDER_CREATED, _record_created_order)
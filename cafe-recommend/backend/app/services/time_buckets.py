@@ -0,0 +1,169 @@
+"""
+주문 시간 구간(bucket) 집계 서비스
+
+시간대(0~23시), 시간, 일, 주 단위의 주문 수/매출 합계를 구간마다 쿼리하지 않고
+GROUP BY 쿼리 한 번(또는 시간대별 매출 집계 테이블 조회 한 번)으로 계산하고,
+주문이 없는 구간은 파이썬에서 0으로 채웁니다.
+
+- 기간 경계가 정시(분/초가 0)이면 sales_hourly_orders 집계 테이블을 읽고,
+  그렇지 않으면 orders 테이블을 직접 GROUP BY 합니다. (결과는 같음)
+- 주 단위 구간의 키는 그 주 월요일 날짜('YYYY-MM-DD')입니다.
+
+사용 예:
+    counts = bucket_orders(db, "hour_of_day", start=start, end=end)   # {0: 3, 1: 0, ..., 23: 5}
+    sales = bucket_orders(db, "day", start=start, end=end, measure="sum")
+"""
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Sequence, Union
+
+from sqlalchemy import Integer, case, cast, func, literal
+from sqlalchemy.orm import Session
+
+from app.models.order import Order
+from app.models.sales_rollup import SalesHourlyOrder
+from app.services.sales_rollup import range_filters
+
+GRANULARITIES = ("hour_of_day", "hour", "day", "week")
+MEASURES = ("count", "sum")
+
+DateLike = Union[date, datetime]
+
+
+def _bucket_expr(column, granularity: str):
+    """주문 시각 컬럼(또는 bucket_hour 문자열)을 구간 키로 변환하는 SQL 식"""
+    if granularity == "hour_of_day":
+        return cast(func.strftime("%H", column), Integer)
+    if granularity == "hour":
+        return func.strftime("%Y-%m-%d %H:00:00", column)
+    if granularity == "day":
+        return func.date(column)
+    if granularity == "week":
+        # 다음 일요일(당일 포함)로 이동한 뒤 6일 전 = 그 주 월요일
+        return func.date(column, "weekday 0", "-6 days")
+    raise ValueError(f"지원하지 않는 구간 단위입니다: {granularity}")
+
+
+def _as_datetime(value: DateLike) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.combine(value, datetime.min.time())
+
+
+def _hour_aligned(value: Optional[DateLike]) -> bool:
+    if value is None or not isinstance(value, datetime):
+        return True
+    return value.minute == 0 and value.second == 0 and value.microsecond == 0
+
+
+def bucket_keys(granularity: str, start: DateLike, end: DateLike) -> List:
+    """[start, end) 기간의 모든 구간 키 (빈 구간 채우기용)"""
+    if granularity == "hour_of_day":
+        return list(range(24))
+    start_dt, end_dt = _as_datetime(start), _as_datetime(end)
+    keys = []
+    if granularity == "hour":
+        current = start_dt.replace(minute=0, second=0, microsecond=0)
+        while current < end_dt:
+            keys.append(current.strftime("%Y-%m-%d %H:00:00"))
+            current += timedelta(hours=1)
+    elif granularity == "day":
+        current = start_dt.date()
+        while datetime.combine(current, datetime.min.time()) < end_dt:
+            keys.append(current.isoformat())
+            current += timedelta(days=1)
+    elif granularity == "week":
+        current = start_dt.date() - timedelta(days=start_dt.weekday())
+        while datetime.combine(current, datetime.min.time()) < end_dt:
+            keys.append(current.isoformat())
+            current += timedelta(weeks=1)
+    else:
+        raise ValueError(f"지원하지 않는 구간 단위입니다: {granularity}")
+    return keys
+
+
+def bucket_orders(
+    db: Session,
+    granularity: str,
+    start: Optional[DateLike] = None,
+    end: Optional[DateLike] = None,
+    *,
+    measure: str = "count",
+    exclude_statuses: Optional[Sequence[str]] = None,
+    fill_empty: bool = True,
+) -> "OrderedDict":
+    """
+    [start, end) 기간 주문을 구간별로 집계합니다. (쿼리 1회)
+
+    Args:
+        granularity: "hour_of_day" | "hour" | "day" | "week"
+        measure: "count"(주문 수) 또는 "sum"(주문 금액 합계)
+        exclude_statuses: 제외할 주문 상태 목록
+        fill_empty: start, end 가 모두 있을 때 주문이 없는 구간을 0으로 채움
+
+    Returns:
+        구간 키 순서의 OrderedDict (hour_of_day 는 int, 나머지는 문자열 키)
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"지원하지 않는 구간 단위입니다: {granularity}")
+    if measure not in MEASURES:
+        raise ValueError(f"지원하지 않는 집계 방식입니다: {measure}")
+
+    if _hour_aligned(start) and _hour_aligned(end):
+        # 정시 경계 기간은 시간대별 매출 집계 테이블에서 합산
+        bucket = _bucket_expr(SalesHourlyOrder.bucket_hour, granularity)
+        value = func.sum(SalesHourlyOrder.order_count if measure == "count" else SalesHourlyOrder.total_amount)
+        query = db.query(bucket.label("bucket"), value.label("value")).filter(
+            *range_filters(SalesHourlyOrder, start, end)
+        )
+        if exclude_statuses:
+            query = query.filter(SalesHourlyOrder.status.notin_(exclude_statuses))
+    else:
+        bucket = _bucket_expr(Order.created_at, granularity)
+        value = func.count(Order.id) if measure == "count" else func.sum(Order.total_amount)
+        query = db.query(bucket.label("bucket"), value.label("value")).filter(Order.created_at.isnot(None))
+        if start is not None:
+            query = query.filter(Order.created_at >= start)
+        if end is not None:
+            query = query.filter(Order.created_at < end)
+        if exclude_statuses:
+            query = query.filter(Order.status.notin_(exclude_statuses))
+
+    rows = query.group_by(bucket).order_by(bucket).all()
+    zero = 0 if measure == "count" else 0.0
+    found = {row.bucket: (int(row.value) if measure == "count" else float(row.value or 0)) for row in rows}
+
+    if fill_empty and (granularity == "hour_of_day" or (start is not None and end is not None)):
+        result = OrderedDict((key, zero) for key in bucket_keys(granularity, start, end))
+        for key, val in found.items():
+            result[key] = val
+        return result
+    return OrderedDict(sorted(found.items()))
+
+
+def count_orders_in_windows(db: Session, edges: Sequence[datetime], open_end: bool = False) -> List[int]:
+    """
+    연속된 구간 [edges[0], edges[1]), [edges[1], edges[2]), ... 의 주문 수를 쿼리 1회로 계산
+
+    최근 N분과 그 이전 N분 비교처럼 임의 경계의 구간 집계에 사용합니다.
+    open_end 이면 마지막 구간 [edges[-1], ...) 을 상한 없이 추가합니다.
+    """
+    bounds = list(edges[1:])
+    size = len(bounds) + (1 if open_end else 0)
+    if size < 1:
+        return []
+    if bounds:
+        window = case(
+            *[(Order.created_at < edge, index) for index, edge in enumerate(bounds)],
+            else_=len(bounds) if open_end else None,
+        )
+    else:
+        window = literal(0)
+    query = db.query(window.label("window"), func.count(Order.id)).filter(Order.created_at >= edges[0])
+    if not open_end:
+        query = query.filter(Order.created_at < edges[-1])
+    counts = [0] * size
+    for index, count in query.group_by(window).all():
+        if index is not None:
+            counts[index] = count
+    return counts
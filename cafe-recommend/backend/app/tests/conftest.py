@@ -8,7 +8,9 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.database import Base, get_db
+from app.db.base import Base as ModelBase
 from app.main import app
+from app.services.sales_rollup import create_sales_rollup_triggers
 
 
 # 테스트용 인메모리 SQLite 데이터베이스 생성
@@ -20,19 +22,35 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 관리자/결제 설정 모델은 app.database.Base, 나머지 모델은 app.db.base.Base 를 사용
+METADATAS = (Base.metadata, ModelBase.metadata)
+
 
 @pytest.fixture(scope="function")
 def db_session():
     """
     테스트용 데이터베이스 세션 제공
     """
-    Base.metadata.create_all(bind=engine)
+    for metadata in METADATAS:
+        metadata.create_all(bind=engine)
     session = TestingSessionLocal()
     try:
         yield session
     finally:
         session.close()
-        Base.metadata.drop_all(bind=engine)
+        for metadata in reversed(METADATAS):
+            metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def sales_rollup_db(db_session):
+    """
+    매출 집계 트리거를 설치한 테스트용 데이터베이스 세션
+    (트리거는 drop_all 로 orders/order_items 가 삭제될 때 함께 삭제됨)
+    """
+    with engine.begin() as conn:
+        create_sales_rollup_triggers(conn)
+    return db_session
 
 
 @pytest.fixture(scope="function")
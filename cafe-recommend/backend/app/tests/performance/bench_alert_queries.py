@@ -0,0 +1,137 @@
+"""
+주문 알림 API 벤치마크: 구간별 COUNT 반복 vs 구간 집계 서비스
+
+실행:
+    python -m app.tests.performance.bench_alert_queries --orders 200000
+
+임시 SQLite 파일에 합성 주문(시간대별 매출 집계 트리거 포함)을 생성한 뒤,
+기존 구현(시간대별 24회, 일별 31회 COUNT)과 time_buckets 서비스 기반 구현의
+쿼리 수와 지연 시간(p50)을 비교합니다.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, create_engine, event, func
+from sqlalchemy.orm import Session
+
+from app.models.order import Order, OrderItem
+from app.models.sales_rollup import SalesHourlyItem, SalesHourlyOrder
+from app.routers.admin.alerts import detect_unusual_patterns, get_hourly_order_trends, get_order_surge
+from app.services.sales_rollup import create_sales_rollup_triggers
+
+
+def legacy_hourly_trends(db: Session, days_back: int) -> list:
+    """기존 구현: 시간대마다 COUNT 1회 (24회)"""
+    start_date = datetime.utcnow() - timedelta(days=days_back)
+    return [
+        db.query(func.count(Order.id)).filter(
+            and_(Order.created_at >= start_date, func.extract('hour', Order.created_at) == hour)
+        ).scalar() or 0
+        for hour in range(24)
+    ]
+
+
+def legacy_daily_counts(db: Session) -> list:
+    """기존 구현: 날짜마다 COUNT 1회 (31회)"""
+    end_date = datetime.utcnow()
+    current_date = end_date - timedelta(days=30)
+    counts = []
+    while current_date <= end_date:
+        next_date = current_date + timedelta(days=1)
+        counts.append(db.query(func.count(Order.id)).filter(
+            and_(Order.created_at >= current_date, Order.created_at < next_date)
+        ).scalar() or 0)
+        current_date = next_date
+    return counts
+
+
+def legacy_surge(db: Session, minutes: int) -> tuple:
+    """기존 구현: 최근/이전 구간 COUNT 2회"""
+    threshold = datetime.utcnow() - timedelta(minutes=minutes)
+    recent = db.query(func.count(Order.id)).filter(Order.created_at >= threshold).scalar()
+    previous = db.query(func.count(Order.id)).filter(
+        and_(Order.created_at >= threshold - timedelta(minutes=minutes), Order.created_at < threshold)
+    ).scalar()
+    return recent, previous
+
+
+def populate(engine, num_orders: int, days: int = 60, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    for model in (Order, OrderItem, SalesHourlyOrder, SalesHourlyItem):
+        model.__table__.create(bind=engine)
+    with engine.begin() as conn:
+        create_sales_rollup_triggers(conn)
+    start = datetime.utcnow() - timedelta(days=days)
+    span = days * 86400
+    batch = []
+    with engine.begin() as conn:
+        for i in range(1, num_orders + 1):
+            batch.append({
+                "id": i,
+                "status": rng.choice(["paid", "completed", "cancelled"]),
+                "payment_method": rng.choice(["kakao", "naver"]),
+                "total_amount": rng.randint(3, 30) * 1000,
+                "created_at": start + timedelta(seconds=rng.randrange(span)),
+            })
+            if len(batch) == 10000:
+                conn.execute(Order.__table__.insert(), batch)
+                batch.clear()
+        if batch:
+            conn.execute(Order.__table__.insert(), batch)
+
+
+def measure(engine, fn, repeat: int) -> dict:
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    timings = []
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return {"queries": len(statements) // repeat, "p50": statistics.median(timings)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="주문 알림 API 쿼리 수/지연 시간 벤치마크")
+    parser.add_argument("--orders", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'alerts.db')}")
+        started = time.perf_counter()
+        populate(engine, args.orders)
+        print(f"주문 {args.orders:,}건 생성: {time.perf_counter() - started:.1f}s")
+
+        cases = [
+            ("hourly-order-trends", lambda db: legacy_hourly_trends(db, 7),
+             lambda db: get_hourly_order_trends(days_back=7, db=db)),
+            ("unusual-order-patterns", legacy_daily_counts,
+             lambda db: detect_unusual_patterns(std_dev_threshold=2.0, db=db)),
+            ("order-surge", lambda db: legacy_surge(db, 30),
+             lambda db: get_order_surge(time_window_minutes=30, surge_threshold=10, db=db)),
+        ]
+        print(f"{'API':<24}{'기존 쿼리':>10}{'기존 p50':>12}{'신규 쿼리':>10}{'신규 p50':>12}")
+        with Session(engine) as db:
+            for name, legacy, current in cases:
+                before = measure(engine, lambda: legacy(db), args.repeat)
+                after = measure(engine, lambda: current(db), args.repeat)
+                print(f"{name:<24}{before['queries']:>10}{before['p50']:>10.1f}ms"
+                      f"{after['queries']:>10}{after['p50']:>10.1f}ms")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+단일 writer 큐(그룹 커밋)와 기존 방식(요청 스레드별 개별 커밋)의 쓰기 처리량 비교 벤치마크
+
+실행:
+    python -m app.tests.performance.bench_db_writer --threads 32 --writes 200
+
+기존 방식은 스레드마다 세션을 열어 INSERT 후 바로 커밋하며,
+`database is locked` 오류가 나면 재시도합니다 (라우트에서 세션을 쓰는 방식과 동일).
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.writer import SQLiteWriter
+
+SCHEMA = """
+CREATE TABLE bench_orders (
+    id INTEGER PRIMARY KEY,
+    session_id VARCHAR,
+    total_amount FLOAT,
+    status VARCHAR,
+    created_at DATETIME
+)
+"""
+INSERT = text(
+    "INSERT INTO bench_orders (session_id, total_amount, status, created_at) "
+    "VALUES (:session_id, :total_amount, 'pending', CURRENT_TIMESTAMP)"
+)
+
+
+def prepare_database(path: str) -> str:
+    url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text(SCHEMA))
+    engine.dispose()
+    return url
+
+
+def run_threads(num_threads: int, writes_per_thread: int, target) -> float:
+    barrier = threading.Barrier(num_threads)
+
+    def worker(thread_no: int):
+        barrier.wait()
+        for i in range(writes_per_thread):
+            target(thread_no, i)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(num_threads)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - started
+
+
+def bench_direct_commit(url: str, num_threads: int, writes_per_thread: int) -> dict:
+    """기존 방식: 스레드마다 개별 세션으로 커밋"""
+    engine = create_engine(url, connect_args={"check_same_thread": False, "timeout": 5})
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    locked_errors = 0
+    lock = threading.Lock()
+
+    def write(thread_no: int, i: int):
+        nonlocal locked_errors
+        while True:
+            db = SessionLocal()
+            try:
+                db.execute(INSERT, {"session_id": f"s-{thread_no}", "total_amount": float(i)})
+                db.commit()
+                return
+            except OperationalError:
+                db.rollback()
+                with lock:
+                    locked_errors += 1
+            finally:
+                db.close()
+
+    elapsed = run_threads(num_threads, writes_per_thread, write)
+    engine.dispose()
+    total = num_threads * writes_per_thread
+    return {"elapsed": elapsed, "writes_per_sec": total / elapsed, "locked_errors": locked_errors}
+
+
+def bench_group_commit(url: str, num_threads: int, writes_per_thread: int, max_latency_ms: float) -> dict:
+    """단일 writer 큐: 모든 쓰기를 하나의 커넥션에서 배치 커밋"""
+    writer = SQLiteWriter(url, max_batch_size=128, max_latency_ms=max_latency_ms)
+    writer.start()
+
+    def write(thread_no: int, i: int):
+        writer.run(lambda session: session.execute(
+            INSERT, {"session_id": f"s-{thread_no}", "total_amount": float(i)}
+        ))
+
+    elapsed = run_threads(num_threads, writes_per_thread, write)
+    stats = writer.stats.as_dict()
+    writer.stop()
+    total = num_threads * writes_per_thread
+    return {"elapsed": elapsed, "writes_per_sec": total / elapsed, **stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite 단일 writer 큐 벤치마크")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--writes", type=int, default=200, help="스레드당 쓰기 횟수")
+    parser.add_argument("--max-latency-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        direct_url = prepare_database(os.path.join(tmp, "direct.db"))
+        writer_url = prepare_database(os.path.join(tmp, "writer.db"))
+
+        direct = bench_direct_commit(direct_url, args.threads, args.writes)
+        grouped = bench_group_commit(writer_url, args.threads, args.writes, args.max_latency_ms)
+
+    total = args.threads * args.writes
+    print(f"threads={args.threads}, writes={total}")
+    print(f"[개별 커밋]   {direct['writes_per_sec']:10.1f} writes/s  "
+          f"elapsed={direct['elapsed']:.2f}s  locked_errors={direct['locked_errors']}")
+    print(f"[그룹 커밋]   {grouped['writes_per_sec']:10.1f} writes/s  "
+          f"elapsed={grouped['elapsed']:.2f}s  batches={grouped['batches']}  "
+          f"avg_batch={grouped['avg_batch_size']}  avg_wait_ms={grouped['avg_wait_ms']}")
+    print(f"처리량 개선: x{grouped['writes_per_sec'] / direct['writes_per_sec']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
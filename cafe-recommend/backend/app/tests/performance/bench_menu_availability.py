@@ -0,0 +1,112 @@
+"""
+메뉴 가용성 계산 벤치마크: 메뉴/재료별 조회(N+1) vs 필요량 행렬 x 재고 벡터
+
+실행:
+    python -m app.tests.performance.bench_menu_availability --menus 100 --ingredients-per-menu 8
+
+임시 SQLite 파일에 합성 메뉴/재료/재고를 만든 뒤, 기존 /all-availability 구현(메뉴마다 재료 목록,
+재료마다 Ingredient/IngredientStock 조회)과 menu_availability 서비스의 쿼리 수와 지연 시간(p50)을 비교합니다.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.models.inventory import Ingredient, IngredientStock, MenuIngredient
+from app.models.menu import MenuItem
+from app.services import menu_availability
+from app.services.menu_availability import load_availability_matrix
+
+
+def legacy_all_availability(db: Session) -> dict:
+    """기존 구현: 메뉴마다 재료 목록 1회 + 재료마다 2회"""
+    result = {}
+    for menu in db.query(MenuItem).filter(MenuItem.is_active == True).all():  # noqa: E712
+        unavailable = []
+        for mi in db.query(MenuIngredient).filter(MenuIngredient.menu_id == menu.id).all():
+            ingredient = db.query(Ingredient).filter(Ingredient.id == mi.ingredient_id).first()
+            stock = db.query(IngredientStock).filter(IngredientStock.ingredient_id == mi.ingredient_id).first()
+            if (not stock or stock.current_quantity < mi.quantity_required) and not mi.is_optional:
+                unavailable.append(ingredient.name)
+        result[menu.id] = not unavailable
+    return result
+
+
+def populate(engine, menus: int, ingredients: int, per_menu: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    for model in (MenuItem, Ingredient, IngredientStock, MenuIngredient):
+        model.__table__.create(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(Ingredient.__table__.insert(), [
+            {"id": i, "name": f"재료{i}", "unit": "g", "min_stock_level": 100, "is_active": True}
+            for i in range(1, ingredients + 1)
+        ])
+        conn.execute(IngredientStock.__table__.insert(), [
+            {"ingredient_id": i, "current_quantity": rng.choice([0, 50, 500, 5000])}
+            for i in range(1, ingredients + 1)
+        ])
+        conn.execute(MenuItem.__table__.insert(), [
+            {"id": m, "name": f"메뉴{m}", "price": 4500, "category": "커피", "is_available": True, "is_active": True}
+            for m in range(1, menus + 1)
+        ])
+        conn.execute(MenuIngredient.__table__.insert(), [
+            {"menu_id": m, "ingredient_id": i, "quantity_required": rng.choice([10, 30, 200]),
+             "is_optional": rng.random() < 0.1}
+            for m in range(1, menus + 1)
+            for i in rng.sample(range(1, ingredients + 1), min(per_menu, ingredients))
+        ])
+
+
+def measure(engine, fn, repeat: int) -> dict:
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    timings = []
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return {"queries": len(statements) // repeat, "p50": statistics.median(timings)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="메뉴 가용성 계산 쿼리 수/지연 시간 벤치마크")
+    parser.add_argument("--menus", type=int, default=100)
+    parser.add_argument("--ingredients", type=int, default=200)
+    parser.add_argument("--ingredients-per-menu", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'availability.db')}")
+        populate(engine, args.menus, args.ingredients, args.ingredients_per_menu)
+        print(f"메뉴 {args.menus}개 x 재료 {args.ingredients_per_menu}개 (재료 {args.ingredients}종)")
+
+        with Session(engine) as db:
+            expected = legacy_all_availability(db)
+            actual = {k: v["is_available"] for k, v in load_availability_matrix(db).evaluate().items()}
+            assert actual == expected, "계산 결과가 기존 구현과 다릅니다"
+
+            cases = [("기존 (메뉴/재료별 조회)", lambda: (db.expire_all(), legacy_all_availability(db)))]
+            cases.append(("행렬 x 벡터" + (" (NumPy)" if menu_availability.np is not None else ""),
+                          lambda: load_availability_matrix(db).evaluate()))
+            print(f"{'구현':<26}{'쿼리':>8}{'p50':>12}")
+            for name, fn in cases:
+                r = measure(engine, fn, args.repeat)
+                print(f"{name:<26}{r['queries']:>8}{r['p50']:>10.1f}ms")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+주문 검색 벤치마크: LIKE '%term%' 스캔 vs FTS5(trigram) 인덱스
+
+실행:
+    python -m app.tests.performance.bench_order_search --orders 1000000
+
+임시 SQLite 파일에 합성 주문을 생성한 뒤, 관리자 검색창 입력처럼
+주문번호/전화번호 뒷자리/주소 검색어로 두 방식의 지연 시간(p50, p95)을 비교합니다.
+두 방식 모두 첫 페이지(20건)와 전체 건수를 조회합니다.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.crud.order_search import create_order_search_index, search_order_ids
+from app.models.order import Order
+
+DISTRICTS = ["강남구", "마포구", "서초구", "송파구", "해운대구", "수성구", "연수구", "유성구"]
+ROADS = ["테헤란로", "월드컵로", "반포대로", "올림픽로", "센텀로", "달구벌대로", "컨벤시아대로", "대학로"]
+
+LIKE_PAGE_SQL = text("""
+    SELECT id FROM orders
+    WHERE order_number LIKE :p OR phone_number LIKE :p OR delivery_address LIKE :p
+    ORDER BY created_at DESC LIMIT 20
+""")
+LIKE_COUNT_SQL = text("""
+    SELECT count(id) FROM orders
+    WHERE order_number LIKE :p OR phone_number LIKE :p OR delivery_address LIKE :p
+""")
+
+
+def populate(engine, num_orders: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    Order.__table__.create(bind=engine)
+    start = datetime(2024, 1, 1)
+    batch = []
+    with engine.begin() as conn:
+        for i in range(1, num_orders + 1):
+            created_at = start + timedelta(seconds=i * 30)
+            batch.append({
+                "id": i,
+                "order_number": f"{created_at:%Y%m%d}-{(i * 30 % 86400) // 30 + 1:03d}",
+                "phone_number": f"010-{rng.randint(0, 9999):04d}-{rng.randint(0, 9999):04d}",
+                "delivery_address": f"{rng.choice(DISTRICTS)} {rng.choice(ROADS)} {rng.randint(1, 999)}",
+                "status": "paid",
+                "total_amount": 4500.0,
+                "created_at": created_at,
+            })
+            if len(batch) == 10000:
+                conn.execute(Order.__table__.insert(), batch)
+                batch.clear()
+        if batch:
+            conn.execute(Order.__table__.insert(), batch)
+
+
+def measure(fn, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "p50": statistics.median(timings),
+        "p95": timings[max(0, int(len(timings) * 0.95) - 1)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="주문 검색 LIKE vs FTS5 벤치마크")
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'search.db')}")
+
+        started = time.perf_counter()
+        populate(engine, args.orders)
+        print(f"주문 {args.orders:,}건 생성: {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            create_order_search_index(conn)
+        print(f"FTS 인덱스 생성(기존 주문 색인): {time.perf_counter() - started:.1f}s")
+
+        terms = ["20240315-123", "5678", "010-1234", "반포대로 77", "해운대구"]
+        print(f"{'검색어':<16}{'LIKE p50':>12}{'LIKE p95':>12}{'FTS p50':>12}{'FTS p95':>12}")
+        with Session(engine) as db:
+            for term in terms:
+                pattern = {"p": f"%{term}%"}
+                like = measure(lambda: (db.execute(LIKE_PAGE_SQL, pattern).fetchall(),
+                                        db.execute(LIKE_COUNT_SQL, pattern).scalar()), args.repeat)
+                fts = measure(lambda: search_order_ids(db, term, limit=20), args.repeat)
+                print(f"{term:<16}{like['p50']:>10.1f}ms{like['p95']:>10.1f}ms"
+                      f"{fts['p50']:>10.1f}ms{fts['p95']:>10.1f}ms")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
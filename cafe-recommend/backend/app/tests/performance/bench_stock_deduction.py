@@ -0,0 +1,152 @@
+"""
+주문 결제 재고 차감 벤치마크: 주문 항목/재료별 ORM 처리 vs 일괄 차감 (피크 시간 결제 처리량)
+
+실행:
+    python -m app.tests.performance.bench_stock_deduction --orders 2000 --batch 32
+
+임시 SQLite 파일에 합성 메뉴/재료/주문을 만든 뒤, 결제 처리 시 재고 차감 방식별로
+주문당 쿼리 수와 처리량(주문/초)을 비교합니다.
+
+- 항목별 ORM: 주문 항목마다 레시피 조회, 재료마다 재고 조회/수정 + 트랜잭션 행 추가 (주문마다 커밋)
+- 일괄 (주문마다 커밋): stock_deduction 훅, 커밋 하나에 주문 1건
+- 일괄 (group commit): writer 큐처럼 --batch 건을 세이브포인트로 묶어 한 번에 커밋
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.orm import Session
+
+from app.models.inventory import Ingredient, IngredientStock, InventoryTransaction, MenuIngredient
+from app.models.menu import MenuItem
+from app.models.order import Order, OrderItem
+from app.services import stock_deduction  # noqa: F401 (결제 -> 재고 차감 훅 등록)
+
+
+def populate(engine, menus: int, ingredients: int, per_menu: int, orders: int, items_per_order: int, seed: int = 42):
+    rng = random.Random(seed)
+    for model in (MenuItem, Ingredient, IngredientStock, MenuIngredient, InventoryTransaction, Order, OrderItem):
+        model.__table__.create(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(Ingredient.__table__.insert(), [
+            {"id": i, "name": f"재료{i}", "unit": "g", "min_stock_level": 100, "is_active": True}
+            for i in range(1, ingredients + 1)
+        ])
+        conn.execute(IngredientStock.__table__.insert(), [
+            {"ingredient_id": i, "current_quantity": 10_000_000} for i in range(1, ingredients + 1)
+        ])
+        conn.execute(MenuItem.__table__.insert(), [
+            {"id": m, "name": f"메뉴{m}", "price": 4500, "category": "커피", "is_available": True, "is_active": True}
+            for m in range(1, menus + 1)
+        ])
+        conn.execute(MenuIngredient.__table__.insert(), [
+            {"menu_id": m, "ingredient_id": i, "quantity_required": rng.choice([10, 30, 200]), "is_optional": False}
+            for m in range(1, menus + 1)
+            for i in rng.sample(range(1, ingredients + 1), min(per_menu, ingredients))
+        ])
+        conn.execute(Order.__table__.insert(), [
+            {"id": o, "status": "pending", "total_amount": 0, "is_refunded": False} for o in range(1, orders + 1)
+        ])
+        conn.execute(OrderItem.__table__.insert(), [
+            {"order_id": o, "menu_id": rng.randint(1, menus), "quantity": rng.randint(1, 3)}
+            for o in range(1, orders + 1)
+            for _ in range(items_per_order)
+        ])
+
+
+def reset(engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(InventoryTransaction.__table__.delete())
+        conn.execute(IngredientStock.__table__.update().values(current_quantity=10_000_000))
+        conn.execute(Order.__table__.update().values(status="pending"))
+
+
+def per_item_orm(db: Session, order_id: int) -> None:
+    """항목별 ORM 처리: 항목 -> 레시피 -> 재료마다 재고 조회/수정"""
+    orders = Order.__table__
+    db.execute(update(orders).where(orders.c.id == order_id).values(status="paid"))  # 훅을 거치지 않음
+    for item in db.query(OrderItem).filter(OrderItem.order_id == order_id).all():
+        for mi in db.query(MenuIngredient).filter(MenuIngredient.menu_id == item.menu_id).all():
+            amount = mi.quantity_required * item.quantity
+            stock = db.query(IngredientStock).filter(IngredientStock.ingredient_id == mi.ingredient_id).first()
+            stock.current_quantity -= amount
+            db.add(InventoryTransaction(ingredient_id=mi.ingredient_id, transaction_type="출고",
+                                        quantity=-amount, order_id=order_id))
+    db.commit()
+
+
+def pay_each(db: Session, order_ids) -> None:
+    for order_id in order_ids:
+        db.get(Order, order_id).status = "paid"
+        db.commit()
+
+
+def pay_grouped(db: Session, order_ids, batch: int) -> None:
+    for start in range(0, len(order_ids), batch):
+        for order_id in order_ids[start:start + batch]:
+            with db.begin_nested():
+                db.get(Order, order_id).status = "paid"
+        db.commit()
+
+
+def snapshot(engine) -> dict:
+    with engine.connect() as conn:
+        return dict(conn.execute(IngredientStock.__table__.select().with_only_columns(
+            IngredientStock.ingredient_id, IngredientStock.current_quantity)).all())
+
+
+def measure(engine, fn, orders: int) -> dict:
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    reset(engine)
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return {"queries": len(statements) / orders, "rate": orders / elapsed, "stock": snapshot(engine)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="주문 결제 재고 차감 쿼리 수/처리량 벤치마크")
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--items-per-order", type=int, default=3)
+    parser.add_argument("--menus", type=int, default=50)
+    parser.add_argument("--ingredients", type=int, default=100)
+    parser.add_argument("--ingredients-per-menu", type=int, default=6)
+    parser.add_argument("--batch", type=int, default=32, help="group commit 한 번에 묶을 주문 수")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'stock.db')}")
+        populate(engine, args.menus, args.ingredients, args.ingredients_per_menu, args.orders, args.items_per_order)
+        order_ids = list(range(1, args.orders + 1))
+        print(f"주문 {args.orders}건 x 항목 {args.items_per_order}개 (메뉴당 재료 {args.ingredients_per_menu}개)")
+
+        with Session(engine) as db:
+            cases = [
+                ("항목별 ORM (주문마다 커밋)", lambda: [per_item_orm(db, o) for o in order_ids]),
+                ("일괄 (주문마다 커밋)", lambda: pay_each(db, order_ids)),
+                (f"일괄 (group commit {args.batch}건)", lambda: pay_grouped(db, order_ids, args.batch)),
+            ]
+            print(f"{'방식':<28}{'주문당 쿼리':>12}{'처리량':>16}")
+            expected = None
+            for name, fn in cases:
+                r = measure(engine, fn, args.orders)
+                if expected is None:
+                    expected = r["stock"]
+                assert all(abs(r["stock"][k] - v) < 1e-6 for k, v in expected.items()), "차감 결과가 다릅니다"
+                print(f"{name:<28}{r['queries']:>12.1f}{r['rate']:>12.0f}건/s")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
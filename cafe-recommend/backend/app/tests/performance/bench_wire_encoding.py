@@ -0,0 +1,132 @@
+"""
+관리자 실시간 WebSocket 메시지 인코딩 벤치마크: JSON vs MessagePack(고정 필드 테이블), permessage-deflate
+
+실행:
+    python -m app.tests.performance.bench_wire_encoding --events 5000
+
+합성 이벤트(주문 상태 변경, 실시간 매출 delta, 알림)를 만들어 형식별로
+- 이벤트당 전송 바이트 (압축 없음 / permessage-deflate)
+- 이벤트당 인코딩 CPU 시간
+을 비교합니다.
+
+permessage-deflate 는 raw deflate(wbits=-15)로 흉내냅니다.
+- no context takeover: 메시지마다 새 압축기 (최악의 경우)
+- context takeover: 연결마다 압축기 하나를 유지 (브라우저/websockets 기본값)
+"""
+import argparse
+import json
+import random
+import time
+import zlib
+from datetime import datetime, timedelta
+
+from app.core.wire import WireMessage, encode_msgpack
+
+STATUSES = ["pending", "paid", "preparing", "completed", "cancelled"]
+MENUS = ["아메리카노", "카페라떼", "바닐라라떼", "콜드브루", "녹차라떼", "크루아상", "치즈케이크"]
+
+
+def make_events(count: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    start = datetime(2025, 6, 2, 9, 0)
+    events = []
+    for i in range(count):
+        created_at = (start + timedelta(seconds=i * 7)).isoformat()
+        kind = rng.random()
+        if kind < 0.6:
+            items = [
+                {
+                    "id": i * 10 + j,
+                    "menu_id": rng.randint(1, len(MENUS)),
+                    "menu_name": rng.choice(MENUS),
+                    "quantity": rng.randint(1, 3),
+                    "unit_price": float(rng.choice([4500, 5000, 5500, 6000])),
+                    "total_price": float(rng.choice([4500, 9000, 11000])),
+                    "status": rng.choice(STATUSES),
+                }
+                for j in range(rng.randint(1, 4))
+            ]
+            events.append({"type": rng.choice(["new_order", "order_update"]), "timestamp": created_at, "data": {
+                "id": i,
+                "order_number": f"ORD-20250602-{i:04d}",
+                "session_id": f"{rng.getrandbits(64):016x}",
+                "status": rng.choice(STATUSES),
+                "total_amount": float(sum(item["total_price"] for item in items)),
+                "payment_method": rng.choice(["card", "kakaopay", "naverpay"]),
+                "created_at": created_at,
+                "items": items,
+            }})
+        elif kind < 0.9:
+            hour = 9 + i * 7 // 3600
+            events.append({"type": "delta", "version": i + 2, "base_version": i + 1, "data": {
+                "today_sales": float(1000 * i),
+                "sales_delta": float(rng.choice([4500, 9000])),
+                "timestamp": created_at,
+                "hourly_data": [{"hour": hour, "count": i % 50, "amount": float(4500 * (i % 50))}],
+                "new_orders": [{"id": i, "order_number": f"ORD-20250602-{i:04d}", "total_amount": 4500.0,
+                                "status": "paid", "created_at": created_at}],
+            }})
+        else:
+            events.append({"type": "order_surge", "timestamp": created_at,
+                           "is_surge": True, "recent_order_count": 25, "previous_order_count": 9,
+                           "baseline": 10.5, "time_window_minutes": 30, "severity": "high",
+                           "created_at": created_at})
+    return events
+
+
+def measure(events: list, encoder) -> dict:
+    started = time.perf_counter()
+    encoded = [encoder(event) for event in events]
+    encode_seconds = time.perf_counter() - started
+
+    raw = sum(len(data) for data in encoded)
+    per_message = 0
+    for data in encoded:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+        per_message += len(compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)) - 4
+    connection = zlib.compressobj(6, zlib.DEFLATED, -15)
+    takeover = sum(len(connection.compress(data) + connection.flush(zlib.Z_SYNC_FLUSH)) - 4 for data in encoded)
+    n = len(events)
+    return {
+        "bytes": raw / n,
+        "deflate_per_message": per_message / n,
+        "deflate_takeover": takeover / n,
+        "encode_us": encode_seconds / n * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=20, help="같은 이벤트를 받는 연결 수 (인코딩 공유 효과 확인)")
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+    results = {
+        "json (기존)": measure(events, lambda e: json.dumps(e, ensure_ascii=False).encode()),
+        "msgpack + 필드 테이블": measure(events, encode_msgpack),
+    }
+    print(f"이벤트 {args.events}건, 이벤트당 평균")
+    print(f"{'형식':<22}{'bytes':>10}{'deflate/msg':>14}{'deflate/conn':>14}{'encode(us)':>12}")
+    for name, r in results.items():
+        print(f"{name:<22}{r['bytes']:>10.1f}{r['deflate_per_message']:>14.1f}"
+              f"{r['deflate_takeover']:>14.1f}{r['encode_us']:>12.2f}")
+
+    # 연결마다 직렬화(기존 send_json) vs WireMessage 로 형식별 1회 직렬화
+    started = time.perf_counter()
+    for event in events:
+        for _ in range(args.clients):
+            json.dumps(event)
+    per_client = time.perf_counter() - started
+    started = time.perf_counter()
+    for event in events:
+        message = WireMessage(event)
+        for i in range(args.clients):
+            message.msgpack if i % 2 else message.json
+    shared = time.perf_counter() - started
+    print(f"\n연결 {args.clients}개 브로드캐스트 직렬화 CPU: 연결마다 {per_client / args.events * 1e6:.1f}us"
+          f" -> 형식별 1회 {shared / args.events * 1e6:.1f}us (이벤트당)")
+
+
+if __name__ == "__main__":
+    main()
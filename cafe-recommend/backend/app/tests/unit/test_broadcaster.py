@@ -0,0 +1,101 @@
+"""
+클라이언트별 bounded 큐 브로드캐스터 단위 테스트
+"""
+import asyncio
+
+import pytest
+
+from app.core.broadcast import DISCONNECT, DROP_OLDEST, Broadcaster
+
+
+class FakeClient:
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.sent = []
+        self.close_reasons = []
+
+    async def send(self, text):
+        if self.fail:
+            raise RuntimeError("connection closed")
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(text)
+
+    async def on_close(self, reason):
+        self.close_reasons.append(reason)
+
+
+async def drain(rounds=50):
+    for _ in range(rounds):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_delay_others_and_drops_oldest():
+    broadcaster = Broadcaster("test", max_queue_size=3, policy=DROP_OLDEST)
+    fast = FakeClient()
+    slow = FakeClient(delay=10)
+    broadcaster.add("fast", fast.send)
+    broadcaster.add("slow", slow.send)
+    try:
+        messages = [f"m{i}" for i in range(10)]
+        for message in messages:
+            assert broadcaster.broadcast(message) == 2
+            await drain(rounds=10)
+
+        assert fast.sent == messages
+        assert all(a is b for a, b in zip(fast.sent, messages))  # 같은 인코딩 결과를 공유
+        assert "slow" in broadcaster and slow.sent == []
+        # 느린 클라이언트 큐는 상한을 넘지 않고 가장 최근 메시지만 남음
+        channel = broadcaster.channels["slow"]
+        assert channel.depth == 3
+        assert list(channel.queue._queue) == messages[-3:]
+        metrics = broadcaster.metrics()
+        assert metrics["clients"] == 2
+        assert metrics["queue_depth_max"] == 3
+        assert metrics["dropped"] == channel.dropped == 6  # 첫 메시지는 전송 중, 3개는 큐에 남음
+    finally:
+        broadcaster.close_all()
+
+
+@pytest.mark.asyncio
+async def test_disconnect_policy_and_dead_connections_are_removed():
+    broadcaster = Broadcaster("test", max_queue_size=2, policy=DISCONNECT, send_timeout=5)
+    healthy = FakeClient()
+    slow = FakeClient(delay=10)
+    dead = FakeClient(fail=True)
+    broadcaster.add("healthy", healthy.send)
+    broadcaster.add("slow", slow.send, on_close=slow.on_close)
+    broadcaster.add("dead", dead.send, on_close=dead.on_close)
+    try:
+        for i in range(5):
+            broadcaster.broadcast(f"m{i}")
+            await drain(rounds=10)
+        await drain()
+
+        assert set(broadcaster.channels) == {"healthy"}
+        assert healthy.sent == [f"m{i}" for i in range(5)]
+        assert slow.close_reasons == ["slow_consumer"]
+        assert dead.close_reasons == ["send_failed"]
+        assert broadcaster.metrics()["evicted"] == 1
+    finally:
+        broadcaster.close_all()
+
+
+@pytest.mark.asyncio
+async def test_pull_channel_for_sse():
+    broadcaster = Broadcaster("test", max_queue_size=2, policy=DISCONNECT)
+    channel = broadcaster.add("sse")
+    broadcaster.broadcast("a")
+    assert await channel.get(timeout=1) == "a"
+    with pytest.raises(asyncio.TimeoutError):
+        await channel.get(timeout=0.01)
+
+    waiter = asyncio.ensure_future(channel.get(timeout=1))
+    await asyncio.sleep(0)
+    for message in ("b", "c", "d"):  # 소비자가 따라오지 못함 -> 연결 정리, 대기 중인 소비자는 None
+        broadcaster.broadcast(message)
+    assert await waiter is None
+    assert "sse" not in broadcaster
+    assert await channel.get(timeout=1) is None
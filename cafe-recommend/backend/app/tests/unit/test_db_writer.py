@@ -0,0 +1,140 @@
+"""
+단일 writer 큐(SQLiteWriter)에 대한 단위 테스트
+"""
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.core.events import event_bus, stage_event
+from app.db.writer import SQLiteWriter
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    """테스트용 SQLite 파일 데이터베이스 URL"""
+    url = f"sqlite:///{tmp_path / 'writer.db'}"
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE events (id INTEGER PRIMARY KEY, name TEXT UNIQUE)"))
+    engine.dispose()
+    return url
+
+
+@pytest.fixture
+def writer(db_url):
+    w = SQLiteWriter(db_url, max_batch_size=32, max_latency_ms=20)
+    yield w
+    w.stop()
+
+
+def count_rows(db_url: str) -> int:
+    engine = create_engine(db_url)
+    with engine.connect() as conn:
+        count = conn.execute(text("SELECT COUNT(*) FROM events")).scalar()
+    engine.dispose()
+    return count
+
+
+def insert_job(name: str):
+    def job(session):
+        return session.execute(
+            text("INSERT INTO events (name) VALUES (:name) RETURNING id"), {"name": name}
+        ).scalar()
+    return job
+
+
+def test_run_returns_job_result_after_commit(writer, db_url):
+    """작업 결과는 커밋 이후에 반환되어야 함"""
+    row_id = writer.run(insert_job("a"))
+
+    assert row_id == 1
+    assert count_rows(db_url) == 1
+
+
+def test_concurrent_jobs_are_group_committed(writer, db_url):
+    """동시에 제출된 작업은 적은 수의 배치로 묶여 커밋되어야 함"""
+    barrier = threading.Barrier(20)
+    results = []
+
+    def worker(i):
+        barrier.wait()
+        results.append(writer.run(insert_job(f"item-{i}")))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(results) == list(range(1, 21))
+    assert count_rows(db_url) == 20
+    assert writer.stats.jobs == 20
+    assert writer.stats.batches < 20
+
+
+def test_failed_job_does_not_affect_batch(writer, db_url):
+    """실패한 작업만 롤백되고 같은 배치의 다른 작업은 커밋되어야 함"""
+    ok_first = writer.submit_nowait(insert_job("dup"))
+    duplicate = writer.submit_nowait(insert_job("dup"))
+    ok_second = writer.submit_nowait(insert_job("other"))
+
+    assert ok_first.result(5) == 1
+    with pytest.raises(Exception):
+        duplicate.result(5)
+    assert ok_second.result(5) is not None
+    assert count_rows(db_url) == 2
+    assert writer.stats.failed_jobs == 1
+
+
+def test_staged_events_publish_after_batch_commit(writer, db_url):
+    """작업 세이브포인트 해제가 아니라 배치 COMMIT 뒤에 발행되고, 실패한 작업의 이벤트만 버려져야 함"""
+    seen = []
+
+    def handler(event):
+        # 발행 시점에 다른 커넥션에서 행이 보여야 함
+        seen.append((event["data"]["name"], count_rows(db_url)))
+
+    def staged_job(name: str, fail: bool = False):
+        def job(session):
+            row_id = insert_job(name)(session)
+            stage_event(session, "test.writer", {"name": name})
+            if fail:
+                raise ValueError("작업 실패")
+            return row_id
+        return job
+
+    event_bus.subscribe("test.writer", handler)
+    try:
+        futures = [
+            writer.submit_nowait(staged_job("first")),
+            writer.submit_nowait(staged_job("failed", fail=True)),
+            writer.submit_nowait(staged_job("second")),
+        ]
+        for future in futures:
+            future.exception(5)
+    finally:
+        event_bus.unsubscribe("test.writer", handler)
+
+    assert writer.stats.batches == 1
+    assert seen == [("first", 2), ("second", 2)]
+
+
+@pytest.mark.asyncio
+async def test_submit_is_awaitable(writer, db_url):
+    """비동기 submit은 배치 커밋 후 결과를 돌려주어야 함"""
+    ids = await asyncio.gather(*(writer.submit(insert_job(f"async-{i}")) for i in range(5)))
+
+    assert sorted(ids) == [1, 2, 3, 4, 5]
+    assert count_rows(db_url) == 5
+
+
+def test_stop_drains_pending_jobs(db_url):
+    """종료 시 큐에 남은 작업도 모두 처리되어야 함"""
+    w = SQLiteWriter(db_url, max_batch_size=4, max_latency_ms=50)
+    futures = [w.submit_nowait(insert_job(f"drain-{i}")) for i in range(10)]
+    w.stop()
+
+    assert all(f.done() for f in futures)
+    assert count_rows(db_url) == 10
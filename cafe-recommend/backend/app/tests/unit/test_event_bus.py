@@ -0,0 +1,127 @@
+"""
+프로세스 내부 이벤트 버스와 주문 ORM 이벤트 발행 단위 테스트
+"""
+import asyncio
+import threading
+from datetime import datetime
+
+import pytest
+
+from app.core.events import (
+    ORDER_CREATED,
+    ORDER_ITEM_STATUS_CHANGED,
+    ORDER_STATUS_CHANGED,
+    PAYMENT_APPROVED,
+    EventBus,
+    event_bus,
+)
+from app.crud.order import mark_order_paid, update_order_fields
+from app.models.order import Order, OrderItem
+from app.services import order_events  # noqa: F401
+
+
+@pytest.mark.asyncio
+async def test_patterns_and_handler_isolation():
+    bus = EventBus()
+    received = []
+
+    def failing(event):
+        raise RuntimeError("boom")
+
+    async def on_any(event):
+        received.append(("any", event["topic"]))
+
+    bus.subscribe("order.*", lambda event: received.append(("order", event["topic"])))
+    bus.subscribe("order.*", failing)
+    bus.subscribe("*", on_any)
+    bus.subscribe(PAYMENT_APPROVED, lambda event: received.append(("payment", event["data"]["order_id"])))
+
+    bus.publish(ORDER_CREATED, {"order_id": 1})
+    bus.publish(PAYMENT_APPROVED, {"order_id": 1})
+    await asyncio.sleep(0)
+
+    assert ("order", ORDER_CREATED) in received
+    assert ("payment", 1) in received
+    assert ("any", ORDER_CREATED) in received and ("any", PAYMENT_APPROVED) in received
+    assert ("order", PAYMENT_APPROVED) not in received
+    assert bus.errors == 1
+
+
+@pytest.mark.asyncio
+async def test_async_handlers_run_on_bound_loop_when_published_from_thread():
+    bus = EventBus()
+    bus.bind_loop(asyncio.get_running_loop())
+    done = asyncio.Event()
+    seen = []
+
+    async def handler(event):
+        seen.append(threading.current_thread() is threading.main_thread())
+        done.set()
+
+    bus.subscribe(ORDER_CREATED, handler)
+    await asyncio.to_thread(bus.publish, ORDER_CREATED, {"order_id": 7})
+    await asyncio.wait_for(done.wait(), timeout=1)
+    assert seen == [True]
+
+
+@pytest.fixture
+def db(sales_rollup_db):
+    return sales_rollup_db
+
+
+@pytest.fixture
+def received():
+    events = []
+
+    def handler(event):
+        events.append(event)
+
+    for topic in ("order.*", PAYMENT_APPROVED):
+        event_bus.subscribe(topic, handler)
+    yield events
+    for topic in ("order.*", PAYMENT_APPROVED):
+        event_bus.unsubscribe(topic, handler)
+
+
+def test_order_writes_publish_after_commit_only(db, received):
+    db.add(Order(id=1, status="pending", total_amount=3000, created_at=datetime(2025, 6, 2, 9, 30)))
+    db.flush()
+    db.rollback()
+    assert received == []
+
+    order = Order(id=1, status="pending", total_amount=3000, created_at=datetime(2025, 6, 2, 9, 30))
+    order.order_items.append(OrderItem(id=10, menu_id=1, quantity=1, unit_price=3000, total_price=3000))
+    db.add(order)
+    db.commit()
+    assert [e["topic"] for e in received] == [ORDER_CREATED]
+    assert received[0]["data"]["created_at"] == "2025-06-02T09:30:00"
+
+    received.clear()
+    mark_order_paid(db, 1, payment_key="tid-1")
+    assert received == []  # 커밋 전에는 발행하지 않음
+    db.commit()
+    topics = [e["topic"] for e in received]
+    assert topics == [ORDER_STATUS_CHANGED, PAYMENT_APPROVED]
+    assert received[0]["data"]["previous_status"] == "pending"
+    assert received[1]["data"]["order_number"] == order.order_number
+
+    received.clear()
+    order.order_items[0].status = "completed"
+    db.commit()
+    assert [e["topic"] for e in received] == [ORDER_ITEM_STATUS_CHANGED]
+    assert received[0]["data"]["item_id"] == 10
+
+
+def test_order_field_updates_publish_and_respect_expected_status(db, received):
+    db.add(Order(id=2, status="pending", total_amount=3000, created_at=datetime(2025, 6, 2, 9, 30)))
+    db.commit()
+    received.clear()
+
+    assert update_order_fields(db, 2, expected_status="paid", status="payment_failed") is None
+    assert update_order_fields(db, 99, status="payment_failed") is None
+    assert update_order_fields(db, 2, expected_status="pending", status="payment_failed", payment_key="tid-2")
+    assert received == []  # 커밋 전에는 발행하지 않음
+    db.commit()
+    assert [e["topic"] for e in received] == [ORDER_STATUS_CHANGED]
+    assert received[0]["data"]["previous_status"] == "pending"
+    assert db.get(Order, 2).payment_key == "tid-2"
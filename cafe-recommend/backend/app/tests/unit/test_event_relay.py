@@ -0,0 +1,64 @@
+"""
+워커 간 이벤트 전달(event_log tailing) 단위 테스트
+"""
+import os
+import tempfile
+
+import pytest
+
+from app.core.events import ORDER_ALERT, ORDER_CREATED, PAYMENT_APPROVED, EventBus
+from app.db.writer import SQLiteWriter
+from app.services.event_relay import EventLogRelay
+
+
+@pytest.fixture
+def database_url():
+    with tempfile.TemporaryDirectory() as tmp:
+        yield f"sqlite:///{os.path.join(tmp, 'events.db')}"
+
+
+def make_worker(database_url, writer, name):
+    bus = EventBus()
+    received = []
+    bus.subscribe("*", received.append)
+    relay = EventLogRelay(database_url, worker_id=name, writer=writer, bus=bus, poll_interval=60)
+    return bus, relay, received
+
+
+@pytest.mark.asyncio
+async def test_events_fan_out_to_other_workers(database_url):
+    writer = SQLiteWriter(database_url)
+    bus_a, relay_a, received_a = make_worker(database_url, writer, "worker-a")
+    bus_b, relay_b, received_b = make_worker(database_url, writer, "worker-b")
+    try:
+        relay_a.start()
+        bus_a.publish(ORDER_CREATED, {"order_id": 0})  # B 시작 전 이벤트는 재생하지 않음
+        await relay_a.poll_once()
+        relay_b.start()
+
+        bus_a.publish(ORDER_CREATED, {"order_id": 1})
+        bus_a.publish(ORDER_ALERT, {"type": "order_surge"})  # 워커별로 계산하는 토픽은 전달하지 않음
+        bus_b.publish(PAYMENT_APPROVED, {"order_id": 2})
+        await relay_a.poll_once()
+        await relay_b.poll_once()
+        await relay_a.poll_once()
+
+        remote_b = [e for e in received_b if "origin" in e]
+        assert [(e["topic"], e["data"], e["origin"]) for e in remote_b] == [(ORDER_CREATED, {"order_id": 1}, "worker-a")]
+        remote_a = [e for e in received_a if "origin" in e]
+        assert [(e["topic"], e["data"], e["origin"]) for e in remote_a] == [(PAYMENT_APPROVED, {"order_id": 2}, "worker-b")]
+
+        # 원격 이벤트는 다시 기록되지 않음
+        assert relay_a.sent == 2 and relay_b.sent == 1
+        assert await relay_a.poll_once() == 0 and await relay_b.poll_once() == 0
+        assert remote_b[0]["log_id"] < remote_a[0]["log_id"]
+    finally:
+        await relay_a.stop()
+        await relay_b.stop()
+        writer.stop()
+
+
+def test_in_memory_database_is_rejected():
+    relay = EventLogRelay("sqlite:///:memory:", bus=EventBus())
+    with pytest.raises(ValueError):
+        relay.start()
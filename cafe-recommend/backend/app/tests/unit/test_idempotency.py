@@ -0,0 +1,115 @@
+"""
+멱등성 키 저장소 단위 테스트
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.core.idempotency import IdempotencyStore, REPLAYED_HEADER, idempotency_store, run_idempotent
+
+
+@pytest.fixture(autouse=True)
+def clear_store():
+    idempotency_store.clear()
+    yield
+    idempotency_store.clear()
+
+
+def make_handler(calls, result=None, delay=0.0, error=None):
+    async def handler():
+        calls.append(1)
+        if delay:
+            await asyncio.sleep(delay)
+        if error:
+            raise error
+        return result
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_replay_returns_stored_result_without_rerun():
+    calls = []
+    payload = {"items": [[1, 2]]}
+    first = await run_idempotent("test", "s-1", payload, make_handler(calls, {"order_id": 1}))
+    response = Response()
+    second = await run_idempotent("test", "s-1", payload, make_handler(calls, {"order_id": 2}), response=response)
+
+    assert first == second == {"order_id": 1}
+    assert len(calls) == 1
+    assert response.headers[REPLAYED_HEADER] == "true"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_retries_share_one_execution():
+    """처리 중에 들어온 재시도는 새로 실행하지 않고 첫 요청의 결과를 기다림"""
+    calls = []
+    handler = make_handler(calls, {"order_id": 7}, delay=0.05)
+    results = await asyncio.gather(*(
+        run_idempotent("test", "s-1", {"a": 1}, handler, idempotency_key="k-1") for _ in range(10)
+    ))
+
+    assert results == [{"order_id": 7}] * 10
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_keys_are_scoped_by_session():
+    calls = []
+    await run_idempotent("test", "s-1", {"a": 1}, make_handler(calls, 1), idempotency_key="same")
+    await run_idempotent("test", "s-2", {"a": 1}, make_handler(calls, 2), idempotency_key="same")
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_same_key_with_different_payload_is_rejected():
+    await run_idempotent("test", "s-1", {"a": 1}, make_handler([], 1), idempotency_key="k")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await run_idempotent("test", "s-1", {"a": 2}, make_handler([], 2), idempotency_key="k")
+    assert exc_info.value.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_stored():
+    calls = []
+    with pytest.raises(HTTPException):
+        await run_idempotent("test", "s-1", {"a": 1},
+                             make_handler(calls, error=HTTPException(status_code=503)))
+    result = await run_idempotent("test", "s-1", {"a": 1}, make_handler(calls, "ok"))
+
+    assert result == "ok"
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_expired_records_are_rerun():
+    store = IdempotencyStore()
+    calls = []
+    await store.run("k", "fp", make_handler(calls, 1), ttl=0)
+    result, replayed = await store.run("k", "fp", make_handler(calls, 2), ttl=0)
+
+    assert (result, replayed) == (2, False)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_purge_pops_only_expired_records(monkeypatch):
+    store = IdempotencyStore()
+    now = [1000.0]
+    monkeypatch.setattr("app.core.idempotency.time.time", lambda: now[0])
+    calls = []
+    await store.run("short", "fp", make_handler(calls, 1), ttl=10)
+    await store.run("long", "fp", make_handler(calls, 2), ttl=100)
+
+    now[0] += 10
+    # 만료된 키를 다시 실행하면 힙에는 이전 기록 항목이 남아 있음
+    await store.run("short", "fp", make_handler(calls, 3), ttl=100)
+    store.purge_expired()
+    assert set(store.records) == {"short", "long"}
+    assert store.records["short"].result == 3
+
+    now[0] += 100
+    store.purge_expired()
+    assert store.records == {} and store._expiry_heap == []
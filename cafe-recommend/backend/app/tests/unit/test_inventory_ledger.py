@@ -0,0 +1,140 @@
+"""
+재고 원장 일일 스냅샷, 시점 재고/기간 소비량 조회, 원장 키셋 페이지네이션 단위 테스트
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, text
+
+from app.core.events import STOCK_CHANGED, event_bus
+from app.crud.pagination import next_cursor, paginate
+from app.models.inventory import Ingredient, IngredientStock, InventorySnapshot, InventoryTransaction
+from app.services.inventory_ledger import (
+    InsufficientStockError,
+    apply_transaction,
+    change_stock,
+    consumption_between,
+    stock_at,
+    take_daily_snapshots,
+)
+
+START = datetime(2025, 6, 1, 0, 30)
+
+
+@pytest.fixture
+def db(db_session):
+    session = db_session
+    session.add(Ingredient(id=1, name="원두", unit="g"))
+    session.add(IngredientStock(ingredient_id=1, current_quantity=0))
+    session.commit()
+    return session
+
+
+def simulate(db, days=4, per_day=24, seed=3):
+    """하루 per_day 건의 트랜잭션과 매일 새벽 스냅샷. 시각별 기대 재고/소비량 반환"""
+    rng = random.Random(seed)
+    stock, consumed, history = 0.0, 0.0, []
+    for day in range(days):
+        for n in range(per_day):
+            at = START + timedelta(days=day, minutes=60 * n + 10)
+            kind = rng.choice(["입고", "출고", "폐기", "주문출고", "주문취소", "조정"] if n else ["입고"])
+            quantity = float(rng.randint(1, 50)) * (10 if kind in ("입고", "조정") else 1)
+            if kind == "주문출고":
+                quantity = -quantity
+            db.add(InventoryTransaction(ingredient_id=1, transaction_type=kind, quantity=quantity, created_at=at))
+            stock = apply_transaction(stock, kind, quantity)
+            if kind in ("출고", "폐기"):
+                consumed += quantity
+            elif kind in ("주문출고", "주문취소"):
+                consumed -= quantity  # 주문출고는 음수, 주문취소(복원)는 양수로 기록됨
+            history.append((at, stock, consumed))
+        db.query(IngredientStock).filter(IngredientStock.ingredient_id == 1).one().current_quantity = stock
+        db.commit()
+        take_daily_snapshots(db, at=START + timedelta(days=day + 1, minutes=-5))
+        db.commit()
+    return history
+
+
+def test_stock_at_matches_full_replay(db):
+    history = simulate(db)
+    assert db.query(InventorySnapshot).count() == 4
+    assert stock_at(db, 1, START) is None  # 첫 스냅샷 이전
+
+    for at, expected, _ in history[24:]:
+        for probe in (at, at + timedelta(minutes=30)):
+            result = stock_at(db, 1, probe)
+            assert result["quantity"] == pytest.approx(expected)
+            assert result["tail_transactions"] <= 24  # 스냅샷 이후 최대 하루치만 읽음
+
+
+def test_consumption_between_uses_snapshot_totals(db):
+    history = simulate(db)
+    by_time = {at: consumed for at, _, consumed in history}
+    times = sorted(by_time)
+    for start, end in [(times[0], times[-1]), (times[3], times[40]), (times[30], times[75]), (times[50], times[51])]:
+        assert consumption_between(db, 1, start, end) == pytest.approx(by_time[end] - by_time[start])
+
+    # 스냅샷을 다시 만들어도(같은 날 갱신) 누적 소비량은 그대로
+    take_daily_snapshots(db, at=START + timedelta(days=4, minutes=-5))
+    db.commit()
+    assert consumption_between(db, 1, times[0], times[-1]) == pytest.approx(by_time[times[-1]] - by_time[times[0]])
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        consumption_between(db, 1, times[30], times[80])
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    assert len(statements) == 4  # 시점마다 스냅샷 1회 + 이후 구간 합계 1회
+
+
+def test_ledger_keyset_pages_without_gaps_or_duplicates(db):
+    at = datetime(2025, 6, 1, 12, 0)
+    for i in range(23):
+        # 같은 created_at 이 여러 건이어도 id 로 이어서 읽음
+        db.add(InventoryTransaction(ingredient_id=1, transaction_type="입고", quantity=i, created_at=at + timedelta(seconds=i // 4)))
+    db.commit()
+
+    query = db.query(InventoryTransaction).filter(InventoryTransaction.ingredient_id == 1)
+    seen, cursor = [], None
+    while True:
+        page = paginate(query, InventoryTransaction, limit=5, cursor=cursor)
+        seen.extend(row.id for row in page)
+        cursor = next_cursor(page, 5)
+        if cursor is None:
+            break
+    expected = [row.id for row in query.order_by(InventoryTransaction.created_at.desc(), InventoryTransaction.id.desc())]
+    assert seen == expected and len(seen) == 23
+
+
+def test_change_stock_applies_sql_increments_and_stages_events(db):
+    received = []
+    handler = lambda event: received.append(event["data"])
+    event_bus.subscribe(STOCK_CHANGED, handler)
+    try:
+        assert change_stock(db, 1, 100) == (0, 100)
+        assert received == []  # 커밋 전에는 발행하지 않음
+        db.commit()
+
+        # 그 사이 다른 작업(주문 차감)이 반영한 수량을 덮어쓰지 않음
+        db.execute(text("UPDATE ingredient_stocks SET current_quantity = current_quantity - 30"))
+        db.commit()
+        assert change_stock(db, 1, set_to=50) == (70, 50)
+        with pytest.raises(InsufficientStockError):
+            change_stock(db, 1, -60, require_available=True)
+
+        # 재고 행이 없으면 만들어서 반영
+        db.add(Ingredient(id=2, name="우유", unit="ml"))
+        db.flush()
+        assert change_stock(db, 2, 5, values={"last_restock_quantity": 5}) == (0, 5)
+        db.commit()
+    finally:
+        event_bus.unsubscribe(STOCK_CHANGED, handler)
+
+    stocks = {s.ingredient_id: s for s in db.query(IngredientStock).all()}
+    assert stocks[1].current_quantity == 50
+    assert (stocks[2].current_quantity, stocks[2].last_restock_quantity) == (5, 5)
+    assert [(e["ingredient_id"], e["previous_quantity"], e["current_quantity"]) for e in received] == [
+        (1, 0, 100), (1, 70, 50), (2, 0, 5)]
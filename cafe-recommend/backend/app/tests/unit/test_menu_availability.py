@@ -0,0 +1,251 @@
+"""
+재고 기반 메뉴 가용성 계산(필요량 행렬 x 재고 벡터) 단위 테스트
+"""
+import asyncio
+import random
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.cache import cache_get, cache_set, cache_tag
+from app.core.events import MENU_AVAILABILITY_CHANGED, MENU_RECIPE_CHANGED, STOCK_CHANGED, event_bus
+from app.models.inventory import Ingredient, IngredientStock, MenuIngredient
+from app.models.menu import MenuItem
+from app.services import menu_availability
+from app.services.menu_availability import (
+    AvailabilityRecomputer,
+    MenuDependencyIndex,
+    changed_flags,
+    load_availability_matrix,
+    recompute_menu_availability,
+    write_availability_flags,
+)
+
+
+@pytest.fixture
+def db(db_session):
+    return db_session
+
+
+def seed(db, menus=30, ingredients=20, seed=7):
+    rng = random.Random(seed)
+    for i in range(1, ingredients + 1):
+        db.add(Ingredient(id=i, name=f"재료{i}", unit="g", min_stock_level=50))
+        if i % 7:  # 일부 재료는 재고 행이 없음
+            db.add(IngredientStock(ingredient_id=i, current_quantity=rng.choice([0, 5, 30, 80, 500])))
+    for m in range(1, menus + 1):
+        db.add(MenuItem(id=m, name=f"메뉴{m}", price=4500, category="커피" if m % 2 else "디저트",
+                        is_available=True, is_active=m != menus))
+        for i in rng.sample(range(1, ingredients + 1), rng.randint(0, min(6, ingredients))):
+            db.add(MenuIngredient(menu_id=m, ingredient_id=i, quantity_required=rng.choice([1, 10, 40]),
+                                  is_optional=rng.random() < 0.2))
+    db.commit()
+
+
+def per_menu_reference(db, menu_id):
+    """기존 API 의 메뉴별 판정 (재료마다 조회)"""
+    unavailable, low = [], []
+    for mi in db.query(MenuIngredient).filter(MenuIngredient.menu_id == menu_id).order_by(MenuIngredient.id):
+        ingredient = db.get(Ingredient, mi.ingredient_id)
+        stock = db.query(IngredientStock).filter(IngredientStock.ingredient_id == mi.ingredient_id).first()
+        if not stock or stock.current_quantity < mi.quantity_required:
+            if not mi.is_optional:
+                unavailable.append(ingredient.name)
+        elif stock.current_quantity < ingredient.min_stock_level:
+            low.append(ingredient.name)
+    return not unavailable, sorted(unavailable), sorted(low)
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_matches_per_menu_evaluation(db, monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(menu_availability, "np", None)
+    elif menu_availability.np is None:
+        pytest.skip("NumPy 미설치")
+    seed(db)
+
+    result = load_availability_matrix(db).evaluate()
+    assert 30 not in result  # 비활성 메뉴 제외
+    assert any(not r["is_available"] for r in result.values()) and any(r["is_available"] for r in result.values())
+    for menu_id, availability in result.items():
+        expected = per_menu_reference(db, menu_id)
+        assert (availability["is_available"], sorted(availability["unavailable_ingredients"]),
+                sorted(availability["low_stock_ingredients"])) == expected
+
+    coffee = load_availability_matrix(db, category="커피").evaluate()
+    assert set(coffee) == {m for m in result if m % 2}
+
+
+def test_two_queries_and_one_batched_update(db):
+    seed(db, menus=100, ingredients=40)
+    statements = []
+    listener = lambda conn, cursor, statement, params, context, executemany: statements.append((statement, executemany))
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        result = load_availability_matrix(db).evaluate()
+        assert len(statements) == 2
+        changes = changed_flags(result)
+        assert changes
+        write_availability_flags(db, changes)
+        db.commit()
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    updates = [s for s in statements if s[0].lstrip().upper().startswith("UPDATE")]
+    assert len(updates) == 1 and updates[0][1]  # executemany 한 번
+    assert changed_flags(load_availability_matrix(db).evaluate()) == []
+
+
+@pytest.fixture
+def events():
+    received = []
+
+    def handler(event):
+        received.append(event)
+
+    for topic in (STOCK_CHANGED, MENU_RECIPE_CHANGED, MENU_AVAILABILITY_CHANGED):
+        event_bus.subscribe(topic, handler)
+    yield received
+    for topic in (STOCK_CHANGED, MENU_RECIPE_CHANGED, MENU_AVAILABILITY_CHANGED):
+        event_bus.unsubscribe(topic, handler)
+
+
+def commit_write(db):
+    def write(fn):
+        result = fn(db)
+        db.commit()
+        return result
+    return write
+
+
+def commit_write_factory(factory):
+    """새 세션에서 쓰고 커밋 (다른 스레드에서 호출되는 재계산용)"""
+    def write(fn):
+        with factory() as session:
+            result = fn(session)
+            session.commit()
+            return result
+    return write
+
+
+def test_stock_change_recomputes_only_dependent_menus(db, events, monkeypatch):
+    monkeypatch.setattr(menu_availability, "dependency_index", MenuDependencyIndex())
+    seed(db)
+    write_availability_flags(db, changed_flags(load_availability_matrix(db).evaluate()))
+    db.commit()
+    menu_availability.dependency_index.load(db)
+
+    ingredient_id = db.query(MenuIngredient.ingredient_id).filter(MenuIngredient.is_optional == False).first()[0]  # noqa: E712
+    dependents = {mi.menu_id for mi in db.query(MenuIngredient).filter(MenuIngredient.ingredient_id == ingredient_id)}
+    assert menu_availability.dependency_index.menus_for([ingredient_id]) == dependents
+
+    cache_set("detail", "cached", 60)
+    cache_tag("detail", f"menu_detail:{min(dependents)}")
+    stock = db.query(IngredientStock).filter(IngredientStock.ingredient_id == ingredient_id).first()
+    if stock is None:
+        stock = IngredientStock(ingredient_id=ingredient_id, current_quantity=0)
+        db.add(stock)
+    stock.current_quantity = 0
+    db.commit()
+    stock.current_quantity = 10_000
+    db.commit()
+    assert events[-1]["topic"] == STOCK_CHANGED and events[-1]["data"]["ingredient_id"] == ingredient_id
+    events.clear()
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        changed = recompute_menu_availability(db, ingredient_ids=[ingredient_id], write=commit_write(db))
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    assert {c["menu_id"] for c in changed} <= dependents
+    assert [e["data"]["menu_id"] for e in events if e["topic"] == MENU_AVAILABILITY_CHANGED] == [c["menu_id"] for c in changed]
+    assert all(
+        availability["is_available"] == per_menu_reference(db, menu_id)[0]
+        for menu_id, availability in load_availability_matrix(db).evaluate().items()
+    )
+    if changed:
+        assert len([s for s in statements if s.lstrip().upper().startswith("UPDATE")]) == 1
+        if min(dependents) in {c["menu_id"] for c in changed}:
+            assert cache_get("detail") is None
+
+
+@pytest.mark.asyncio
+async def test_recipe_events_update_index_and_trigger_recompute(db, monkeypatch):
+    index = MenuDependencyIndex()
+    monkeypatch.setattr(menu_availability, "dependency_index", index)
+    seed(db, menus=3, ingredients=3)
+    index.load(db)
+    recomputer = AvailabilityRecomputer(session_factory=lambda: sessionmaker(bind=db.get_bind())(),
+                                        write=commit_write(db))
+    monkeypatch.setattr(menu_availability, "availability_recomputer", recomputer)
+    event_bus.bind_loop(asyncio.get_running_loop())
+    event_bus.subscribe(MENU_RECIPE_CHANGED, recomputer.on_event)
+    try:
+        db.add(Ingredient(id=99, name="품절 재료", unit="g", min_stock_level=0))
+        db.add(MenuIngredient(menu_id=1, ingredient_id=99, quantity_required=5))
+        db.commit()
+        await asyncio.sleep(0)
+        await recomputer.wait_idle()
+        assert 1 in index.menus_for([99])
+        db.expire_all()
+        assert db.get(MenuItem, 1).is_available is False  # 재고 행이 없는 필수 재료
+
+        recipe = db.query(MenuIngredient).filter(MenuIngredient.ingredient_id == 99).one()
+        db.delete(recipe)
+        db.commit()
+        await asyncio.sleep(0)
+        await recomputer.wait_idle()
+        assert index.menus_for([99]) == set()
+        # 다른 워커에서 전달된 이벤트는 인덱스만 갱신하고 재계산하지 않음
+        runs = recomputer.runs
+        await recomputer.on_event({"topic": MENU_RECIPE_CHANGED, "origin": "other",
+                                   "data": {"menu_id": 2, "ingredient_id": 99, "action": "added"}})
+        assert index.menus_for([99]) == {2} and recomputer.runs == runs
+    finally:
+        event_bus.unsubscribe(MENU_RECIPE_CHANGED, recomputer.on_event)
+
+
+def test_stock_change_through_writer_recomputes_from_committed_stock(tmp_path, monkeypatch):
+    """writer 큐의 작업 세이브포인트 해제가 아니라 배치 커밋 뒤에 재계산되어 커밋된 재고를 읽어야 함"""
+    from app.db.writer import SQLiteWriter
+
+    monkeypatch.setattr(menu_availability, "dependency_index", MenuDependencyIndex())
+    url = f"sqlite:///{tmp_path / 'menu.db'}"
+    engine = create_engine(url)
+    for model in (MenuItem, Ingredient, IngredientStock, MenuIngredient):
+        model.__table__.create(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add(Ingredient(id=1, name="원두", unit="g", min_stock_level=0))
+        db.add(IngredientStock(ingredient_id=1, current_quantity=100))
+        db.add(MenuItem(id=1, name="아메리카노", price=4500, category="커피", is_available=True, is_active=True))
+        db.add(MenuIngredient(menu_id=1, ingredient_id=1, quantity_required=30))
+        db.commit()
+
+    recomputer = AvailabilityRecomputer(session_factory=factory, write=commit_write_factory(factory))
+    changed = []
+
+    def on_stock_changed(event):
+        # 발행한 스레드(writer)에서 바로 재계산: 이 시점에 재고가 커밋되어 있어야 함
+        data = event["data"]
+        changed.append(recomputer._run_once(set(data.get("ingredient_ids") or [data["ingredient_id"]]), set()))
+
+    def use_up(session):
+        session.query(IngredientStock).filter(IngredientStock.ingredient_id == 1).one().current_quantity = 10
+
+    writer = SQLiteWriter(url, max_latency_ms=20)
+    event_bus.subscribe(STOCK_CHANGED, on_stock_changed)
+    try:
+        writer.run(use_up, timeout=5)
+    finally:
+        event_bus.unsubscribe(STOCK_CHANGED, on_stock_changed)
+        writer.stop()
+
+    assert changed == [1]
+    with factory() as db:
+        assert db.get(MenuItem, 1).is_available is False
+    engine.dispose()
@@ -0,0 +1,110 @@
+"""
+관리자 알림 저장소(읽음 커서, 읽지 않은 알림 카운터, 키셋 페이지네이션) 단위 테스트
+"""
+import pytest
+from sqlalchemy import event
+
+from app.core.events import ORDER_ALERT, STOCK_LOW
+from app.crud import notification as notification_crud
+from app.models.notification import AdminNotificationRead
+from app.routers.admin.notifications import notification_dedupe_key
+
+
+@pytest.fixture
+def db(db_session):
+    return db_session
+
+
+def add(db, count, type="stock_low"):
+    ids = [
+        notification_crud.add_notification(db, type, {"ingredient_id": i}, severity="medium")
+        for i in range(count)
+    ]
+    db.commit()
+    return ids
+
+
+def cursor_of(db, admin_id):
+    db.expire_all()
+    return notification_crud.get_cursor(db, admin_id)
+
+
+def test_unread_counter_follows_writes_and_reads(db):
+    add(db, 3)
+    notification_crud.ensure_cursor(db, 1)  # 기존 알림 3건은 읽지 않음으로 시작
+    db.commit()
+    assert cursor_of(db, 1).unread_count == 3
+
+    ids = add(db, 2)
+    assert cursor_of(db, 1).unread_count == 5
+
+    assert notification_crud.mark_read(db, 1, ids[0]) is True
+    assert notification_crud.mark_read(db, 1, ids[0]) is False  # 이미 읽음
+    assert notification_crud.mark_read(db, 1, 999) is None
+    db.commit()
+    assert cursor_of(db, 1).unread_count == 4
+
+    assert notification_crud.mark_all_read(db, 1) == 4
+    db.commit()
+    assert cursor_of(db, 1).unread_count == 0
+    assert db.query(AdminNotificationRead).count() == 0  # 커서가 앞으로 이동하며 개별 읽음 기록 정리
+    assert notification_crud.mark_read(db, 1, ids[1]) is False
+
+    add(db, 1)
+    assert notification_crud.get_unread_count(db, 1) == 1
+
+
+def test_unread_count_is_a_single_row_read(db):
+    add(db, 50)
+    notification_crud.ensure_cursor(db, 1)
+    db.commit()
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        assert notification_crud.get_unread_count(db, 1) == 50
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    assert len(statements) == 1 and "count(" not in statements[0].lower()
+
+
+def test_keyset_pages_and_read_flags(db):
+    add(db, 5, type="stock_low")
+    add(db, 2, type="order_surge")
+    notification_crud.ensure_cursor(db, 1)
+    notification_crud.mark_read(db, 1, 6)
+    db.commit()
+    cursor_row = cursor_of(db, 1)
+
+    page, next_page = notification_crud.list_notifications(db, cursor_row, limit=3)
+    assert [item["id"] for item in page] == [7, 6, 5]
+    assert [item["is_read"] for item in page] == [False, True, False]
+    assert page[0]["type"] == "order_surge" and page[2]["ingredient_id"] == 4
+    page, next_page = notification_crud.list_notifications(db, cursor_row, cursor=next_page, limit=3)
+    assert [item["id"] for item in page] == [4, 3, 2]
+    page, next_page = notification_crud.list_notifications(db, cursor_row, cursor=next_page, limit=3)
+    assert [item["id"] for item in page] == [1] and next_page is None
+
+    stock, _ = notification_crud.list_notifications(db, cursor_row, type="stock_low", limit=10)
+    assert [item["id"] for item in stock] == [5, 4, 3, 2, 1]
+    unread, _ = notification_crud.list_notifications(db, cursor_row, unread_only=True, limit=10)
+    assert 6 not in [item["id"] for item in unread] and len(unread) == 6
+
+    with pytest.raises(ValueError):
+        notification_crud.list_notifications(db, cursor_row, cursor="not-a-cursor")
+
+
+def test_alerts_computed_by_every_worker_are_stored_once(db):
+    notification_crud.ensure_cursor(db, 1)
+    alert = {
+        "topic": ORDER_ALERT,
+        "timestamp": "2025-06-02T12:00:05",
+        "data": {"type": "order_surge", "is_surge": True, "created_at": "2025-06-02T12:00:00", "severity": "high"},
+    }
+    key = notification_dedupe_key(alert)
+    ids = [notification_crud.add_notification(db, "order_surge", alert["data"], "high", key) for _ in range(3)]
+    db.commit()
+    assert ids[0] is not None and ids[1:] == [None, None]
+    assert cursor_of(db, 1).unread_count == 1
+    assert notification_dedupe_key({"topic": STOCK_LOW, "data": {"ingredient_id": 1}}) is None
@@ -0,0 +1,60 @@
+"""
+주문 분석 OLAP 큐브 단위 테스트
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.menu import MenuItem
+from app.models.order import Order, OrderItem
+from app.services.order_analytics import _analytics_without_numpy, get_order_analytics_data, order_cube_cache
+
+pytest.importorskip("numpy")
+
+START = datetime(2025, 6, 1)
+END = datetime(2025, 6, 4)
+
+
+@pytest.fixture
+def db(sales_rollup_db):
+    session = sales_rollup_db
+    session.add_all([
+        MenuItem(id=1, name="아메리카노", price=3000, category="coffee"),
+        MenuItem(id=2, name="라떼", price=4000, category="coffee"),
+        MenuItem(id=3, name="치즈케이크", price=6000, category="dessert"),
+    ])
+    statuses = ["paid", "completed", "cancelled", "refunded", None]
+    methods = ["kakao", "naver", None]
+    for i in range(1, 61):
+        menu_id = i % 3 + 1
+        price = {1: 3000, 2: 4000, 3: 6000}[menu_id]
+        quantity = i % 4 + 1
+        session.add(Order(id=i, status=statuses[i % 5], payment_method=methods[i % 3],
+                          total_amount=price * quantity, created_at=START + timedelta(minutes=73 * i)))
+        session.add(OrderItem(order_id=i, menu_id=menu_id, quantity=quantity, unit_price=price,
+                              total_price=price * quantity))
+    session.commit()
+    order_cube_cache.invalidate()
+    return session
+
+
+@pytest.mark.asyncio
+async def test_cube_matches_python_aggregation(db):
+    for start, end in ((START, END), (START + timedelta(days=1), END), (None, None)):
+        assert await get_order_analytics_data(db, start, end) == await _analytics_without_numpy(db, start, end)
+
+
+@pytest.mark.asyncio
+async def test_cube_is_cached_per_range_and_invalidated_by_new_orders(db):
+    first = await get_order_analytics_data(db, START, END)
+    misses = order_cube_cache.misses
+    assert await get_order_analytics_data(db, START, END) == first
+    assert order_cube_cache.misses == misses
+
+    db.add(Order(id=100, status="paid", payment_method="kakao", total_amount=5000,
+                 created_at=START + timedelta(hours=2)))
+    db.commit()
+
+    updated = await get_order_analytics_data(db, START, END)
+    assert order_cube_cache.misses == misses + 1
+    assert updated["summary"]["total_orders"] == first["summary"]["total_orders"] + 1
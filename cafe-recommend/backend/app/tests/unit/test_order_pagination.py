@@ -0,0 +1,78 @@
+"""
+주문 목록 키셋(커서) 페이지네이션 단위 테스트
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.cache import cache_clear
+from app.crud import order as order_crud
+from app.crud.pagination import decode_cursor, encode_cursor, next_cursor
+from app.models.order import Order
+
+
+@pytest.fixture
+def db(db_session):
+    session = db_session
+    base = datetime(2025, 6, 1, 12, 0, 0)
+    for i in range(25):
+        # 5건씩 같은 created_at을 갖도록 하여 id 타이브레이크를 검증
+        session.add(Order(
+            session_id="s-1" if i % 2 == 0 else "s-2",
+            status="paid",
+            total_amount=1000 + i,
+            created_at=base + timedelta(minutes=i // 5),
+        ))
+    session.commit()
+    cache_clear()
+    return session
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 6, 1, 12, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+
+def test_invalid_cursor_raises_value_error():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_keyset_pages_match_offset_pages(db):
+    """커서로 넘긴 페이지는 OFFSET 페이지와 같은 순서, 중복 없이 전체를 덮어야 함"""
+    offset_ids = []
+    for skip in range(0, 25, 7):
+        page, _ = order_crud.get_by_status(db, status="paid", skip=skip, limit=7)
+        offset_ids.extend(o.id for o in page)
+
+    keyset_ids = []
+    cursor = None
+    while True:
+        page, total = order_crud.get_by_status(db, status="paid", limit=7, cursor=cursor)
+        keyset_ids.extend(o.id for o in page)
+        cursor = next_cursor(page, 7)
+        if cursor is None:
+            break
+
+    assert total == 25
+    assert keyset_ids == offset_ids
+    assert len(set(keyset_ids)) == 25
+
+
+def test_session_filter_and_without_total(db):
+    page, total = order_crud.get_by_session(db, session_id="s-1", limit=5, with_total=False)
+
+    assert total is None
+    assert all(o.session_id == "s-1" for o in page)
+    created = [(o.created_at, o.id) for o in page]
+    assert created == sorted(created, reverse=True)
+
+
+def test_total_is_cached_between_pages(db):
+    """같은 조건의 전체 건수는 캐시되어 두 번째 페이지에서 COUNT를 다시 하지 않음"""
+    _, first_total = order_crud.get_by_status(db, status="paid", limit=5)
+    db.add(Order(session_id="s-3", status="paid", created_at=datetime(2025, 6, 2)))
+    db.commit()
+    _, second_total = order_crud.get_by_status(db, status="paid", limit=5)
+
+    assert first_total == second_total == 25
@@ -0,0 +1,114 @@
+"""
+주문 검색 FTS5 인덱스 단위 테스트
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import Response
+from sqlalchemy import text
+
+from app.api.admin.orders import search_admin_orders
+from app.core.cache import cache_clear
+from app.crud.order import search_orders
+from app.crud.order_search import build_match_query, create_order_search_index, drop_order_search_index
+from app.crud.pagination import cursor_for
+from app.models.order import Order
+
+
+@pytest.fixture
+def db(db_session):
+    session = db_session
+    engine = session.get_bind()
+    base = datetime(2025, 6, 1, 9, 0, 0)
+    rows = [
+        ("20250601-001", "010-1234-5678", "서울시 강남구 테헤란로 1"),
+        ("20250601-002", "010-5678-1234", "서울시 마포구 월드컵로 2"),
+        ("20250601-003", "010-9999-0000", "부산시 해운대구 1234번길"),
+        (None, None, "서울시 강남구 역삼로 3"),
+    ]
+    for i, (number, phone, address) in enumerate(rows, start=1):
+        session.add(Order(id=i, order_number=number, phone_number=phone, delivery_address=address,
+                          status="paid", created_at=base + timedelta(minutes=i)))
+    session.commit()
+
+    # 인덱스 생성 시 기존 주문이 색인되어야 함
+    with engine.begin() as conn:
+        create_order_search_index(conn)
+    cache_clear()
+    yield session
+    # FTS 가상 테이블은 conftest 의 drop_all 대상이 아니므로 직접 삭제
+    session.rollback()
+    with engine.begin() as conn:
+        drop_order_search_index(conn)
+
+
+def test_backfill_and_insert_trigger(db):
+    db.add(Order(id=5, order_number="20250602-001", phone_number="010-4321-8765",
+                 delivery_address="대구시 중구", created_at=datetime(2025, 6, 2)))
+    db.commit()
+
+    assert db.execute(text("SELECT count(*) FROM orders_fts")).scalar() == 5
+    orders, total = search_orders(db, search_term="대구시")
+    assert [o.id for o in orders] == [5]
+    assert total == 1
+
+
+def test_update_and_delete_triggers(db):
+    db.execute(text("UPDATE orders SET delivery_address = '인천시 연수구' WHERE id = 4"))
+    db.execute(text("DELETE FROM orders WHERE id = 3"))
+    db.commit()
+
+    assert [o.id for o in search_orders(db, search_term="인천시")[0]] == [4]
+    assert search_orders(db, search_term="해운대")[0] == []
+
+
+def test_phone_suffix_ranked_first(db):
+    """전화번호 뒷자리가 일치하는 주문이 중간에 포함된 주문보다 먼저 나와야 함"""
+    orders, total = search_orders(db, search_term="1234")
+
+    # 3번 주문은 주소에만 '1234'가 있으므로 전화번호 검색 대상이 아님
+    assert [o.id for o in orders] == [2, 1]
+    assert total == 2
+
+
+def test_hyphenated_phone_and_exact_order_number(db):
+    assert [o.id for o in search_orders(db, search_term="5678-1234")[0]] == [2]
+    assert [o.id for o in search_orders(db, search_term="20250601-003")[0]][0] == 3
+
+
+def test_short_term_falls_back_to_like(db):
+    assert build_match_query("강남") is None
+    orders, total = search_orders(db, search_term="강남")
+    assert sorted(o.id for o in orders) == [1, 4]
+    assert total == 2
+
+
+def test_cursor_pagination_within_matches(db):
+    first, _ = search_orders(db, search_term="서울시", limit=2, cursor=None)
+    assert len(first) == 2
+
+    page1, total = search_orders(db, search_term="서울시", limit=2, cursor=cursor_for(first[0]))
+    assert total == 3
+    assert all(o.created_at < first[0].created_at for o in page1)
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_pages_from_first_request(db):
+    async def search(limit, cursor=None):
+        response = Response()
+        orders = await search_admin_orders(response, q="서울시", skip=0, limit=limit, cursor=cursor,
+                                           db=db, current_admin=None)
+        return [o.id for o in orders], response.headers.get("X-Next-Cursor")
+
+    # 한 페이지에 모두 들어가면 관련도순, 커서 없음
+    ids, next_page = await search(limit=3)
+    assert sorted(ids) == [1, 2, 4] and next_page is None
+
+    # 더 많으면 첫 페이지부터 최신순으로 커서를 반환
+    pages, next_page = [], None
+    while True:
+        ids, next_page = await search(limit=2, cursor=next_page)
+        pages.append(ids)
+        if next_page is None:
+            break
+    assert pages == [[4, 2], [1]]
@@ -0,0 +1,78 @@
+"""
+고객 주문 상태 푸시(세션별 채널, long-poll) 단위 테스트
+"""
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+
+from app.core.events import ORDER_STATUS_CHANGED, event_bus
+from app.crud.order import mark_order_paid
+from app.models.order import Order
+from app.services.order_status_push import OrderStatusHub, order_status_hub
+
+
+@pytest.mark.asyncio
+async def test_status_change_is_pushed_to_owning_session_only():
+    hub = OrderStatusHub()
+    mine = hub.subscribe("session-a", "tab-1")
+    other = hub.subscribe("session-b", "tab-1")
+    hub.remember(1, "session-a", "pending", "ORD-1")
+
+    hub.apply(ORDER_STATUS_CHANGED, {"order_id": 1, "session_id": "session-a", "status": "paid"})
+    hub.apply(ORDER_STATUS_CHANGED, {"order_id": 1, "session_id": "session-a", "status": "paid"})  # 중복
+
+    message = json.loads((await mine.get(timeout=1)).json)
+    assert message["type"] == "order_status"
+    assert message["data"]["status"] == "paid" and message["data"]["previous_status"] == "pending"
+    assert "session_id" not in message["data"]
+    assert mine.queue.empty()  # 같은 상태는 다시 보내지 않음
+    assert other.queue.empty()
+    assert hub.version == 1 and hub.pushed == 1
+
+    hub.unsubscribe("session-a", "tab-1")
+    hub.unsubscribe("session-b", "tab-1")
+    assert hub.metrics()["sessions"] == 0
+
+
+@pytest.mark.asyncio
+async def test_long_poll_parks_until_change_or_timeout():
+    hub = OrderStatusHub()
+    hub.remember(1, "session-a", "paid")
+
+    assert await hub.wait(1, since_version=0, timeout=0.05) is None
+    assert hub.metrics()["long_poll_waiting"] == 0
+
+    waiters = [asyncio.create_task(hub.wait(1, since_version=0, timeout=1)) for _ in range(3)]
+    await asyncio.sleep(0)
+    hub.apply(ORDER_STATUS_CHANGED, {"order_id": 1, "status": "preparing"})
+    states = await asyncio.gather(*waiters)
+    assert [state["status"] for state in states] == ["preparing"] * 3
+    assert hub.metrics()["long_poll_waiting"] == 0
+
+    # 이미 본 version 보다 새 상태가 있으면 바로 반환
+    assert (await hub.wait(1, since_version=0, timeout=1))["version"] == 1
+    assert hub.lookups == 1  # DB에서 읽은 것은 처음 remember 한 번뿐
+
+
+@pytest.mark.asyncio
+async def test_order_commit_feeds_session_channel(db_session):
+    db = db_session
+    event_bus.bind_loop(asyncio.get_running_loop())
+    channel = order_status_hub.subscribe("session-db", "tab-1")
+    try:
+        db.add(Order(id=901, session_id="session-db", status="pending", total_amount=3000,
+                     created_at=datetime(2025, 6, 2, 9, 30)))
+        db.commit()
+        mark_order_paid(db, 901, payment_key="tid-901")
+        db.commit()
+
+        created = json.loads((await channel.get(timeout=1)).json)["data"]
+        paid = json.loads((await channel.get(timeout=1)).json)["data"]
+        assert (created["order_id"], created["status"]) == (901, "pending")
+        assert (paid["status"], paid["previous_status"]) == ("paid", "pending")
+        assert paid["version"] > created["version"]
+        assert order_status_hub.get(901)["status"] == "paid"
+    finally:
+        order_status_hub.unsubscribe("session-db", "tab-1")
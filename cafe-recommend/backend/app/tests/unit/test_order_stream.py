@@ -0,0 +1,63 @@
+"""
+관리자 주문 목록 스트리밍 조회 단위 테스트
+"""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.crud.order_stream import iter_order_chunks, stream_orders_json_array, stream_orders_ndjson
+from app.models.menu import MenuItem
+from app.models.order import Order, OrderItem
+
+
+@pytest.fixture
+def db(db_session):
+    session = db_session
+    session.add(MenuItem(id=1, name="아메리카노", price=3000, category="coffee"))
+    base = datetime(2025, 6, 1, 9, 0, 0)
+    for i in range(1, 31):
+        session.add(Order(id=i, status="paid" if i % 3 else "cancelled", total_amount=3000 * i,
+                          created_at=base + timedelta(minutes=i)))
+        session.add(OrderItem(order_id=i, menu_id=1, quantity=i, unit_price=3000,
+                              total_price=3000 * i, status="pending", created_at=base))
+    # 메뉴가 삭제된 항목
+    session.add(OrderItem(order_id=30, menu_id=99, quantity=1, unit_price=1000,
+                          total_price=1000, status="pending", created_at=base))
+    session.commit()
+    return session
+
+
+def test_chunks_use_one_item_query_per_chunk(db):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        chunks = list(iter_order_chunks(db, [], chunk_size=10))
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    assert [len(chunk) for chunk in chunks] == [10, 10, 10]
+    # 주문 쿼리 1번 + chunk당 항목 쿼리 1번
+    assert len(statements) == 4
+
+
+def test_ndjson_stream_is_newest_first_with_items(db):
+    lines = b"".join(stream_orders_ndjson(db, [], chunk_size=7)).decode().splitlines()
+    orders = [json.loads(line) for line in lines]
+
+    assert [o["id"] for o in orders] == list(range(30, 0, -1))
+    assert orders[0]["order_number"] == "ORD-000030"
+    assert [item["menu_name"] for item in orders[0]["items"]] == ["아메리카노", "알 수 없는 메뉴"]
+
+
+def test_json_array_stream_applies_filters(db):
+    body = b"".join(stream_orders_json_array(db, [Order.status == "cancelled"], chunk_size=4))
+    orders = json.loads(body)
+
+    assert [o["id"] for o in orders] == [30, 27, 24, 21, 18, 15, 12, 9, 6, 3]
+
+
+def test_json_array_stream_empty(db):
+    assert json.loads(b"".join(stream_orders_json_array(db, [Order.id < 0]))) == []
@@ -0,0 +1,87 @@
+"""
+읽기 전용 커넥션 풀 병렬 조회 단위 테스트
+"""
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.read_pool import ReadQueryExecutor, ReadQueryTimeout, run_read_queries
+
+# 오래 걸리는 읽기 쿼리 (재귀 CTE 로 n 까지 합산)
+SLOW_SQL = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < :n) SELECT sum(x) FROM c"
+
+
+@pytest.fixture
+def database_url():
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'read.db')}"
+        engine = create_engine(url)
+        with engine.begin() as conn:
+            conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+            conn.exec_driver_sql("CREATE TABLE t (id INTEGER PRIMARY KEY, v INTEGER)")
+            conn.exec_driver_sql("INSERT INTO t (v) VALUES (1), (2), (3)")
+        engine.dispose()
+        yield url
+
+
+@pytest.fixture
+def executor(database_url):
+    executor = ReadQueryExecutor(database_url, pool_size=3, timeout=5.0)
+    yield executor
+    executor.close()
+
+
+@pytest.mark.asyncio
+async def test_runs_queries_and_merges_results_by_name(executor):
+    results = await executor.run({
+        "total": lambda s: s.execute(text("SELECT sum(v) FROM t")).scalar(),
+        "count": lambda s: s.execute(text("SELECT count(*) FROM t")).scalar(),
+        "slow": lambda s: s.execute(text(SLOW_SQL), {"n": 1000}).scalar(),
+    })
+    assert results == {"total": 6, "count": 3, "slow": 500500}
+
+
+@pytest.mark.asyncio
+async def test_connections_are_query_only(executor):
+    with pytest.raises(OperationalError):
+        await executor.run({"write": lambda s: s.execute(text("INSERT INTO t (v) VALUES (4)"))})
+
+
+@pytest.mark.asyncio
+async def test_slow_query_is_interrupted_after_timeout(executor):
+    with pytest.raises(ReadQueryTimeout) as exc_info:
+        await executor.run(
+            {
+                "fast": lambda s: s.execute(text("SELECT 1")).scalar(),
+                "slow": lambda s: s.execute(text(SLOW_SQL), {"n": 10 ** 10}).scalar(),
+            },
+            timeouts={"slow": 0.1},
+        )
+    assert exc_info.value.name == "slow"
+    assert executor.timeouts == 1
+
+    # 중단된 커넥션은 풀로 돌아와 다시 사용할 수 있어야 함
+    results = await executor.run({"again": lambda s: s.execute(text("SELECT count(*) FROM t")).scalar()})
+    assert results == {"again": 3}
+
+
+@pytest.mark.asyncio
+async def test_in_memory_database_falls_back_to_request_session():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    session = sessionmaker(bind=engine)()
+    session.execute(text("CREATE TABLE t (v INTEGER)"))
+    session.execute(text("INSERT INTO t VALUES (7)"))
+
+    results = await run_read_queries(session, {"v": lambda s: s.execute(text("SELECT v FROM t")).scalar()})
+    assert results == {"v": 7}
+    session.close()
+    engine.dispose()
@@ -0,0 +1,139 @@
+"""
+실시간 매출 스냅샷 공유 poller 단위 테스트
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.models.order import Order
+from app.services import realtime_sales
+from app.services.realtime_sales import SalesSnapshotPoller, compute_sales_snapshot
+
+TODAY = datetime.combine(datetime.now().date(), datetime.min.time())
+
+
+class FakeWebSocket:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.sent = []
+
+    async def send_text(self, text):
+        if self.fail:
+            raise RuntimeError("connection closed")
+        self.sent.append(text)
+
+
+@pytest.fixture
+def engine(sales_rollup_db):
+    """주문을 넣은 conftest 엔진 (poller 가 세션을 직접 만들도록 엔진을 넘김)"""
+    session = sales_rollup_db
+    statuses = ["paid", "completed", "cancelled", "pending_payment"]
+    for i in range(1, 13):
+        session.add(Order(id=i, order_number=f"ORD-{i}", status=statuses[i % 4], total_amount=1000 * i,
+                          created_at=TODAY + timedelta(hours=i % 3 + 9, minutes=i)))
+    session.add(Order(id=13, status="paid", total_amount=99000, created_at=TODAY - timedelta(hours=1)))
+    session.commit()
+    return session.get_bind()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_matches_order_table(engine):
+    with sessionmaker(bind=engine)() as db:
+        snapshot = await compute_sales_snapshot(db, now=TODAY + timedelta(hours=12))
+        counted = [o for o in db.query(Order).all()
+                   if o.status in ("paid", "completed") and o.created_at >= TODAY]
+
+    assert snapshot["today_sales"] == sum(o.total_amount for o in counted)
+    assert sum(h["count"] for h in snapshot["hourly_data"]) == len(counted)
+    assert [h["hour"] for h in snapshot["hourly_data"]] == [9, 10, 11]
+    assert [o["id"] for o in snapshot["recent_orders"]] == [8, 5, 4, 1, 12]
+    assert snapshot["latest_order"]["id"] == 11
+
+
+@pytest.mark.asyncio
+async def test_one_computation_is_shared_by_all_subscribers(engine):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    Session = sessionmaker(bind=engine)
+    poller = SalesSnapshotPoller(tick_seconds=60, min_interval_seconds=0, session_factory=Session)
+    original = realtime_sales.sales_snapshot_poller
+    realtime_sales.sales_snapshot_poller = poller
+    try:
+        clients = [FakeWebSocket() for _ in range(20)]
+        for client in clients:
+            await poller.subscribe(client)
+        await asyncio.sleep(0.01)
+        assert poller.computations == 1
+        assert len(statements) == 3
+        assert all(client.sent[0] is clients[0].sent[0] for client in clients)
+        assert json.loads(clients[0].sent[0])["type"] == "initial_data"
+
+        broken = FakeWebSocket(fail=True)
+        poller.subscribers.add(broken, broken.send_text)
+
+        # 주문 커밋 -> tick 을 기다리지 않고 한 번 재계산해 모두에게 같은 문자열 전송
+        with Session() as db:
+            db.add(Order(id=100, status="paid", total_amount=5000, created_at=TODAY + timedelta(hours=23)))
+            db.commit()
+        for _ in range(20):
+            await asyncio.sleep(0.01)
+            if len(clients[-1].sent) == 2:
+                break
+
+        assert poller.computations == 2
+        update = clients[0].sent[1]
+        assert all(client.sent[1] is update for client in clients)
+        assert json.loads(update)["type"] == "delta"
+        assert json.loads(update)["data"]["latest_order"]["id"] == 100
+        assert broken not in poller.subscribers
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+        await poller.stop()
+        realtime_sales.sales_snapshot_poller = original
+
+
+@pytest.mark.asyncio
+async def test_updates_are_versioned_deltas_and_unchanged_ticks_are_suppressed(engine):
+    Session = sessionmaker(bind=engine)
+    poller = SalesSnapshotPoller(tick_seconds=60, min_interval_seconds=0, session_factory=Session)
+    client = FakeWebSocket()
+    try:
+        await poller.subscribe(client)
+        await asyncio.sleep(0.01)
+        initial = json.loads(client.sent[0])
+        assert initial["type"] == "initial_data"
+        version = initial["version"]
+
+        # 바뀐 것이 없으면 전송하지 않음
+        assert await poller._refresh() is None
+        assert poller.suppressed == 1 and poller.version == version
+
+        with Session() as db:
+            db.add(Order(id=200, order_number="ORD-200", status="paid", total_amount=2500,
+                         created_at=TODAY + timedelta(hours=10, minutes=59)))
+            db.commit()
+        delta_text = (await poller._refresh()).json
+        delta = json.loads(delta_text)
+        assert (delta["type"], delta["version"], delta["base_version"]) == ("delta", version + 1, version)
+        data = delta["data"]
+        assert data["sales_delta"] == 2500
+        assert data["today_sales"] == initial["data"]["today_sales"] + 2500
+        # 주문이 들어온 10시 버킷만 전달
+        assert [h["hour"] for h in data["hourly_data"]] == [10]
+        previous_10 = next(h for h in initial["data"]["hourly_data"] if h["hour"] == 10)
+        assert data["hourly_data"][0]["count"] == previous_10["count"] + 1
+        assert [o["id"] for o in data["new_orders"]] == [200]
+        assert "latest_order" not in data and len(delta_text) < len(client.sent[0])
+
+        # 버전 차이를 발견한 클라이언트는 현재 버전의 전체 스냅샷을 다시 받음
+        poller.resync(client)
+        await asyncio.sleep(0.01)
+        resynced = json.loads(client.sent[-1])
+        assert (resynced["type"], resynced["version"]) == ("initial_data", version + 1)
+    finally:
+        await poller.stop()
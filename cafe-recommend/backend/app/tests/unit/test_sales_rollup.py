@@ -0,0 +1,114 @@
+"""
+시간대별 매출 집계(rollup) 트리거 단위 테스트
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app.api.admin.dashboard import get_order_analytics
+from app.crud.order import order as crud_order
+from app.models.menu import MenuItem
+from app.models.order import Order, OrderItem
+from app.models.sales_rollup import SalesHourlyItem, SalesHourlyOrder
+from app.services.sales_rollup import rebuild_sales_rollups
+
+ROLLUP_TABLES = ("sales_hourly_orders", "sales_hourly_items")
+
+
+@pytest.fixture
+def db(sales_rollup_db):
+    session = sales_rollup_db
+    session.add_all([
+        MenuItem(id=1, name="아메리카노", price=3000, category="coffee"),
+        MenuItem(id=2, name="치즈케이크", price=6000, category="dessert"),
+    ])
+    base = datetime(2025, 6, 1, 9, 0, 0)
+    for i in range(1, 13):
+        session.add(Order(id=i, status="pending", payment_method="kakao" if i % 2 else "naver",
+                          total_amount=9000, created_at=base + timedelta(minutes=20 * i)))
+        session.add(OrderItem(order_id=i, menu_id=1, quantity=1, unit_price=3000, total_price=3000))
+        session.add(OrderItem(order_id=i, menu_id=2, quantity=1, unit_price=6000, total_price=6000))
+    session.commit()
+    return session
+
+
+def snapshot(db):
+    return {
+        table: sorted(tuple(row) for row in db.execute(text(f"SELECT * FROM {table}")))
+        for table in ROLLUP_TABLES
+    }
+
+
+def assert_matches_rebuild(db):
+    """트리거로 유지된 집계가 원본에서 다시 계산한 결과와 같아야 함"""
+    incremental = snapshot(db)
+    rebuild_sales_rollups(db.connection())
+    assert snapshot(db) == incremental
+
+
+def test_insert_triggers_build_hourly_buckets(db):
+    rows = db.query(SalesHourlyOrder).order_by(SalesHourlyOrder.bucket_hour).all()
+    assert sum(r.order_count for r in rows) == 12
+    assert {r.bucket_hour for r in rows} == {
+        "2025-06-01 09:00:00", "2025-06-01 10:00:00", "2025-06-01 11:00:00", "2025-06-01 12:00:00", "2025-06-01 13:00:00"
+    }
+    assert_matches_rebuild(db)
+
+
+def test_status_transitions_move_orders_and_items(db):
+    for order_id in range(1, 7):
+        db.get(Order, order_id).status = "paid"
+    db.commit()
+    db.get(Order, 1).status = "cancelled"
+    db.get(Order, 2).status = "refunded"
+    db.get(Order, 3).payment_method = "card"
+    db.commit()
+
+    statuses = dict(db.execute(text(
+        "SELECT status, sum(order_count) FROM sales_hourly_orders GROUP BY status"
+    )).fetchall())
+    assert statuses == {"pending": 6, "paid": 4, "cancelled": 1, "refunded": 1}
+    cancelled_items = db.query(SalesHourlyItem).filter_by(status="cancelled").all()
+    assert sum(r.quantity for r in cancelled_items) == 2
+    assert_matches_rebuild(db)
+
+
+def test_item_changes_and_deletes_are_reverted(db):
+    db.execute(text("UPDATE order_items SET quantity = 3, total_price = 9000 WHERE order_id = 4 AND menu_id = 1"))
+    db.execute(text("DELETE FROM order_items WHERE order_id = 5"))
+    db.execute(text("DELETE FROM order_items WHERE order_id = 6"))
+    db.execute(text("DELETE FROM orders WHERE id = 6"))
+    db.commit()
+
+    assert_matches_rebuild(db)
+    # 0이 된 집계 행은 남지 않음
+    assert db.execute(text("SELECT count(*) FROM sales_hourly_items WHERE item_count = 0")).scalar() == 0
+
+
+def test_daily_stats_read_rollups(db):
+    db.get(Order, 12).status = "cancelled"
+    db.commit()
+
+    stats = crud_order.get_daily_stats(db, date_from=date(2025, 6, 1), date_to=date(2025, 6, 1))
+    assert stats == [{"date": "2025-06-01", "count": 11, "sales": 99000.0}]
+
+
+@pytest.mark.asyncio
+async def test_order_analytics_from_rollups(db):
+    db.get(Order, 1).status = "cancelled"
+    db.get(Order, 2).status = "completed"
+    db.commit()
+
+    result = await get_order_analytics(start_date="2025-06-01", end_date="2025-06-01", current_admin=None, db=db)
+
+    assert result["summary"]["total_orders"] == 12
+    assert result["summary"]["total_sales"] == 99000.0
+    assert result["cancellation_rate"] == pytest.approx(100 / 12)
+    assert [m["quantity"] for m in result["menu_sales"]] == [11, 11]
+    assert {c["category"]: c["total_sales"] for c in result["category_sales"]} == {
+        "dessert": 66000.0, "coffee": 33000.0
+    }
+    assert sum(h["order_count"] for h in result["hourly_orders"]) == 11
+    assert {p["method"]: p["order_count"] for p in result["payment_method_sales"]} == {"kakao": 5, "naver": 6}
+    assert result["daily_trend"] == [{"date": "2025-06-01", "order_count": 11, "total_amount": 99000.0}]
@@ -0,0 +1,87 @@
+"""
+주문 이벤트 SSE 재연결(Last-Event-ID) 재전송 단위 테스트
+"""
+import json
+
+import pytest
+
+from app.api.admin import realtime
+from app.api.admin.realtime import ConnectionManager, broadcast_order_event, order_event_stream_generator
+from app.core.broadcast import Broadcaster, ReplayBuffer
+
+
+class FakeRequest:
+    client = "test-client"
+
+    async def is_disconnected(self):
+        return False
+
+
+class FakeAdmin:
+    email = "admin@example.com"
+
+
+def frame_payload(frame):
+    """SSE 프레임(bytes 또는 ServerSentEvent) -> (id, JSON data)"""
+    text = frame if isinstance(frame, bytes) else frame.encode()
+    fields = dict(line.split(": ", 1) for line in text.decode().splitlines() if ": " in line)
+    return fields.get("id"), json.loads(fields["data"])
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    manager = ConnectionManager(Broadcaster("ws"), Broadcaster("sse"), ReplayBuffer(capacity=3))
+    monkeypatch.setattr(realtime, "manager", manager)
+    yield manager
+    manager.sse.close_all()
+
+
+async def open_stream(last_event_id=None):
+    stream = order_event_stream_generator(FakeRequest(), FakeAdmin(), last_event_id)
+    return stream, await stream.__anext__()
+
+
+@pytest.mark.asyncio
+async def test_reconnect_replays_missed_events(manager):
+    await broadcast_order_event("new_order", {"id": 1})
+    stream, first = await open_stream()
+    current_id, message = frame_payload(first)
+    assert message["event"] == "connection_established"
+    assert current_id == manager.sse_replay.last_id  # 새 연결도 재연결 기준 ID를 받음
+
+    await broadcast_order_event("new_order", {"id": 2})
+    received_id, message = frame_payload(await stream.__anext__())
+    assert message["data"] == {"id": 2} and message["id"] == received_id
+    await stream.aclose()
+    assert len(manager.sse) == 0
+
+    # 연결이 끊긴 동안의 이벤트는 재연결 시 순서대로 재전송
+    await broadcast_order_event("order_update", {"id": 2, "status": "completed"})
+    await broadcast_order_event("new_order", {"id": 3})
+    stream, first = await open_stream(received_id)
+    assert frame_payload(first)[1]["data"]["replayed"] == 2
+    replayed = [frame_payload(await stream.__anext__())[1] for _ in range(2)]
+    assert [(m["event"], m["data"]["id"]) for m in replayed] == [("order_update", 2), ("new_order", 3)]
+
+    # 재전송 이후의 실시간 이벤트는 중복 없이 이어짐
+    await broadcast_order_event("new_order", {"id": 4})
+    assert frame_payload(await stream.__anext__())[1]["data"] == {"id": 4}
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_gap_outside_buffer_or_unknown_epoch_requests_resync(manager):
+    await broadcast_order_event("new_order", {"id": 1})
+    first_id = manager.sse_replay.last_id
+    for order_id in range(2, 6):  # 버퍼(3개)에서 밀려남
+        await broadcast_order_event("new_order", {"id": order_id})
+
+    for last_event_id in (first_id, "deadbeef-5"):
+        stream, first = await open_stream(last_event_id)
+        resync_id, message = frame_payload(first)
+        assert message["event"] == "resync"
+        assert resync_id == manager.sse_replay.last_id
+        await stream.aclose()
+
+    assert manager.sse_replay.resyncs == 2
+    assert manager.has_clients()  # 방금 끊긴 클라이언트의 재연결을 위해 이벤트를 계속 기록
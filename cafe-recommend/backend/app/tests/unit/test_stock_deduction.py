@@ -0,0 +1,118 @@
+"""
+주문 결제/취소에 따른 재료 재고 일괄 차감/복원 단위 테스트
+"""
+import pytest
+from sqlalchemy import event
+
+from app.core.events import STOCK_CHANGED, event_bus
+from app.crud.order import update_order_status
+from app.models.inventory import Ingredient, IngredientStock, InventoryTransaction, MenuIngredient
+from app.models.menu import MenuItem
+from app.models.order import Order, OrderItem
+from app.services.stock_deduction import ORDER_DEDUCTION, ORDER_RESTORE
+
+
+@pytest.fixture
+def db(db_session):
+    session = db_session
+    # 메뉴 1: 원두 20 + 우유 200 (+ 선택 시럽 10), 메뉴 2: 원두 20
+    for i, name in enumerate(["원두", "우유", "시럽"], start=1):
+        session.add(Ingredient(id=i, name=name, unit="g", min_stock_level=0))
+        session.add(IngredientStock(ingredient_id=i, current_quantity=1000))
+    session.add_all([
+        MenuItem(id=1, name="카페라떼", price=5000, category="커피", is_available=True, is_active=True),
+        MenuItem(id=2, name="아메리카노", price=4500, category="커피", is_available=True, is_active=True),
+        MenuIngredient(menu_id=1, ingredient_id=1, quantity_required=20),
+        MenuIngredient(menu_id=1, ingredient_id=2, quantity_required=200),
+        MenuIngredient(menu_id=1, ingredient_id=3, quantity_required=10, is_optional=True),
+        MenuIngredient(menu_id=2, ingredient_id=1, quantity_required=20),
+    ])
+    session.commit()
+    return session
+
+
+def place_order(db, items, status="pending"):
+    order = Order(status=status, total_amount=0,
+                  order_items=[OrderItem(menu_id=menu_id, quantity=quantity) for menu_id, quantity in items])
+    db.add(order)
+    db.flush()
+    return order
+
+
+def stock(db):
+    db.expire_all()
+    return {s.ingredient_id: s.current_quantity for s in db.query(IngredientStock)}
+
+
+@pytest.fixture
+def stock_events():
+    received = []
+    handler = lambda event: received.append(event)
+    event_bus.subscribe(STOCK_CHANGED, handler)
+    yield received
+    event_bus.unsubscribe(STOCK_CHANGED, handler)
+
+
+def test_paid_deducts_and_cancel_restores_once(db, stock_events):
+    order = place_order(db, [(1, 2), (2, 1)])
+    db.commit()
+    assert stock(db) == {1: 1000, 2: 1000, 3: 1000}  # 결제 전에는 그대로
+
+    order.status = "paid"
+    db.commit()
+    assert stock(db) == {1: 940, 2: 600, 3: 1000}  # 선택 재료 제외
+    rows = db.query(InventoryTransaction).filter(InventoryTransaction.order_id == order.id).all()
+    assert sorted((r.ingredient_id, r.transaction_type, r.quantity) for r in rows) == [
+        (1, ORDER_DEDUCTION, -60), (2, ORDER_DEDUCTION, -400)]
+    assert stock_events[-1]["data"]["ingredient_ids"] == [1, 2]
+
+    order.status = "preparing"
+    db.commit()
+    order.status = "paid"  # 중복 결제 콜백
+    db.commit()
+    assert stock(db) == {1: 940, 2: 600, 3: 1000}
+
+    # 레시피가 바뀌어도 복원은 실제로 뺀 양만큼
+    db.query(MenuIngredient).filter(MenuIngredient.menu_id == 1, MenuIngredient.ingredient_id == 2).one().quantity_required = 50
+    order.status = "CANCELLED"
+    db.commit()
+    assert stock(db) == {1: 1000, 2: 1000, 3: 1000}
+    order.status = "refunded"
+    order.is_refunded = True
+    db.commit()
+    assert stock(db) == {1: 1000, 2: 1000, 3: 1000}
+    assert db.query(InventoryTransaction).filter(InventoryTransaction.transaction_type == ORDER_RESTORE).count() == 2
+
+
+def test_many_paid_orders_are_applied_in_one_batch(db):
+    orders = [place_order(db, [(1, 1), (2, 2)]) for _ in range(50)]
+    db.commit()
+
+    statements = []
+    listener = lambda conn, cursor, statement, params, context, executemany: statements.append(statement)
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        # writer 큐처럼 주문마다 세이브포인트, 커밋은 한 번
+        for order in orders:
+            with db.begin_nested():
+                order.status = "paid"
+        db.commit()
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    assert stock(db) == {1: 1000 - 50 * 60, 2: 1000 - 50 * 200, 3: 1000}
+    inserts = [s for s in statements if s.startswith("INSERT INTO inventory_transactions")]
+    stock_updates = [s for s in statements if s.startswith("UPDATE ingredient_stocks")]
+    # 주문 상태 1회 + 반영된 변동 1회 + 소비량 1회 + 재고 기준선 확인 1회 (만료된 주문 객체 재로딩 제외)
+    batch_selects = [s for s in statements if s.startswith("SELECT") and " IN (" in s]
+    assert len(inserts) == 1 and len(stock_updates) == 1 and len(batch_selects) == 4
+    assert db.query(InventoryTransaction).count() == 100  # 주문 x 재료
+
+
+def test_raw_sql_status_change_is_tracked(db):
+    order = place_order(db, [(2, 3)])
+    db.commit()
+    update_order_status(db, order.id, "paid")
+    assert stock(db)[1] == 940
+    update_order_status(db, order.id, "cancelled")
+    assert stock(db)[1] == 1000
@@ -0,0 +1,130 @@
+"""
+재료 소진 예측(요일/시간대 계절성)과 동적 발주점, 증분 갱신 캐시 단위 테스트
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.core.events import STOCK_CHANGED, event_bus
+from app.models.inventory import Ingredient, IngredientStock, InventoryTransaction, MenuIngredient
+from app.models.menu import MenuItem
+from app.models.order import Order, OrderItem
+from app.services import stock_forecast
+from app.services.stock_forecast import LOCAL_OFFSET, StockForecaster, _compute_numpy, _compute_python
+
+# 2025-06-09 (월) 07:00 KST
+NOW = datetime(2025, 6, 9, 7, 0)
+
+
+@pytest.fixture
+def db(db_session):
+    session = db_session
+    for i, name in enumerate(["원두", "우유"], start=1):
+        session.add(Ingredient(id=i, name=name, unit="g", min_stock_level=10))
+        session.add(IngredientStock(ingredient_id=i, current_quantity=100))
+    session.add(MenuItem(id=1, name="카페라떼", price=5000, category="커피", is_available=True, is_active=True))
+    session.add(MenuIngredient(menu_id=1, ingredient_id=2, quantity_required=5))
+    session.commit()
+    return session
+
+
+@pytest.fixture
+def forecaster():
+    return StockForecaster(history_days=28, horizon_days=7, clock=lambda: NOW)
+
+
+def add_usage(db, ingredient_id, local_at, quantity):
+    """로컬(KST) 시각의 출고 기록 (트랜잭션은 UTC 로 저장)"""
+    db.add(InventoryTransaction(ingredient_id=ingredient_id, transaction_type="출고",
+                                quantity=quantity, created_at=local_at - LOCAL_OFFSET))
+
+
+def test_seasonal_stockout_and_reorder_point(db, forecaster):
+    # 원두: 매일 08~19시에 시간당 10 소비, 밤에는 소비 없음
+    for day in range(1, 29):
+        for hour in range(8, 20):
+            add_usage(db, 1, NOW - timedelta(days=day) + timedelta(hours=hour - 7, minutes=15), 10)
+    # 우유: 원장 차감 이전의 결제 주문 (매일 12시 라떼 4잔 = 20) + 취소 주문은 제외
+    orders, items = Order.__table__, OrderItem.__table__
+    for day in range(1, 29):
+        for order_id, status in ((day * 2, "completed"), (day * 2 + 1, "cancelled")):
+            db.execute(orders.insert().values(id=order_id, status=status, total_amount=0, is_refunded=False,
+                                              created_at=NOW - timedelta(days=day) + timedelta(hours=5)))
+            db.execute(items.insert().values(order_id=order_id, menu_id=1, quantity=4))
+    db.commit()
+
+    result = forecaster.forecast(db)
+    beans, milk = result[1], result[2]
+    assert beans["daily_consumption"] == pytest.approx(120)
+    assert beans["hourly_rate_now"] == pytest.approx(0)  # 새벽 7시에는 소비 없음
+    # 08시부터 시간당 10 -> 재고 100 은 18시에 소진 (11시간 후)
+    assert beans["hours_until_stockout"] == pytest.approx(11)
+    assert beans["predicted_stockout_at"] == datetime(2025, 6, 9, 18, 0)
+    # 리드타임 2일 소비량 240, 매일 같으므로 안전 재고 0
+    assert beans["safety_stock"] == pytest.approx(0)
+    assert beans["reorder_point"] == pytest.approx(240) and beans["needs_reorder"]
+
+    assert milk["daily_consumption"] == pytest.approx(20)
+    # 매일 12시대에 20씩 -> 5일째 12시대가 끝날 때 소진
+    assert milk["predicted_stockout_at"] == datetime(2025, 6, 13, 13, 0)
+    assert milk["reorder_point"] == pytest.approx(40) and not milk["needs_reorder"]
+
+
+def test_numpy_and_python_paths_agree():
+    if stock_forecast.np is None:
+        pytest.skip("NumPy 미설치")
+    rng = random.Random(5)
+    hours = 28 * 24
+    start = stock_forecast.hour_id(NOW) - hours
+    cells = [(rng.randint(1, 20), rng.randrange(hours), float(rng.randint(1, 30))) for _ in range(3000)]
+
+    class Row:
+        def __init__(self, i):
+            self.id, self.name, self.unit, self.min_stock_level = i, f"재료{i}", "g", 10
+            self.current_quantity = [0, 50, 400, 5000][i % 4]
+
+    rows = [Row(i) for i in range(1, 22)]  # 21번은 이력 없음
+    now = NOW + timedelta(minutes=25)
+    params = {"horizon_hours": 7 * 24, "lead_hours": 48, "lead_days": 2.0, "z": 1.65}
+    fast = _compute_numpy((start, hours, cells), rows, now, params)
+    slow = _compute_python((start, hours, cells), rows, now, params)
+    assert fast.keys() == slow.keys()
+    for i in fast:
+        for key, value in fast[i].items():
+            if isinstance(value, float):
+                assert value == pytest.approx(slow[i][key], abs=1e-3), (i, key)
+            else:
+                assert value == slow[i][key], (i, key)
+
+
+def test_cached_until_stock_changes_then_refreshes_incrementally(db, forecaster):
+    for day in range(1, 8):
+        add_usage(db, 1, NOW - timedelta(days=day), 24)
+    db.commit()
+    handler = lambda event: forecaster.invalidate()
+    event_bus.subscribe(STOCK_CHANGED, handler)
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        first = forecaster.forecast(db)
+        assert forecaster.forecast(db) is first  # 변경이 없으면 쿼리 없이 캐시 반환
+        loaded = len(statements)
+
+        # 새 트랜잭션 -> stock.changed -> 마지막 ID 이후만 읽어 이력에 더함
+        add_usage(db, 1, NOW - timedelta(hours=2), 48)
+        db.commit()
+        event_bus.publish(STOCK_CHANGED, {"ingredient_ids": [1]})
+        second = forecaster.forecast(db)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+        event_bus.unsubscribe(STOCK_CHANGED, handler)
+
+    assert forecaster.loads == 1 and forecaster.refreshes == 1 and forecaster.computes == 2
+    refresh = [s for s in statements[loaded:] if s.startswith("SELECT") and "inventory_transactions" in s]
+    assert len(refresh) == 1 and "inventory_transactions.id >" in refresh[0]
+    assert first[1]["daily_consumption"] == pytest.approx(24 * 7 / 28, abs=1e-3)
+    assert second[1]["daily_consumption"] == pytest.approx((24 * 7 + 48) / 28, abs=1e-3)
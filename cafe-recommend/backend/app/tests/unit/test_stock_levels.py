@@ -0,0 +1,92 @@
+"""
+재고 상태 구간(재고 없음/부족/충분) 한 번 조회와 재고 변경 시 기준선 통과 알림 단위 테스트
+"""
+import pytest
+from sqlalchemy import event
+
+from app.core.events import STOCK_LOW, event_bus
+from app.models.inventory import Ingredient, IngredientStock, MenuIngredient
+from app.models.menu import MenuItem
+from app.models.order import Order, OrderItem
+from app.services import inventory_events  # noqa: F401 (재고 ORM 변경 훅 등록)
+from app.services.stock_levels import LOW, OK, OUT, stock_levels, stock_overview
+
+
+@pytest.fixture
+def db(db_session):
+    session = db_session
+    # 1: 충분, 2: 부족, 3: 0 (재고 없음), 4: 재고 행 없음, 5: 비활성
+    for i, quantity in enumerate([500, 50, 0, None, 10], start=1):
+        session.add(Ingredient(id=i, name=f"재료{i}", unit="g", min_stock_level=100, is_active=i != 5))
+        if quantity is not None:
+            session.add(IngredientStock(ingredient_id=i, current_quantity=quantity))
+    session.add(MenuItem(id=1, name="아메리카노", price=4500, category="커피", is_available=True, is_active=True))
+    session.add(MenuIngredient(menu_id=1, ingredient_id=1, quantity_required=150))
+    session.commit()
+    return session
+
+
+@pytest.fixture
+def low_events():
+    received = []
+    handler = lambda event: received.append(event["data"])
+    event_bus.subscribe(STOCK_LOW, handler)
+    yield received
+    event_bus.unsubscribe(STOCK_LOW, handler)
+
+
+def test_overview_buckets_in_one_query(db):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        overview = stock_overview(db)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    assert len(statements) == 1
+    assert overview["total"] == 4
+    assert overview["counts"] == {OUT: 2, LOW: 1, OK: 1}
+    assert overview["total_quantity"] == 550
+    assert [(row["id"], row["status"]) for row in overview["alerts"]] == [(2, LOW), (3, OUT), (4, OUT)]
+    assert [row["id"] for row in stock_levels(db, {OUT})] == [3, 4]
+
+
+def test_stock_low_staged_only_when_status_worsens(db, low_events):
+    stock = db.query(IngredientStock).filter(IngredientStock.ingredient_id == 1).one()
+    stock.current_quantity = 80  # 충분 -> 부족
+    db.flush()
+    assert low_events == []  # 커밋 전에는 발행하지 않음
+    db.commit()
+    assert [(e["ingredient_id"], e["previous_status"], e["status"], e["severity"]) for e in low_events] == [
+        (1, OK, LOW, "medium")]
+
+    stock.current_quantity = 60  # 부족 -> 부족: 알림 없음
+    db.commit()
+    stock.current_quantity = 300  # 회복: 알림 없음
+    db.commit()
+    stock.current_quantity = 0  # 충분 -> 재고 없음
+    db.commit()
+    stock.current_quantity = 90
+    db.rollback()  # 롤백된 변경은 알림 없음
+    assert [(e["previous_status"], e["status"], e["severity"]) for e in low_events[1:]] == [(OK, OUT, "high")]
+
+
+def test_order_deduction_crossing_threshold_emits_stock_low(db, low_events):
+    for status in ("pending", "pending"):
+        db.add(Order(status=status, total_amount=0, order_items=[OrderItem(menu_id=1, quantity=1)]))
+    db.commit()
+    first, second = db.query(Order).order_by(Order.id).all()
+
+    first.status = "paid"  # 500 -> 350: 충분 유지
+    db.commit()
+    assert low_events == []
+    second.status = "paid"  # 350 -> 200: 충분 유지
+    db.commit()
+    assert low_events == []
+
+    db.query(IngredientStock).filter(IngredientStock.ingredient_id == 1).one().current_quantity = 200
+    db.add(Order(status="paid", total_amount=0, order_items=[OrderItem(menu_id=1, quantity=1)]))
+    db.commit()  # 200 -> 50: 부족
+    assert [(e["ingredient_id"], e["previous_quantity"], e["current_quantity"], e["status"]) for e in low_events] == [
+        (1, 200, 50, LOW)]
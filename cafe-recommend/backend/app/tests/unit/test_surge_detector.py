@@ -0,0 +1,139 @@
+"""
+주문 급증/이상 패턴 스트리밍 감지기 단위 테스트
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.order import Order
+from app.services.surge_detector import OrderSurgeDetector, surge_detector
+
+BASE = datetime(2025, 6, 2, 9, 0, 0)  # 월요일 09:00
+
+
+def make_detector(**kwargs):
+    return OrderSurgeDetector(clock=lambda: BASE, **kwargs)
+
+
+def test_sliding_window_counts_move_with_time():
+    detector = make_detector(window_minutes=10, surge_min_orders=1000)
+    for minute in range(25):
+        detector.record(BASE + timedelta(minutes=minute, seconds=30))
+
+    state = detector.snapshot(BASE + timedelta(minutes=24))
+    assert (state["recent_order_count"], state["previous_order_count"]) == (10, 10)
+
+    state = detector.snapshot(BASE + timedelta(minutes=30))
+    assert (state["recent_order_count"], state["previous_order_count"]) == (4, 10)
+
+    state = detector.snapshot(BASE + timedelta(hours=3))
+    assert (state["recent_order_count"], state["previous_order_count"]) == (0, 0)
+    assert state["current_hour_order_count"] == 0
+
+
+def test_late_event_inside_window_is_counted():
+    detector = make_detector(window_minutes=10)
+    detector.record(BASE + timedelta(minutes=15))
+    detector.record(BASE + timedelta(minutes=3))  # 이전 구간
+    detector.record(BASE - timedelta(hours=1))  # 윈도우 밖
+    state = detector.snapshot(BASE + timedelta(minutes=15))
+    assert (state["recent_order_count"], state["previous_order_count"]) == (1, 1)
+    assert state["events"] == 2
+
+
+@pytest.mark.asyncio
+async def test_surge_is_pushed_once_when_threshold_is_crossed():
+    detector = make_detector(window_minutes=10, surge_min_orders=5, surge_ratio=1.5)
+    received = []
+
+    async def listener(notification):
+        received.append(notification)
+
+    detector.add_listener(listener)
+    # 평소: 2분에 1건
+    for minute in range(0, 60, 2):
+        detector.record(BASE + timedelta(minutes=minute))
+    await asyncio.sleep(0)
+    assert received == []
+
+    # 급증: 1분에 3건
+    for minute in range(60, 70):
+        for _ in range(3):
+            detector.record(BASE + timedelta(minutes=minute))
+    await asyncio.sleep(0)
+    surges = [n for n in received if n["type"] == "order_surge"]
+    assert len(surges) == 1
+    assert surges[0]["is_surge"] is True
+    assert detector.snapshot(BASE + timedelta(minutes=69))["is_surge"] is True
+
+    # 주문이 끊기면 해제 알림
+    detector.tick(BASE + timedelta(minutes=90))
+    await asyncio.sleep(0)
+    surges = [n for n in received if n["type"] == "order_surge"]
+    assert [n["is_surge"] for n in surges] == [True, False]
+
+
+@pytest.mark.asyncio
+async def test_seasonal_baseline_flags_high_and_low_hours():
+    detector = make_detector(window_minutes=10, surge_min_orders=10 ** 6, min_seasonal_samples=3)
+    received = []
+
+    async def listener(notification):
+        received.append(notification)
+
+    detector.add_listener(listener)
+    # 3주 동안 월요일 09시에는 10건씩 주문
+    for week in range(3):
+        hour = BASE + timedelta(weeks=week)
+        for i in range(10):
+            detector.record(hour + timedelta(minutes=5 * i))
+        detector.tick(hour + timedelta(hours=1))
+
+    week4 = BASE + timedelta(weeks=3)
+    state = detector.snapshot(week4)
+    assert state["expected_hour_order_count"] == pytest.approx(10.0)
+
+    # 4주차 같은 시간대에 주문이 없으면 시간이 닫힐 때 '낮음'
+    detector.tick(week4 + timedelta(hours=1))
+    await asyncio.sleep(0)
+    anomalies = [(n["direction"], n["is_anomaly"]) for n in received if n["type"] == "order_anomaly"]
+    assert anomalies == [("low", True)]
+
+    # 5주차에는 주문이 몰리는 즉시 '높음'
+    week5 = BASE + timedelta(weeks=4)
+    for i in range(30):
+        detector.record(week5 + timedelta(minutes=i))
+    await asyncio.sleep(0)
+    assert detector.snapshot(week5 + timedelta(minutes=30))["anomaly"] == "high"
+    anomalies = [(n["direction"], n["is_anomaly"]) for n in received if n["type"] == "order_anomaly"]
+    assert anomalies[-1] == ("high", True)
+
+
+def test_committed_orders_feed_detector_and_warm_up(sales_rollup_db):
+    session = sales_rollup_db
+
+    original_clock = surge_detector.clock
+    surge_detector.clock = lambda: BASE + timedelta(minutes=5)
+    surge_detector._reset_state()
+    try:
+        before = surge_detector.snapshot()["events"]
+        session.add_all([Order(id=i, status="paid", total_amount=1000, created_at=BASE + timedelta(minutes=i))
+                         for i in range(1, 4)])
+        session.flush()
+        session.rollback()
+        assert surge_detector.snapshot()["events"] == before
+
+        session.add_all([Order(id=i, status="paid", total_amount=1000, created_at=BASE + timedelta(minutes=i))
+                         for i in range(1, 4)])
+        session.commit()
+        assert surge_detector.snapshot()["events"] == before + 3
+
+        detector = make_detector(window_minutes=10)
+        detector.warm_up(session, weeks=1, now=BASE + timedelta(minutes=5))
+        state = detector.snapshot(BASE + timedelta(minutes=5))
+        assert state["recent_order_count"] == 3
+        assert state["current_hour_order_count"] == 3
+    finally:
+        surge_detector.clock = original_clock
+        surge_detector._reset_state()
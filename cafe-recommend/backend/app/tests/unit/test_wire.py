@@ -0,0 +1,71 @@
+"""
+관리자 실시간 WebSocket 메시지 인코딩(JSON/MessagePack) 단위 테스트
+"""
+import json
+
+import pytest
+
+from app.core import wire
+from app.core.wire import JSON, MSGPACK, WireMessage, decode_msgpack, message_sender, negotiate_encoding
+
+ORDER_EVENT = {
+    "type": "order_update",
+    "data": {
+        "id": 42,
+        "order_number": "ORD-20250602-0042",
+        "total_amount": 13500.0,
+        "status": "paid",
+        "created_at": "2025-06-02T09:30:00",
+        "items": [{"id": 1, "menu_id": 3, "menu_name": "아메리카노", "quantity": 3, "unit_price": 4500.0}],
+        "custom_note": "키 테이블에 없는 필드",
+    },
+    "timestamp": "2025-06-02T09:30:01",
+}
+
+
+class FakeWebSocket:
+    def __init__(self, subprotocols=(), query=None):
+        self.scope = {"subprotocols": list(subprotocols)}
+        self.query_params = query or {}
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+    async def send_bytes(self, data):
+        self.sent.append(data)
+
+
+def test_msgpack_round_trip_is_smaller_than_json():
+    message = WireMessage(ORDER_EVENT)
+    decoded = decode_msgpack(message.msgpack)
+    assert decoded == json.loads(message.json)  # 13500.0 == 13500
+    assert decoded["data"]["custom_note"] == "키 테이블에 없는 필드"
+    assert len(message.msgpack) < len(message.json.encode()) * 0.6
+
+
+def test_negotiation_prefers_subprotocol_then_query():
+    assert negotiate_encoding(FakeWebSocket(["cafe.msgpack.v1", "cafe.json.v1"])) == (MSGPACK, "cafe.msgpack.v1")
+    assert negotiate_encoding(FakeWebSocket(["cafe.json.v1"])) == (JSON, "cafe.json.v1")
+    assert negotiate_encoding(FakeWebSocket(query={"encoding": "msgpack"})) == (MSGPACK, None)
+    assert negotiate_encoding(FakeWebSocket(["unknown"])) == (JSON, None)
+
+
+def test_negotiation_falls_back_to_json_without_msgpack(monkeypatch):
+    monkeypatch.setattr(wire, "msgpack", None)
+    assert negotiate_encoding(FakeWebSocket(["cafe.msgpack.v1"], {"encoding": "msgpack"})) == (JSON, None)
+
+
+@pytest.mark.asyncio
+async def test_each_encoding_is_computed_once_and_shared():
+    message = WireMessage(ORDER_EVENT)
+    json_clients = [FakeWebSocket() for _ in range(3)]
+    msgpack_clients = [FakeWebSocket() for _ in range(3)]
+    for client in json_clients:
+        await message_sender(client, JSON)(message)
+    for client in msgpack_clients:
+        await message_sender(client, MSGPACK)(message)
+
+    assert all(client.sent[0] is json_clients[0].sent[0] for client in json_clients)
+    assert all(client.sent[0] is msgpack_clients[0].sent[0] for client in msgpack_clients)
+    assert isinstance(json_clients[0].sent[0], str) and isinstance(msgpack_clients[0].sent[0], bytes)
@@ -66,6 +66,8 @@ export default function AdminOrdersPage() {
 
   // SSE 연결 상태 참조
   const eventSourceRef = useRef<EventSource | null>(null);
+  // SSE 재연결 시 놓친 이벤트를 서버가 재전송할 수 없으면(resync) 주문 목록 다시 조회
+  const resyncOrdersRef = useRef<() => void>(() => {});
 
   // 날짜를 YYYY-MM-DD 형식으로 변환하는 함수
   const formatDateString = (date: Date): string => {
@@ -169,6 +171,10 @@ export default function AdminOrdersPage() {
       try {
         const parsedData = JSON.parse(event.data);
         if (parsedData.event === 'connection_established' || parsedData.event === 'heartbeat') return;
+        if (parsedData.event === 'resync') {
+          resyncOrdersRef.current();
+          return;
+        }
 
         const orderEventData = parsedData.data;
         if (!orderEventData || !orderEventData.id) return;
@@ -395,6 +401,10 @@ export default function AdminOrdersPage() {
 
   const handleFocus = useCallback(() => fetchOrders(selectedDate), [fetchOrders, selectedDate]);
 
+  useEffect(() => {
+    resyncOrdersRef.current = () => fetchOrders(selectedDate, statusFilter);
+  }, [fetchOrders, selectedDate, statusFilter]);
+
   useEffect(() => {
     document.addEventListener('visibilitychange', handleVisibilityChange);
     window.addEventListener('focus', handleFocus);
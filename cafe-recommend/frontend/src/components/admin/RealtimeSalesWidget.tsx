@@ -9,8 +9,15 @@ import { ko } from 'date-fns/locale';
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://116.124.191.174:15030';
 
+interface HourlyBucket {
+  hour: number;
+  count: number;
+  amount: number;
+}
+
 interface RealtimeSalesData {
   today_sales: number;
+  hourly_data?: HourlyBucket[];
   current_hour: {
     hour: number;
     count: number;
@@ -51,6 +58,8 @@ export default function RealtimeSalesWidget({ className }: RealtimeSalesWidgetPr
   const [lastUpdate, setLastUpdate] = useState<Date | null>(null);
   const [error, setError] = useState<string | null>(null);
   const wsRef = useRef<WebSocket | null>(null);
+  // 마지막으로 반영한 스냅샷 버전 (delta 의 base_version 과 비교, null 이면 initial_data 대기 중)
+  const versionRef = useRef<number | null>(null);
 
   // 마지막 시간대 매출 데이터 저장 (변화 감지용)
   const lastHourlyDataRef = useRef<{
@@ -149,6 +158,7 @@ export default function RealtimeSalesWidget({ className }: RealtimeSalesWidgetPr
             // 상태 업데이트 로직
             if (message.type === 'initial_data') {
               console.log('Setting initial_data to salesData:', JSON.stringify(finalDataToSet, null, 2));
+              versionRef.current = message.version ?? null;
               setSalesData(finalDataToSet as RealtimeSalesData);
               setLastUpdate(new Date());
               
@@ -164,6 +174,33 @@ export default function RealtimeSalesWidget({ className }: RealtimeSalesWidgetPr
               setSalesData(finalDataToSet as RealtimeSalesData);
               setLastUpdate(new Date());
             }
+            else if (message.type === 'delta') {
+              // 중간 메시지를 놓쳤으면(버전이 이어지지 않음) 전체 스냅샷 재요청
+              if (versionRef.current === null) return;
+              if (message.base_version !== versionRef.current) {
+                versionRef.current = null;
+                ws.send(JSON.stringify({ type: 'resync' }));
+                return;
+              }
+              versionRef.current = message.version;
+              const delta = dataFromBackend;
+              setSalesData(prev => {
+                if (!prev) return prev;
+                const hourly = new Map<number, HourlyBucket>((prev.hourly_data || []).map(h => [h.hour, h]));
+                (delta.hourly_data || []).forEach((h: HourlyBucket) => {
+                  if (h.count === 0 && h.amount === 0) hourly.delete(h.hour);
+                  else hourly.set(h.hour, h);
+                });
+                return {
+                  ...prev,
+                  today_sales: delta.today_sales,
+                  hourly_data: Array.from(hourly.values()).sort((a, b) => a.hour - b.hour),
+                  latest_order: delta.latest_order ?? prev.latest_order,
+                  timestamp: delta.timestamp,
+                };
+              });
+              setLastUpdate(new Date());
+            }
             else if (message.type === 'order_event' || message.type === 'order_update') {
               if (processedLatestOrderForState) {
                 console.log(`Reflecting ${message.type} in salesData.latest_order:`, JSON.stringify(processedLatestOrderForState, null, 2));
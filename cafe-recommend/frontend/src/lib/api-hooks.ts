@@ -3,7 +3,7 @@
  */
 
 import { useState, useEffect, useCallback, useRef } from 'react';
-import apiClient, { ApiError } from './api-client';
+import apiClient, { API_BASE_URL, ApiError } from './api-client';
 
 // 데이터 가져오기 상태
 interface FetchState<T> {
@@ -227,19 +227,32 @@ interface OrderStatus {
   order_id: number;
   status: string;
   description: string;
-  updated_at: string;
+  updated_at: string | null;
+  version: number;
 }
 
+// long-poll 한 번의 최대 대기 시간 (초, 서버 ORDER_STATUS_LONG_POLL_SECONDS 이하)
+const ORDER_STATUS_WAIT_SECONDS = 25;
+
 /**
  * 주문 상태를 실시간으로 업데이트하는 훅
+ *
+ * 세션 주문 상태 SSE(/orders/events)로 상태 변경을 받고, EventSource 를 쓸 수 없거나
+ * 연결이 끊기면 long-poll(/orders/{id}/status/wait)로 대체합니다.
  * @param orderId 주문 ID
- * @param pollingInterval 갱신 주기 (밀리초, 기본값 3000ms)
+ * @param retryInterval long-poll 오류 시 재시도 간격 (밀리초, 기본값 3000ms)
  */
-export function useOrderStatus(orderId: number | null, pollingInterval = 3000) {
+export function useOrderStatus(orderId: number | null, retryInterval = 3000) {
   const [status, setStatus] = useState<OrderStatus | null>(null);
   const [loading, setLoading] = useState<boolean>(false);
   const [error, setError] = useState<Error | null>(null);
-  const intervalRef = useRef<NodeJS.Timeout | null>(null);
+  const versionRef = useRef<number>(0);
+
+  const applyStatus = useCallback((next: OrderStatus) => {
+    if (next.version < versionRef.current) return;
+    versionRef.current = next.version;
+    setStatus(next);
+  }, []);
 
   const fetchStatus = useCallback(async () => {
     if (!orderId) return;
@@ -251,31 +264,75 @@ export function useOrderStatus(orderId: number | null, pollingInterval = 3000) {
       const response = await apiClient.get<OrderStatus>(`/orders/${orderId}/status`, {
         useCache: false // 실시간 데이터를 위해 캐시 사용 안 함
       });
-      setStatus(response);
+      applyStatus(response);
     } catch (error) {
       setError(error instanceof Error ? error : new Error('주문 상태를 불러올 수 없습니다.'));
     } finally {
       setLoading(false);
     }
-  }, [orderId]);
+  }, [orderId, applyStatus]);
 
-  // 컴포넌트 마운트 시 첫 번째 요청 및 폴링 설정
   useEffect(() => {
     if (!orderId) return;
 
-    // 초기 요청
+    let stopped = false;
+    let eventSource: EventSource | null = null;
+    let retryTimer: NodeJS.Timeout | null = null;
+    const abort = new AbortController();
+    versionRef.current = 0;
+
+    // 상태가 바뀔 때까지 서버에서 대기 (204 = 변경 없음)
+    const longPoll = async () => {
+      while (!stopped) {
+        try {
+          const response = await fetch(
+            `${API_BASE_URL}/orders/${orderId}/status/wait?since=${versionRef.current}&timeout=${ORDER_STATUS_WAIT_SECONDS}`,
+            { credentials: 'include', signal: abort.signal }
+          );
+          if (response.status === 200) {
+            applyStatus(await response.json());
+          } else if (response.status !== 204) {
+            throw new ApiError(`API 요청 실패: ${response.status} ${response.statusText}`, response.status);
+          }
+        } catch (error) {
+          if (stopped) return;
+          setError(error instanceof Error ? error : new Error('주문 상태를 불러올 수 없습니다.'));
+          await new Promise<void>((resolve) => { retryTimer = setTimeout(resolve, retryInterval); });
+        }
+      }
+    };
+
     fetchStatus();
 
-    // 폴링 설정
-    intervalRef.current = setInterval(fetchStatus, pollingInterval);
+    if (typeof EventSource === 'undefined') {
+      longPoll();
+    } else {
+      eventSource = new EventSource(`${API_BASE_URL}/orders/events`, { withCredentials: true });
+      eventSource.onmessage = (event) => {
+        const message = JSON.parse(event.data);
+        if (message.type === 'snapshot') {
+          const current = message.data.find((item: OrderStatus) => item.order_id === orderId);
+          if (current) applyStatus(current);
+        } else if (message.type === 'order_status' && message.data.order_id === orderId) {
+          applyStatus(message.data);
+        }
+      };
+      eventSource.onerror = () => {
+        // 연결 자체를 열 수 없으면 long-poll 로 전환 (일시적 끊김은 EventSource 가 재연결)
+        if (eventSource && eventSource.readyState === EventSource.CLOSED) {
+          eventSource = null;
+          longPoll();
+        }
+      };
+    }
 
-    // 컴포넌트 언마운트 시 폴링 중지
     return () => {
-      if (intervalRef.current) {
-        clearInterval(intervalRef.current);
-      }
+      stopped = true;
+      abort.abort();
+      eventSource?.close();
+      if (retryTimer) clearTimeout(retryTimer);
     };
-  }, [orderId, pollingInterval, fetchStatus]);
+  }, [orderId, retryInterval, fetchStatus, applyStatus]);
 
   // 주문 상태 수동 갱신 함수
   const refetch = useCallback(() => {
@@ -283,4 +340,4 @@ export function useOrderStatus(orderId: number | null, pollingInterval = 3000) {
   }, [fetchStatus]);
 
   return { status, loading, error, refetch };
-} 
\ No newline at end of file
+}
@@ -66,6 +66,7 @@ fi
 # FastAPI 서버 시작
 echo "포트 $PORT에서 Backend 서버를 시작합니다. 로그 파일: ${LOG_FILE}, 에러 로그: ${ERROR_LOG_FILE}"
 cd "$BACKEND_DIR" # uvicorn 실행 전에 BACKEND_DIR로 이동
-nohup uvicorn app.main:app --host 0.0.0.0 --port $PORT --log-level debug --reload > "${LOG_FILE}" 2> "${ERROR_LOG_FILE}" &
+# 관리자 실시간 WebSocket 은 클라이언트가 지원하면 permessage-deflate 로 압축
+nohup uvicorn app.main:app --host 0.0.0.0 --port $PORT --log-level debug --reload --ws websockets --ws-per-message-deflate true > "${LOG_FILE}" 2> "${ERROR_LOG_FILE}" &
 
 echo "백엔드 서버가 백그라운드에서 시작되었습니다. PID: $!" 
\ No newline at end of file